@@ -0,0 +1,231 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import asyncio
+import atexit
+import functools
+import itertools
+import time
+try:
+    import pythoncom  # type: ignore
+except ImportError:  # pywin32 is only available on Windows
+    pythoncom = None
+from Core.Framework import Session
+from Flow.Data import Case
+from Logging.Logging import Logger
+
+
+_worker_numbers = itertools.count()
+
+
+def _co_initialize() -> None:
+    if pythoncom is not None:
+        pythoncom.CoInitialize()
+
+
+def _co_uninitialize() -> None:
+    if pythoncom is not None:
+        pythoncom.CoUninitialize()
+
+
+class ComWorker:
+    """
+    Single thread executing calls in submission order, COM is initialized on the thread as a
+    single-threaded apartment. Every COM object of a SAP GUI session must be created and used
+    on the same ComWorker.
+
+    Keyword Arguments:
+        name {Optional[str]} -- Thread name (default: {None})
+    """
+    def __init__(self, name: Optional[str] = None) -> None:
+        self.name: str = name if name is not None else f"ComWorker-{next(_worker_numbers)}"
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name, initializer=_co_initialize)
+        self.calls: int = 0
+
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) on the worker thread and await its result.
+        """
+        self.calls += 1
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def shutdown(self) -> None:
+        """
+        Uninitialize COM on the worker thread and stop it after the pending calls.
+        """
+        await self.call(_co_uninitialize)
+        self.executor.shutdown(wait=False)
+
+
+class AsyncSession:
+    """
+    asyncio facade over a Session. Every call into the Session runs on the session's own ComWorker thread,
+    the event loop is never blocked, so one process can drive several SAP GUI sessions, web sessions and
+    other coroutines at the same time.
+
+    Public Session methods are available as coroutines with the same arguments, e.g. await sap.set_text(id, text).
+    Waits (wait, wait_until_ready, wait_for_element & web_wait_for_element) are asyncio timers between checks
+    made on the worker instead of sleeps. Other attributes are read from the Session directly.
+
+    Arguments:
+        session {Session} -- Session created on worker
+        worker {ComWorker} -- Worker thread owning the session's COM objects
+    """
+    def __init__(self, session: Session, worker: ComWorker) -> None:
+        self.session: Session = session
+        self.worker: ComWorker = worker
+        self.__actions: dict[str, Callable] = {}
+
+    @staticmethod
+    async def create(case: Optional[Case] = None, sap_gui: Optional[Any] = None, name: Optional[str] = None,
+                     sap_gui_factory: Optional[Callable[[], Any]] = None) -> "AsyncSession":
+        """
+        Create a Session on a new ComWorker thread.
+
+        Keyword Arguments:
+            case {Optional[Case]} -- Case of the session, default Case() (default: {None})
+            sap_gui {Optional[Any]} -- SAP GUI scripting object passed to Session as is (default: {None})
+            name {Optional[str]} -- Worker thread name (default: {None})
+            sap_gui_factory {Optional[Callable[[], Any]]} -- Called without arguments on the worker to create the SAP GUI scripting object, e.g. Core.Simulator.SapGuiAutomation (default: {None})
+
+        Raises:
+            ValueError -- If both sap_gui and sap_gui_factory are given
+
+        Returns:
+            AsyncSession -- The new session, close it with await close() or use it as async context manager
+        """
+        if sap_gui is not None and sap_gui_factory is not None:
+            raise ValueError("Pass either sap_gui or sap_gui_factory, not both")
+        __worker = ComWorker(name=name)
+        __session = await __worker.call(_new_session, case, sap_gui, sap_gui_factory)
+        return AsyncSession(__session, __worker)
+
+    def __getattr__(self, name: str) -> Any:
+        __attr = getattr(self.session, name)
+        if name.startswith("_") or not callable(__attr):
+            return __attr
+        __action = self.__actions.get(name)
+        if __action is None:
+            async def __action(*args, **kwargs) -> Any:
+                return await self.worker.call(getattr(self.session, name), *args, **kwargs)
+            __action.__name__ = name
+            __action.__doc__ = __attr.__doc__
+            self.__actions[name] = __action
+        return __action
+
+    async def call(self, func: Callable[[Session], Any]) -> Any:
+        """
+        Run func(session) on the worker, e.g. await sap.call(lambda s: s.session.findById("wnd[0]/usr").Children.Count)
+        """
+        return await self.worker.call(func, self.session)
+
+    async def wait(self, seconds: float) -> None:
+        """
+        Wait for a given number of seconds without blocking the event loop.
+        """
+        self.session.documentation("Waiting 1 second..." if seconds == 1.0 else f"Waiting {seconds} seconds...")
+        await asyncio.sleep(seconds)
+
+    async def wait_for(self, predicate: Callable[[Session], bool], timeout: Optional[float] = None) -> bool:
+        """
+        Poll predicate(session) on the worker with the adaptive back-off of the case's WaitPolicy,
+        sleeping on the event loop between polls. An exception counts as False.
+
+        Arguments:
+            predicate {Callable[[Session], bool]} -- Condition to wait for
+
+        Keyword Arguments:
+            timeout {Optional[float]} -- Timeout in seconds, default is WaitPolicy.Timeout (default: {None})
+
+        Returns:
+            bool -- Returns True if the predicate returned True otherwise False (timeout)
+        """
+        __policy = self.session.waiter.policy
+        __stats = self.session.waiter.stats
+        __timeout = timeout if timeout is not None else __policy.Timeout
+        __delay = __policy.InitialDelay
+        __start = time.perf_counter()
+        try:
+            while True:
+                __stats.Polls += 1
+                if await self.worker.call(_check, predicate, self.session):
+                    return True
+                __remaining = __timeout - (time.perf_counter() - __start)
+                if __remaining <= 0:
+                    __stats.Timeouts += 1
+                    return False
+                await asyncio.sleep(min(__delay, __remaining))
+                __delay = min(__delay * __policy.Backoff, __policy.MaxDelay)
+        finally:
+            __stats.WaitedSeconds += time.perf_counter() - __start
+
+    async def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the SAP GUI session to stop being busy.
+        """
+        __ready = await self.wait_for(Session.is_ready, timeout=timeout)
+        if not __ready and self.session.logger is not None:
+            self.session.logger.log.warning(f"SAP GUI session still busy after waiting {timeout or self.session.waiter.policy.Timeout}s")
+        return __ready
+
+    async def wait_for_element(self, id: str, timeout: Optional[float] = 60.0) -> None:
+        """
+        Wait <timeout> seconds for the SAP GUI element to become available, passes or fails the step like Session.wait_for_element.
+        """
+        __id = self.session.ace_id(id)
+        if await self.wait_for(lambda s: s.find_element(__id) is not None, timeout=timeout):
+            await self.worker.call(self.session.step_pass, msg=f"Found element with id: {__id}", ss_name="wait_for_element_pass")
+        else:
+            await self.worker.call(self.session.step_fail, msg=f"No element found with id: {__id}", ss_name="wait_for_element_fail")
+
+    async def web_wait_for_element(self, xpath: str, timeout: Optional[float] = 5.0, delay_time: Optional[float] = 1.0) -> bool:
+        """
+        Wait for a web element to be displayed or for the timeout to elapse, checking every delay_time seconds.
+
+        Returns:
+            bool -- Returns True if the element is displayed otherwise False
+        """
+        __start = time.perf_counter()
+        while True:
+            __element = await self.worker.call(self.session.web_find_by_xpath, xpath=xpath, return_element=True, wait_time=0)
+            if await self.worker.call(_check, lambda s: __element is not None and __element.is_displayed(), self.session):
+                return True
+            __remaining = timeout - (time.perf_counter() - __start)
+            if __remaining <= 0:
+                return False
+            await asyncio.sleep(min(delay_time, __remaining))
+
+    async def close(self, cleanup: bool = True, close_sap: Optional[bool] = None) -> None:
+        """
+        Run Session.cleanup on the worker and stop the worker thread.
+
+        Keyword Arguments:
+            cleanup {bool} -- Run Session.cleanup (default: {True})
+            close_sap {Optional[bool]} -- Passed to Session.cleanup (default: {None})
+        """
+        try:
+            if cleanup:
+                await self.worker.call(self.session.cleanup, close_sap=close_sap)
+        finally:
+            await self.worker.shutdown()
+
+    async def __aenter__(self) -> "AsyncSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def _new_session(case: Optional[Case], sap_gui: Optional[Any], sap_gui_factory: Optional[Callable[[], Any]]) -> Session:
+    __session = Session(case=case, sap_gui=sap_gui_factory() if sap_gui_factory is not None else sap_gui)
+    # cleanup must run on the worker thread, see AsyncSession.close
+    atexit.unregister(__session.cleanup)
+    if __session.logger is None:
+        __session.logger = Logger(config=__session.case.LogConfig)
+    return __session
+
+
+def _check(predicate: Callable[[Session], bool], session: Session) -> bool:
+    try:
+        return bool(predicate(session))
+    except Exception:
+        return False
@@ -0,0 +1,309 @@
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+import argparse
+import atexit
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from Core.Framework import Session
+from Core.Simulator import SapGuiAutomation
+from Flow.Data import Case
+from Logging.Logging import Logger, LoggingConfig
+
+
+BASELINE_VERSION: int = 1
+DEFAULT_BASELINE: Path = Path(__file__).with_name("benchmark_baseline.json")
+
+
+@dataclass
+class Benchmark:
+    """
+    A Session action measured by the benchmark suite. Setup seeds the simulated screen once, Run is the measured call.
+    """
+    Name: str
+    Run: Callable[[Session], Any]
+    Setup: Optional[Callable[[Session], None]] = None
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Measurements of one Benchmark, all values are per iteration. Seconds is the median wall time, ComCalls the
+    counted scripting API calls, RoundTrips the simulated server round trips and PeakBytes the largest
+    tracemalloc peak of an iteration. Error is set if the action raised.
+    """
+    Name: str
+    Iterations: int = 0
+    Seconds: float = 0.0
+    MinSeconds: float = 0.0
+    ComCalls: int = 0
+    RoundTrips: int = 0
+    PeakBytes: int = 0
+    Steps: int = 0
+    Error: Optional[str] = None
+
+    @staticmethod
+    def from_dict(data: dict) -> "BenchmarkResult":
+        return BenchmarkResult(**{k: v for k, v in data.items() if k in BenchmarkResult.__dataclass_fields__})
+
+    def __repr__(self) -> str:
+        return f"class BenchmarkResult<Name: {self.Name}, Iterations: {self.Iterations}, Seconds: {self.Seconds:.6f}, ComCalls: {self.ComCalls}, RoundTrips: {self.RoundTrips}, PeakBytes: {self.PeakBytes}, Steps: {self.Steps}, Error: {self.Error}>"
+
+
+@dataclass
+class Thresholds:
+    """
+    Allowed growth against the baseline as factor, None does not compare the metric.
+    Seconds below MinSeconds and PeakBytes below MinPeakBytes are not compared (timer & allocator noise).
+    """
+    Seconds: Optional[float] = 1.5
+    ComCalls: Optional[float] = 1.0
+    RoundTrips: Optional[float] = 1.0
+    PeakBytes: Optional[float] = 1.5
+    MinSeconds: float = 0.0005
+    MinPeakBytes: int = 65536
+
+
+@dataclass
+class BenchmarkRegression:
+    Name: str
+    Metric: str
+    Baseline: float
+    Value: float
+    Limit: float
+
+    def __repr__(self) -> str:
+        return f"class BenchmarkRegression<Name: {self.Name}, Metric: {self.Metric}, Baseline: {self.Baseline}, Value: {self.Value}, Limit: {self.Limit}>"
+
+
+def _seed_va01(sap: Session) -> None:
+    sap.start_transaction("VA01")
+    sap.session.set_screen("SAPMV45A", 4001, transaction="VA01")
+
+
+def _seed_grid(sap: Session) -> None:
+    sap.session.add_grid("wnd[0]/usr/cntlGRID1/shellcont/shell", ["MATNR", "WERKS", "LGORT", "LABST"], [[f"M{i:06}", "1000", "0001", str(i)] for i in range(500)])
+
+
+def _seed_table_control(sap: Session) -> None:
+    sap.session.add_table_control("wnd[0]/usr/tblSAPLMBTC", ["MATNR", "WERKS", "LABST"], [[f"M{i:06}", "1000", str(i)] for i in range(100)])
+
+
+def _seed_modal(sap: Session) -> None:
+    sap.session.open_window(1, "Save changes?")
+
+
+BENCHMARKS: list[Benchmark] = [
+    Benchmark("start_transaction", lambda s: s.start_transaction("VA01")),
+    Benchmark("set_text", lambda s: s.set_text("usr/ctxtVBAK-AUART", "OR"), _seed_va01),
+    Benchmark("click_element", lambda s: s.click_element("tbar[1]/btn[8]"), _seed_va01),
+    Benchmark("get_value", lambda s: s.get_value("usr/ctxtVBAK-AUART"), _seed_va01),
+    Benchmark("set_checkbox", lambda s: s.set_checkbox("usr/chkRV45A-FLG_KEINE", True), _seed_va01),
+    Benchmark("send_vkey", lambda s: s.send_vkey("ENTER"), _seed_va01),
+    Benchmark("send_vkeys", lambda s: s.send_vkeys(["ENTER", "F3", "CTRL+S"]), _seed_va01),
+    Benchmark("check_for_modal", lambda s: s.check_for_modal("Save"), _seed_modal),
+    Benchmark("dump_table_values_grid", lambda s: s.dump_table_values("wnd[0]/usr/cntlGRID1/shellcont/shell"), _seed_grid),
+    Benchmark("dump_table_values_table_control", lambda s: s.dump_table_values("wnd[0]/usr/tblSAPLMBTC"), _seed_table_control),
+    Benchmark("get_cell_value", lambda s: s.get_cell_value("wnd[0]/usr/cntlGRID1/shellcont/shell", 250, "MATNR"), _seed_grid),
+    Benchmark("export_table_values_grid", lambda s: s.export_table_values("wnd[0]/usr/cntlGRID1/shellcont/shell"), _seed_grid),
+    Benchmark("get_table_data", lambda s: s.get_table_data("SELECT MATNR, WERKS FROM MARC WHERE WERKS = '1000'"), _seed_grid),
+    Benchmark("get_table_data_in_list", lambda s: s.get_table_data(f"SELECT MATNR, WERKS FROM MARC WHERE MATNR IN ({', '.join(repr(f'M{i:06}') for i in range(5000))})"), _seed_grid),
+    Benchmark("fill_va01_line_items", lambda s: s.fill_va01_line_items([
+        {"material": "M000001", "qty": "1", "uom": "EA"},
+        {"material": "M000002", "qty": "5", "uom": "CS", "amount": "12.50", "storage_location": "0001"},
+        {"material": "M000003", "qty": "2", "uom": "EA", "item_category": "TAN", "shipping_point": "1000"},
+    ]), _seed_va01),
+]
+
+
+def new_session(log_path: Path, latency: float = 0.0, server_latency: float = 0.0) -> tuple[SapGuiAutomation, Session]:
+    """
+    Returns a simulator and a Session connected to it, without screenshots, exits or SAP cleanup.
+    """
+    __gui = SapGuiAutomation(latency=latency, server_latency=server_latency)
+    __case = Case(
+        Name="benchmark",
+        LogConfig=LoggingConfig(LogPath=log_path, LogFilename=Path(log_path, "benchmark.log")),
+        ExitOnFail=False,
+        CloseSAPOnCleanup=False)
+    __session = Session(case=__case, sap_gui=__gui)
+    atexit.unregister(__session.cleanup)
+    __session.logger = Logger(config=__case.LogConfig)
+    __session.open_connection(connection_name="BENCH")
+    return __gui, __session
+
+
+def run_benchmark(
+    benchmark: Benchmark,
+    iterations: int = 20,
+    allocation_iterations: int = 3,
+    latency: float = 0.0,
+    server_latency: float = 0.0
+    ) -> BenchmarkResult:
+    """
+    Run a Benchmark on a new simulated session: one warm-up call, iterations timed calls counting the COM calls
+    and allocation_iterations calls traced with tracemalloc (tracing slows the calls down, so they are not timed).
+
+    Returns:
+        BenchmarkResult -- The per iteration measurements
+    """
+    __result = BenchmarkResult(Name=benchmark.Name, Iterations=iterations)
+    with tempfile.TemporaryDirectory() as log_path:
+        __gui, __session = new_session(Path(log_path), latency=latency, server_latency=server_latency)
+        try:
+            if benchmark.Setup is not None:
+                benchmark.Setup(__session)
+            benchmark.Run(__session)
+            __seconds, __calls, __round_trips = [], [], []
+            __steps = len(__session.case.Steps)
+            for _ in range(iterations):
+                __gui.stats.reset()
+                __start = time.perf_counter()
+                benchmark.Run(__session)
+                __seconds.append(time.perf_counter() - __start)
+                __calls.append(__gui.stats.Calls)
+                __round_trips.append(__gui.stats.ServerRoundTrips)
+            __result.Steps = (len(__session.case.Steps) - __steps) // max(1, iterations)
+            __result.Seconds = statistics.median(__seconds) if __seconds else 0.0
+            __result.MinSeconds = min(__seconds) if __seconds else 0.0
+            __result.ComCalls = max(__calls) if __calls else 0
+            __result.RoundTrips = max(__round_trips) if __round_trips else 0
+            tracemalloc.start()
+            try:
+                for _ in range(allocation_iterations):
+                    tracemalloc.reset_peak()
+                    __current = tracemalloc.get_traced_memory()[0]
+                    benchmark.Run(__session)
+                    __result.PeakBytes = max(__result.PeakBytes, tracemalloc.get_traced_memory()[1] - __current)
+            finally:
+                tracemalloc.stop()
+        except Exception as err:
+            __result.Error = f"{type(err).__name__}: {err}"
+        finally:
+            __session.cleanup(close_sap=False)
+            __session.logger.flush()
+    return __result
+
+
+def run_benchmarks(names: Optional[Iterable[str]] = None, iterations: int = 20, **kwargs) -> list[BenchmarkResult]:
+    """
+    Run the BENCHMARKS, or only the ones in names, keyword arguments are passed to run_benchmark.
+
+    Raises:
+        ValueError -- If a name is not a benchmark
+    """
+    __benchmarks = {x.Name: x for x in BENCHMARKS}
+    __names = list(names) if names is not None else list(__benchmarks)
+    __unknown = [x for x in __names if x not in __benchmarks]
+    if __unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(__unknown)}")
+    return [run_benchmark(__benchmarks[x], iterations=iterations, **kwargs) for x in __names]
+
+
+def compare(
+    results: Iterable[BenchmarkResult],
+    baseline: dict[str, BenchmarkResult],
+    thresholds: Optional[Thresholds] = None
+    ) -> list[BenchmarkRegression]:
+    """
+    Compare results with a baseline, returns the metrics above baseline * threshold.
+    A benchmark that fails but has a successful baseline is a regression of the metric Error.
+    """
+    __thresholds = thresholds if thresholds is not None else Thresholds()
+    __regressions = []
+    for result in results:
+        __base = baseline.get(result.Name)
+        if __base is None or __base.Error is not None:
+            continue
+        if result.Error is not None:
+            __regressions.append(BenchmarkRegression(result.Name, "Error", 0, 1, 0))
+            continue
+        for metric in ("Seconds", "ComCalls", "RoundTrips", "PeakBytes"):
+            __factor = getattr(__thresholds, metric)
+            if __factor is None:
+                continue
+            __limit = getattr(__base, metric) * __factor
+            if metric == "Seconds":
+                __limit = max(__limit, __thresholds.MinSeconds)
+            elif metric == "PeakBytes":
+                __limit = max(__limit, __thresholds.MinPeakBytes)
+            if getattr(result, metric) > __limit:
+                __regressions.append(BenchmarkRegression(result.Name, metric, getattr(__base, metric), getattr(result, metric), __limit))
+    return __regressions
+
+
+def load_baseline(path: Path = DEFAULT_BASELINE) -> dict[str, BenchmarkResult]:
+    """
+    Returns the results of a baseline file by benchmark name, empty if the file does not exist.
+    """
+    if not Path(path).is_file():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        __data = json.load(f)
+    return {x["Name"]: BenchmarkResult.from_dict(x) for x in __data.get("results", [])}
+
+
+def save_baseline(results: Iterable[BenchmarkResult], path: Path = DEFAULT_BASELINE) -> None:
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        json.dump({
+            "version": BASELINE_VERSION,
+            "python": platform.python_version(),
+            "results": [asdict(x) for x in results],
+        }, f, indent=2)
+        f.write("\n")
+
+
+def format_results(results: Iterable[BenchmarkResult], baseline: Optional[dict[str, BenchmarkResult]] = None) -> str:
+    """
+    Returns the results as text table, with the baseline values in brackets if given.
+    """
+    __baseline = baseline if baseline is not None else {}
+    __lines = [f"{'benchmark':<34}{'ms':>12}{'com calls':>16}{'round trips':>16}{'peak KiB':>16}  error"]
+    for result in results:
+        __base = __baseline.get(result.Name)
+        def cell(value: str, base: Optional[str]) -> str:
+            return f"{value} ({base})" if base is not None else value
+        __lines.append(
+            f"{result.Name:<34}"
+            f"{cell(f'{result.Seconds * 1000:.3f}', f'{__base.Seconds * 1000:.3f}' if __base else None):>12}"
+            f"{cell(str(result.ComCalls), str(__base.ComCalls) if __base else None):>16}"
+            f"{cell(str(result.RoundTrips), str(__base.RoundTrips) if __base else None):>16}"
+            f"{cell(f'{result.PeakBytes / 1024:.1f}', f'{__base.PeakBytes / 1024:.1f}' if __base else None):>16}"
+            f"  {result.Error or ''}")
+    return "\n".join(__lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command line entry point: python -m Core.Benchmark [--only NAME ...] [--iterations N] [--baseline PATH] [--update] [--no-time]
+    Returns 1 if a benchmark regressed against the baseline otherwise 0.
+    """
+    __parser = argparse.ArgumentParser(prog="python -m Core.Benchmark", description="Benchmark Session actions against the SAP GUI simulator.")
+    __parser.add_argument("--only", nargs="+", default=None, help="benchmarks to run (default: all)")
+    __parser.add_argument("--iterations", type=int, default=20)
+    __parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    __parser.add_argument("--update", action="store_true", help="write the results as new baseline")
+    __parser.add_argument("--no-time", action="store_true", help="do not compare wall time, e.g. on shared CI machines")
+    __args = __parser.parse_args(argv)
+    __results = run_benchmarks(__args.only, iterations=__args.iterations)
+    __baseline = load_baseline(__args.baseline)
+    print(format_results(__results, __baseline))
+    if __args.update:
+        __merged = dict(__baseline)
+        __merged.update({x.Name: x for x in __results})
+        save_baseline(__merged.values(), __args.baseline)
+        print(f"Baseline written to {__args.baseline}")
+        return 0
+    __regressions = compare(__results, __baseline, Thresholds(Seconds=None) if __args.no_time else Thresholds())
+    for regression in __regressions:
+        print(f"REGRESSION {regression.Name} {regression.Metric}: {regression.Value} > {regression.Limit} (baseline {regression.Baseline})")
+    return 1 if __regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Hashable, Optional
+import json
+import os
+import re
+import time
+from Flow.Columnar import ColumnStore
+
+
+WINDOW_PATTERN = re.compile(r"^(.*?/wnd\[\d+\])")
+
+
+@dataclass
+class CacheStats:
+    """
+    Hit/miss counters of a cache.
+    Evictions counts entries dropped for size (LRU), Expirations entries dropped because their TTL ran out.
+    """
+    Hits: int = 0
+    Misses: int = 0
+    Invalidations: int = 0
+    Evictions: int = 0
+    Expirations: int = 0
+
+    @property
+    def HitRate(self) -> float:
+        __total = self.Hits + self.Misses
+        return self.Hits / __total if __total else 0.0
+
+    def __repr__(self) -> str:
+        return f"class CacheStats<Hits: {self.Hits}, Misses: {self.Misses}, Invalidations: {self.Invalidations}, Evictions: {self.Evictions}, Expirations: {self.Expirations}, HitRate: {self.HitRate:.2%}>"
+
+
+class ElementCache:
+    """
+    Per-window cache of SAP GUI element handles keyed by the fully resolved element id.
+
+    Handles are only valid for the screen they were found on. Any action that may cause a
+    server round trip calls expire(), the next lookup then calls validate() with the current
+    screen key (window number, program, screen number) and the cache is cleared if it changed.
+    """
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled: bool = enabled
+        self.stats: CacheStats = CacheStats()
+        self.screen: Optional[tuple] = None
+        self.stale: bool = True
+        self.__windows: dict[str, dict[str, Any]] = {}
+
+    @staticmethod
+    def window_of(id: str) -> str:
+        """
+        Returns the window part of a full element id, e.g. /app/con[0]/ses[0]/wnd[0]
+        """
+        __match = WINDOW_PATTERN.match(id)
+        return __match.group(1) if __match else ""
+
+    def get(self, id: str) -> Any|None:
+        """
+        Returns the cached handle for id or None and counts the hit/miss.
+        """
+        if not self.enabled:
+            return None
+        __handle = self.__windows.get(self.window_of(id), {}).get(id)
+        if __handle is None:
+            self.stats.Misses += 1
+        else:
+            self.stats.Hits += 1
+        return __handle
+
+    def put(self, id: str, handle: Any) -> None:
+        if self.enabled and handle is not None:
+            self.__windows.setdefault(self.window_of(id), {})[id] = handle
+
+    def discard(self, id: str) -> None:
+        self.__windows.get(self.window_of(id), {}).pop(id, None)
+
+    def expire(self) -> None:
+        """
+        Mark the cache as possibly out of date, e.g. after a server round trip.
+        """
+        self.stale = True
+
+    def validate(self, screen: tuple) -> bool:
+        """
+        Compare the current screen key with the key the handles were cached for.
+
+        Arguments:
+            screen {tuple} -- Current screen key, e.g. (window number, program, screen number)
+
+        Returns:
+            bool -- Returns True if the cached handles are still valid otherwise False (cache cleared)
+        """
+        __valid = screen == self.screen
+        if not __valid:
+            self.clear()
+            self.screen = screen
+        self.stale = False
+        return __valid
+
+    def clear(self, window: Optional[str] = None) -> None:
+        """
+        Drop all cached handles, or only the handles of the given window id.
+        """
+        if window is not None:
+            if self.__windows.pop(window, None) is not None:
+                self.stats.Invalidations += 1
+        elif self.__windows:
+            self.__windows.clear()
+            self.stats.Invalidations += 1
+        self.stale = True
+
+    def __len__(self) -> int:
+        return sum(len(x) for x in self.__windows.values())
+
+
+@dataclass
+class TableCachePolicy:
+    """
+    Per-case settings of the table read cache, see TableCache.
+
+    Enabled caches the results of Session.get_table_data (and of dump_table_values given a cache_table).
+    TTL is the lifetime of a result in seconds, Tables overrides it per table name, 0 never caches the table.
+    At most MaxEntries results are kept, the least recently used is dropped first. Path persists the cache
+    between runs in a pickle file, None keeps it in memory. Invalidate maps a transaction to the tables it
+    writes, starting the transaction drops their cached results.
+    """
+    Enabled: bool = False
+    TTL: float = 3600.0
+    Tables: dict[str, float] = field(default_factory=dict)
+    MaxEntries: int = 256
+    Path: "Optional[Path]" = None
+    Invalidate: dict[str, list[str]] = field(default_factory=dict)
+
+    @staticmethod
+    def from_dict(data: dict) -> "TableCachePolicy":
+        """
+        Create a TableCachePolicy from a dict using the json data file keys:
+        enabled, ttl, tables, max_entries, path & invalidate
+        """
+        __policy = TableCachePolicy()
+        if "enabled" in data:
+            __policy.Enabled = bool(data.get("enabled"))
+        if "ttl" in data:
+            __policy.TTL = float(data.get("ttl"))
+        if "tables" in data:
+            __policy.Tables = {str(k).upper(): float(v) for k, v in data.get("tables").items()}
+        if "max_entries" in data:
+            __policy.MaxEntries = int(data.get("max_entries"))
+        if "path" in data:
+            __policy.Path = Path(data.get("path")) if data.get("path") is not None else None
+        if "invalidate" in data:
+            __policy.Invalidate = {str(k).upper(): [str(x).upper() for x in v] for k, v in data.get("invalidate").items()}
+        return __policy
+
+
+@dataclass
+class TableCacheEntry:
+    """
+    Cached result of a table read, the rows are kept as tuples.
+    Seconds is the duration of the read, saved by every hit.
+    """
+    Table: str
+    Type: str
+    Columns: list[str]
+    Rows: list[tuple]
+    Expires: float
+    Seconds: float = 0.0
+
+    def data(self) -> ColumnStore:
+        """
+        Returns a new ColumnStore of the cached rows.
+        """
+        __data = ColumnStore(columns=self.Columns)
+        __data.extend(dict(zip(self.Columns, row)) for row in self.Rows)
+        return __data
+
+
+class TableCache:
+    """
+    Read-through cache of table reads keyed by e.g. (system, client, normalized statement).
+
+    Results expire after the TTL of their table, the cache holds at most MaxEntries results (LRU).
+    Expiry uses wall clock time so entries persisted with Path stay valid across runs. 
+    The file is JSON Lines, a version line followed by one line per entry, lists of the key & rows are loaded as tuples.
+    """
+    FILE_VERSION: int = 2
+
+    def __init__(self, policy: Optional[TableCachePolicy] = None) -> None:
+        self.policy: TableCachePolicy = policy if policy is not None else TableCachePolicy()
+        self.enabled: bool = self.policy.Enabled
+        self.stats: CacheStats = CacheStats()
+        self.seconds_saved: float = 0.0
+        self.__entries: OrderedDict[Hashable, TableCacheEntry] = OrderedDict()
+        if self.enabled and self.policy.Path is not None:
+            self.load()
+
+    def ttl(self, table: Optional[str]) -> float:
+        """
+        Returns the TTL of a table in seconds, the policy TTL if the table has none.
+        """
+        if table is None:
+            return self.policy.TTL
+        return self.policy.Tables.get(table.upper(), self.policy.TTL)
+
+    def get(self, key: Hashable) -> Optional[TableCacheEntry]:
+        """
+        Returns the cached entry or None and counts the hit/miss, an expired entry is dropped.
+        """
+        if not self.enabled:
+            return None
+        __entry = self.__entries.get(key)
+        if __entry is not None and __entry.Expires <= time.time():
+            del self.__entries[key]
+            self.stats.Expirations += 1
+            __entry = None
+        if __entry is None:
+            self.stats.Misses += 1
+            return None
+        self.__entries.move_to_end(key)
+        self.stats.Hits += 1
+        self.seconds_saved += __entry.Seconds
+        return __entry
+
+    def put(self, key: Hashable, table: str, type: str, data: ColumnStore, seconds: float = 0.0) -> None:
+        """
+        Cache the rows of a read unless the TTL of the table is 0.
+
+        Arguments:
+            key {Hashable} -- Cache key
+            table {str} -- Table name, for its TTL & invalidate
+            type {str} -- Table.Type of the read
+            data {ColumnStore} -- Read rows
+
+        Keyword Arguments:
+            seconds {float} -- Duration of the read (default: {0.0})
+        """
+        __ttl = self.ttl(table)
+        if not self.enabled or __ttl <= 0:
+            return
+        self.__entries[key] = TableCacheEntry(
+            Table=table.upper(),
+            Type=type,
+            Columns=list(data.columns),
+            Rows=list(data.iter_tuples()),
+            Expires=time.time() + __ttl,
+            Seconds=seconds)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > max(self.policy.MaxEntries, 0):
+            self.__entries.popitem(last=False)
+            self.stats.Evictions += 1
+
+    def invalidate(self, table: Optional[str] = None) -> int:
+        """
+        Drop the cached results of a table, or all results.
+
+        Returns:
+            int -- Number of dropped results
+        """
+        __keys = [k for k, v in self.__entries.items() if table is None or v.Table == table.upper()]
+        for key in __keys:
+            del self.__entries[key]
+        if __keys:
+            self.stats.Invalidations += 1
+        return len(__keys)
+
+    def invalidate_transaction(self, transaction: str) -> int:
+        """
+        Drop the cached results of the tables the transaction writes, see TableCachePolicy.Invalidate.
+        """
+        return sum(self.invalidate(x) for x in self.policy.Invalidate.get(transaction.upper(), []))
+
+    def load(self) -> None:
+        """
+        Load the entries persisted at policy.Path, expired entries are skipped. An unreadable file is ignored.
+        """
+        __entries: list[tuple[Hashable, TableCacheEntry]] = []
+        __now = time.time()
+        try:
+            with open(self.policy.Path, "r", encoding="utf-8") as f:
+                if json.loads(f.readline() or "null") != {"version": self.FILE_VERSION}:
+                    return
+                for line in f:
+                    __data = json.loads(line)
+                    if __data["expires"] <= __now:
+                        continue
+                    __entries.append((_tuples(__data["key"]), TableCacheEntry(
+                        Table=str(__data["table"]),
+                        Type=str(__data["type"]),
+                        Columns=[str(x) for x in __data["columns"]],
+                        Rows=[tuple(x) for x in __data["rows"]],
+                        Expires=float(__data["expires"]),
+                        Seconds=float(__data.get("seconds", 0.0)))))
+        except (OSError, UnicodeDecodeError, ValueError, KeyError, TypeError):
+            return
+        self.__entries.update(__entries)
+
+    def save(self) -> None:
+        """
+        Persist the unexpired entries to policy.Path, written to a temporary file first so a concurrent reader 
+        never sees a partial file. Keys & cell values must be JSON types, tuples are written as lists.
+        """
+        if not self.enabled or self.policy.Path is None:
+            return
+        __now = time.time()
+        __lines = [json.dumps({"version": self.FILE_VERSION})]
+        for key, entry in self.__entries.items():
+            if entry.Expires > __now:
+                __lines.append(json.dumps({
+                    "key": key, "table": entry.Table, "type": entry.Type, "columns": entry.Columns,
+                    "rows": entry.Rows, "expires": entry.Expires, "seconds": entry.Seconds}, ensure_ascii=False))
+        __path = Path(self.policy.Path)
+        __path.parent.mkdir(parents=True, exist_ok=True)
+        __tmp = __path.with_name(f"{__path.name}.{os.getpid()}.tmp")
+        with open(__tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(__lines) + "\n")
+        __tmp.replace(__path)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __repr__(self) -> str:
+        return f"class TableCache<Entries: {len(self)}, Stats: {self.stats}, SecondsSaved: {self.seconds_saved:.3f}>"
+
+
+def _tuples(value: Any) -> Any:
+    """
+    Returns the value with its (nested) lists as tuples, e.g. a cache key loaded from JSON.
+    """
+    if isinstance(value, list):
+        return tuple(_tuples(x) for x in value)
+    return value
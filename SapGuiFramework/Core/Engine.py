@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+import inspect
+import time
+from Flow.Actions import Step
+from Flow.Results import Result
+
+
+# Parameter names an action may take the step's ElementId as, in order of preference
+ELEMENT_ID_PARAMETERS: tuple[str, ...] = ("id", "element_id", "table_id", "element")
+
+# Signatures of dispatched functions, computed once per function
+_SIGNATURES: dict[Callable, inspect.Signature|None] = {}
+# Public methods per Session class, computed once per class
+_ACTIONS: dict[type, dict[str, Callable]] = {}
+
+
+def _signature(func: Callable) -> inspect.Signature|None:
+    if func not in _SIGNATURES:
+        try:
+            _SIGNATURES[func] = inspect.signature(func)
+        except (TypeError, ValueError):
+            _SIGNATURES[func] = None
+    return _SIGNATURES[func]
+
+
+def session_actions(session_type: type) -> dict[str, Callable]:
+    """
+    Returns the public methods of a Session class by name, the unbound functions are cached per class.
+    """
+    __actions = _ACTIONS.get(session_type)
+    if __actions is None:
+        __actions = {
+            name: func for name, func in inspect.getmembers(session_type, inspect.isfunction)
+            if not name.startswith("_")}
+        _ACTIONS[session_type] = __actions
+    return __actions
+
+
+@dataclass
+class StepResult:
+    """
+    Outcome of one step executed by the StepEngine.
+    """
+    Step: Step
+    Index: int
+    Result: "Result|None" = None
+    Seconds: float = 0.0
+    ReturnValue: Any = None
+    Error: str|None = None
+
+    def __repr__(self) -> str:
+        return f"class StepResult<Index: {self.Index}, Action: {self.Step.Action}, Result: {self.Result}, Seconds: {self.Seconds:.3f}, Error: {self.Error}>"
+
+
+@dataclass
+class _Call:
+    Func: Callable
+    Args: tuple
+    Kwargs: dict
+
+
+class StepEngine:
+    """
+    Executes a list of Steps against a Session.
+
+    Step.Action is either the name of a Session method (as recorded by Session.new_step or loaded from a
+    json data file) or any callable. Names are resolved to bound methods through a dispatch table built
+    once per Session class, the arguments of every step are checked against the method signature before
+    the first step runs. A step's ElementId is passed as the method's id argument when it is not given in Args/Kwargs.
+
+    A step fails when it raises, exits the case (Case.ExitOnFail) or records a failed step in Case.Status.
+    Execution stops at the first failed step unless continue_on_fail is set.
+
+    Arguments:
+        session {Any} -- Core.Framework.Session the steps are run against
+
+    Keyword Arguments:
+        continue_on_fail {Optional[bool]} -- Run the remaining steps after a failed step, default is Case.ContinueOnFail (default: {None})
+    """
+    def __init__(self, session: Any, continue_on_fail: Optional[bool] = None) -> None:
+        self.session: Any = session
+        self.continue_on_fail: bool = continue_on_fail if continue_on_fail is not None else session.case.ContinueOnFail
+        self.actions: dict[str, Callable] = session_actions(type(session))
+        self.dispatch: dict[str, Callable] = {}
+
+    def resolve(self, step: Step) -> Callable:
+        """
+        Returns the callable of the step's Action, Session method names are bound once and kept in the dispatch table.
+        """
+        __action = step.Action
+        if isinstance(__action, str):
+            __bound = self.dispatch.get(__action)
+            if __bound is None:
+                __func = self.actions.get(__action)
+                if __func is None:
+                    raise ValueError(f"Unknown action: {__action}")
+                __bound = __func.__get__(self.session, type(self.session))
+                self.dispatch[__action] = __bound
+            return __bound
+        if callable(__action):
+            return __action
+        raise ValueError(f"Step action must be a Session method name or callable, got: {__action!r}")
+
+    def prepare(self, step: Step) -> _Call:
+        """
+        Resolve the step's action and bind its arguments, raises ValueError if they do not match the signature.
+        """
+        __func = self.resolve(step)
+        __args = tuple(step.Args) if step.Args is not None else ()
+        __kwargs = dict(step.Kwargs) if step.Kwargs is not None else {}
+        __signature = _signature(inspect.unwrap(getattr(__func, "__func__", __func)))
+        if __signature is None:
+            return _Call(Func=__func, Args=__args, Kwargs=__kwargs)
+        __is_method = hasattr(__func, "__self__")
+        __parameters = list(__signature.parameters)
+        if step.ElementId:
+            for name in ELEMENT_ID_PARAMETERS:
+                if name in __signature.parameters and name not in __kwargs:
+                    __position = __parameters.index(name) - (1 if __is_method else 0)
+                    if len(__args) <= __position:
+                        __kwargs[name] = step.ElementId
+                    break
+        try:
+            if __is_method:
+                __signature.bind(__func.__self__, *__args, **__kwargs)
+            else:
+                __signature.bind(*__args, **__kwargs)
+        except TypeError as err:
+            raise ValueError(f"Invalid arguments for action {step.Action}: {err}") from err
+        return _Call(Func=__func, Args=__args, Kwargs=__kwargs)
+
+    def validate(self, steps: Iterable[Step]) -> list[_Call]:
+        """
+        Prepare every step before any of them runs.
+
+        Returns:
+            list[_Call] -- Prepared calls in step order
+
+        Raises:
+            ValueError -- Lists every step with an unknown action or invalid arguments
+        """
+        __calls = []
+        __errors = []
+        for i, step in enumerate(steps):
+            try:
+                __calls.append(self.prepare(step))
+            except ValueError as err:
+                __errors.append(f"Step {i} ({step.Name or step.Action}): {err}")
+        if __errors:
+            raise ValueError("Invalid steps:\n" + "\n".join(__errors))
+        return __calls
+
+    def run(self, steps: Iterable[Step]) -> list[StepResult]:
+        """
+        Validate and execute the steps.
+
+        Arguments:
+            steps {Iterable[Step]} -- Steps to execute, iterated once before anything runs
+
+        Returns:
+            list[StepResult] -- One StepResult per executed step
+        """
+        __steps = list(steps)
+        __calls = self.validate(__steps)
+        __status = self.session.case.Status
+        __results = []
+        for i, (step, call) in enumerate(zip(__steps, __calls)):
+            __result = StepResult(Step=step, Index=i)
+            __failed_steps = __status.Failed
+            __start = time.perf_counter()
+            try:
+                __result.ReturnValue = call.Func(*call.Args, **call.Kwargs)
+            except SystemExit:
+                __result.Error = "Case exited on failed step"
+            except Exception as err:
+                __result.Error = f"{type(err).__name__}: {err}"
+            __result.Seconds = time.perf_counter() - __start
+            if __result.Error is None and __status.Failed > __failed_steps:
+                __result.Error = __status.FailedSteps[-1].Status.Error or "Step failed"
+            __result.Result = Result.FAIL if __result.Error is not None else Result.PASS
+            step.Status.Result = __result.Result
+            step.Status.Error = __result.Error
+            __results.append(__result)
+            if __result.Result == Result.FAIL and not self.continue_on_fail:
+                break
+        return __results
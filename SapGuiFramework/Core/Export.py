@@ -0,0 +1,236 @@
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import codecs
+import time
+from Core.Tables import ExtractStats
+
+
+# SAP code pages of the "Save list in file" encoding field, SAP code page -> python codec
+SAP_CODEPAGES: dict[str, str] = {
+    "4110": "utf-8",
+    "4102": "utf-16-be",
+    "4103": "utf-16-le",
+    "1100": "latin-1",
+    "1160": "cp1252",
+    "1401": "iso8859-2",
+    "1500": "iso8859-5",
+    "1610": "iso8859-9",
+    "1700": "iso8859-7",
+    "1800": "iso8859-8",
+    "8000": "shift_jis",
+    "8300": "big5",
+    "8400": "gb2312",
+    "8500": "euc-kr",
+}
+# Formats of the "Save list in file" popup, format -> index of its radio button
+EXPORT_FORMATS: dict[str, int] = {"unconverted": 0, "spreadsheet": 1, "rtf": 2, "html": 3, "clipboard": 4}
+# Formats iter_export_rows can read
+READABLE_FORMATS: tuple[str, ...] = ("unconverted", "spreadsheet")
+# Ids of the export popups, relative to the session
+EXPORT_FORMAT_RADIO: str = "wnd[1]/usr/subSUBSCREEN_STEPLOOP:SAPLSPO5:0150/sub:SAPLSPO5:0150/radSPOPLI-SELFLAG[{index},0]"
+EXPORT_PATH: str = "wnd[1]/usr/ctxtDY_PATH"
+EXPORT_FILENAME: str = "wnd[1]/usr/ctxtDY_FILENAME"
+EXPORT_ENCODING: str = "wnd[1]/usr/ctxtDY_FILE_ENCODING"
+_BOMS: tuple[tuple[bytes, str], ...] = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+
+def codec_for(codepage: Optional[str|int]) -> str:
+    """
+    Returns the python codec of a SAP code page, code page 0000 or None is the SAP GUI default (cp1252).
+
+    Raises:
+        ValueError -- If the code page is unknown
+    """
+    if codepage is None or str(codepage).strip("0 ") == "":
+        return "cp1252"
+    __codepage = str(codepage).strip().zfill(4)
+    if __codepage not in SAP_CODEPAGES:
+        raise ValueError(f"Unknown SAP code page: {codepage}, expected one of {', '.join(SAP_CODEPAGES)}")
+    return SAP_CODEPAGES[__codepage]
+
+
+def detect_encoding(path: Path, default: str = "cp1252") -> str:
+    """
+    Returns the codec of a file from its byte order mark, default if it has none.
+    """
+    with open(path, "rb") as f:
+        __head = f.read(4)
+    for bom, codec in _BOMS:
+        if __head.startswith(bom):
+            return codec
+    return default
+
+
+def _is_rule(line: str) -> bool:
+    __line = line.strip()
+    return len(__line) != 0 and __line.strip("-") == ""
+
+
+def iter_unconverted_rows(lines: Iterable[str], columns: Optional[list[str]] = None) -> Iterator[dict]:
+    """
+    Stream the rows of an "unconverted" list export, the fixed width layout of ABAP lists:
+
+        18.10.2026                Dynamic List Display                1
+        ----------------------------------------
+        |Material          |Plant|Stor. Loc.|
+        ----------------------------------------
+        |M000001           |1000 |0001      |
+
+    The first pipe line is the header, its pipe positions are the column bounds of every row, so values containing
+    a pipe are kept. Title, blank & rule lines are skipped, a repeated header (page break) too.
+
+    Arguments:
+        lines {Iterable[str]} -- Lines of the export, e.g. an open text file
+
+    Keyword Arguments:
+        columns {Optional[list[str]]} -- Column names used instead of the header titles, by position (default: {None})
+
+    Yields:
+        dict -- One dict of column name to stripped cell value per list row
+    """
+    __bounds: Optional[list[tuple[int, int]]] = None
+    __header: Optional[str] = None
+    __names: list[str] = []
+    for line in lines:
+        __line = line.rstrip("\r\n")
+        if not __line.startswith("|") or _is_rule(__line):
+            continue
+        if __bounds is None:
+            __pipes = [i for i, c in enumerate(__line) if c == "|"]
+            if len(__pipes) < 2:
+                continue
+            __bounds = list(zip([x + 1 for x in __pipes[:-1]], __pipes[1:]))
+            __header = __line
+            __titles = [__line[start:end].strip() for start, end in __bounds]
+            __names = list(columns) + __titles[len(columns):] if columns is not None else __titles
+            continue
+        if __line == __header:
+            continue
+        yield {name: __line[start:end].strip() for name, (start, end) in zip(__names, __bounds)}
+
+
+def iter_spreadsheet_rows(lines: Iterable[str], columns: Optional[list[str]] = None) -> Iterator[dict]:
+    """
+    Stream the rows of a "spreadsheet" export, tab separated values with the column titles in the first non-empty line.
+    Rows shorter than the header are padded with empty values.
+
+    Arguments:
+        lines {Iterable[str]} -- Lines of the export, e.g. an open text file
+
+    Keyword Arguments:
+        columns {Optional[list[str]]} -- Column names used instead of the header titles, by position (default: {None})
+
+    Yields:
+        dict -- One dict of column name to stripped cell value per row
+    """
+    __names: Optional[list[str]] = None
+    __width = 0
+    for line in lines:
+        __line = line.rstrip("\r\n")
+        if __line.strip() == "":
+            continue
+        __cells = __line.split("\t")
+        if __names is None:
+            # SAP indents the spreadsheet export by one empty column if the list has no row markers
+            __offset = 1 if __cells[0].strip() == "" and len(__cells) > 1 else 0
+            __titles = [x.strip() for x in __cells[__offset:]]
+            __names = list(columns) + __titles[len(columns):] if columns is not None else __titles
+            __width = len(__names)
+            continue
+        __cells = __cells[__offset:]
+        if len(__cells) < __width:
+            __cells.extend([""] * (__width - len(__cells)))
+        yield {name: __cells[i].strip() for i, name in enumerate(__names)}
+
+
+def iter_export_rows(
+    path: str|Path,
+    export_format: str = "unconverted",
+    codepage: Optional[str|int] = None,
+    columns: Optional[list[str]] = None,
+    number_rows: Optional[int] = None,
+    stats: Optional[ExtractStats] = None
+    ) -> Iterator[dict]:
+    """
+    Stream the rows of a list exported with "Save list in file" (%PC), one line at a time.
+    A byte order mark in the file takes precedence over codepage.
+
+    Arguments:
+        path {str|Path} -- Exported file
+
+    Keyword Arguments:
+        export_format {str} -- unconverted or spreadsheet (default: {"unconverted"})
+        codepage {Optional[str|int]} -- SAP code page the file was written with, see SAP_CODEPAGES (default: {None})
+        columns {Optional[list[str]]} -- Column names used instead of the header titles, by position (default: {None})
+        number_rows {Optional[int]} -- Number of rows to return, default is All (default: {None})
+        stats {Optional[ExtractStats]} -- ExtractStats instance updated while rows are yielded (default: {None})
+
+    Raises:
+        ValueError -- If export_format is not one of READABLE_FORMATS
+
+    Yields:
+        dict -- One dict of column name to cell value per row
+    """
+    if export_format not in READABLE_FORMATS:
+        raise ValueError(f"Unable to read {export_format} exports, expected one of {', '.join(READABLE_FORMATS)}")
+    __reader = iter_unconverted_rows if export_format == "unconverted" else iter_spreadsheet_rows
+    __stats = stats if stats is not None else ExtractStats()
+    __start_time = time.perf_counter()
+    __encoding = detect_encoding(Path(path), default=codec_for(codepage))
+    try:
+        with open(path, "r", encoding=__encoding, errors="replace", newline="") as f:
+            __stats.Pages += 1
+            for row in __reader(f, columns=columns):
+                if number_rows is not None and __stats.Rows >= number_rows:
+                    break
+                __stats.Rows += 1
+                __stats.Cells += len(row)
+                yield row
+    finally:
+        __stats.Seconds += time.perf_counter() - __start_time
+
+
+def write_export(
+    path: str|Path,
+    columns: list[str],
+    rows: Iterable[list[str]],
+    export_format: str = "unconverted",
+    codepage: Optional[str|int] = None,
+    title: str = "Dynamic List Display"
+    ) -> Path:
+    """
+    Write rows in the layout of a SAP list export, used by Core.Simulator for "Save list in file".
+
+    Arguments:
+        path {str|Path} -- File to write
+        columns {list[str]} -- Column titles
+        rows {Iterable[list[str]]} -- Cell values
+
+    Keyword Arguments:
+        export_format {str} -- unconverted or spreadsheet (default: {"unconverted"})
+        codepage {Optional[str|int]} -- SAP code page of the file (default: {None})
+        title {str} -- List title of the unconverted layout (default: {"Dynamic List Display"})
+
+    Returns:
+        Path -- The written file
+    """
+    if export_format not in READABLE_FORMATS:
+        raise ValueError(f"Unable to write {export_format} exports, expected one of {', '.join(READABLE_FORMATS)}")
+    __rows = [[str(x) for x in row] for row in rows]
+    with open(path, "w", encoding=codec_for(codepage), errors="replace", newline="\r\n") as f:
+        if export_format == "spreadsheet":
+            f.write("\n")
+            f.write("\t".join(columns) + "\n")
+            for row in __rows:
+                f.write("\t".join(row) + "\n")
+        else:
+            __widths = [max([len(c)] + [len(r[i]) for r in __rows if i < len(r)]) for i, c in enumerate(columns)]
+            __rule = "-" * (sum(__widths) + len(__widths) + 1)
+            f.write(f"{time.strftime('%d.%m.%Y')}{title:^{max(len(__rule) - 20, len(title))}}1\n\n")
+            f.write(__rule + "\n")
+            f.write("|" + "|".join(c.ljust(w) for c, w in zip(columns, __widths)) + "|\n")
+            f.write(__rule + "\n")
+            for row in __rows:
+                f.write("|" + "|".join((row[i] if i < len(row) else "").ljust(w) for i, w in enumerate(__widths)) + "|\n")
+            f.write(__rule + "\n")
+    return Path(path)
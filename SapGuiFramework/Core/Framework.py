@@ -1,12 +1,32 @@
 from dotenv import load_dotenv  # type: ignore
-from typing import Any, Optional
-import win32com.client
-from Flow.Data import Case, load_case_from_json_file, TextElements, VKEYS, Table, BrowserType, CaseTypes
+from typing import Any, Iterator, Optional
+try:
+    import win32com.client
+except ImportError:  # SAP GUI scripting is only available on Windows, see Core.Simulator
+    win32com = None
+from Flow.Data import Case, load_case_from_json_file, TextElements, Table, BrowserType, CaseTypes, vkey_number
+from Flow.Columnar import ColumnStore
 from Flow.Results import Result
+from Flow.Sinks import open_result_sink
 from Flow.Actions import Step
 from Logging.Logging import Logger, LoggingConfig
-from Core.Utilities import explicit_wait_before, explicit_wait_after, Timer
-from time import sleep
+from Core.Utilities import explicit_wait_before, explicit_wait_after, id_index, SelectionRange, Timer
+from Core.Cache import ElementCache, TableCache, TableCacheEntry
+from Core.History import RunHistory
+from Core.Metadata import META_DATA_FIELDS, MetaDataCollector, SessionMetaData
+from Core.Waits import ReadinessWaiter
+from Core.Engine import StepEngine, StepResult
+from Core.Plan import CasePlan, resolve_id
+from Core.Screenshots import ScreenshotPipeline, ScreenshotRef, ScreenshotStore
+from Core.Tables import ExtractStats, iter_grid_rows, iter_table_control_rows
+from Core.Export import EXPORT_ENCODING, EXPORT_FILENAME, EXPORT_FORMAT_RADIO, EXPORT_FORMATS, EXPORT_PATH, READABLE_FORMATS, iter_export_rows
+from Core.Selection import COPY_SELECTION, MULTIPLE_SELECTION_TAB, SELECTION_OPTION_ROWS, SELECTION_OPTIONS, UPLOAD_CLIPBOARD, clipboard_lock, selection_uploads, write_clipboard
+from Core.Query import COMPARISON_OPTIONS, SE16_RESULT, SE16N_FIELD_NAME, SE16N_FIELDS, SE16N_HIGH, SE16N_LOW, SE16N_MAX_LINES, SE16N_MORE, SE16N_OUTPUT, SE16N_RESULT, SE16N_TABLE, QueryPlanner
+from Core.Trace import Tracer
+from Core.Latency import LatencyReport, StepLatency
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter, sleep
 import atexit
 import base64
 import datetime
@@ -26,7 +46,7 @@ class Session:
     __explicit_wait__: float = 0.0
     __explicit_wait_web__: float = 0.0
     
-    def __init__(self, case: Optional[Case] = None, json_data: Optional[str] = None) -> None:
+    def __init__(self, case: Optional[Case] = None, json_data: Optional[str] = None, sap_gui: Optional[Any] = None) -> None:
         """
         Initialize Session object.
         1. Load any available .env file
@@ -41,6 +61,8 @@ class Session:
             case {Optional[Case]} -- Provide a specific Case object (default: {None})
             json_data {Optional[str]} -- Provide a string of a path to a json data file to 
                                             be loaded (default: {None})
+            sap_gui {Optional[Any]} -- Provide a SAP GUI scripting object to use instead of 
+                                        win32com.client.GetObject("SAPGUI"), e.g. Core.Simulator.SapGuiAutomation (default: {None})
         """
         load_dotenv()
         self.case: Case = None
@@ -62,7 +84,7 @@ class Session:
         self.__session_number: int = 0
         self.__window_number: int = 0
         self.connection_name: str|None = None
-        self.sap_gui: win32com.client.CDispatch|None = None
+        self.sap_gui: win32com.client.CDispatch|None = sap_gui
         self.sap_app: win32com.client.CDispatch|None = None
         self.connection: win32com.client.CDispatch|None = None
         self.session: win32com.client.CDispatch|None = None
@@ -75,8 +97,27 @@ class Session:
         self.usr: win32com.client.CDispatch|None = None
         self.sbar: win32com.client.CDispatch|None = None
         self.current_element: win32com.client.CDispatch|None = None
+        self.meta_data: MetaDataCollector = MetaDataCollector()
+        self.history: RunHistory|None = None
+        self.__step_started: float|None = None
+        self.__step_index: int = 0
+        self.__finished_step: Step|None = None
+        self.tracer: Tracer|None = Tracer.from_policy(self.case.TraceConfig, self.case.LogConfig.LogPath)
+        self.latency: LatencyReport = LatencyReport()
+        self.__step_spans: Counter = Counter()
+        self.__com_started: float = 0.0
+        self.element_cache: ElementCache = ElementCache(enabled=self.case.CacheElements)
+        self.waiter: ReadinessWaiter = ReadinessWaiter(policy=self.case.WaitConfig, ready=self.is_ready)
         self.current_transaction: str|None = None
-        self.current_step: Step|None = self.case.Steps.pop(0) if len(self.case.Steps) != 0 else None
+        self.last_extract: ExtractStats|None = None
+        self.screenshots: ScreenshotPipeline|None = None
+        self.__hard_copy_to_memory: bool|None = None
+        self.__screenshot_count: int = 0
+        self.__export_count: int = 0
+        self.query_planner: QueryPlanner = QueryPlanner()
+        self.table_cache: TableCache = TableCache(self.case.TableCacheConfig)
+        self.steps: list[Step] = list(self.case.Steps)
+        self.current_step: Step|None = self.steps[0] if len(self.steps) != 0 else None
         atexit.register(self.cleanup)
     
     def __post_init__(self) -> None:
@@ -108,14 +149,46 @@ class Session:
             if isinstance(self.case.System, str):
                     self.open_connection(connection_name=self.case.System)
         else:
-            # TODO: Implement auto run steps if they are included in the case object.
             self.run_steps()
     
-    def run_steps(self) -> None:
-        while len(self.case.Steps) > 0:
-            __result = self.current_step.run()
-            self.current_step = self.case.Steps.pop(0)
+    def run_steps(self, steps: Optional[list[Step]] = None, continue_on_fail: Optional[bool] = None) -> list[StepResult]:
+        """
+        Execute the case's steps with a Core.Engine.StepEngine.
+        All steps are validated before the first one runs, execution stops at the first failed step 
+        unless continue_on_fail (or Case.ContinueOnFail) is set.
+
+        Keyword Arguments:
+            steps {Optional[list[Step]]} -- Steps to run, default is the steps the case had when the Session was created (default: {None})
+            continue_on_fail {Optional[bool]} -- Overrides Case.ContinueOnFail (default: {None})
+
+        Returns:
+            list[StepResult] -- Result, timing & return value of each executed step
+        """
+        __steps = list(steps) if steps is not None else self.steps
+        __results = StepEngine(self, continue_on_fail=continue_on_fail).run(__steps)
+        for result in __results:
+            self.logger.log.debug("%r", result)
+        __failed = len([x for x in __results if x.Result == Result.FAIL])
+        self.logger.log.info(f"Ran {len(__results)} of {len(__steps)} steps, {__failed} failed, in {sum(x.Seconds for x in __results):.3f}s")
+        return __results
     
+    def run_plan(self, plan: CasePlan, continue_on_fail: Optional[bool] = None) -> list[StepResult]:
+        """
+        Execute the steps of a compiled Core.Plan.CasePlan.
+        The plan is resolved again if it was compiled for another connection/session/window than the Session is bound to.
+
+        Arguments:
+            plan {CasePlan} -- Plan to run
+
+        Keyword Arguments:
+            continue_on_fail {Optional[bool]} -- Overrides Case.ContinueOnFail (default: {None})
+
+        Returns:
+            list[StepResult] -- Result, timing & return value of each executed step
+        """
+        __plan = plan.retarget(self.__connection_number, self.__session_number, self.__window_number)
+        return self.run_steps(steps=__plan.to_steps(), continue_on_fail=continue_on_fail)
+
     # Screenshot Actions
     def hard_copy(self, filename: str, image_type: Optional[str] = "PNG", pos: Optional[tuple[int, int, int, int]] = None) -> bytes|None:
         """
@@ -152,6 +225,73 @@ class Session:
                 error=err)
         return shot_bytes
 
+    @contextmanager
+    def trace_span(self, name: str, category: str, **args) -> Iterator[None]:
+        """
+        Context manager timing its block for the latency breakdown of the current step (see Core.Latency),
+        also added as span to the trace if the case is traced (Case.TraceConfig).
+
+        Arguments:
+            name {str} -- Span name
+            category {str} -- Span category, e.g. sleep, wait, screenshot or metadata
+        """
+        __start = perf_counter()
+        try:
+            if self.tracer is not None:
+                with self.tracer.span(name, category, **args):
+                    yield
+            else:
+                yield
+        finally:
+            self.__step_spans[category] += perf_counter() - __start
+
+    def screenshot(self, screenshot_name: str, pos: Optional[tuple[int, int, int, int]] = None) -> ScreenshotRef|None:
+        """
+        Capture the SAP GUI main window (or a region of it) into the case's screenshot pipeline.
+        The capture is taken with main_window.HardCopyToMemory when SAP GUI supports it, otherwise HardCopy writes
+        a temporary file. Conversion & storage run on the pipeline's worker threads, see Core.Screenshots.
+
+        Arguments:
+            screenshot_name {str} -- Name of screenshot
+
+        Keyword Arguments:
+            pos {Optional[tuple[int, int, int, int]]} -- Optional tuple of (left, top, width, height) (default: {None})
+
+        Returns:
+            ScreenshotRef|None -- Reference to the stored screenshot or None if there is no window or the capture failed
+        """
+        if self.main_window is None:
+            return None
+        with self.trace_span("screenshot", "screenshot", screenshot=screenshot_name):
+            try:
+                if self.screenshots is None:
+                    __policy = self.case.ScreenshotConfig
+                    __store_path = __policy.StorePath if __policy.StorePath is not None else Path(self.case.LogConfig.LogPath, "screenshots")
+                    self.screenshots = ScreenshotPipeline(ScreenshotStore(__store_path), policy=__policy)
+                    if __policy.Dedup and not self.screenshots.dedup and self.logger is not None:
+                        self.logger.log.warning("Screenshot dedup requires Pillow (pip install Pillow), only identical screenshots are stored once")
+                if pos is None and self.__hard_copy_to_memory is not False:
+                    try:
+                        __data = bytes(self.main_window.HardCopyToMemory("PNG"))
+                        self.__hard_copy_to_memory = True
+                        return self.screenshots.submit(screenshot_name, data=__data)
+                    except Exception:
+                        if self.__hard_copy_to_memory is True:
+                            raise
+                        # SAP GUI before 7.60 has no HardCopyToMemory
+                        self.__hard_copy_to_memory = False
+                self.__screenshot_count += 1
+                __filename = f"{screenshot_name}_{os.getpid()}_{id(self)}_{self.__screenshot_count}"
+                if pos is not None:
+                    __path = self.main_window.HardCopy(__filename, "PNG", pos[0], pos[1], pos[2], pos[3])
+                else:
+                    __path = self.main_window.HardCopy(__filename, "PNG")
+                return self.screenshots.submit(screenshot_name, path=__path)
+            except Exception as err:
+                if self.logger is not None:
+                    self.logger.log.warning(f"Unable to capture screenshot: {screenshot_name}|{err}")
+                return None
+
     @explicit_wait_before(wait_time=__explicit_wait__)
     def capture_fullscreen(self, screenshot_name: str) -> bytes|None:
         """
@@ -212,7 +352,7 @@ class Session:
         """
         shot_bytes: bytes|None = None
         try:
-            __element = self.session.FindById(self.ace_id(element_id))
+            __element = self.find_element(element_id)
             __pos = (
                 __element.ScreenLeft, 
                 __element.ScreenTop, 
@@ -254,9 +394,10 @@ class Session:
         Returns:
             bool -- Returns True if element exist otherwise False
         """
+        __element = element
         try:
             __element = self.ace_id(element)
-            self.current_element = self.session.findById(__element)
+            self.current_element = self.find_element(__element)
             self.step_pass(
                 msg="Element: %s is valid" % __element, 
                 ss_name="is_element_pass")
@@ -268,11 +409,51 @@ class Session:
                 error=err)
         return False
 
+    def find_element(self, id: str) -> Any:
+        """
+        Find a SAP GUI element by its (partial) id. 
+        Handles are served from the element cache of the current screen, only a cache miss 
+        costs a findById round trip to the SAP GUI.
+
+        Arguments:
+            id {str} -- SAP GUI element id
+
+        Returns:
+            win32com.client.CDispatch -- Returns the SAP GUI element, raises the scripting engine error if not found
+        """
+        __id = self.ace_id(id)
+        if self.element_cache.enabled:
+            if self.element_cache.stale:
+                self.check_screen()
+            __element = self.element_cache.get(__id)
+            if __element is not None:
+                return __element
+        __element = self.session.findById(__id)
+        self.element_cache.put(__id, __element)
+        return __element
+
+    def check_screen(self) -> bool:
+        """
+        Revalidate the element cache against the current window number, program and screen number.
+        Called on the first element lookup after an action that may have caused a server round trip.
+
+        Returns:
+            bool -- Returns True if the cached element handles are still valid otherwise False
+        """
+        try:
+            __screen = (self.__window_number, self.session_info.Program, self.session_info.ScreenNumber)
+        except Exception as err:
+            self.logger.log.debug(f"Unable to read screen info, clearing element cache|{err}")
+            self.element_cache.clear()
+            return False
+        return self.element_cache.validate(__screen)
+
     def exit(self) -> None:
         """
         Exits the current SAP GUI session and window.
         """
         try:
+            self.element_cache.clear()
             self.connection.closeSession(self.ace_id())
             self.connection.closeConnection()
             self.step_pass(
@@ -284,23 +465,86 @@ class Session:
                 ss_name="exit_exception", 
                 error=err)
     
-    def cleanup(self) -> None:
+    def cleanup(self, close_sap: Optional[bool] = None) -> None:
         """
         Handler for cleanup at end of session usage. 
         If CloseOnCleanup flag is True then makes sure to exit open sessions even if process is terminated due to error.
         Updates Case.Status.Result to Result.FAIL is any step has fails else to Result.PASS. 
         Logs to case's final result status.
+
+        Keyword Arguments:
+            close_sap {Optional[bool]} -- Overrides the case's CloseSAPOnCleanup flag, e.g. when the session is reused by Core.Runner (default: {None})
         """
-        if self.case.CloseSAPOnCleanup:
+        if self.current_step is not None and self.current_step is not self.__finished_step and self.current_step.Seconds is not None:
+            try:
+                __after = self.meta_data.collect(self.session_info) if self.session is not None else None
+            except Exception:
+                __after = None
+            self.finish_step(self.current_step, __after)
+        if (close_sap if close_sap is not None else self.case.CloseSAPOnCleanup):
             self.exit()
         if self.case.Status.Result is None:
-            if len(self.case.Status.FailedSteps) != 0:
+            if self.case.Status.Failed != 0 or len(self.case.Status.FailedSteps) != 0:
                 self.case.Status.Result = Result.FAIL
-        else:
-            self.case.Status.Result = Result.PASS
+            else:
+                self.case.Status.Result = Result.PASS
+        if self.screenshots is not None:
+            self.screenshots.close(wait=True)
+            if self.logger is not None:
+                self.logger.log.info(repr(self.screenshots.stats))
+        if self.case.Status.Sink is not None:
+            self.case.Status.Sink.close()
+            if self.logger is not None:
+                self.logger.log.info(f"Wrote {self.case.Status.Sink.count} step results to {self.case.Status.Sink.path}")
+        if self.history is not None:
+            self.close_history()
+        if self.logger is not None and len(self.latency.groups["case"]) != 0:
+            self.logger.log.info("Latency breakdown\n%s", self.latency.format())
+        if self.tracer is not None:
+            self.close_trace()
+        if self.table_cache.enabled:
+            self.close_table_cache()
+        __waits = self.waiter.stats
+        if self.logger is not None and __waits.Waits > 0:
+            self.logger.log.info(f"Waited {__waits.WaitedSeconds:.3f}s in {__waits.Waits} readiness waits ({__waits.Polls} polls, {__waits.Timeouts} timeouts)")
         self.documentation(
             f"{self.case.Name} completed with status: {self.case.Status.Result.value}")
 
+    def close_table_cache(self) -> None:
+        """
+        Persist the table cache (Case.TableCacheConfig.Path) and log its hit rate & the seconds saved.
+        """
+        try:
+            self.table_cache.save()
+        except (OSError, TypeError) as err:
+            if self.logger is not None:
+                self.logger.log.warning(f"Unable to save table cache to {self.table_cache.policy.Path}|{err}")
+        if self.logger is not None:
+            self.logger.log.info(f"Table cache: {self.table_cache.stats.Hits} hits, {self.table_cache.stats.Misses} misses ({self.table_cache.stats.HitRate:.0%}), saved {self.table_cache.seconds_saved:.3f}s of table reads")
+
+    def table_cache_key(self, *parts: Any) -> tuple:
+        """
+        Returns a table cache key of the parts scoped to the system & client of the session.
+        """
+        if self.session_info is None:
+            return (None, None, *parts)
+        return (self.session_info.SystemName, self.session_info.Client, *parts)
+
+    def close_trace(self) -> None:
+        """
+        End the traced step, write the Chrome trace-event file of the case (Case.TraceConfig) and log the most called COM members.
+        """
+        try:
+            __path = self.tracer.close()
+            if self.logger is not None:
+                __total = self.tracer.total
+                self.logger.log.info(
+                    f"Traced {__total.Calls} COM calls ({__total.ComSeconds:.3f}s) in {len(self.tracer.steps)} steps to {__path}, most called: "
+                    + ", ".join(f"{member} {calls}x {seconds:.3f}s" for member, calls, seconds in self.tracer.hot_members(5)))
+        except Exception as err:
+            if self.logger is not None:
+                self.logger.log.warning(msg=f"Unhandled exception while writing trace|{err}")
+
     def wait(self, seconds: float) -> None:
         """
         Wait/Sleep for a given number fo seconds.
@@ -314,12 +558,39 @@ class Session:
             self.documentation("Waiting 1 second...")
         else:
             self.documentation(f"Waiting {seconds} seconds...")
-        sleep(seconds)
+        with self.trace_span("wait", "sleep", seconds=seconds):
+            sleep(seconds)
     
+    def is_ready(self) -> bool:
+        """
+        Readiness predicate of the session's ReadinessWaiter.
+
+        Returns:
+            bool -- Returns True if there is no SAP GUI session yet or the session is not busy
+        """
+        return self.session is None or not self.session.Busy
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for SAP GUI to become ready according to the case's WaitPolicy.
+        Replaces the fixed explicit wait before/after Session actions.
+
+        Keyword Arguments:
+            timeout {Optional[float]} -- Timeout in seconds, default is WaitPolicy.Timeout (default: {None})
+
+        Returns:
+            bool -- Returns True if SAP GUI is ready otherwise False (timeout)
+        """
+        with self.trace_span("wait_until_ready", "wait"):
+            __ready = self.waiter.wait(timeout=timeout)
+        if not __ready and self.logger is not None:
+            self.logger.log.warning(f"SAP GUI session still busy after waiting {self.waiter.policy.Timeout}s")
+        return __ready
+
     def wait_for_element(self, id: str, timeout: Optional[float] = 60.0) -> None:
         """
         Waits <timeout> seconds for the provided SAP GUI element to become ready or available.
-        Rechecks ever half second.
+        Rechecks with the adaptive back-off of the case's WaitPolicy.
 
         Arguments:
             id {str} -- SAP GUI element id
@@ -329,13 +600,9 @@ class Session:
         """
         try:
             __id = self.ace_id(id)
-            t = Timer()
-            while True:
-                if not self.is_element(element=__id) and t.elapsed() <= timeout:
-                    self.wait(seconds=0.5)
-                else:
-                    break
-            if not self.is_element(element=__id):
+            with self.trace_span("wait_for_element", "wait", id=__id):
+                __found = self.waiter.wait_for(lambda: self.find_element(__id) is not None, timeout=timeout)
+            if not __found:
                 self.step_fail(
                     msg=f"No element found with id: {__id}", 
                     ss_name="wait_for_element_fail")
@@ -367,9 +634,7 @@ class Session:
             self.logger.log.info(f"Unhandled exception during Try and Continue wrapped function: {func}")
             self.current_step.Status.Result = Result.WARN
             self.current_step.Status.Error = err
-            self.case.Status.PassedSteps.append(self.current_step)
-            if self.case.ScreenShotOnPass:
-                self.case.Status.PassedScreenShots.append(self.capture_fullscreen(screenshot_name="try_and_continue_exception"))            
+            self.record_step(self.screenshot(screenshot_name="try_and_continue_exception") if self.case.ScreenShotOnPass else None)
         return __result
     
     def parse_document_number(self) -> str|None:
@@ -394,59 +659,8 @@ class Session:
         Returns:
             str -- Full SAP GUI element id
         """
-        base_id: str = f"/app/con[{self.__connection_number}]/ses[{self.__session_number}]/wnd[{self.__window_number}]"
-        match id:
-            case ("",  " ", None):
-                return base_id
-            case id.startswith("usr"):
-                return f"{base_id}/{id}"
-            case id.startswith("/usr"):
-                return f"{base_id}{id}"
-            case id.startswith("wnd"):
-                return f"/app/con[{self.__connection_number}]/ses[{self.__session_number}]/{id}"
-            case id.startswith("/wnd"):
-                return f"/app/con[{self.__connection_number}]/ses[{self.__session_number}]{id}"
-            case id.startswith("ses"):
-                return f"/app/con[{self.__connection_number}]/{id}"
-            case id.startswith("/ses"):
-                return f"/app/con[{self.__connection_number}]{id}"
-            case id.startswith("con"):
-                return f"/app/{id}"
-            case id.startswith("/con"):
-                return f"/app{id}"
-            case id.startswith("app"):
-                return f"/{id}"
-            case id.startswith("/app"):
-                return id
-            case _:
-                return id
-        
-        # base_id: str = f"/app/con[{self.__connection_number}]/ses[{self.__session_number}]/wnd[{self.__window_number}]"
-        # if id in ("",  " ", None):
-        #     return base_id
-        # elif id.startswith("usr"):
-        #     return f"{base_id}/{id}"
-        # elif id.startswith("/usr"):
-        #     return f"{base_id}{id}"
-        # elif id.startswith("wnd"):
-        #     return f"/app/con[{self.__connection_number}]/ses[{self.__session_number}]/{id}"
-        # elif id.startswith("/wnd"):
-        #     return f"/app/con[{self.__connection_number}]/ses[{self.__session_number}]{id}"
-        # elif id.startswith("ses"):
-        #     return f"/app/con[{self.__connection_number}]/{id}"
-        # elif id.startswith("/ses"):
-        #     return f"/app/con[{self.__connection_number}]{id}"
-        # elif id.startswith("con"):
-        #     return f"/app/{id}"
-        # elif id.startswith("/con"):
-        #     return f"/app{id}"
-        # elif id.startswith("app"):
-        #     return f"/{id}"
-        # elif id.startswith("/app"):
-        #     return id
-        # else:
-        #     return id
-    
+        return resolve_id(id, self.__connection_number, self.__session_number, self.__window_number)
+
     def documentation(self, msg: Optional[str] = None) -> None:
         """
         Handler for documenting a msg in the log.
@@ -458,7 +672,6 @@ class Session:
         if _msg is not None and _msg != "" and _msg != "--":
             self.logger.log.documentation(_msg)
     
-    @explicit_wait_before(wait_time=__explicit_wait__)
     def step_fail(self, msg: Optional[str] = None, ss_name: Optional[str] = None, error: Optional[str] = None) -> None:
         """
         Handler for test case steps, called when step fails or is unsuccessful.
@@ -473,14 +686,14 @@ class Session:
             self.logger.log.error(msg)
         self.current_step.Status.Result = Result.FAIL
         self.current_step.Status.Error = error if error is not None else ""
-        self.case.Status.FailedSteps.append(self.current_step)
+        __ref = None
         if self.case.ScreenShotOnFail:
             __ss_name = ss_name if ss_name is not None else f"screenshot_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            self.case.Status.FailedScreenShots.append(self.capture_fullscreen(screenshot_name=__ss_name))
+            __ref = self.screenshot(screenshot_name=__ss_name)
+        self.record_step(__ref)
         if self.case.ExitOnFail:
             sys.exit()
 
-    @explicit_wait_before(wait_time=__explicit_wait__)
     def step_pass(self, msg: Optional[str] = None, ss_name: Optional[str] = None) -> None:
         """
         Handler for test case steps, called when step passes or is successful.
@@ -493,10 +706,90 @@ class Session:
         if msg:
             self.logger.log.info(msg)
         self.current_step.Status.Result = Result.PASS
-        self.case.Status.PassedSteps.append(self.current_step)
+        __ref = None
         if self.case.ScreenShotOnPass:
             __ss_name = ss_name if ss_name is not None else f"screenshot_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            self.case.Status.PassedScreenShots.append(self.capture_fullscreen(screenshot_name=__ss_name))
+            __ref = self.screenshot(screenshot_name=__ss_name)
+        self.record_step(__ref)
+
+    def record_step(self, screenshot: Optional[ScreenshotRef] = None) -> None:
+        """
+        Record the current step in Case.Status. With a Case.ResultConfig sink the step is streamed to the sink 
+        (opened on the first step) instead of being kept in memory, see Flow.Sinks.
+
+        Keyword Arguments:
+            screenshot {Optional[ScreenshotRef]} -- Screenshot of the step (default: {None})
+        """
+        if self.__step_started is not None:
+            self.current_step.Seconds = perf_counter() - self.__step_started
+            self.current_step.Latency = StepLatency(
+                Case=self.case.Name, 
+                Step=self.current_step.Name, 
+                Transaction=self.current_step.Transaction, 
+                Seconds=self.current_step.Seconds, 
+                Overhead=dict(self.__step_spans), 
+                ComSeconds=self.tracer.total.ComSeconds - self.__com_started if self.tracer is not None else None)
+        __status = self.case.Status
+        if __status.Sink is None and self.case.ResultConfig.Sink is not None:
+            __status.stream_to(
+                open_result_sink(self.case.ResultConfig, self.case.LogConfig.LogPath, self.case.Name), 
+                keep_failures=self.case.ResultConfig.KeepFailures)
+        __status.add_step(self.current_step, screenshot)
+
+    def finish_step(self, step: Step|None, after: Optional[SessionMetaData] = None) -> None:
+        """
+        Complete the latency breakdown of a finished step (Step.Latency) with the server response time & round trips
+        of the step, add it to Session.latency and write the step to the case's run history (Case.HistoryConfig).
+        Called by new_step for the previous step and by cleanup for the last one. Steps that never passed or failed are skipped.
+
+        Arguments:
+            step {Step|None} -- The finished step
+
+        Keyword Arguments:
+            after {Optional[SessionMetaData]} -- Session metadata after the step, the ResponseTime & RoundTrips deltas are 
+                                                    the step's server time & round trips (default: {None})
+        """
+        if step is None or step.Seconds is None or step is self.__finished_step:
+            return
+        self.__finished_step = step
+        __latency = step.Latency
+        __measured = __latency is not None and step.MetaData is not None and after is not None
+        if __latency is not None:
+            __latency.Index = self.__step_index
+            self.latency.add(__latency.measure(step.MetaData, after))
+        if self.case.HistoryConfig.Path is not None:
+            try:
+                if self.history is None:
+                    self.history = RunHistory(self.case.HistoryConfig.Path, flush_every=self.case.HistoryConfig.FlushEvery)
+                    __version = None
+                    if self.case.SapMajorVersion is not None:
+                        __version = f"{self.case.SapMajorVersion}.{self.case.SapMinorVersion}.{self.case.SapPatchLevel}.{self.case.SapRevision}"
+                    self.history.start_run(self.case.Name, meta_data=step.MetaData, sap_version=__version)
+                self.history.add(
+                    self.case.Name, 
+                    self.__step_index, 
+                    step, 
+                    step.Seconds, 
+                    response_time=__latency.ServerSeconds * 1000 if __measured else None, 
+                    round_trips=__latency.RoundTrips if __measured else None)
+            except Exception as err:
+                self.logger.log.warning(msg=f"Unhandled exception while writing run history|{err}")
+        self.__step_index += 1
+
+    def close_history(self) -> None:
+        """
+        Write the pending step timings, log the steps slower than their baseline and close the run history.
+        """
+        __policy = self.case.HistoryConfig
+        try:
+            for regression in self.history.regressions(factor=__policy.RegressionFactor, min_samples=__policy.MinSamples):
+                self.logger.log.warning(
+                    f"Step {regression.Index} {regression.Step} took {regression.Value:.3f}s, {regression.Ratio:.1f}x its median "
+                    f"of {regression.Baseline:.3f}s in {regression.Samples} earlier runs")
+            self.history.close()
+        except Exception as err:
+            self.logger.log.warning(msg=f"Unhandled exception while closing run history|{err}")
+        self.history = None
     
     @explicit_wait_before(wait_time=__explicit_wait__)
     def handle_unknown_exception(self, msg: Optional[str] = None, ss_name: Optional[str] = None, error: Optional[str] = None) -> None:
@@ -606,6 +899,7 @@ class Session:
             desc {Optional[str]} -- Optional step description for reporting (default: {None})
         """
         try:
+            __previous = self.current_step
             __action = action
             __name = name if name is not None else __action.replace("_", " ").title()
             __desc = desc if desc is not None else ""
@@ -616,16 +910,28 @@ class Session:
                 Kwargs = kwargs,
                 Name = __name, 
                 Description = __desc)
+            if self.tracer is not None:
+                self.tracer.begin_step(self.current_step)
             self.collect_step_meta_data()
-            self.case.Steps.append(self.current_step)
-            self.logger.log.info(self.current_step.__repr__())
+            # the metadata of the new step is the state after the previous one
+            self.finish_step(__previous, self.current_step.MetaData)
+            self.__step_spans.clear()
+            if self.tracer is not None:
+                self.__com_started = self.tracer.total.ComSeconds
+            self.__step_started = perf_counter()
+            # a streaming case (Case.ResultConfig) keeps its executed steps in the result sink only
+            if self.case.ResultConfig.Sink is None:
+                self.case.Steps.append(self.current_step)
+            # formatted by the log handlers only if INFO is enabled
+            self.logger.log.info("%r", self.current_step)
         except Exception as err:
             self.logger.log.warning(msg=f"Unhandled exception while creating new step|{err}")
 
-    @explicit_wait_before(wait_time=__explicit_wait__)
     def collect_step_meta_data(self) -> None:
         """
-        Collect SAP metadata for current test step.
+        Collect SAP metadata for current test step, see Core.Metadata.MetaDataCollector.
+        Static values are read once per connection and the others only after an action that can talk to the server 
+        (expire_screen), steps without such an action in between share the same Step.MetaData snapshot.
         Data collected includes:
         - Application Server
         - Language
@@ -641,20 +947,27 @@ class Session:
         """
         try:
             if self.current_step and self.session:
-                self.current_step.ApplicationServer = self.session_info.ApplicationServer
-                self.current_step.Language = self.session_info.Language
-                self.current_step.Program = self.session_info.Program
-                self.current_step.ResponseTime = self.session_info.ResponseTime
-                self.current_step.RoundTrips = self.session_info.RoundTrips
-                self.current_step.ScreenNumber = self.session_info.ScreenNumber
-                self.current_step.SystemName = self.session_info.SystemName
-                self.current_step.SystemNumber = self.session_info.SystemNumber
-                self.current_step.SystemSessionId = self.session_info.SystemSessionId
-                self.current_step.Transaction = self.session_info.Transaction
-                self.current_step.User = self.session_info.User
+                with self.trace_span("collect_step_meta_data", "metadata"):
+                    __meta_data = self.meta_data.collect(self.session_info)
+                self.current_step.MetaData = __meta_data
+                for name in META_DATA_FIELDS:
+                    setattr(self.current_step, name, getattr(__meta_data, name))
         except Exception as err:
             self.logger.log.warning(msg=f"Unhandled exception while collecting step metadata|{err}")
     
+    def expire_screen(self) -> None:
+        """
+        Called after every action that can talk to the server: the cached element handles & the step metadata
+        are out of date and the response time & round trips of the dialog step are added to the current step,
+        see Core.Cache.ElementCache & Core.Metadata.MetaDataCollector.
+        """
+        self.element_cache.expire()
+        try:
+            self.meta_data.expire(self.session_info)
+        except Exception as err:
+            self.meta_data.expire()
+            self.logger.log.debug(f"Unable to read the dialog step of the session|{err}")
+
     @explicit_wait_before(wait_time=__explicit_wait__)
     def collect_case_meta_data(self) -> None:
         """
@@ -698,44 +1011,120 @@ class Session:
     #     return self.case.Data
     
     # Connection Actions
-    def open_connection(self, connection_name: str) -> None:
+    @property
+    def connection_number(self) -> int:
+        return self.__connection_number
+
+    @property
+    def session_number(self) -> int:
+        return self.__session_number
+
+    @property
+    def window_number(self) -> int:
+        return self.__window_number
+
+    @staticmethod
+    def id_index(id: str) -> int:
+        """
+        Returns the index of the last segment of a SAP GUI id, e.g. 3 for /app/con[0]/ses[3], see Core.Utilities.id_index
+        """
+        return id_index(id)
+
+    def bind_session(self, session_number: int, timeout: Optional[float] = 30.0) -> Any:
+        """
+        Get the SAP GUI session /ses[<session_number>] of the current connection, 
+        creating new sessions with CreateSession until it exists (a SAP logon allows up to 6 sessions).
+
+        Arguments:
+            session_number {int} -- Index of the session in the connection
+
+        Keyword Arguments:
+            timeout {Optional[float]} -- Time in seconds to wait for each new session to open (default: {30.0})
+
+        Returns:
+            Any -- GuiSession scripting object
+        """
+        while True:
+            __sessions = [x for x in self.connection.sessions]
+            for ses in __sessions:
+                if self.id_index(ses.Id) == session_number:
+                    return ses
+            __count = len(__sessions)
+            __sessions[0].CreateSession()
+            if not self.waiter.wait_for(lambda: len(self.connection.sessions) > __count, timeout=timeout):
+                raise TimeoutError(f"Unable to create session {session_number} on connection {self.connection.Id}")
+
+    def open_connection(
+        self, 
+        connection_name: str, 
+        session_number: Optional[int] = None, 
+        connection_number: Optional[int] = None, 
+        new_connection: Optional[bool] = False
+        ) -> None:
         """
         Open win32 api connection to SAP GUI application.
 
         Arguments:
             connection_name {str} -- SAP environment name to connect with, can be found in the login pad.
-        """
-        self.new_step(action="open_connection", connection_name=connection_name)
+
+        Keyword Arguments:
+            session_number {Optional[int]} -- Bind to session /ses[<session_number>] of the connection, 
+                                                creating it if needed, default is the first session (default: {None})
+            connection_number {Optional[int]} -- Bind to the open connection /app/con[<connection_number>] instead 
+                                                    of the first connection matching connection_name (default: {None})
+            new_connection {Optional[bool]} -- Always open a new connection, e.g. a second logon to the same system (default: {False})
+        """
+        self.new_step(
+            action="open_connection", 
+            connection_name=connection_name, 
+            session_number=session_number, 
+            connection_number=connection_number, 
+            new_connection=new_connection)
         self.connection_name = connection_name if connection_name else self.connection_name
         self.documentation(msg=f"Opening connection for {self.connection_name}")
         if not hasattr(self.sap_app, "OpenConnection"):
             try:
-                self.sap_gui = win32com.client.GetObject("SAPGUI")
-                if not type(self.sap_gui) == win32com.client.CDispatch:
-                    self.step_fail("Error while getting SAP GUI object using win32com.client")
+                if self.sap_gui is None:
+                    if win32com is None:
+                        self.step_fail("win32com.client is not available, provide a sap_gui object to Session")
+                    self.sap_gui = win32com.client.GetObject("SAPGUI")
+                    if not type(self.sap_gui) == win32com.client.CDispatch:
+                        self.step_fail("Error while getting SAP GUI object using win32com.client")
+                if self.tracer is not None:
+                    self.sap_gui = self.tracer.wrap(self.sap_gui, "SapGuiAutomation")
+                    if self.logger is not None:
+                        self.tracer.watch(self.logger.log)
                 self.sap_app = self.sap_gui.GetScriptingEngine
-                if not type(self.sap_app) == win32com.client.CDispatch:
+                if self.sap_app is None:
                     self.sap_gui = None
                     self.step_fail("Error while getting SAP scripting engine")
                 __conns = self.sap_app.connections
-                if len(__conns) == 0:
+                if connection_number is not None:
+                    for conn in __conns:
+                        if self.id_index(conn.Id) == connection_number:
+                            self.connection = conn
+                            self.__connection_number = connection_number
+                    if self.connection is None:
+                        raise ValueError(f"No open connection with number {connection_number}")
+                elif new_connection or len(__conns) == 0:
                     self.connection = self.sap_app.OpenConnection(self.connection_name, True)
-                    self.__connection_number = self.connection.Id[-2]
+                    self.__connection_number = self.id_index(self.connection.Id)
                 else:
                     for conn in __conns:
                         if conn.description == connection_name:
                             self.connection = conn
-                            self.__connection_number = self.connection.Id[-2]
+                            self.__connection_number = self.id_index(self.connection.Id)
                     if self.connection is None:
                         self.connection = self.sap_app.OpenConnection(self.connection_name, True)
-                        self.__connection_number = self.connection.Id[-2]
+                        self.__connection_number = self.id_index(self.connection.Id)
                 __sessions = self.connection.sessions
-                if len(__sessions) == 0:
+                if session_number is not None:
+                    self.session = self.bind_session(session_number)
+                elif len(__sessions) == 0:
                     self.session = self.connection.children(self.__session_number)
-                    self.__session_number = self.session.Id[-2]
                 else:
                     self.session = __sessions[0]
-                    self.__session_number = self.session.Id[-2]
+                self.__session_number = self.id_index(self.session.Id)
                 self.collect_session_info()
                 self.step_pass(
                     msg=f"Connection open for {self.connection_name}", 
@@ -777,9 +1166,10 @@ class Session:
         """
         try:
             if self.session:
+                self.element_cache.clear()
                 self.wait_for_element(self.ace_id())
                 self.main_window = self.session.findById(self.ace_id())
-                self.__window_number = self.main_window.Id[-2]
+                self.__window_number = self.id_index(self.main_window.Id)
                 self.mbar = self.session.findById(f"{self.ace_id()}/mbar")
                 self.tbar0 = self.session.findById(f"{self.ace_id()}/tbar[0]")
                 self.titl = self.session.findById(f"{self.ace_id()}/titl")
@@ -787,6 +1177,7 @@ class Session:
                 self.usr = self.session.findById(f"{self.ace_id()}/usr")
                 self.sbar = self.session.findById(f"{self.ace_id()}/sbar")
                 self.session_info = self.session.info
+                self.meta_data.reset()
         except Exception as err:
             self.logger.log.warning(msg=f"Unhandled exception while collecting session info|{err}")
     
@@ -837,7 +1228,7 @@ class Session:
                     if match_id is not None:
                         __text = None
                         try:
-                            __text = self.session.FindById(match_id).Text
+                            __text = self.find_element(match_id).Text
                         except Exception as err:
                             self.handle_unknown_exception(
                                 f"Unable to locate match_id: {match_id}.", 
@@ -868,8 +1259,10 @@ class Session:
         """
         self.new_step(action="start_transaction", transaction=transaction)
         self.current_transaction = transaction.upper()
+        self.table_cache.invalidate_transaction(self.current_transaction)
         try:
             self.session.startTransaction(self.current_transaction)
+            self.expire_screen()
             self.step_pass(
                 msg=f"Successfully started transaction: {self.current_transaction}", 
                 ss_name="start_transaction_pass")
@@ -886,6 +1279,7 @@ class Session:
         self.new_step(action="end_transaction", transaction=self.current_transaction)
         try:
             self.session.endTransaction()
+            self.expire_screen()
             self.step_pass(
                 msg=f"Successfully ended transaction: {self.current_transaction}", 
                 ss_name="end_transaction_pass")
@@ -908,6 +1302,7 @@ class Session:
         if self.is_element(id):
             try:
                 self.current_element.verticalScrollbar.position = pos
+                self.expire_screen()
                 self.step_pass(
                     msg=f"Successfully set scrollbar: {self.current_element.Id} \
                         to position: {pos}.", 
@@ -958,6 +1353,7 @@ class Session:
         if self.is_element(id):
             try:
                 self.current_element.horizontalScrollbar.position = pos
+                self.expire_screen()
                 self.step_pass(
                     msg=f"Successfully set horizontal scrollbar: {self.current_element.Id} \
                         to position: {pos}.", 
@@ -1024,9 +1420,11 @@ class Session:
             try:
                 if self.current_element.Type in ("GuiTab", "GuiMenu", "GuiRadioButton"):
                     self.current_element.Select()
+                    self.expire_screen()
                     self.step_pass(msg=f"Successfully clicked element: {id}", ss_name="click_element_success")
                 elif self.current_element.Type == "GuiButton":
                     self.current_element.Press()
+                    self.expire_screen()
                     self.step_pass(msg=f"Successfully clicking GuiButton: {id}", ss_name="click_gui_button_success")
                 else:
                     self.step_fail(msg=f"Unable to click element: {id}", ss_name="click_element_failed")
@@ -1047,7 +1445,7 @@ class Session:
         self.new_step(action="set_focus_of_element", id=id)
         if self.is_element(id):
             try:
-                self.session.FindById(self.current_element).SetFocus()
+                self.current_element.SetFocus()
             except Exception as err:
                 self.handle_unknown_exception(
                     msg=f"Unhandled exception while setting focus of element: {id}", 
@@ -1067,12 +1465,14 @@ class Session:
         if self.is_element(table_id):
             try:
                 self.current_element.pressToolbarButton(button_id)
+                self.expire_screen()
                 self.step_pass(
                     msg=f"Successfully clicked toolbar button: {button_id} \
                         for table: {self.current_element.Id}", 
                     ss_name="click_toolbar_button_pass")
             except AttributeError:
                 self.current_element.pressButton(button_id)
+                self.expire_screen()
                 self.step_pass(
                     msg=f"Successfully clicked toolbar button: {button_id} for table: {self.current_element.Id}", 
                     ss_name="click_toolbar_button_pass")
@@ -1097,6 +1497,7 @@ class Session:
             try:
                 if self.current_element.Type == "GuiShell":
                     self.current_element.doubleClickItem(item_id, column_id)
+                    self.expire_screen()
                 self.step_pass(
                     msg=f"Successfully double clicked id: {self.current_element.Id} at item: {item_id} and column: {column_id}", 
                     ss_name="double_click_pass")
@@ -1123,7 +1524,7 @@ class Session:
         __value: str = None
         if self.is_element(table_id):
             try:
-                __value = self.session.findById(self.current_element.Id).getCellValue(row_num, column_id)
+                __value = self.current_element.getCellValue(row_num, column_id)
                 self.step_pass(msg=f"Success getting cell value from table: {self.current_element.Id} in \
                     column: {column_id} and row: {row_num}", 
                     ss_name="get_cell_value_pass")
@@ -1147,8 +1548,9 @@ class Session:
         self.new_step(action="set_combobox", id=id, key=key)
         if self.is_element(id):
             try:
-                if self.current_element.Id == "GuiComboBox":
-                    self.session.findById(self.current_element.Id).key = key
+                if self.current_element.Type == "GuiComboBox":
+                    self.current_element.key = key
+                    self.expire_screen()
                     self.step_pass(msg=f"Successfully set combobox: {self.current_element.Id} with key: {key}", 
                         ss_name="set_combobox_pass")
             except Exception as err:
@@ -1232,7 +1634,7 @@ class Session:
         __value: str = None
         if self.is_element(id):
             try:
-                if self.current_element.Type in TextElements:
+                if self.current_element.Type in TextElements.__members__:
                     __value = self.current_element.Text
                     self.step_pass(
                         msg=f"Successfully got value from: {self.current_element.Id}", 
@@ -1266,7 +1668,7 @@ class Session:
         self.new_step(action="set_text", id=id, text=text)
         if self.is_element(id):
             try:
-                if self.current_element.Type in [i.value for i in TextElements]:
+                if self.current_element.Type in TextElements.__members__:
                     if self.current_element.Changeable:
                         self.current_element.Text = text
                         self.step_pass(
@@ -1319,6 +1721,7 @@ class Session:
             try:
                 if self.current_element.Type == "GuiCheckBox":
                     self.current_element.selected = state
+                    self.expire_screen()
                     self.step_pass(msg="", ss_name="set_checkbox_pass")
                 else:
                     self.step_fail(msg="", ss_name="set_checkbox_fail")
@@ -1337,32 +1740,21 @@ class Session:
     def send_vkey(self, vkey: str) -> None:
         """
         Send a virtual key press to the currently active main window of the SAP GUi session.
-        A complete list of supported virtual keys can be found in Flow.Data.VKEYS
+        A complete list of supported virtual keys can be found in Flow.Data.VKEY_NUMBERS
 
         Arguments:
             vkey {str} -- Virtual key to send to the window
         """
         self.new_step(action="send_vkey", vkey=vkey)
-        __vkey_id: str = str(vkey)
-        if not __vkey_id.isdigit():
-            __search_comb: str = __vkey_id.upper()
-            __search_comb = __search_comb.replace(" ", "")
-            __search_comb = __search_comb.replace("CONTROL", "CTRL")
-            __search_comb = __search_comb.replace("DELETE", "DEL")
-            __search_comb = __search_comb.replace("INSERT", "INS")
-            try:
-                __vkey_id = VKEYS.index(__search_comb)
-            except ValueError:
-                if __search_comb == "CTRL+S":
-                    __vkey_id = 11
-                elif __search_comb == "ESC":
-                    __vkey_id = 12
-                else:
-                    self.step_fail(
-                        msg=f"Invalid vkey: {__vkey_id}, provide a valid Vkey number or combination", 
-                        ss_name="send_vkey_fail")
+        __vkey_id: str|int = vkey
+        try:
+            __vkey_id = vkey_number(vkey)
+        except ValueError as err:
+            self.step_fail(msg=str(err), ss_name="send_vkey_fail")
+            return
         try:
             self.main_window.sendVKey(__vkey_id)
+            self.expire_screen()
             self.step_pass(
                 msg=f"Successfully sent vkey: {__vkey_id} to window: {self.main_window.Id}", 
                 ss_name="send_vkey_pass")
@@ -1372,6 +1764,42 @@ class Session:
                 ss_name="send_vkey_exception",
                 error=err)
 
+    @explicit_wait_after(wait_time=__explicit_wait__)
+    def send_vkeys(self, vkeys: list[str|int]) -> None:
+        """
+        Send a sequence of virtual key presses to the currently active main window as one step.
+        All keys are converted to vkey numbers before the first one is sent, between keys the session
+        is only polled for readiness, the step bookkeeping & screenshots are done once for the sequence.
+
+        Arguments:
+            vkeys {list[str|int]} -- Virtual keys to send in order, see Flow.Data.VKEY_NUMBERS
+        """
+        self.new_step(action="send_vkeys", vkeys=vkeys)
+        try:
+            __vkey_ids: list[int] = [vkey_number(x) for x in vkeys]
+        except ValueError as err:
+            self.step_fail(msg=str(err), ss_name="send_vkeys_fail")
+            return
+        __sent = 0
+        try:
+            for vkey_id in __vkey_ids:
+                if __sent:
+                    self.waiter.wait_for(self.is_ready)
+                self.main_window.sendVKey(vkey_id)
+                __sent += 1
+                # every vkey is a dialog step of its own
+                self.expire_screen()
+            self.step_pass(
+                msg=f"Successfully sent vkeys: {__vkey_ids} to window: {self.main_window.Id}", 
+                ss_name="send_vkeys_pass")
+        except Exception as err:
+            self.element_cache.expire()
+            self.meta_data.expire()
+            self.handle_unknown_exception(
+                msg=f"Unhandled exception sending vkey: {__vkey_ids[__sent]} ({__sent + 1} of {len(__vkey_ids)}) to window: {self.main_window.Id}",
+                ss_name="send_vkeys_exception",
+                error=err)
+
     @explicit_wait_after(wait_time=__explicit_wait__)
     def enter(self) -> None:
         """
@@ -1733,7 +2161,40 @@ class Session:
 
     # Compound functions
     ## Tables
-    def dump_table_values(self, table_id: str, number_rows: Optional[int] = None) -> Table:
+    def iter_table_values(self, table_id: str, number_rows: Optional[int] = None, stats: Optional[ExtractStats] = None) -> Iterator[dict]:
+        """
+        Stream the cell values of a GuiTableControl or GuiShell/GridView one row at a time. 
+        Tables are read one visible page at a time, see Core.Tables.
+
+        Arguments:
+            table_id {str} -- Id of the table element
+
+        Keyword Arguments:
+            number_rows {Optional[int]} -- Number of rows to return, default is All (default: {None})
+            stats {Optional[ExtractStats]} -- ExtractStats instance updated while rows are read (default: {None})
+
+        Yields:
+            dict -- One dict of column name to cell value per table row
+        """
+        __id = self.ace_id(table_id)
+        __table = self.find_element(__id)
+        __type = __table.Type
+        if __type == "GuiTableControl":
+            def refind() -> Any:
+                self.element_cache.discard(__id)
+                return self.find_element(__id)
+            yield from iter_table_control_rows(__table, refind=refind, number_rows=number_rows, stats=stats)
+            self.expire_screen()
+        elif __type == "GuiShell" and __table.SubType == "GridView":
+            yield from iter_grid_rows(__table, number_rows=number_rows, stats=stats)
+
+    def dump_table_values(
+        self, 
+        table_id: str, 
+        number_rows: Optional[int] = None, 
+        cache_table: Optional[str] = None, 
+        cache_key: Optional[str] = None
+        ) -> Table:
         """
         Dump the cell values of a GuiTable object.
 
@@ -1742,112 +2203,461 @@ class Session:
 
         Keyword Arguments:
             number_rows {Optional[int]} -- Number of rows to return, default is All (default: {None})
+            cache_table {Optional[str]} -- Table shown, caches the dump in Session.table_cache with the TTL of the table, 
+                                           None does not cache (default: {None})
+            cache_key {Optional[str]} -- What the dump shows, e.g. the selection, to tell dumps of the same element apart (default: {None})
 
         Returns:
-            Table -- Returned instance of the Table class containing the GuiTable's values
-        """
-        __table = self.session.FindById(table_id)
+            Table -- Returned instance of the Table class containing the GuiTable's values, Table.Data is a
+                     ColumnStore holding the rows column by column
+        """
+        __key = self.table_cache_key("dump", cache_table.upper(), table_id, cache_key, number_rows) if cache_table is not None else None
+        __entry = self.table_cache.get(__key) if __key is not None else None
+        if __entry is not None:
+            self.logger.log.info(f"Table cache hit for table: {table_id}, {len(__entry.Rows)} rows")
+            return self.cached_table(table_id, __entry)
+        __table = self.find_element(table_id)
+        __stats = ExtractStats()
         if __table.Type == "GuiTableControl":
             my_table = Table(
                 Id = table_id, 
-                Type = __table.Type,
+                Type = "GuiTableControl",
                 TableObject = __table,
                 RowCount = __table.RowCount,
                 VisibleRows = __table.VisibleRowCount,
-                Columns = [x for x in __table.Columns],
-                Rows = [x for x in __table.Rows],
-                Data = []
+                Columns = [x.Name for x in __table.Columns],
+                Rows = [],
+                Data = None
             )
-            __columns = [x for x in __table.Columns]
-            __rows = [x for x in __table.Rows]
-            for row in __rows:
-                cells = {}
-                for cell in range(0, row.Count):
-                    cells[__columns[cell].Name] = row.ElementAt(cell).Text
-                my_table.Data.append(cells)
-            return my_table
-        elif __table.Type == "GuiShell":
-            if __table.SubType == "GridView":
-                __column_order = __table.ColumnOrder
-                my_table = Table(
-                    Id = table_id, 
-                    Type = __table.SubType,
-                    TableObject = __table,
-                    RowCount = __table.RowCount,
-                    VisibleRows = __table.VisibleRowCount,
-                    Columns = __column_order,
-                    Rows = [],
-                    Data = []
-                )
-                if number_rows is not None:
-                    scroll_position: int = 1
-                    vbar: win32com.client.CDispatch|None = self.usr.VerticalScrollbar
-                    for row in range(0, number_rows):
-                        if row > __table.VisibleRowCount * scroll_position:
-                            scroll_position += 1
-                            self.set_v_scrollbar(id=vbar.Id, pos=scroll_position)
-                        cells = {}
-                        for cell in range(0, __table.ColumnCount):
-                            cells[__column_order[cell]] = __table.GetCellValue(row, __column_order[cell])
-                        my_table.Data.append(cells)
-                else:
-                    for row in range(0, __table.RowCount):
-                        cells = {}
-                        for cell in range(0, __table.ColumnCount):
-                            cells[__column_order[cell]] = __table.GetCellValue(row, __column_order[cell])
-                        my_table.Data.append(cells)
-                return my_table
+        elif __table.Type == "GuiShell" and __table.SubType == "GridView":
+            my_table = Table(
+                Id = table_id, 
+                Type = "GridView",
+                TableObject = __table,
+                RowCount = __table.RowCount,
+                VisibleRows = __table.VisibleRowCount,
+                Columns = [x for x in __table.ColumnOrder],
+                Rows = [],
+                Data = None
+            )
+        else:
+            return None
+        my_table.Data = ColumnStore(columns=my_table.Columns)
+        my_table.Data.extend(self.iter_table_values(table_id, number_rows=number_rows, stats=__stats))
+        self.last_extract = __stats
+        self.logger.log.info(f"Dumped {__stats.Rows} rows from table: {table_id} in {__stats.Seconds:.3f}s ({__stats.RowsPerSecond:.1f} rows/sec)")
+        if __key is not None:
+            self.table_cache.put(__key, cache_table, my_table.Type, my_table.Data, seconds=__stats.Seconds)
+        return my_table
+
+    def cached_table(self, table_id: str, entry: TableCacheEntry) -> Table:
+        """
+        Returns a Table of a table cache entry, with a new ColumnStore & no TableObject.
+        """
+        __data = entry.data()
+        return Table(
+            Id = table_id, 
+            Type = entry.Type, 
+            TableObject = None, 
+            RowCount = len(__data), 
+            VisibleRows = len(__data), 
+            Columns = __data.columns, 
+            Rows = [], 
+            Data = __data)
     
+    def export_table_values(
+        self, 
+        table_id: str, 
+        export_format: str = "unconverted", 
+        codepage: str = "4110", 
+        directory: Optional[str|Path] = None, 
+        number_rows: Optional[int] = None, 
+        keep_file: bool = False
+        ) -> Table|None:
+        """
+        Export a GuiShell/GridView (ALV grid) or ABAP list with SAP GUI's "Save list in file" (grid context menu &PC, 
+        OK-code %PC for lists) and stream the local file into a Table, see Core.Export. 
+        Reads the whole result in a few round trips instead of the cell by cell reads of dump_table_values.
+
+        Arguments:
+            table_id {str} -- Id of the grid, or of any element of the list screen
+
+        Keyword Arguments:
+            export_format {str} -- unconverted (fixed width, pipe delimited) or spreadsheet (tab separated) (default: {"unconverted"})
+            codepage {str} -- SAP code page of the file, see Core.Export.SAP_CODEPAGES (default: {"4110"})
+            directory {Optional[str|Path]} -- Directory of the file, default is <LogPath>/exports (default: {None})
+            number_rows {Optional[int]} -- Number of rows to return, default is All (default: {None})
+            keep_file {bool} -- Keep the exported file, otherwise it is deleted after reading (default: {False})
+
+        Returns:
+            Table|None -- Table with TableObject the path of the file and Data a ColumnStore, None if the export failed
+        """
+        self.new_step(action="export_table_values", id=table_id, export_format=export_format, codepage=codepage)
+        if export_format not in READABLE_FORMATS:
+            self.step_fail(msg=f"Unable to read {export_format} exports, expected one of {', '.join(READABLE_FORMATS)}", ss_name="export_table_values_fail")
+            return None
+        try:
+            __directory = Path(directory) if directory is not None else Path(self.case.LogConfig.LogPath, "exports")
+            __directory.mkdir(parents=True, exist_ok=True)
+            self.__export_count += 1
+            __filename = f"export_{os.getpid()}_{id(self)}_{self.__export_count}.txt"
+            __table = self.find_element(table_id)
+            if __table.Type == "GuiShell" and __table.SubType == "GridView":
+                __table.PressToolbarContextButton("&MB_EXPORT")
+                __table.SelectContextMenuItem("&PC")
+            else:
+                self.session.findById(self.ace_id("tbar[0]/okcd")).Text = "%PC"
+                self.main_window.SendVKey(0)
+            self.session.findById(self.ace_id(EXPORT_FORMAT_RADIO.format(index=EXPORT_FORMATS[export_format]))).Select()
+            self.session.findById(self.ace_id("wnd[1]/tbar[0]/btn[0]")).Press()
+            self.session.findById(self.ace_id(EXPORT_PATH)).Text = str(__directory)
+            self.session.findById(self.ace_id(EXPORT_FILENAME)).Text = __filename
+            self.session.findById(self.ace_id(EXPORT_ENCODING)).Text = codepage
+            # Replace also writes a new file, Generate fails if the file exists
+            self.session.findById(self.ace_id("wnd[1]/tbar[0]/btn[11]")).Press()
+            self.expire_screen()
+            __path = Path(__directory, __filename)
+            __stats = ExtractStats()
+            __data = ColumnStore()
+            try:
+                __data.extend(iter_export_rows(__path, export_format=export_format, codepage=codepage, number_rows=number_rows, stats=__stats))
+            finally:
+                if not keep_file:
+                    __path.unlink(missing_ok=True)
+            self.last_extract = __stats
+            self.step_pass(msg=f"Exported {__stats.Rows} rows from table: {table_id} in {__stats.Seconds:.3f}s ({__stats.RowsPerSecond:.1f} rows/sec)")
+            return Table(
+                Id = table_id, 
+                Type = "Export", 
+                TableObject = __path, 
+                RowCount = len(__data), 
+                VisibleRows = len(__data), 
+                Columns = __data.columns, 
+                Rows = [], 
+                Data = __data)
+        except Exception as err:
+            self.handle_unknown_exception(
+                msg=f"Unhandled exception while exporting table: {table_id}", 
+                ss_name="export_table_values_exception", 
+                error=err)
+        return None
+
+    def set_multiple_selection(self, id: str, ranges: list[SelectionRange]) -> None:
+        """
+        Fill the "Multiple Selection" dialog of a select option with all its ranges in one upload per tab: 
+        single values, ranges, excluded single values & excluded ranges are each written to the clipboard and 
+        uploaded with "Upload from clipboard". The round trips do not depend on the number of values.
+        The clipboard is held with Core.Selection.clipboard_lock and its previous text is restored.
+
+        Arguments:
+            id {str} -- Id of the multiple selection button, e.g. wnd[0]/usr/btn%_I1_%_APP_%-VALU_PUSH
+            ranges {list[SelectionRange]} -- EQ, CP & BT ranges of the select option
+        """
+        self.new_step(action="set_multiple_selection", id=id, ranges=len(ranges))
+        try:
+            __uploads = selection_uploads(ranges)
+            self.session.findById(self.ace_id(id)).Press()
+            for tab, text in __uploads.items():
+                self.session.findById(self.ace_id(MULTIPLE_SELECTION_TAB.format(tab=tab))).Select()
+                with clipboard_lock():
+                    write_clipboard(text)
+                    self.session.findById(self.ace_id(UPLOAD_CLIPBOARD)).Press()
+            self.session.findById(self.ace_id(COPY_SELECTION)).Press()
+            self.expire_screen()
+            self.step_pass(msg=f"Uploaded {len(ranges)} selection ranges to: {id}")
+        except Exception as err:
+            self.handle_unknown_exception(
+                msg=f"Unhandled exception while uploading selection ranges to: {id}", 
+                ss_name="set_multiple_selection_exception", 
+                error=err)
+
+    def set_select_option(self, index: int, selection: SelectionRange) -> None:
+        """
+        Set one range on the SE16 selection screen, comparisons (GT, GE, LT, LE) through the selection options popup.
+
+        Arguments:
+            index {int} -- Number of the select option on the selection screen, I<index>-LOW
+            selection {SelectionRange} -- Included range of the select option
+        """
+        self.set_text(id=f"wnd[0]/usr/ctxtI{index}-LOW", text=selection.Low)
+        if selection.Option == "BT":
+            self.set_text(id=f"wnd[0]/usr/ctxtI{index}-HIGH", text=selection.High)
+        elif selection.Option in SELECTION_OPTION_ROWS and selection.Option != "EQ":
+            self.f2()
+            __options = self.find_element(SELECTION_OPTIONS)
+            __options.CurrentCellRow = SELECTION_OPTION_ROWS[selection.Option]
+            __options.SelectedRows = str(SELECTION_OPTION_ROWS[selection.Option])
+            self.click_element(id="wnd[1]/tbar[0]/btn[0]")
+
     # Get Table Data
-    def get_table_data(self, statement: str) -> Table:
+    def get_table_data(
+        self, 
+        statement: str, 
+        export_format: str = "unconverted", 
+        codepage: str = "4110", 
+        strategy: Optional[str] = None
+        ) -> Table|None:
+        """
+        Gets the data returned by the specified statement. The statement is planned by Session.query_planner 
+        (Core.Query.QueryPlanner): parsed once & cached, executed with SE16, SE16N or a TableReader (rfc) and 
+        IN lists longer than the selection limit are split into several executions whose rows are combined.
+        With Case.TableCacheConfig enabled the result is read through Session.table_cache, keyed by system, 
+        client & normalized statement.
+
+        Arguments:
+            statement {str} -- A SQL like select statement, e.g. SELECT MATNR, WERKS FROM MARC WHERE WERKS IN ('1000', '2000')
+
+        Keyword Arguments:
+            export_format {str} -- Format of the exported result, unconverted or spreadsheet (default: {"unconverted"})
+            codepage {str} -- SAP code page of the exported result (default: {"4110"})
+            strategy {Optional[str]} -- rfc, se16n or se16 instead of the planned strategy (default: {None})
+
+        Returns:
+            Table -- Returned instance of the Table class containing the values returned by the statement
         """
-        Gets the data returned by the specified statement using transaction SE16.
+        try:
+            __plan = self.query_planner.plan(statement, strategy=strategy)
+        except ValueError as err:
+            self.new_step(action="get_table_data", statement=statement)
+            self.step_fail(msg=f"Unable to plan statement: {statement}", ss_name="get_table_data_fail", error=str(err))
+            return None
+        self.logger.log.debug(f"Query plan|{__plan}")
+        __key = self.table_cache_key("select", __plan.Statement) if self.table_cache.enabled else None
+        __entry = self.table_cache.get(__key) if __key is not None else None
+        if __entry is not None:
+            self.logger.log.info(f"Table cache hit for: {__plan.Statement}, {len(__entry.Rows)} rows")
+            return self.cached_table(__plan.Table, __entry)
+        __started = perf_counter()
+        __result: Table|None = None
+        for conditions in __plan.chunks():
+            __top = __plan.Top - len(__result.Data) if __plan.Top is not None and __result is not None else __plan.Top
+            if __plan.Strategy == "rfc":
+                __table = self.select_rfc(__plan.Table, __plan.Fields, conditions, top=__top)
+            elif __plan.Strategy == "se16n":
+                __table = self.select_se16n(__plan.Table, __plan.Fields, conditions, top=__top, export_format=export_format, codepage=codepage)
+            else:
+                __table = self.select_se16(__plan.Table, __plan.Fields, conditions, top=__top, export_format=export_format, codepage=codepage)
+            if __table is None:
+                return None
+            if __result is None:
+                __result = __table
+            else:
+                __result.Data.extend(__table.Data)
+            if __plan.Top is not None and len(__result.Data) >= __plan.Top:
+                break
+        __result.RowCount = __result.VisibleRows = len(__result.Data)
+        if __key is not None:
+            self.table_cache.put(__key, __plan.Table, __result.Type, __result.Data, seconds=perf_counter() - __started)
+        return __result
+
+    def select_se16(
+        self, 
+        table: str, 
+        fields: list[str], 
+        conditions: dict[str, list[SelectionRange]], 
+        top: Optional[int] = None, 
+        export_format: str = "unconverted", 
+        codepage: str = "4110"
+        ) -> Table|None:
+        """
+        Select rows of a table with transaction SE16. A single value, range or comparison is typed on the selection 
+        screen, value lists (IN) & exclusions are uploaded at once with set_multiple_selection. 
+        The result grid is read with export_table_values (Save list in file) instead of cell by cell.
 
         Arguments:
-            statement {str} -- A SQL like select statement 
+            table {str} -- Table name
+            fields {list[str]} -- Output fields, ["*"] for all
+            conditions {dict[str, list[SelectionRange]]} -- Selection ranges by field, see Core.Utilities.parse_sql_conditions
+
+        Keyword Arguments:
+            top {Optional[int]} -- Maximum number of rows (default: {None})
+            export_format {str} -- Format of the exported result, unconverted or spreadsheet (default: {"unconverted"})
+            codepage {str} -- SAP code page of the exported result (default: {"4110"})
 
         Returns:
-            Table -- Returned instance of the Table class containing the values returned values from transaction SE16
+            Table|None -- Exported result, None if the export failed
         """
-        fields, max_rows, table, conditions = self.parse_sql_select(statement)
         self.start_transaction(transaction="SE16")
         
         # Set table
-        self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/ctxtDATABROWSE-TABLENAME", text=table)
+        self.set_text(id="wnd[0]/usr/ctxtDATABROWSE-TABLENAME", text=table)
         self.enter()
         
+        # Set selection fields, the select options I1, I2, ... follow the order of the conditions
+        if len(conditions) != 0:
+            self.click_element(id="wnd[0]/mbar/menu[3]/menu[2]")
+            self.click_element(id="wnd[1]/tbar[0]/btn[14]")  # Unselect All
+            for field in conditions:
+                self.click_element(id="wnd[1]/tbar[0]/btn[71]")  # Search
+                self.set_text(id="wnd[2]/usr/txtRSYSF-STRING", text=field)
+                self.set_checkbox(id="wnd[2]/usr/chkSCAN_STRING-START", state=False)
+                self.click_element(id="wnd[2]/tbar[0]/btn[0]")
+                self.find_element("wnd[3]/usr/lbl[3,2]").SetFocus()
+                self.click_element(id="wnd[3]/tbar[0]/btn[2]")
+                self.set_checkbox(id="wnd[1]/usr/chk[2,6]", state=True)
+            self.click_element(id="wnd[1]/tbar[0]/btn[0]")
+        
         # Set conditions
-        self.click_element(id="/app/con[0]/ses[0]/wnd[0]/mbar/menu[3]/menu[2]")
-        self.click_element(id="/app/con[0]/ses[0]/wnd[1]/tbar[0]/btn[14]")  # Unselect All
-        for condition in conditions:
-            self.click_element(id="/app/con[0]/ses[0]/wnd[1]/tbar[0]/btn[71]")  # Search
-            self.set_text(id="/app/con[0]/ses[0]/wnd[2]/usr/txtRSYSF-STRING", text=condition[0])
-            self.set_checkbox(id="/app/con[0]/ses[0]/wnd[2]/usr/chkSCAN_STRING-START", state=False)
-            self.click_element(id="/app/con[0]/ses[0]/wnd[2]/tbar[0]/btn[0]")
-            self.session.FindById("/app/con[0]/ses[0]/wnd[3]/usr/lbl[3,2]").SetFocus()
-            self.click_element(id="/app/con[0]/ses[0]/wnd[3]/tbar[0]/btn[2]")
-            self.set_checkbox(id="/app/con[0]/ses[0]/wnd[1]/usr/chk[2,6]", state=True)
-            self.click_element(id="/app/con[0]/ses[0]/wnd[1]/usr/chk[2,6]")
-            self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/ctxtI1-LOW", text=condition[2])
-            self.f2()
-            _ = self.session.FindById("/app/con[0]/ses[0]/wnd[1]/usr/cntlOPTION_CONTAINER/shellcont/shell")
-            # Set selection option
+        for index, ranges in enumerate(conditions.values(), start=1):
+            __included = [x for x in ranges if x.Sign == "I"]
+            # a single value, range or comparison is typed on the selection screen, comparisons can not be uploaded
+            if len(__included) == 1 and (len(ranges) == 1 or __included[0].Option in COMPARISON_OPTIONS):
+                self.set_select_option(index, __included[0])
+                ranges = [x for x in ranges if x is not __included[0]]
+            if len(ranges) != 0:
+                self.set_multiple_selection(f"wnd[0]/usr/btn%_I{index}_%_APP_%-VALU_PUSH", ranges)
         
         # Set max rows to return
-        self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/txtMAX_SEL", text=max_rows)
+        self.set_text(id="wnd[0]/usr/txtMAX_SEL", text=str(top) if top is not None else "")
         
         # Set fields
-        self.click_element(id="/app/con[0]/ses[0]/wnd[0]/mbar/menu[3]/menu[0]/menu[1]")
-        self.click_element(id="/app/con[0]/ses[0]/wnd[1]/tbar[0]/btn[14]")
-        for field in fields:
-            self.click_element(id="/app/con[0]/ses[0]/wnd[1]/tbar[0]/btn[71]")
-            self.set_text(id="/app/con[0]/ses[0]/wnd[2]/usr/txtRSYSF-STRING", text="HERKL")
-            self.set_checkbox(id="/app/con[0]/ses[0]/wnd[2]/usr/chkSCAN_STRING-START", state=False)
-            self.click_element(id="/app/con[0]/ses[0]/wnd[2]/tbar[0]/btn[0]")
-            self.session.FindById("/app/con[0]/ses[0]/wnd[3]/usr/lbl[3,2]").SetFocus()
-            self.click_element(id="/app/con[0]/ses[0]/wnd[3]/tbar[0]/btn[2]")
-            self.set_checkbox(id="/app/con[0]/ses[0]/wnd[1]/usr/chk[1,3]", state=True)
-            self.click_element(id="/app/con[0]/ses[0]/wnd[1]/tbar[0]/btn[6]")
+        if fields != ["*"]:
+            self.click_element(id="wnd[0]/mbar/menu[3]/menu[0]/menu[1]")
+            self.click_element(id="wnd[1]/tbar[0]/btn[14]")
+            for field in fields:
+                self.click_element(id="wnd[1]/tbar[0]/btn[71]")
+                self.set_text(id="wnd[2]/usr/txtRSYSF-STRING", text=field)
+                self.set_checkbox(id="wnd[2]/usr/chkSCAN_STRING-START", state=False)
+                self.click_element(id="wnd[2]/tbar[0]/btn[0]")
+                self.find_element("wnd[3]/usr/lbl[3,2]").SetFocus()
+                self.click_element(id="wnd[3]/tbar[0]/btn[2]")
+                self.set_checkbox(id="wnd[1]/usr/chk[1,3]", state=True)
+                self.click_element(id="wnd[1]/tbar[0]/btn[6]")
+        
+        # Execute & export the result grid
+        self.f8()
+        return self.export_table_values(SE16_RESULT, export_format=export_format, codepage=codepage)
+
+    def select_se16n(
+        self, 
+        table: str, 
+        fields: list[str], 
+        conditions: dict[str, list[SelectionRange]], 
+        top: Optional[int] = None, 
+        export_format: str = "unconverted", 
+        codepage: str = "4110"
+        ) -> Table|None:
+        """
+        Select rows of a table with transaction SE16N. The conditions & output fields are set in the field table 
+        of SE16N, one page of the table at a time, without the field search popups of SE16. 
+        Comparisons (GT, GE, LT, LE) are not supported, see select_se16.
+
+        Arguments:
+            table {str} -- Table name
+            fields {list[str]} -- Output fields, ["*"] for all
+            conditions {dict[str, list[SelectionRange]]} -- Selection ranges by field, see Core.Utilities.parse_sql_conditions
+
+        Keyword Arguments:
+            top {Optional[int]} -- Maximum number of rows (default: {None})
+            export_format {str} -- Format of the exported result, unconverted or spreadsheet (default: {"unconverted"})
+            codepage {str} -- SAP code page of the exported result (default: {"4110"})
+
+        Returns:
+            Table|None -- Exported result, None if a field does not exist or the export failed
+        """
+        self.start_transaction(transaction="SE16N")
+        self.set_text(id=SE16N_TABLE, text=table)
+        self.enter()
+        self.set_text(id=SE16N_MAX_LINES, text=str(top) if top is not None else "")
+        
+        # Rows of the field table by field name
+        __rows = {row[SE16N_FIELD_NAME]: index for index, row in enumerate(self.iter_table_values(SE16N_FIELDS))}
+        __missing = [x for x in [*conditions, *(fields if fields != ["*"] else [])] if x not in __rows]
+        self.new_step(action="select_se16n", id=table, fields=fields, conditions=len(conditions))
+        if len(__missing) != 0:
+            self.step_fail(msg=f"Fields {', '.join(__missing)} not found in table: {table}", ss_name="select_se16n_fail")
+            return None
+        __uploads: dict[int, list[SelectionRange]] = {}
+        try:
+            __visible = max(int(self.find_element(SE16N_FIELDS).VisibleRowCount), 1)
+            __by_row = {index: name for name, index in __rows.items()}
+            __targets = sorted(__rows.values()) if fields != ["*"] else sorted(__rows[x] for x in conditions)
+            __page = None
+            for row in __targets:
+                if row - row % __visible != __page:
+                    __page = row - row % __visible
+                    self.find_element(SE16N_FIELDS).VerticalScrollbar.Position = __page
+                    self.expire_screen()
+                __row = row - __page
+                __name = __by_row[row]
+                if fields != ["*"]:
+                    self.session.findById(self.ace_id(SE16N_OUTPUT.format(row=__row))).Selected = __name in fields
+                __ranges = conditions.get(__name, [])
+                if len(__ranges) == 1 and __ranges[0].Sign == "I":
+                    self.session.findById(self.ace_id(SE16N_LOW.format(row=__row))).Text = __ranges[0].Low
+                    if __ranges[0].Option == "BT":
+                        self.session.findById(self.ace_id(SE16N_HIGH.format(row=__row))).Text = __ranges[0].High
+                elif len(__ranges) != 0:
+                    __uploads[row] = __ranges
+            self.step_pass(msg=f"Set {len(conditions)} conditions & {len(fields)} fields of table: {table}")
+        except Exception as err:
+            self.handle_unknown_exception(
+                msg=f"Unhandled exception while setting the fields of table: {table}", 
+                ss_name="select_se16n_exception", 
+                error=err)
+            return None
+        
+        # Upload value lists & exclusions, the row is scrolled to the top of the field table
+        for row, ranges in __uploads.items():
+            self.find_element(SE16N_FIELDS).VerticalScrollbar.Position = row
+            self.expire_screen()
+            self.set_multiple_selection(SE16N_MORE.format(row=0), ranges)
+        
+        # Execute & export the result grid
+        self.f8()
+        return self.export_table_values(SE16N_RESULT, export_format=export_format, codepage=codepage)
+
+    def select_rfc(
+        self, 
+        table: str, 
+        fields: list[str], 
+        conditions: dict[str, list[SelectionRange]], 
+        top: Optional[int] = None
+        ) -> Table|None:
+        """
+        Select rows of a table with the TableReader of Session.query_planner (RFC_READ_TABLE), without the SAP GUI.
+
+        Arguments:
+            table {str} -- Table name
+            fields {list[str]} -- Output fields, ["*"] for all
+            conditions {dict[str, list[SelectionRange]]} -- Selection ranges by field, see Core.Utilities.parse_sql_conditions
+
+        Keyword Arguments:
+            top {Optional[int]} -- Maximum number of rows (default: {None})
+
+        Returns:
+            Table|None -- Table with TableObject the reader and Data a ColumnStore, None if the read failed
+        """
+        self.new_step(action="select_rfc", id=table, fields=fields, conditions=len(conditions), top=top)
+        __reader = self.query_planner.reader
+        if __reader is None:
+            self.step_fail(msg=f"No TableReader set in Session.query_planner to read table: {table}", ss_name="select_rfc_fail")
+            return None
+        try:
+            __stats = ExtractStats(Pages=1)
+            __started = perf_counter()
+            __data = ColumnStore(columns=fields if fields != ["*"] else None)
+            __data.extend(__reader.read_table(table, fields, conditions, top=top))
+            __stats.Rows = len(__data)
+            __stats.Cells = len(__data) * len(__data.columns)
+            __stats.Seconds = perf_counter() - __started
+            self.last_extract = __stats
+            self.step_pass(msg=f"Read {__stats.Rows} rows from table: {table} in {__stats.Seconds:.3f}s ({__stats.RowsPerSecond:.1f} rows/sec)")
+            return Table(
+                Id = table, 
+                Type = "RFC_READ_TABLE", 
+                TableObject = __reader, 
+                RowCount = len(__data), 
+                VisibleRows = len(__data), 
+                Columns = __data.columns, 
+                Rows = [], 
+                Data = __data)
+        except Exception as err:
+            self.handle_unknown_exception(
+                msg=f"Unhandled exception while reading table: {table}", 
+                ss_name="select_rfc_exception", 
+                error=err)
+        return None
     
     ## Sales Orders
     def availability_control(self) -> None:
@@ -1959,15 +2769,15 @@ class Session:
             self.set_text(id="usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/txtRV45A-KWMENG[2,0]", text=item.get('qty'))
             self.set_text(id="usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/ctxtVBAP-VRKME[3,0]", text=item.get('uom'))
             if "amount" in item.keys():
-                self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/txtKOMV-KBETR[23,0]", text=item.get('amount'))
+                self.set_text(id="wnd[0]/usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/txtKOMV-KBETR[23,0]", text=item.get('amount'))
             if "customer_material" in item.keys():
                 self.set_text(id="usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/ctxtVBAP-KDMAT[12,0]", text=item.get('customer_material'))
             if "item_category" in item.keys():
                 self.set_text(id="usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/ctxtVBAP-PSTYV[7,0]", text=item.get('item_category'))
             if "shipping_point" in item.keys():
-                self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/ctxtVBAP-VSTEL[70,0]", text=item.get('shipping_point'))
+                self.set_text(id="wnd[0]/usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/ctxtVBAP-VSTEL[70,0]", text=item.get('shipping_point'))
             if "storage_location" in item.keys():
-                self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/ctxtVBAP-LGORT[67,0]", text=item.get('storage_location'))
+                self.set_text(id="wnd[0]/usr/tabsTAXI_TABSTRIP_OVERVIEW/tabpT\\01/ssubSUBSCREEN_BODY:SAPMV45A:4400/subSUBSCREEN_TC:SAPMV45A:4900/tblSAPMV45ATCTRL_U_ERF_AUFTRAG/ctxtVBAP-LGORT[67,0]", text=item.get('storage_location'))
             self.enter()
     
     ## Delivery
@@ -1979,7 +2789,7 @@ class Session:
             delivery {str} -- Outbound delivery document
         """
         self.start_transaction("VL03N")
-        self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/ctxtLIKP-VBELN", text=delivery)
+        self.set_text(id="wnd[0]/usr/ctxtLIKP-VBELN", text=delivery)
         self.enter()
 
     def get_delivery_header_outputs(self, delivery: str) -> Table:
@@ -1993,8 +2803,8 @@ class Session:
             Table -- Returns a Table object of the output conditions of the delivery
         """
         self.display_delivery(delivery=delivery)
-        self.click_element(id="/app/con[0]/ses[0]/wnd[0]/mbar/menu[3]/menu[2]/menu[0]")
-        return self.dump_table_values(table_id="/app/con[0]/ses[0]/wnd[0]/usr/tblSAPDV70ATC_NAST3")
+        self.click_element(id="wnd[0]/mbar/menu[3]/menu[2]/menu[0]")
+        return self.dump_table_values(table_id="wnd[0]/usr/tblSAPDV70ATC_NAST3")
 
     def fill_vl01n_initial_screen(
         self, 
@@ -2020,16 +2830,16 @@ class Session:
             delivery_type {Optional[str]} -- Delivery type of the outbound delivery to be created (default: {None})
             enter_after_fill {Optional[bool]} -- Flag determining if enter should be pressed after filling the screen fields (default: {True})
         """
-        self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/ctxtLIKP-VSTEL", text=shipping_point)
-        self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/ctxtLV50C-VBELN", text=sales_order)
+        self.set_text(id="wnd[0]/usr/ctxtLIKP-VSTEL", text=shipping_point)
+        self.set_text(id="wnd[0]/usr/ctxtLV50C-VBELN", text=sales_order)
         if selection_date is not None:
-            self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/ctxtLV50C-DATBI", text=selection_date)
+            self.set_text(id="wnd[0]/usr/ctxtLV50C-DATBI", text=selection_date)
         if from_so_item is not None:
-            self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/ctxtLV50C-ABPOS", text=from_so_item)
+            self.set_text(id="wnd[0]/usr/ctxtLV50C-ABPOS", text=from_so_item)
         if to_so_item is not None:
-            self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/ctxtLV50C-BIPOS", text=to_so_item)
+            self.set_text(id="wnd[0]/usr/ctxtLV50C-BIPOS", text=to_so_item)
         if delivery_type is not None:
-            self.set_text(id="/app/con[0]/ses[0]/wnd[0]/usr/ctxtLIKP-LFART", text=delivery_type)
+            self.set_text(id="wnd[0]/usr/ctxtLIKP-LFART", text=delivery_type)
         if enter_after_fill:
             self.enter()
     
@@ -2157,7 +2967,7 @@ class Session:
                     break
             except Exception as err:
                 self.logger.log.debug(f"Error while waiting for element: {xpath} -- {err}")
-                continue
+                self.wait(delay_time)
     
     def web_set_text(self, xpath: str, text: str) -> None:
         """
@@ -0,0 +1,369 @@
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+import math
+import sqlite3
+import threading
+import uuid
+
+
+SCHEMA: tuple[str, ...] = (
+    """CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        run TEXT UNIQUE NOT NULL,
+        case_name TEXT,
+        started TEXT,
+        system_name TEXT,
+        application_server TEXT,
+        user TEXT,
+        sap_version TEXT)""",
+    """CREATE TABLE IF NOT EXISTS steps (
+        id INTEGER PRIMARY KEY,
+        run_id INTEGER NOT NULL REFERENCES runs (id),
+        case_name TEXT,
+        step_index INTEGER,
+        step_name TEXT,
+        action TEXT,
+        transaction_code TEXT,
+        program TEXT,
+        screen_number TEXT,
+        started TEXT,
+        seconds REAL,
+        response_time REAL,
+        round_trips INTEGER,
+        result TEXT)""",
+    "CREATE INDEX IF NOT EXISTS steps_case_step ON steps (case_name, step_name)",
+    "CREATE INDEX IF NOT EXISTS steps_transaction ON steps (transaction_code, program, screen_number)",
+    "CREATE INDEX IF NOT EXISTS steps_started ON steps (started)",
+    "CREATE INDEX IF NOT EXISTS steps_run ON steps (run_id)",
+)
+# Values of a step that can be aggregated, metric name -> steps column
+METRICS: dict[str, str] = {"seconds": "seconds", "response_time": "response_time", "round_trips": "round_trips"}
+# Columns a timing can be grouped by, key name -> steps column
+GROUPS: dict[str, str] = {
+    "case": "case_name",
+    "step": "step_name",
+    "action": "action",
+    "transaction": "transaction_code",
+    "program": "program",
+    "screen": "screen_number",
+}
+
+
+@dataclass
+class HistoryPolicy:
+    """
+    Per-case settings of the run history.
+
+    Path is the SQLite database every run of the case is written to, None disables the history.
+    After a run the steps slower than RegressionFactor times their median of the earlier runs
+    (with at least MinSamples earlier runs) are logged as warnings, see RunHistory.regressions.
+    """
+    Path: "Optional[Path]" = None
+    FlushEvery: int = 100
+    RegressionFactor: float = 1.5
+    MinSamples: int = 5
+
+    @staticmethod
+    def from_dict(data: dict) -> "HistoryPolicy":
+        """
+        Create a HistoryPolicy from a dict using the json data file keys:
+        path, flush_every, regression_factor & min_samples
+        """
+        __policy = HistoryPolicy()
+        if data.get("path") is not None:
+            __policy.Path = Path(data.get("path"))
+        if "flush_every" in data:
+            __policy.FlushEvery = int(data.get("flush_every"))
+        if "regression_factor" in data:
+            __policy.RegressionFactor = float(data.get("regression_factor"))
+        if "min_samples" in data:
+            __policy.MinSamples = int(data.get("min_samples"))
+        return __policy
+
+
+@dataclass
+class TimingStats:
+    """
+    Percentiles of a metric of the steps of one group, Key holds the group values in the order of group_by.
+    """
+    Key: tuple
+    Count: int
+    Mean: float
+    P50: float
+    P95: float
+    P99: float
+    Max: float
+
+    def __repr__(self) -> str:
+        return f"class TimingStats<Key: {self.Key}, Count: {self.Count}, Mean: {self.Mean:.3f}, P50: {self.P50:.3f}, P95: {self.P95:.3f}, P99: {self.P99:.3f}, Max: {self.Max:.3f}>"
+
+
+@dataclass
+class Regression:
+    """
+    A step of a run that was slower than its baseline, the median of the same case & step in earlier runs.
+    """
+    Case: str
+    Step: str
+    Index: int
+    Transaction: Optional[str]
+    Value: float
+    Baseline: float
+    BaselineP95: float
+    Samples: int
+
+    @property
+    def Ratio(self) -> float:
+        return self.Value / self.Baseline if self.Baseline else math.inf
+
+    def __repr__(self) -> str:
+        return f"class Regression<Case: {self.Case}, Step: {self.Step}, Index: {self.Index}, Transaction: {self.Transaction}, Value: {self.Value:.3f}, Baseline: {self.Baseline:.3f}, BaselineP95: {self.BaselineP95:.3f}, Samples: {self.Samples}, Ratio: {self.Ratio:.2f}>"
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of sorted values, q between 0 and 1.
+    """
+    if not values:
+        return math.nan
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+class RunHistory:
+    """
+    SQLite store of the step timings of all runs, indexed by case & step name, transaction/program/screen and date.
+
+    start_run registers a run, add queues the timing of a finished step, queued steps are inserted every
+    flush_every steps and by flush(). The query helpers read the whole history across runs and processes.
+
+    Arguments:
+        path {Path} -- SQLite database, created with its parent directory if missing
+
+    Keyword Arguments:
+        flush_every {int} -- Steps kept before they are inserted (default: {100})
+    """
+    def __init__(self, path: Path, flush_every: int = 100) -> None:
+        self.path: Path = Path(path)
+        self.flush_every: int = max(1, flush_every)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection: sqlite3.Connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+        self.run: Optional[str] = None
+        self.run_id: Optional[int] = None
+        self.__pending: list[tuple] = []
+        self.__lock: threading.Lock = threading.Lock()
+
+    def start_run(self, case_name: str, meta_data: Optional[Any] = None, sap_version: Optional[str] = None) -> str:
+        """
+        Register a new run, the steps added from now on belong to it.
+
+        Arguments:
+            case_name {str} -- Name of the case
+
+        Keyword Arguments:
+            meta_data {Optional[SessionMetaData]} -- Session metadata of the run (default: {None})
+            sap_version {Optional[str]} -- SAP GUI version (default: {None})
+
+        Returns:
+            str -- The run id
+        """
+        self.flush()
+        self.run = uuid.uuid4().hex
+        with self.connection:
+            __cursor = self.connection.execute(
+                "INSERT INTO runs (run, case_name, started, system_name, application_server, user, sap_version) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.run, case_name, datetime.now().isoformat(timespec="seconds"),
+                 getattr(meta_data, "SystemName", None), getattr(meta_data, "ApplicationServer", None), getattr(meta_data, "User", None), sap_version))
+        self.run_id = __cursor.lastrowid
+        return self.run
+
+    def add(
+        self,
+        case_name: str,
+        index: int,
+        step: Any,
+        seconds: Optional[float],
+        response_time: Optional[float] = None,
+        round_trips: Optional[int] = None
+        ) -> None:
+        """
+        Queue the timing of a finished step of the current run.
+
+        Arguments:
+            case_name {str} -- Name of the case
+            index {int} -- Number of the step in the run
+            step {Step} -- The step, its name, action, transaction, program, screen number & result are stored
+            seconds {Optional[float]} -- Duration of the step
+
+        Keyword Arguments:
+            response_time {Optional[float]} -- Server response time of the step in ms, see Core.Latency.StepLatency (default: {None})
+            round_trips {Optional[int]} -- Round trips of the step (default: {None})
+        """
+        if self.run_id is None:
+            self.start_run(case_name)
+        __action = getattr(step.Action, "__name__", step.Action)
+        __result = step.Status.Result.value if step.Status.Result is not None else None
+        with self.__lock:
+            self.__pending.append((
+                self.run_id, case_name, index, step.Name, __action, step.Transaction, step.Program, step.ScreenNumber,
+                datetime.now().isoformat(timespec="seconds"), seconds, response_time, round_trips, __result))
+            __flush = len(self.__pending) >= self.flush_every
+        if __flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Insert the queued steps.
+        """
+        with self.__lock:
+            __pending, self.__pending = self.__pending, []
+            if __pending:
+                with self.connection:
+                    self.connection.executemany(
+                        """INSERT INTO steps (run_id, case_name, step_index, step_name, action, transaction_code, program,
+                        screen_number, started, seconds, response_time, round_trips, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        __pending)
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    def timings(
+        self,
+        group_by: Iterable[str] = ("transaction", "program", "screen"),
+        metric: str = "seconds",
+        case: Optional[str] = None,
+        transaction: Optional[str] = None,
+        since: Optional[datetime|str] = None,
+        until: Optional[datetime|str] = None
+        ) -> list[TimingStats]:
+        """
+        Percentiles of a metric per group, e.g. per transaction & screen.
+
+        Keyword Arguments:
+            group_by {Iterable[str]} -- Keys of GROUPS to group by (default: {("transaction", "program", "screen")})
+            metric {str} -- Key of METRICS (default: {"seconds"})
+            case {Optional[str]} -- Only steps of this case (default: {None})
+            transaction {Optional[str]} -- Only steps of this transaction (default: {None})
+            since {Optional[datetime|str]} -- Only steps started at or after (default: {None})
+            until {Optional[datetime|str]} -- Only steps started before (default: {None})
+
+        Returns:
+            list[TimingStats] -- One TimingStats per group, ordered by the group keys
+
+        Raises:
+            ValueError -- If a group or the metric is unknown
+        """
+        self.flush()
+        __groups = [_column(GROUPS, x, "group") for x in group_by]
+        __metric = _column(METRICS, metric, "metric")
+        __where, __params = _filters(case=case, transaction=transaction, since=since, until=until)
+        __where.append(f"{__metric} IS NOT NULL")
+        __key_columns = ", ".join(__groups) if __groups else "NULL"
+        __order = ", ".join(__groups + [__metric]) if __groups else __metric
+        __cursor = self.connection.execute(
+            f"SELECT {__key_columns}, {__metric} FROM steps WHERE {' AND '.join(__where)} ORDER BY {__order}", __params)
+        __stats = []
+        __key, __values = None, []
+        for row in __cursor:
+            __row_key = tuple(row[:-1]) if __groups else ()
+            if __row_key != __key and __values:
+                __stats.append(_timing(__key, __values))
+                __values = []
+            __key = __row_key
+            __values.append(row[-1])
+        if __values:
+            __stats.append(_timing(__key, __values))
+        return __stats
+
+    def regressions(
+        self,
+        run: Optional[str] = None,
+        factor: float = 1.5,
+        min_samples: int = 5,
+        metric: str = "seconds"
+        ) -> list[Regression]:
+        """
+        Steps of a run slower than factor times their baseline, the median of the same case & step name in earlier runs.
+        Steps with fewer than min_samples earlier values are not compared.
+
+        Keyword Arguments:
+            run {Optional[str]} -- Run id, default the current run or the latest run in the history (default: {None})
+            factor {float} -- Slowdown against the baseline median that counts as regression (default: {1.5})
+            min_samples {int} -- Earlier values needed for a baseline (default: {5})
+            metric {str} -- Key of METRICS (default: {"seconds"})
+
+        Returns:
+            list[Regression] -- The regressions ordered by ratio, slowest first
+        """
+        self.flush()
+        __metric = _column(METRICS, metric, "metric")
+        __run_id = self.__run_id(run)
+        if __run_id is None:
+            return []
+        __steps = self.connection.execute(
+            f"SELECT case_name, step_name, step_index, transaction_code, {__metric} FROM steps WHERE run_id = ? AND {__metric} IS NOT NULL ORDER BY step_index",
+            (__run_id,)).fetchall()
+        __baselines: dict[tuple[str, str], list[float]] = {}
+        __regressions = []
+        for case_name, step_name, index, transaction, value in __steps:
+            __key = (case_name, step_name)
+            if __key not in __baselines:
+                __baselines[__key] = [x[0] for x in self.connection.execute(
+                    f"SELECT {__metric} FROM steps WHERE case_name = ? AND step_name = ? AND run_id < ? AND {__metric} IS NOT NULL ORDER BY {__metric}",
+                    (case_name, step_name, __run_id))]
+            __values = __baselines[__key]
+            if len(__values) < min_samples:
+                continue
+            __median = percentile(__values, 0.5)
+            if value > __median * factor:
+                __regressions.append(Regression(
+                    Case=case_name, Step=step_name, Index=index, Transaction=transaction, Value=value,
+                    Baseline=__median, BaselineP95=percentile(__values, 0.95), Samples=len(__values)))
+        return sorted(__regressions, key=lambda x: x.Ratio, reverse=True)
+
+    def __run_id(self, run: Optional[str]) -> Optional[int]:
+        if run is None and self.run_id is not None:
+            return self.run_id
+        if run is None:
+            __row = self.connection.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        else:
+            __row = self.connection.execute("SELECT id FROM runs WHERE run = ?", (run,)).fetchone()
+        return __row[0] if __row else None
+
+
+def _column(columns: dict[str, str], name: str, kind: str) -> str:
+    if name not in columns:
+        raise ValueError(f"Unknown {kind}: {name}, expected one of {', '.join(columns)}")
+    return columns[name]
+
+
+def _filters(
+    case: Optional[str] = None,
+    transaction: Optional[str] = None,
+    since: Optional[datetime|str] = None,
+    until: Optional[datetime|str] = None
+    ) -> tuple[list[str], list]:
+    __where, __params = ["1 = 1"], []
+    for column, operator, value in (
+        ("case_name", "=", case), ("transaction_code", "=", transaction), ("started", ">=", since), ("started", "<", until)):
+        if value is not None:
+            __where.append(f"{column} {operator} ?")
+            __params.append(value.isoformat(timespec="seconds") if isinstance(value, datetime) else value)
+    return __where, __params
+
+
+def _timing(key: tuple, values: list[float]) -> TimingStats:
+    __values = sorted(values)
+    return TimingStats(
+        Key=key,
+        Count=len(__values),
+        Mean=sum(__values) / len(__values),
+        P50=percentile(__values, 0.5),
+        P95=percentile(__values, 0.95),
+        P99=percentile(__values, 0.99),
+        Max=__values[-1])
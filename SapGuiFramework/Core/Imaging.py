@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+from typing import Optional
+import io
+import struct
+import zlib
+try:
+    from PIL import Image  # type: ignore
+except ImportError:  # Pillow is optional, ScreenshotPipeline dedup requires it
+    Image = None
+
+
+PNG_SIGNATURE: bytes = b"\x89PNG\r\n\x1a\n"
+# PNG color type -> channels of 8 bit images: gray, RGB, gray + alpha, RGBA
+_PNG_CHANNELS: dict[int, int] = {0: 1, 2: 3, 4: 2, 6: 4}
+
+
+@dataclass
+class Frame:
+    """
+    Decoded image as 8 bit pixel rows, Pixels holds Height rows of Width * Channels bytes.
+    """
+    Width: int
+    Height: int
+    Channels: int
+    Pixels: bytes
+
+    @property
+    def stride(self) -> int:
+        return self.Width * self.Channels
+
+    def crop(self, box: tuple[int, int, int, int]) -> "Frame":
+        """
+        Returns the region (left, top, width, height) as a new Frame.
+        """
+        __left, __top, __width, __height = box
+        __stride = self.stride
+        __start = __left * self.Channels
+        __end = __start + __width * self.Channels
+        return Frame(
+            Width=__width,
+            Height=__height,
+            Channels=self.Channels,
+            Pixels=b"".join(self.Pixels[y * __stride + __start:y * __stride + __end] for y in range(__top, __top + __height)))
+
+    def paste(self, frame: "Frame", left: int, top: int) -> "Frame":
+        """
+        Returns a copy of this frame with frame pasted at (left, top), both frames must have the same channels.
+        """
+        if frame.Channels != self.Channels:
+            raise ValueError(f"Can not paste a {frame.Channels} channel frame into a {self.Channels} channel frame")
+        __pixels = bytearray(self.Pixels)
+        __stride = self.stride
+        __row = frame.stride
+        for y in range(frame.Height):
+            __start = (top + y) * __stride + left * self.Channels
+            __pixels[__start:__start + __row] = frame.Pixels[y * __row:(y + 1) * __row]
+        return Frame(self.Width, self.Height, self.Channels, bytes(__pixels))
+
+
+def _unfilter(data: bytes, width: int, height: int, channels: int) -> bytes:
+    __stride = width * channels
+    __out = bytearray(__stride * height)
+    __previous = bytearray(__stride)
+    __position = 0
+    for y in range(height):
+        __filter = data[__position]
+        __row = bytearray(data[__position + 1:__position + 1 + __stride])
+        __position += 1 + __stride
+        match __filter:
+            case 0:
+                pass
+            case 1:
+                for x in range(channels, __stride):
+                    __row[x] = (__row[x] + __row[x - channels]) & 0xFF
+            case 2:
+                __row = bytearray((a + b) & 0xFF for a, b in zip(__row, __previous))
+            case 3:
+                for x in range(__stride):
+                    __left = __row[x - channels] if x >= channels else 0
+                    __row[x] = (__row[x] + ((__left + __previous[x]) >> 1)) & 0xFF
+            case 4:
+                for x in range(__stride):
+                    __a = __row[x - channels] if x >= channels else 0
+                    __b = __previous[x]
+                    __c = __previous[x - channels] if x >= channels else 0
+                    __p = __a + __b - __c
+                    __pa, __pb, __pc = abs(__p - __a), abs(__p - __b), abs(__p - __c)
+                    __row[x] = (__row[x] + (__a if __pa <= __pb and __pa <= __pc else __b if __pb <= __pc else __c)) & 0xFF
+            case _:
+                raise ValueError(f"Invalid PNG filter type: {__filter}")
+        __out[y * __stride:(y + 1) * __stride] = __row
+        __previous = __row
+    return bytes(__out)
+
+
+def decode_png(data: bytes) -> Frame:
+    """
+    Decode an 8 bit, non-interlaced gray, RGB or RGBA PNG (what SAP GUI HardCopy writes) without Pillow.
+
+    Raises:
+        ValueError -- If data is not a supported PNG
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a PNG image")
+    __header = None
+    __idat = []
+    __position = len(PNG_SIGNATURE)
+    while __position + 8 <= len(data):
+        __length, __tag = struct.unpack(">I4s", data[__position:__position + 8])
+        __body = data[__position + 8:__position + 8 + __length]
+        __position += 12 + __length
+        if __tag == b"IHDR":
+            __header = struct.unpack(">IIBBBBB", __body)
+        elif __tag == b"IDAT":
+            __idat.append(__body)
+        elif __tag == b"IEND":
+            break
+    if __header is None:
+        raise ValueError("PNG without IHDR chunk")
+    __width, __height, __depth, __color_type, _, _, __interlace = __header
+    if __depth != 8 or __color_type not in _PNG_CHANNELS or __interlace != 0:
+        raise ValueError(f"Unsupported PNG: bit depth {__depth}, color type {__color_type}, interlace {__interlace}")
+    __channels = _PNG_CHANNELS[__color_type]
+    return Frame(__width, __height, __channels, _unfilter(zlib.decompress(b"".join(__idat)), __width, __height, __channels))
+
+
+def encode_png(frame: Frame, level: int = 6) -> bytes:
+    """
+    Encode a Frame as PNG (filter type 0) without Pillow.
+    """
+    __color_type = {v: k for k, v in _PNG_CHANNELS.items()}[frame.Channels]
+    __stride = frame.stride
+    __raw = b"".join(b"\x00" + frame.Pixels[y * __stride:(y + 1) * __stride] for y in range(frame.Height))
+    def chunk(tag: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body))
+    return b"".join([
+        PNG_SIGNATURE,
+        chunk(b"IHDR", struct.pack(">IIBBBBB", frame.Width, frame.Height, 8, __color_type, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(__raw, level)),
+        chunk(b"IEND", b""),
+    ])
+
+
+def decode_image(data: bytes) -> Frame:
+    """
+    Decode an image to a Frame, with Pillow any format it reads otherwise PNG only.
+    """
+    if Image is None:
+        return decode_png(data)
+    with Image.open(io.BytesIO(data)) as img:
+        if img.mode not in ("L", "RGB", "LA", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        return Frame(img.width, img.height, len(img.getbands()), img.tobytes())
+
+
+def block_hashes(frame: Frame, block_size: int = 16) -> tuple[int, ...]:
+    """
+    CRC-32 of each block_size x block_size block of the frame, row by row. Two frames of the same size
+    differ in a block if (and, up to CRC collisions, only if) the block's hashes differ.
+    """
+    __stride = frame.stride
+    __block = block_size * frame.Channels
+    __columns = range(0, __stride, __block)
+    __hashes = []
+    __pixels = memoryview(frame.Pixels)
+    for top in range(0, frame.Height, block_size):
+        __crcs = [0] * len(__columns)
+        for y in range(top, min(top + block_size, frame.Height)):
+            __row = y * __stride
+            for i, x in enumerate(__columns):
+                __crcs[i] = zlib.crc32(__pixels[__row + x:__row + min(x + __block, __stride)], __crcs[i])
+        __hashes.extend(__crcs)
+    return tuple(__hashes)
+
+
+def changed_box(
+    frame: Frame,
+    hashes: tuple[int, ...],
+    other: tuple[int, ...],
+    block_size: int = 16
+    ) -> Optional[tuple[int, int, int, int]]:
+    """
+    Returns the bounding box (left, top, width, height) of the blocks that differ between two block hash
+    tuples of frames of the same size, None if no block differs.
+    """
+    __per_row = -(-frame.Width // block_size)
+    __changed = [i for i, (a, b) in enumerate(zip(hashes, other)) if a != b]
+    if not __changed:
+        return None
+    __rows = [i // __per_row for i in __changed]
+    __columns = [i % __per_row for i in __changed]
+    __left, __top = min(__columns) * block_size, min(__rows) * block_size
+    __right = min((max(__columns) + 1) * block_size, frame.Width)
+    __bottom = min((max(__rows) + 1) * block_size, frame.Height)
+    return (__left, __top, __right - __left, __bottom - __top)
@@ -0,0 +1,173 @@
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+
+# Session.trace_span categories counted as framework overhead of a step
+OVERHEAD_CATEGORIES: tuple[str, ...] = ("sleep", "wait", "screenshot")
+# Groups of a LatencyReport, group name -> StepLatency attribute
+REPORT_GROUPS: dict[str, str] = {"case": "Case", "transaction": "Transaction"}
+
+
+@dataclass
+class StepLatency:
+    """
+    Wall time of a step split into its parts.
+
+    ServerSeconds is the GuiSessionInfo.ResponseTime of the dialog steps of the step (time from sending the request
+    to the server response) and RoundTrips their GuiSessionInfo.RoundTrips, summed by Core.Metadata.MetaDataCollector. Overhead holds the seconds of the
+    framework's sleeps, readiness waits & screenshots by category. ComSeconds is the time spent in COM calls,
+    only known if the case is traced (Case.TraceConfig). ClientSeconds is the rest: COM calls outside the
+    server round trips and the automation code itself.
+    """
+    Case: str
+    Step: str
+    Index: int = 0
+    Transaction: Optional[str] = None
+    Seconds: float = 0.0
+    ServerSeconds: float = 0.0
+    RoundTrips: int = 0
+    Overhead: dict[str, float] = field(default_factory=dict)
+    ComSeconds: Optional[float] = None
+
+    @property
+    def OverheadSeconds(self) -> float:
+        return sum(self.Overhead.get(x, 0.0) for x in OVERHEAD_CATEGORIES)
+
+    @property
+    def ClientSeconds(self) -> float:
+        return max(0.0, self.Seconds - self.ServerSeconds - self.OverheadSeconds)
+
+    def measure(self, before: Any, after: Any) -> "StepLatency":
+        """
+        Set ServerSeconds & RoundTrips from the session metadata before and after the step. The snapshot after the
+        step holds the dialog steps since the one before, the same snapshot means the step did not talk to the server.
+
+        Arguments:
+            before {Optional[SessionMetaData]} -- Metadata collected when the step started
+            after {Optional[SessionMetaData]} -- Metadata collected after the step
+
+        Returns:
+            StepLatency -- self
+        """
+        if before is not None and after is not None and after is not before:
+            # ResponseTime is in milliseconds
+            self.ServerSeconds = (after.ResponseTime or 0) / 1000
+            self.RoundTrips = after.RoundTrips or 0
+        return self
+
+    def __repr__(self) -> str:
+        return f"class StepLatency<Case: {self.Case}, Step: {self.Step}, Index: {self.Index}, Transaction: {self.Transaction}, Seconds: {self.Seconds:.3f}, ServerSeconds: {self.ServerSeconds:.3f}, RoundTrips: {self.RoundTrips}, OverheadSeconds: {self.OverheadSeconds:.3f}, ClientSeconds: {self.ClientSeconds:.3f}>"
+
+
+@dataclass
+class LatencyTotals:
+    """
+    Summed StepLatency of the steps of one case or transaction.
+    Blame names the largest part of the time: server, framework or client. With a server share, a high
+    SecondsPerRoundTrip points at the app server, many round trips with a low one at the network & a chatty flow.
+    """
+    Key: Optional[str]
+    Steps: int = 0
+    Seconds: float = 0.0
+    ServerSeconds: float = 0.0
+    RoundTrips: int = 0
+    SleepSeconds: float = 0.0
+    WaitSeconds: float = 0.0
+    ScreenshotSeconds: float = 0.0
+    ClientSeconds: float = 0.0
+    ComSeconds: Optional[float] = None
+
+    def add(self, latency: StepLatency) -> None:
+        self.Steps += 1
+        self.Seconds += latency.Seconds
+        self.ServerSeconds += latency.ServerSeconds
+        self.RoundTrips += latency.RoundTrips
+        self.SleepSeconds += latency.Overhead.get("sleep", 0.0)
+        self.WaitSeconds += latency.Overhead.get("wait", 0.0)
+        self.ScreenshotSeconds += latency.Overhead.get("screenshot", 0.0)
+        self.ClientSeconds += latency.ClientSeconds
+        if latency.ComSeconds is not None:
+            self.ComSeconds = (self.ComSeconds or 0.0) + latency.ComSeconds
+
+    @property
+    def OverheadSeconds(self) -> float:
+        return self.SleepSeconds + self.WaitSeconds + self.ScreenshotSeconds
+
+    @property
+    def SecondsPerRoundTrip(self) -> Optional[float]:
+        return self.ServerSeconds / self.RoundTrips if self.RoundTrips else None
+
+    @property
+    def Blame(self) -> str:
+        __parts = {"server": self.ServerSeconds, "framework": self.OverheadSeconds, "client": self.ClientSeconds}
+        return max(__parts, key=__parts.get)
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.Key,
+            "steps": self.Steps,
+            "seconds": self.Seconds,
+            "server_seconds": self.ServerSeconds,
+            "round_trips": self.RoundTrips,
+            "seconds_per_round_trip": self.SecondsPerRoundTrip,
+            "sleep_seconds": self.SleepSeconds,
+            "wait_seconds": self.WaitSeconds,
+            "screenshot_seconds": self.ScreenshotSeconds,
+            "client_seconds": self.ClientSeconds,
+            "com_seconds": self.ComSeconds,
+            "blame": self.Blame,
+        }
+
+    def __repr__(self) -> str:
+        return f"class LatencyTotals<Key: {self.Key}, Steps: {self.Steps}, Seconds: {self.Seconds:.3f}, ServerSeconds: {self.ServerSeconds:.3f}, RoundTrips: {self.RoundTrips}, OverheadSeconds: {self.OverheadSeconds:.3f}, ClientSeconds: {self.ClientSeconds:.3f}, Blame: {self.Blame}>"
+
+
+class LatencyReport:
+    """
+    Latency breakdown of the finished steps of a session, summed per case and per transaction.
+    """
+    def __init__(self) -> None:
+        self.groups: dict[str, dict[Optional[str], LatencyTotals]] = {x: {} for x in REPORT_GROUPS}
+
+    def add(self, latency: StepLatency) -> None:
+        for group, attribute in REPORT_GROUPS.items():
+            __key = getattr(latency, attribute)
+            __totals = self.groups[group].get(__key)
+            if __totals is None:
+                __totals = self.groups[group][__key] = LatencyTotals(Key=__key)
+            __totals.add(latency)
+
+    def totals(self, group_by: str = "case") -> list[LatencyTotals]:
+        """
+        Returns the totals of a group, slowest first.
+
+        Keyword Arguments:
+            group_by {str} -- case or transaction (default: {"case"})
+
+        Raises:
+            ValueError -- If group_by is not one of REPORT_GROUPS
+        """
+        if group_by not in self.groups:
+            raise ValueError(f"Unknown latency group: {group_by}, expected one of {', '.join(REPORT_GROUPS)}")
+        return sorted(self.groups[group_by].values(), key=lambda x: x.Seconds, reverse=True)
+
+    def to_dict(self) -> dict:
+        return {x: [y.to_dict() for y in self.totals(x)] for x in self.groups}
+
+    def format(self, group_by: Optional[Iterable[str]] = None) -> str:
+        """
+        Returns the report as text table per group, the seconds of each part with its share of the wall time.
+        """
+        __lines = []
+        for group in (group_by if group_by is not None else self.groups):
+            if __lines:
+                __lines.append("")
+            __lines.append(f"{group:<32}{'steps':>7}{'total s':>10}{'server s':>16}{'round trips':>13}{'ms/trip':>9}{'framework s':>16}{'client s':>16}  blame")
+            for totals in self.totals(group):
+                def part(seconds: float) -> str:
+                    return f"{seconds:.3f} {seconds / totals.Seconds:>4.0%}" if totals.Seconds else f"{seconds:.3f}"
+                __lines.append(
+                    f"{str(totals.Key):<32}{totals.Steps:>7}{totals.Seconds:>10.3f}{part(totals.ServerSeconds):>16}{totals.RoundTrips:>13}"
+                    f"{(f'{totals.SecondsPerRoundTrip * 1000:.0f}' if totals.SecondsPerRoundTrip is not None else '-'):>9}"
+                    f"{part(totals.OverheadSeconds):>16}{part(totals.ClientSeconds):>16}  {totals.Blame}")
+        return "\n".join(__lines)
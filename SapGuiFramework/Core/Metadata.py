@@ -0,0 +1,113 @@
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+
+# GuiSessionInfo properties that do not change while a session is connected
+STATIC_FIELDS: tuple[str, ...] = ("ApplicationServer", "Language", "SystemName", "SystemNumber", "SystemSessionId", "User")
+# GuiSessionInfo properties that can only change with a server round trip
+VOLATILE_FIELDS: tuple[str, ...] = ("Program", "ScreenNumber", "Transaction")
+# GuiSessionInfo properties describing the last dialog step (not the session), summed by MetaDataCollector.expire
+DIALOG_STEP_FIELDS: tuple[str, ...] = ("ResponseTime", "RoundTrips")
+META_DATA_FIELDS: tuple[str, ...] = STATIC_FIELDS + VOLATILE_FIELDS + DIALOG_STEP_FIELDS
+
+
+@dataclass(frozen=True)
+class SessionMetaData:
+    """
+    Snapshot of the GuiSessionInfo properties recorded with a step. Steps share one snapshot until
+    the session info changes. ResponseTime & RoundTrips are the sums of the dialog steps since the previous
+    snapshot, GuiSessionInfo only reports the last dialog step.
+    """
+    ApplicationServer: Optional[str] = None
+    Language: Optional[str] = None
+    Program: Optional[str] = None
+    ResponseTime: Optional[float] = None
+    RoundTrips: Optional[int] = None
+    ScreenNumber: Optional[str] = None
+    SystemName: Optional[str] = None
+    SystemNumber: Optional[int] = None
+    SystemSessionId: Optional[str] = None
+    Transaction: Optional[str] = None
+    User: Optional[str] = None
+
+
+@dataclass
+class MetaDataStats:
+    """
+    Counters of a MetaDataCollector. Reads are GuiSessionInfo property reads (COM calls).
+    """
+    Collections: int = 0
+    Snapshots: int = 0
+    Reads: int = 0
+
+    def __repr__(self) -> str:
+        return f"class MetaDataStats<Collections: {self.Collections}, Snapshots: {self.Snapshots}, Reads: {self.Reads}>"
+
+
+class MetaDataCollector:
+    """
+    Collects the step metadata of a session with as few COM calls as possible.
+
+    The static fields are read once per connection. The volatile fields are only read again after expire,
+    which the Session calls after every action that can talk to the server, otherwise the previous snapshot
+    is returned without any COM call. GuiSessionInfo.ResponseTime & RoundTrips describe the last dialog step
+    only, expire reads them after each action and the next snapshot holds their sums.
+    """
+    def __init__(self) -> None:
+        self.stats: MetaDataStats = MetaDataStats()
+        self.snapshot: Optional[SessionMetaData] = None
+        self.stale: bool = True
+        self.__response_time: float = 0
+        self.__round_trips: int = 0
+
+    def reset(self) -> None:
+        """
+        Forget the snapshot, e.g. after connecting to another session.
+        """
+        self.snapshot = None
+        self.stale = True
+        self.__response_time = 0
+        self.__round_trips = 0
+
+    def expire(self, info: Any = None) -> None:
+        """
+        Mark the volatile fields as out of date after an action that can talk to the server and add the 
+        response time & round trips of the dialog step that just ended.
+
+        Keyword Arguments:
+            info {win32com.client.CDispatch} -- GuiSessionInfo of the session, None only marks the snapshot out of date (default: {None})
+        """
+        self.stale = True
+        if info is not None:
+            self.__response_time += self.__read(info, "ResponseTime") or 0
+            self.__round_trips += self.__read(info, "RoundTrips") or 0
+
+    def collect(self, info: Any) -> SessionMetaData:
+        """
+        Returns the metadata of the session.
+
+        Arguments:
+            info {win32com.client.CDispatch} -- GuiSessionInfo of the session
+
+        Returns:
+            SessionMetaData -- The previous snapshot if nothing changed otherwise a new one
+        """
+        self.stats.Collections += 1
+        if self.snapshot is not None and not self.stale:
+            return self.snapshot
+        __values = {x: self.__read(info, x) for x in VOLATILE_FIELDS}
+        __values.update(ResponseTime=self.__response_time, RoundTrips=self.__round_trips)
+        if self.snapshot is None:
+            __values.update({x: self.__read(info, x) for x in STATIC_FIELDS})
+            self.snapshot = SessionMetaData(**__values)
+        else:
+            self.snapshot = replace(self.snapshot, **__values)
+        self.stale = False
+        self.__response_time = 0
+        self.__round_trips = 0
+        self.stats.Snapshots += 1
+        return self.snapshot
+
+    def __read(self, info: Any, name: str) -> Any:
+        self.stats.Reads += 1
+        return getattr(info, name)
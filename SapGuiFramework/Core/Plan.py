@@ -0,0 +1,390 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+import hashlib
+import inspect
+import pickle
+from Core.Engine import ELEMENT_ID_PARAMETERS, session_actions, _signature
+from Flow.Actions import Step
+from Flow.Data import Case, load_case_from_json_file, vkey_number
+
+
+# Bump when CasePlan/PlannedStep change so cached plans of older versions are recompiled
+PLAN_VERSION: int = 1
+
+# Actions whose vkey (or vkeys) argument is converted to vkey numbers at compile time
+VKEY_ACTIONS: dict[str, str] = {"send_vkey": "vkey", "send_vkeys": "vkeys"}
+
+
+def resolve_id(id: Optional[str] = None, connection_number: int = 0, session_number: int = 0, window_number: int = 0) -> str:
+    """
+    Auto complete a partial SAP GUI element id to a full id, the logic behind Session.ace_id.
+    If no id is provided the id of the main window is returned.
+
+    Keyword Arguments:
+        id {Optional[str]} -- Optional (partial) SAP GUI element id (default: {None})
+        connection_number {int} -- Connection index, /app/con[n] (default: {0})
+        session_number {int} -- Session index, /ses[n] (default: {0})
+        window_number {int} -- Window index, /wnd[n] (default: {0})
+
+    Returns:
+        str -- Full SAP GUI element id
+    """
+    __session_id: str = f"/app/con[{connection_number}]/ses[{session_number}]"
+    base_id: str = f"{__session_id}/wnd[{window_number}]"
+    if id is None or id.strip() == "":
+        return base_id
+    elif id.startswith(("usr", "mbar", "tbar", "titl", "sbar")):
+        return f"{base_id}/{id}"
+    elif id.startswith(("/usr", "/mbar", "/tbar", "/titl", "/sbar")):
+        return f"{base_id}{id}"
+    elif id.startswith("wnd"):
+        return f"{__session_id}/{id}"
+    elif id.startswith("/wnd"):
+        return f"{__session_id}{id}"
+    elif id.startswith("ses"):
+        return f"/app/con[{connection_number}]/{id}"
+    elif id.startswith("/ses"):
+        return f"/app/con[{connection_number}]{id}"
+    elif id.startswith("con"):
+        return f"/app/{id}"
+    elif id.startswith("/con"):
+        return f"/app{id}"
+    elif id.startswith("app"):
+        return f"/{id}"
+    else:
+        return id
+
+
+@dataclass(frozen=True)
+class PlannedStep:
+    """
+    One compiled step of a CasePlan.
+
+    ElementId, Args & Kwargs hold the resolved element ids and vkey numbers, SourceElementId, SourceArgs
+    & SourceKwargs the values as loaded so the step can be resolved again for another session.
+    ElementIndex is the position of ElementId in CasePlan.ElementIds, None for steps without element.
+    """
+    Index: int
+    Action: str|Callable
+    ElementId: str = ""
+    Args: tuple = ()
+    Kwargs: tuple[tuple[str, Any], ...] = ()
+    Name: str = ""
+    Description: str = ""
+    ElementIndex: Optional[int] = None
+    SourceElementId: str = ""
+    SourceArgs: tuple = ()
+    SourceKwargs: tuple[tuple[str, Any], ...] = ()
+
+    def to_step(self) -> Step:
+        """
+        Returns a new mutable Step for the StepEngine.
+        """
+        return Step(
+            Action=self.Action,
+            ElementId=self.ElementId,
+            Args=list(self.Args),
+            Kwargs=dict(self.Kwargs),
+            Name=self.Name,
+            Description=self.Description)
+
+
+@dataclass(frozen=True)
+class CasePlan:
+    """
+    Immutable execution plan of a Case compiled with compile_case for one connection/session/window.
+
+    ElementIds are the distinct resolved element ids of all steps, every step referencing the same
+    element shares the same string. Case holds the settings (logging, waits, flags) of the compiled case,
+    it is not part of the plan's equality.
+    """
+    CaseName: str
+    ConnectionNumber: int
+    SessionNumber: int
+    WindowNumber: int
+    Steps: tuple[PlannedStep, ...]
+    ElementIds: tuple[str, ...]
+    Fingerprint: str = ""
+    Version: int = PLAN_VERSION
+    Case: "Optional[Case]" = field(default=None, compare=False, repr=False)
+
+    def to_steps(self) -> list[Step]:
+        return [x.to_step() for x in self.Steps]
+
+    def retarget(self, connection_number: int, session_number: int, window_number: Optional[int] = None) -> "CasePlan":
+        """
+        Returns the plan resolved for another connection/session, the plan itself if nothing changes.
+        """
+        __window_number = window_number if window_number is not None else self.WindowNumber
+        if (connection_number, session_number, __window_number) == (self.ConnectionNumber, self.SessionNumber, self.WindowNumber):
+            return self
+        return _compile_steps(
+            self.CaseName,
+            [(x.Action, x.SourceElementId, x.SourceArgs, x.SourceKwargs, x.Name, x.Description) for x in self.Steps],
+            connection_number,
+            session_number,
+            __window_number,
+            fingerprint=self.Fingerprint,
+            case=self.Case)
+
+    def __repr__(self) -> str:
+        return f"class CasePlan<CaseName: {self.CaseName}, Target: /app/con[{self.ConnectionNumber}]/ses[{self.SessionNumber}]/wnd[{self.WindowNumber}], Steps: {len(self.Steps)}, ElementIds: {len(self.ElementIds)}, Fingerprint: {self.Fingerprint[:12]}>"
+
+
+def _id_position(action: str|Callable, session_type: type) -> tuple[Optional[str], Optional[int]]:
+    """
+    Returns the id-like parameter name of an action and its positional index (excluding self).
+    """
+    if isinstance(action, str):
+        __func = session_actions(session_type).get(action)
+        if __func is None:
+            return None, None
+        __is_method = True
+    else:
+        __func = action
+        __is_method = False
+    __signature = _signature(inspect.unwrap(__func))
+    if __signature is None:
+        return None, None
+    __parameters = list(__signature.parameters)
+    for name in ELEMENT_ID_PARAMETERS:
+        if name in __signature.parameters:
+            return name, __parameters.index(name) - (1 if __is_method else 0)
+    return None, None
+
+
+def _compile_steps(
+    case_name: str,
+    steps: list[tuple],
+    connection_number: int,
+    session_number: int,
+    window_number: int,
+    fingerprint: str = "",
+    case: Optional[Case] = None,
+    session_type: Optional[type] = None
+    ) -> CasePlan:
+    if session_type is None:
+        from Core.Framework import Session
+        session_type = Session
+    __ids: dict[str, int] = {}
+    __element_ids: list[str] = []
+    __resolved: dict[str, tuple[str, int]] = {}
+    __errors: list[str] = []
+    __planned: list[PlannedStep] = []
+
+    def __resolve(id: str) -> tuple[str, int]:
+        # Each distinct (partial) id is resolved once, all steps share the resolved string
+        __entry = __resolved.get(id)
+        if __entry is None:
+            __full_id = resolve_id(id, connection_number, session_number, window_number)
+            if __full_id not in __ids:
+                __ids[__full_id] = len(__element_ids)
+                __element_ids.append(__full_id)
+            __index = __ids[__full_id]
+            __entry = (__element_ids[__index], __index)
+            __resolved[id] = __entry
+        return __entry
+
+    for i, (action, element_id, args, kwargs, name, description) in enumerate(steps):
+        __args = list(args)
+        __kwargs = dict(kwargs)
+        __element_id = ""
+        __element_index = None
+        __parameter, __position = _id_position(action, session_type)
+        if __parameter is not None:
+            if __parameter in __kwargs and isinstance(__kwargs[__parameter], str):
+                __kwargs[__parameter], __element_index = __resolve(__kwargs[__parameter])
+            elif __position is not None and len(__args) > __position and isinstance(__args[__position], str):
+                __args[__position], __element_index = __resolve(__args[__position])
+        if element_id:
+            __element_id, __element_index = __resolve(element_id)
+        if isinstance(action, str) and action in VKEY_ACTIONS:
+            __convert = vkey_number if VKEY_ACTIONS[action] == "vkey" else lambda x: tuple(vkey_number(y) for y in x)
+            try:
+                if VKEY_ACTIONS[action] in __kwargs:
+                    __kwargs[VKEY_ACTIONS[action]] = __convert(__kwargs[VKEY_ACTIONS[action]])
+                elif __args:
+                    __args[0] = __convert(__args[0])
+            except ValueError as err:
+                __errors.append(f"Step {i} ({name or action}): {err}")
+        __planned.append(PlannedStep(
+            Index=i,
+            Action=action,
+            ElementId=__element_id,
+            Args=tuple(__args),
+            Kwargs=tuple(__kwargs.items()),
+            Name=name,
+            Description=description,
+            ElementIndex=__element_index,
+            SourceElementId=element_id,
+            SourceArgs=tuple(args),
+            SourceKwargs=tuple(kwargs.items()) if isinstance(kwargs, dict) else tuple(kwargs)))
+    if __errors:
+        raise ValueError("Invalid steps:\n" + "\n".join(__errors))
+    return CasePlan(
+        CaseName=case_name,
+        ConnectionNumber=connection_number,
+        SessionNumber=session_number,
+        WindowNumber=window_number,
+        Steps=tuple(__planned),
+        ElementIds=tuple(__element_ids),
+        Fingerprint=fingerprint,
+        Case=case)
+
+
+def compile_case(
+    case: Case,
+    connection_number: int = 0,
+    session_number: int = 0,
+    window_number: int = 0,
+    fingerprint: str = "",
+    session_type: Optional[type] = None
+    ) -> CasePlan:
+    """
+    Compile the steps of a case into an immutable CasePlan.
+    Element ids (Step.ElementId and the id/element_id/table_id argument of the action) are resolved to full
+    ids for the target connection/session/window and deduplicated, vkey combinations of send_vkey(s) are
+    converted to vkey numbers.
+
+    Arguments:
+        case {Case} -- Case to compile
+
+    Keyword Arguments:
+        connection_number {int} -- Target connection index (default: {0})
+        session_number {int} -- Target session index (default: {0})
+        window_number {int} -- Target window index (default: {0})
+        fingerprint {str} -- Hash identifying the source of the case, see PlanCache (default: {""})
+        session_type {Optional[type]} -- Class whose methods the actions name, default Core.Framework.Session (default: {None})
+
+    Returns:
+        CasePlan -- The compiled plan
+
+    Raises:
+        ValueError -- Lists every step with an invalid vkey
+    """
+    return _compile_steps(
+        case.Name,
+        [(x.Action, x.ElementId or "", x.Args or (), x.Kwargs or {}, x.Name, x.Description) for x in case.Steps],
+        connection_number,
+        session_number,
+        window_number,
+        fingerprint=fingerprint,
+        case=case,
+        session_type=session_type)
+
+
+class PlanCache:
+    """
+    Disk cache of compiled CasePlans, one pickle file per plan.
+
+    Plans are keyed by the SHA-256 of the json data file content, the target connection/session/window
+    and PLAN_VERSION, so an edited data file or a framework upgrade compiles a new plan.
+    Only load plan files written by this cache, pickle files can execute code when loaded.
+
+    Arguments:
+        directory {str|Path} -- Directory of the plan files, created if missing
+    """
+    def __init__(self, directory: str|Path) -> None:
+        self.directory: Path = Path(directory)
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def fingerprint(data_file: str|Path, connection_number: int = 0, session_number: int = 0, window_number: int = 0) -> str:
+        __hash = hashlib.sha256()
+        __hash.update(Path(data_file).read_bytes())
+        __hash.update(f"|{connection_number}|{session_number}|{window_number}|{PLAN_VERSION}".encode())
+        return __hash.hexdigest()
+
+    def path(self, fingerprint: str) -> Path:
+        return self.directory / f"{fingerprint}.plan"
+
+    def get(self, fingerprint: str) -> Optional[CasePlan]:
+        """
+        Returns the cached plan or None if there is none or it can not be read.
+        """
+        try:
+            with open(self.path(fingerprint), "rb") as f:
+                __plan = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if not isinstance(__plan, CasePlan) or __plan.Version != PLAN_VERSION or __plan.Fingerprint != fingerprint:
+            return None
+        return __plan
+
+    def put(self, plan: CasePlan) -> None:
+        """
+        Store a plan, written to a temporary file first so a concurrent reader never sees a partial plan.
+        Plans with callable actions that can not be pickled are not cached.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        __path = self.path(plan.Fingerprint)
+        __tmp = __path.with_suffix(f".{id(plan)}.tmp")
+        try:
+            with open(__tmp, "wb") as f:
+                pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+            __tmp.replace(__path)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            __tmp.unlink(missing_ok=True)
+
+    def load(self, data_file: str|Path, connection_number: int = 0, session_number: int = 0, window_number: int = 0) -> CasePlan:
+        """
+        Returns the plan of a json data file from the cache, or loads, compiles and caches it.
+
+        Arguments:
+            data_file {str|Path} -- Path of the json data file
+
+        Keyword Arguments:
+            connection_number {int} -- Target connection index (default: {0})
+            session_number {int} -- Target session index (default: {0})
+            window_number {int} -- Target window index (default: {0})
+
+        Returns:
+            CasePlan -- The compiled plan
+        """
+        __fingerprint = self.fingerprint(data_file, connection_number, session_number, window_number)
+        __plan = self.get(__fingerprint)
+        if __plan is not None:
+            self.hits += 1
+            return __plan
+        self.misses += 1
+        __plan = compile_case(
+            load_case_from_json_file(str(data_file)),
+            connection_number=connection_number,
+            session_number=session_number,
+            window_number=window_number,
+            fingerprint=__fingerprint)
+        self.put(__plan)
+        return __plan
+
+
+def load_plan(
+    data_file: str|Path,
+    connection_number: int = 0,
+    session_number: int = 0,
+    window_number: int = 0,
+    cache_dir: Optional[str|Path] = None
+    ) -> CasePlan:
+    """
+    Load and compile a json data file, through a PlanCache when cache_dir is given.
+
+    Arguments:
+        data_file {str|Path} -- Path of the json data file
+
+    Keyword Arguments:
+        connection_number {int} -- Target connection index (default: {0})
+        session_number {int} -- Target session index (default: {0})
+        window_number {int} -- Target window index (default: {0})
+        cache_dir {Optional[str|Path]} -- Plan cache directory, None compiles without caching (default: {None})
+
+    Returns:
+        CasePlan -- The compiled plan
+    """
+    if cache_dir is not None:
+        return PlanCache(cache_dir).load(data_file, connection_number, session_number, window_number)
+    return compile_case(
+        load_case_from_json_file(str(data_file)),
+        connection_number=connection_number,
+        session_number=session_number,
+        window_number=window_number)
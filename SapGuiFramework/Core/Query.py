@@ -0,0 +1,350 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from itertools import product
+from typing import Any, Iterable, Iterator, Optional, Protocol
+from Core.Cache import CacheStats
+from Core.Selection import selection_uploads
+from Core.Utilities import SelectionRange, normalize_sql, parse_sql_conditions, parse_sql_select
+
+
+# Execution strategies of get_table_data, in order of preference
+STRATEGIES: tuple[str, ...] = ("rfc", "se16n", "se16")
+# Included single values of a select option per execution, larger IN lists are split into chunks. A selection
+# becomes one OR per value in the generated SQL, too many values exceed the statement size of the database.
+MAX_SELECTION_VALUES: dict[str, int] = {"rfc": 1000, "se16n": 3000, "se16": 3000}
+# Options of SelectionRange that can not be uploaded to a multiple selection
+COMPARISON_OPTIONS: tuple[str, ...] = ("GT", "GE", "LT", "LE")
+# Width of a line of the RFC_READ_TABLE OPTIONS table
+RFC_OPTION_WIDTH: int = 72
+RFC_OPERATORS: dict[str, str] = {"EQ": "=", "NE": "<>", "GT": ">", "GE": ">=", "LT": "<", "LE": "<="}
+
+# Ids of transaction SE16N, relative to the session
+SE16N_TABLE: str = "wnd[0]/usr/ctxtGD-TAB"
+SE16N_MAX_LINES: str = "wnd[0]/usr/txtGD-MAX_LINES"
+SE16N_FIELDS: str = "wnd[0]/usr/tblSAPLSE16NSELFIELDS_TC"
+SE16N_FIELD_NAME: str = "GS_SELFIELDS-FIELDNAME"
+SE16N_LOW: str = "wnd[0]/usr/tblSAPLSE16NSELFIELDS_TC/ctxtGS_SELFIELDS-LOW[2,{row}]"
+SE16N_HIGH: str = "wnd[0]/usr/tblSAPLSE16NSELFIELDS_TC/ctxtGS_SELFIELDS-HIGH[3,{row}]"
+SE16N_MORE: str = "wnd[0]/usr/tblSAPLSE16NSELFIELDS_TC/btnPUSH[4,{row}]"
+SE16N_OUTPUT: str = "wnd[0]/usr/tblSAPLSE16NSELFIELDS_TC/chkGS_SELFIELDS-MARK[5,{row}]"
+SE16N_RESULT: str = "wnd[0]/usr/cntlRESULT_LIST/shellcont/shell"
+SE16_RESULT: str = "wnd[0]/usr/cntlGRID1/shellcont/shell"
+
+
+class TableReader(Protocol):
+    """
+    Backend of the rfc strategy, reads a table without the SAP GUI.
+    """
+    def read_table(self, table: str, fields: list[str], conditions: dict[str, list[SelectionRange]], top: Optional[int] = None) -> Iterable[dict]:
+        ...
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def rfc_conditions(conditions: dict[str, list[SelectionRange]]) -> str:
+    """
+    Returns the selection ranges as Open SQL WHERE clause, the included ranges of a field are ORed and its
+    excluded ranges are ANDed with NOT like a SAP selection.
+    """
+    __terms = []
+    for name, ranges in conditions.items():
+        __included, __excluded = [], []
+        __values = [x.Low for x in ranges if x.Sign == "I" and x.Option == "EQ"]
+        if len(__values) > 1:
+            __included.append(f"{name} IN ({', '.join(_quote(x) for x in __values)})")
+        for selection in ranges:
+            if selection.Sign == "I" and selection.Option == "EQ" and len(__values) > 1:
+                continue
+            if selection.Option == "BT":
+                __term = f"{name} BETWEEN {_quote(selection.Low)} AND {_quote(selection.High)}"
+            elif selection.Option == "CP":
+                __term = f"{name} LIKE {_quote(selection.Low.replace('*', '%').replace('+', '_'))}"
+            else:
+                __term = f"{name} {RFC_OPERATORS[selection.Option]} {_quote(selection.Low)}"
+            (__included if selection.Sign == "I" else __excluded).append(__term)
+        if len(__included) != 0:
+            __terms.append(f"( {' OR '.join(__included)} )" if len(__included) > 1 else __included[0])
+        __terms.extend(f"NOT {x}" for x in __excluded)
+    return " AND ".join(__terms)
+
+
+def rfc_options(conditions: dict[str, list[SelectionRange]], width: int = RFC_OPTION_WIDTH) -> list[str]:
+    """
+    Returns the WHERE clause of the selection ranges wrapped in lines of the RFC_READ_TABLE OPTIONS table,
+    lines are broken between words and never inside a quoted value.
+
+    Raises:
+        ValueError -- If a single value is longer than width
+    """
+    __lines: list[str] = []
+    __line = ""
+    __clause = rfc_conditions(conditions)
+    __words: list[str] = []
+    # split at spaces outside quotes
+    __word, __quoted = "", False
+    for char in __clause:
+        if char == "'":
+            __quoted = not __quoted
+        if char == " " and not __quoted:
+            __words.append(__word)
+            __word = ""
+        else:
+            __word += char
+    if __word:
+        __words.append(__word)
+    for word in __words:
+        if len(word) > width:
+            raise ValueError(f"Value {word} is longer than an RFC_READ_TABLE option line ({width})")
+        if __line and len(__line) + 1 + len(word) > width:
+            __lines.append(__line)
+            __line = word
+        else:
+            __line = f"{__line} {word}" if __line else word
+    if __line:
+        __lines.append(__line)
+    return __lines
+
+
+def matches_selection(value: str, ranges: list[SelectionRange]) -> bool:
+    """
+    Returns True if value is in the selection: any included range matches (or there is none) and no excluded one.
+    """
+    def matches(selection: SelectionRange) -> bool:
+        if selection.Option == "EQ":
+            return value == selection.Low
+        if selection.Option == "NE":
+            return value != selection.Low
+        if selection.Option == "BT":
+            return selection.Low <= value <= selection.High
+        if selection.Option == "CP":
+            return fnmatchcase(value, selection.Low.replace("+", "?"))
+        if selection.Option == "GT":
+            return value > selection.Low
+        if selection.Option == "GE":
+            return value >= selection.Low
+        if selection.Option == "LT":
+            return value < selection.Low
+        if selection.Option == "LE":
+            return value <= selection.Low
+        raise ValueError(f"Unknown selection option: {selection.Option}")
+    __included = [x for x in ranges if x.Sign == "I"]
+    if len(__included) != 0 and not any(matches(x) for x in __included):
+        return False
+    return not any(matches(x) for x in ranges if x.Sign == "E")
+
+
+class RfcTableReader:
+    """
+    TableReader calling RFC_READ_TABLE (or a compatible function module, e.g. /BODS/RFC_READ_TABLE2) through a
+    pyrfc.Connection like object with a call(function, **parameters) method.
+    """
+    def __init__(self, connection: Any, function: str = "RFC_READ_TABLE", delimiter: str = "|") -> None:
+        self.connection: Any = connection
+        self.function: str = function
+        self.delimiter: str = delimiter
+
+    def read_table(self, table: str, fields: list[str], conditions: dict[str, list[SelectionRange]], top: Optional[int] = None) -> Iterator[dict]:
+        __result = self.connection.call(
+            self.function,
+            QUERY_TABLE=table,
+            DELIMITER=self.delimiter,
+            FIELDS=[{"FIELDNAME": x} for x in fields if x != "*"],
+            OPTIONS=[{"TEXT": x} for x in rfc_options(conditions)],
+            ROWCOUNT=top or 0)
+        __names = [x["FIELDNAME"] for x in __result["FIELDS"]]
+        for row in __result["DATA"]:
+            yield dict(zip(__names, [x.strip() for x in row["WA"].split(self.delimiter)]))
+
+
+class LocalTableReader:
+    """
+    In memory stand-in for RFC_READ_TABLE, tables are lists of row dicts keyed by table name.
+    Used to run the rfc strategy without a SAP system, e.g. in tests and benchmarks.
+    """
+    def __init__(self, tables: Optional[dict[str, list[dict]]] = None) -> None:
+        self.tables: dict[str, list[dict]] = tables if tables is not None else {}
+        self.calls: int = 0
+
+    def read_table(self, table: str, fields: list[str], conditions: dict[str, list[SelectionRange]], top: Optional[int] = None) -> Iterator[dict]:
+        self.calls += 1
+        if table not in self.tables:
+            raise ValueError(f"Table {table} does not exist")
+        __count = 0
+        for row in self.tables[table]:
+            if top and __count >= top:
+                break
+            if all(matches_selection(str(row.get(name, "")), ranges) for name, ranges in conditions.items()):
+                __count += 1
+                yield dict(row) if fields == ["*"] else {x: row.get(x, "") for x in fields}
+
+
+def estimate_round_trips(strategy: str, fields: list[str], conditions: dict[str, list[SelectionRange]]) -> int:
+    """
+    Returns the estimated server round trips of one execution of a statement with a strategy.
+    SE16 selects each condition & output field in a search popup, SE16N sets them in its field table.
+    """
+    if strategy == "rfc":
+        return 1
+    __uploads = 0
+    for ranges in conditions.values():
+        __included = [x for x in ranges if x.Sign == "I"]
+        __direct = len(__included) == 1 and (len(ranges) == 1 or __included[0].Option in COMPARISON_OPTIONS)
+        __rest = [x for x in ranges if not (__direct and x is __included[0])]
+        __uploads += (3 if __direct and __included[0].Option in COMPARISON_OPTIONS else 0)
+        __uploads += (2 + 2 * len(selection_uploads(__rest))) if len(__rest) != 0 else 0
+    # start transaction, table, execute & export
+    __trips = 3 + 5 + __uploads
+    if strategy == "se16":
+        __trips += (3 + 6 * len(conditions)) if len(conditions) != 0 else 0
+        __trips += (2 + 7 * len(fields)) if fields != ["*"] else 0
+    else:
+        # read the field table & scroll to the rows of the conditions & output fields
+        __trips += 2 + len(conditions) + (len(fields) if fields != ["*"] else 0)
+    return __trips
+
+
+@dataclass
+class QueryPlan:
+    """
+    Parsed statement of get_table_data with its execution strategy. Plans are cached & shared by QueryPlanner,
+    they must not be changed.
+    """
+    Statement: str
+    Table: str
+    Fields: list[str] = field(default_factory=lambda: ["*"])
+    Top: Optional[int] = None
+    Conditions: dict[str, list[SelectionRange]] = field(default_factory=dict)
+    Strategy: str = "se16"
+    MaxValues: int = MAX_SELECTION_VALUES["se16"]
+    RoundTrips: int = 0
+
+    def chunks(self) -> Iterator[dict[str, list[SelectionRange]]]:
+        """
+        Yield the conditions of each execution. Included single values (IN lists) longer than MaxValues are split,
+        the chunks of several fields are combined, all other ranges are part of every chunk.
+        """
+        __fields: list[list[list[SelectionRange]]] = []
+        for ranges in self.Conditions.values():
+            __values = list({x.Low: x for x in ranges if x.Sign == "I" and x.Option == "EQ"}.values())
+            __others = [x for x in ranges if not (x.Sign == "I" and x.Option == "EQ")]
+            if len(__values) <= self.MaxValues:
+                __fields.append([ranges])
+            else:
+                __fields.append([__values[i:i + self.MaxValues] + __others for i in range(0, len(__values), self.MaxValues)])
+        for combination in product(*__fields):
+            yield dict(zip(self.Conditions, combination))
+
+    @property
+    def Executions(self) -> int:
+        __count = 1
+        for ranges in self.Conditions.values():
+            __values = len({x.Low for x in ranges if x.Sign == "I" and x.Option == "EQ"})
+            __count *= max(1, -(-__values // self.MaxValues))
+        return __count
+
+    def __repr__(self) -> str:
+        return f"class QueryPlan<Table: {self.Table}, Fields: {self.Fields}, Top: {self.Top}, Conditions: {len(self.Conditions)}, Strategy: {self.Strategy}, Executions: {self.Executions}, RoundTrips: {self.RoundTrips}>"
+
+
+class QueryPlanner:
+    """
+    Plans the statements of get_table_data: parses them once into a QueryPlan kept in an LRU cache keyed by the
+    normalized statement and chooses the strategy with the fewest estimated round trips among the enabled ones.
+    rfc needs a reader (TableReader), se16n is only chosen if enabled because SE16N is not available in every system.
+    """
+    def __init__(
+        self,
+        maxsize: int = 256,
+        reader: Optional[TableReader] = None,
+        strategies: Optional[Iterable[str]] = None,
+        max_values: Optional[dict[str, int]] = None
+        ) -> None:
+        """
+        Keyword Arguments:
+            maxsize {int} -- Number of cached plans (default: {256})
+            reader {Optional[TableReader]} -- Backend of the rfc strategy, e.g. RfcTableReader or LocalTableReader (default: {None})
+            strategies {Optional[Iterable[str]]} -- Enabled strategies (default: {("rfc", "se16")})
+            max_values {Optional[dict[str, int]]} -- Included single values per execution by strategy (default: {MAX_SELECTION_VALUES})
+        """
+        self.maxsize: int = maxsize
+        self.reader: Optional[TableReader] = reader
+        self.strategies: tuple[str, ...] = tuple(strategies) if strategies is not None else ("rfc", "se16")
+        __unknown = [x for x in self.strategies if x not in STRATEGIES]
+        if __unknown:
+            raise ValueError(f"Unknown strategies: {', '.join(__unknown)}, expected {', '.join(STRATEGIES)}")
+        self.max_values: dict[str, int] = {**MAX_SELECTION_VALUES, **(max_values or {})}
+        self.stats: CacheStats = CacheStats()
+        self.__plans: OrderedDict[tuple[str, Optional[str]], QueryPlan] = OrderedDict()
+        # statement as written -> normalized key, a repeated statement is not tokenized again
+        self.__keys: dict[tuple[str, Optional[str]], tuple[str, Optional[str]]] = {}
+
+    def choose_strategy(self, fields: list[str], conditions: dict[str, list[SelectionRange]]) -> str:
+        """
+        Returns the enabled strategy with the fewest estimated round trips, rfc needs a reader and SE16N can not 
+        take comparisons (GT, GE, LT, LE).
+        """
+        __candidates = []
+        for strategy in self.strategies:
+            if strategy == "rfc" and self.reader is None:
+                continue
+            if strategy == "se16n" and any(x.Option in COMPARISON_OPTIONS for r in conditions.values() for x in r):
+                continue
+            __candidates.append(strategy)
+        if len(__candidates) == 0:
+            return "se16"
+        return min(__candidates, key=lambda x: (estimate_round_trips(x, fields, conditions), STRATEGIES.index(x)))
+
+    def plan(self, statement: str, strategy: Optional[str] = None) -> QueryPlan:
+        """
+        Returns the plan of a statement, from the cache if the normalized statement was planned before.
+
+        Arguments:
+            statement {str} -- A SQL like select statement, see Core.Utilities.parse_sql_select
+
+        Keyword Arguments:
+            strategy {Optional[str]} -- Strategy to use instead of the chosen one (default: {None})
+
+        Raises:
+            ValueError -- If the statement can not be parsed or the strategy is unknown
+        """
+        if strategy is not None and strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}, expected one of {', '.join(STRATEGIES)}")
+        __key = self.__keys.get((statement, strategy))
+        if __key is None:
+            __key = (normalize_sql(statement), strategy)
+            if len(self.__keys) >= 4 * self.maxsize:
+                self.__keys.clear()
+            self.__keys[(statement, strategy)] = __key
+        __plan = self.__plans.get(__key)
+        if __plan is not None:
+            self.stats.Hits += 1
+            self.__plans.move_to_end(__key)
+            return __plan
+        self.stats.Misses += 1
+        __fields, __top, __table, __where = parse_sql_select(statement)
+        __conditions = parse_sql_conditions(__where)
+        __strategy = strategy if strategy is not None else self.choose_strategy(__fields, __conditions)
+        __plan = QueryPlan(
+            Statement=__key[0],
+            Table=__table,
+            Fields=__fields,
+            Top=int(__top[1]) if len(__top) == 2 else None,
+            Conditions=__conditions,
+            Strategy=__strategy,
+            MaxValues=self.max_values[__strategy])
+        __plan.RoundTrips = __plan.Executions * estimate_round_trips(__strategy, __fields, __conditions)
+        self.__plans[__key] = __plan
+        if len(self.__plans) > self.maxsize:
+            self.__plans.popitem(last=False)
+            self.stats.Invalidations += 1
+        return __plan
+
+    def clear(self) -> None:
+        self.__plans.clear()
+        self.__keys.clear()
+
+    def __len__(self) -> int:
+        return len(self.__plans)
@@ -0,0 +1,592 @@
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from queue import Queue
+from typing import Any, Callable, Iterable, Optional, Sized
+import atexit
+import multiprocessing
+import pickle
+import threading
+import time
+import traceback
+try:
+    import pythoncom  # type: ignore
+except ImportError:  # pywin32 is only available on Windows
+    pythoncom = None
+from Core.Framework import Session
+from Core.Plan import CasePlan
+from Flow.Data import Case
+from Flow.Results import Result, ResultCase, merge_results
+from Logging.Logging import Logger, LoggingConfig
+
+
+MAX_SESSIONS: int = 6  # Sessions allowed per SAP logon
+CASE_TIMEOUT: float = 1800.0  # Default seconds a LogonPool case may run
+
+
+@dataclass
+class CaseRun:
+    """
+    Outcome of one case executed by a runner.
+    """
+    Case: Case
+    Worker: int
+    Result: "Result|None" = None
+    Seconds: float = 0.0
+    ReturnValue: Any = None
+    Error: str|None = None
+
+    def __repr__(self) -> str:
+        return f"class CaseRun<Case: {self.Case.Name}, Worker: {self.Worker}, Result: {self.Result}, Seconds: {self.Seconds:.3f}, Error: {self.Error}>"
+
+
+@dataclass
+class RunReport:
+    """
+    Merged report of all cases executed by a runner, Runs are in the order the cases were queued.
+    Cases counts the executed cases, Runs holds only the failed runs when the runner does not keep all runs.
+    """
+    Result: ResultCase = field(default_factory=ResultCase)
+    Runs: list[CaseRun] = field(default_factory=list)
+    Cases: int = 0
+    Seconds: float = 0.0
+    Workers: int = 0
+    Steals: int = 0
+    Restarts: int = 0
+
+    @property
+    def Passed(self) -> int:
+        return self.Cases - self.Failed
+
+    @property
+    def Failed(self) -> int:
+        return len([x for x in self.Runs if x.Result != Result.PASS])
+
+    @property
+    def CasesPerMinute(self) -> float:
+        return self.Cases / self.Seconds * 60 if self.Seconds > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"class RunReport<Result: {self.Result.Result}, Cases: {self.Cases}, Passed: {self.Passed}, Failed: {self.Failed}, Workers: {self.Workers}, Steals: {self.Steals}, Restarts: {self.Restarts}, Seconds: {self.Seconds:.3f}, CasesPerMinute: {self.CasesPerMinute:.1f}>"
+
+
+def _case_of(case: Case|CasePlan) -> Case:
+    return case.Case if isinstance(case, CasePlan) else case
+
+
+def run_case(
+    case: Case|CasePlan,
+    task: Optional[Callable[[Session], Any]],
+    connection_name: str,
+    session_number: Optional[int] = None,
+    connection_number: Optional[int] = None,
+    sap_gui: Optional[Any] = None,
+    worker: int = 0,
+    lock: Optional[threading.Lock] = None
+    ) -> CaseRun:
+    """
+    Execute one case on its own Session bound to /ses[<session_number>] of the connection.
+    The SAP GUI session is left open for the next case, the case result is set by Session.cleanup.
+
+    Arguments:
+        case {Case|CasePlan} -- Case or compiled Core.Plan.CasePlan to execute
+        task {Optional[Callable[[Session], Any]]} -- Called with the connected Session, runs the case, None runs Session.run_steps (Session.run_plan for a plan)
+        connection_name {str} -- SAP environment name to connect with
+
+    Keyword Arguments:
+        session_number {Optional[int]} -- Session index to bind to (default: {None})
+        connection_number {Optional[int]} -- Connection index to bind to, default is the first connection matching connection_name (default: {None})
+        sap_gui {Optional[Any]} -- SAP GUI scripting object passed to Session (default: {None})
+        worker {int} -- Worker number reported in CaseRun (default: {0})
+        lock {Optional[threading.Lock]} -- Lock serializing connection setup between workers (default: {None})
+
+    Returns:
+        CaseRun -- Outcome of the case
+    """
+    __plan = case if isinstance(case, CasePlan) else None
+    case = _case_of(case)
+    __run = CaseRun(Case=case, Worker=worker)
+    __start = time.perf_counter()
+    __session: Session|None = None
+    try:
+        if lock is not None:
+            lock.acquire()
+        try:
+            __session = Session(case=case, sap_gui=sap_gui)
+            atexit.unregister(__session.cleanup)
+            if __session.logger is None:
+                __session.logger = Logger(config=case.LogConfig)
+            __session.open_connection(connection_name, session_number=session_number, connection_number=connection_number)
+        finally:
+            if lock is not None:
+                lock.release()
+        if task is not None:
+            __run.ReturnValue = task(__session)
+        elif __plan is not None:
+            __run.ReturnValue = __session.run_plan(__plan)
+        else:
+            __run.ReturnValue = __session.run_steps()
+    except SystemExit:
+        # Session.step_fail exits the case when Case.ExitOnFail is set
+        __run.Error = "Case exited on failed step"
+    except Exception as err:
+        __run.Error = f"{err}|{traceback.format_exc()}"
+        case.Status.Result = Result.FAIL
+    finally:
+        if __session is not None and __session.logger is not None:
+            try:
+                __session.cleanup(close_sap=False)
+            except Exception as err:
+                __session.logger.log.warning(f"Unhandled exception during case cleanup|{err}")
+        if case.Status.Result is None and __run.Error is not None:
+            case.Status.Result = Result.FAIL
+        __run.Result = case.Status.Result
+        __run.Seconds = time.perf_counter() - __start
+    return __run
+
+
+class SessionRunner:
+    """
+    Runs a queue of cases in parallel over several sessions of one SAP logon.
+
+    One worker thread per session, each worker binds a new Session per case to its own session index
+    (/ses[first_session + worker]), creating the SAP GUI session if it does not exist.
+    Workers take the next case from a shared queue when they finish one, so long cases do not hold up the others.
+    The queue is bounded, cases are taken from the iterable only as workers become free (see Flow.Data.load_cases_from_excel_file).
+
+    Arguments:
+        connection_name {str} -- SAP environment name to connect with, can be found in the login pad
+
+    Keyword Arguments:
+        sessions {int} -- Number of parallel sessions, at most 6 per logon (default: {MAX_SESSIONS})
+        first_session {int} -- Session index of the first worker (default: {0})
+        sap_gui {Optional[Any]} -- SAP GUI scripting object shared by all workers, None gets it in each worker thread (default: {None})
+    """
+    def __init__(self, connection_name: str, sessions: int = MAX_SESSIONS, first_session: int = 0, sap_gui: Optional[Any] = None) -> None:
+        if not 1 <= sessions <= MAX_SESSIONS:
+            raise ValueError(f"sessions must be between 1 and {MAX_SESSIONS}, got {sessions}")
+        self.connection_name: str = connection_name
+        self.sessions: int = sessions
+        self.first_session: int = first_session
+        self.sap_gui: Optional[Any] = sap_gui
+        self.__setup_lock: threading.Lock = threading.Lock()
+
+    def _worker(self, worker: int, queue: Queue, task: Callable[[Session], Any], finish: Callable[[int, CaseRun], None]) -> None:
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+        try:
+            while True:
+                __item = queue.get()
+                if __item is None:
+                    break
+                __index, __case = __item
+                finish(__index, run_case(
+                    __case,
+                    task,
+                    self.connection_name,
+                    session_number=self.first_session + worker,
+                    sap_gui=self.sap_gui,
+                    worker=worker,
+                    lock=self.__setup_lock))
+        finally:
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+
+    def run(self, cases: Iterable[Case|CasePlan], task: Optional[Callable[[Session], Any]] = None, keep_runs: bool = True) -> RunReport:
+        """
+        Execute the cases and wait for all of them to finish.
+
+        Arguments:
+            cases {Iterable[Case|CasePlan]} -- Cases or compiled plans to execute, an iterator is consumed as workers become free
+
+        Keyword Arguments:
+            task {Optional[Callable[[Session], Any]]} -- Called with each case's connected Session, runs the case, default is Session.run_steps (default: {None})
+            keep_runs {bool} -- Keep the run of every case in RunReport.Runs, False keeps only the failed runs and merges each 
+                                case result as it finishes so memory does not grow with passing cases (default: {True})
+
+        Returns:
+            RunReport -- Case outcomes in queue order and the merged ResultCase
+        """
+        __start = time.perf_counter()
+        __queue: Queue = Queue(maxsize=self.sessions * 2)
+        __runs: dict[int, CaseRun] = {}
+        __report = RunReport()
+        __lock = threading.Lock()
+
+        def finish(index: int, run: CaseRun) -> None:
+            with __lock:
+                __report.Cases += 1
+                if keep_runs:
+                    __runs[index] = run
+                    return
+                __report.Result = merge_results([__report.Result, run.Case.Status])
+                if run.Result != Result.PASS:
+                    __runs[index] = run
+
+        __report.Workers = min(self.sessions, len(cases)) if isinstance(cases, Sized) else self.sessions
+        __threads = [
+            threading.Thread(target=self._worker, args=(i, __queue, task, finish), name=f"SessionRunner-ses{self.first_session + i}", daemon=True)
+            for i in range(__report.Workers)]
+        for thread in __threads:
+            thread.start()
+        try:
+            for i, case in enumerate(cases):
+                __queue.put((i, case))
+        finally:
+            for _ in __threads:
+                __queue.put(None)
+            for thread in __threads:
+                thread.join()
+        __report.Runs = [__runs[i] for i in sorted(__runs)]
+        if keep_runs:
+            __report.Result = merge_results(x.Case.Status for x in __report.Runs)
+        __report.Seconds = time.perf_counter() - __start
+        return __report
+
+
+@dataclass
+class Logon:
+    """
+    One SAP logon (connection) served by its own LogonPool worker process.
+
+    Login is called once in the worker process after the connection is open, e.g. to enter User/Password/Client/Language 
+    when the connection is a second logon to the same system (NewConnection=True).
+    SapGui is a factory called in the worker process for the SAP GUI scripting object, e.g. Core.Simulator.SapGuiAutomation,
+    None gets the SAP GUI of the machine with win32com.
+    Login, SapGui and the task are sent to the worker process so they must be picklable, e.g. module level functions.
+    """
+    ConnectionName: str
+    Sessions: int = 1
+    NewConnection: bool = False
+    User: Optional[str] = None
+    Password: Optional[str] = field(default=None, repr=False)
+    Client: Optional[str] = None
+    Language: Optional[str] = None
+    Login: Optional[Callable[[Session, "Logon"], None]] = None
+    SapGui: Optional[Callable[[], Any]] = None
+    LogConfig: LoggingConfig = field(default_factory=LoggingConfig)
+
+
+def _connect_logon(logon: Logon, sap_gui: Optional[Any]) -> int:
+    __case = Case(Name=f"logon_{logon.ConnectionName}", LogConfig=logon.LogConfig, ExitOnFail=False, CloseSAPOnCleanup=False)
+    __session = Session(case=__case, sap_gui=sap_gui)
+    atexit.unregister(__session.cleanup)
+    __session.logger = Logger(config=logon.LogConfig)
+    __session.open_connection(logon.ConnectionName, new_connection=logon.NewConnection)
+    if __session.session is None:
+        raise ConnectionError(f"Unable to open connection {logon.ConnectionName}")
+    if logon.Login is not None:
+        logon.Login(__session, logon)
+    return __session.connection_number
+
+
+def _run_payload(run: CaseRun) -> tuple:
+    __payload = (run.Result, run.Seconds, run.ReturnValue, run.Error, run.Case.Status)
+    try:
+        pickle.dumps(__payload)
+    except Exception:
+        __payload = (run.Result, run.Seconds, repr(run.ReturnValue), run.Error, ResultCase(Result=run.Case.Status.Result))
+    return __payload
+
+
+def _logon_worker(worker: int, logon: Logon, task: Callable[[Session], Any], conn: Connection, heartbeat_interval: float) -> None:
+    """
+    Entry point of a LogonPool worker process: opens the logon's connection, then runs one thread per session
+    that reports ready, receives a case, runs it with run_case and sends back the outcome.
+    A heartbeat is sent every heartbeat_interval seconds.
+    """
+    __send_lock = threading.Lock()
+    __stop = threading.Event()
+    __inbox: Queue = Queue()
+
+    def send(*message) -> None:
+        try:
+            with __send_lock:
+                conn.send(message)
+        except OSError:
+            pass  # pool closed the pipe, receive() stops the slots
+
+    def heartbeat() -> None:
+        while not __stop.wait(heartbeat_interval):
+            send("heartbeat", worker)
+
+    def receive() -> None:
+        try:
+            while True:
+                __inbox.put(conn.recv())
+        except (EOFError, OSError):
+            for _ in range(logon.Sessions):
+                __inbox.put(None)
+
+    def slot(session_number: int, connection_number: int, sap_gui: Optional[Any], lock: threading.Lock) -> None:
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+        try:
+            while True:
+                send("ready", worker)
+                __item = __inbox.get()
+                if __item is None:
+                    break
+                __index, __case = __item
+                send("started", worker, __index)
+                __run = run_case(
+                    __case,
+                    task,
+                    logon.ConnectionName,
+                    session_number=session_number,
+                    connection_number=connection_number,
+                    sap_gui=sap_gui,
+                    worker=worker,
+                    lock=lock)
+                send("done", worker, __index, _run_payload(__run))
+        finally:
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    if pythoncom is not None:
+        pythoncom.CoInitialize()
+    try:
+        __sap_gui = logon.SapGui() if logon.SapGui is not None else None
+        __connection_number = _connect_logon(logon, __sap_gui)
+    except BaseException as err:
+        send("failed", worker, f"{err}|{traceback.format_exc()}")
+        return
+    threading.Thread(target=receive, daemon=True).start()
+    __lock = threading.Lock()
+    __slots = [
+        threading.Thread(target=slot, args=(i, __connection_number, __sap_gui, __lock), name=f"LogonPool-{worker}-ses{i}")
+        for i in range(logon.Sessions)]
+    for thread in __slots:
+        thread.start()
+    for thread in __slots:
+        thread.join()
+    __stop.set()
+
+
+@dataclass
+class _Worker:
+    Number: int
+    Logon: Logon
+    Process: Any = None
+    Conn: Optional[Connection] = None
+    Ready: int = 0
+    LastSeen: float = 0.0
+    Restarts: int = 0
+    Dead: bool = False
+
+
+class LogonPool:
+    """
+    Runs cases in worker processes spread over several SAP logons, one process per Logon.
+
+    Cases are split into batches of batch_size that are dealt to the workers in proportion to their sessions.
+    A worker that runs out of cases steals from the end of the longest queue of another worker.
+    The pool checks the health of every worker: a worker process that exits, stops sending heartbeats for 
+    heartbeat_timeout seconds or runs a case longer than case_timeout seconds is killed and restarted (at most max_restarts times).
+    Cases that timed out are failed, the other cases the worker was running are queued again up to retries times,
+    so one wedged SAP GUI session does not stall the batch. Heartbeats only tell that the worker process is alive,
+    a session stuck in a COM call is detected by case_timeout.
+
+    Arguments:
+        logons {Iterable[Logon]} -- Logons to run cases on, one worker process each
+
+    Keyword Arguments:
+        batch_size {int} -- Number of consecutive cases dealt to a worker at once (default: {1})
+        case_timeout {Optional[float]} -- Maximum seconds per case, None for no limit (default: {CASE_TIMEOUT})
+        heartbeat_interval {float} -- Seconds between worker heartbeats (default: {1.0})
+        heartbeat_timeout {float} -- Seconds without any message after which a worker is considered hung (default: {60.0})
+        max_restarts {int} -- Number of times a worker is restarted after a crash or kill (default: {2})
+        retries {int} -- Number of times a case is queued again when its worker crashed (default: {1})
+        start_method {str} -- multiprocessing start method (default: {"spawn"})
+    """
+    def __init__(
+        self,
+        logons: Iterable[Logon],
+        batch_size: int = 1,
+        case_timeout: Optional[float] = CASE_TIMEOUT,
+        heartbeat_interval: float = 1.0,
+        heartbeat_timeout: float = 60.0,
+        max_restarts: int = 2,
+        retries: int = 1,
+        start_method: str = "spawn"
+        ) -> None:
+        self.logons: list[Logon] = list(logons)
+        if len(self.logons) == 0:
+            raise ValueError("LogonPool needs at least one Logon")
+        for logon in self.logons:
+            if not 1 <= logon.Sessions <= MAX_SESSIONS:
+                raise ValueError(f"Logon.Sessions must be between 1 and {MAX_SESSIONS}, got {logon.Sessions}")
+        self.batch_size: int = max(batch_size, 1)
+        self.case_timeout: Optional[float] = case_timeout
+        self.heartbeat_interval: float = heartbeat_interval
+        self.heartbeat_timeout: float = heartbeat_timeout
+        self.max_restarts: int = max_restarts
+        self.retries: int = retries
+        self.__context = multiprocessing.get_context(start_method)
+
+    def _start(self, worker: _Worker, task: Callable[[Session], Any]) -> None:
+        __parent_conn, __child_conn = self.__context.Pipe()
+        worker.Process = self.__context.Process(
+            target=_logon_worker,
+            args=(worker.Number, worker.Logon, task, __child_conn, self.heartbeat_interval),
+            name=f"LogonPool-{worker.Number}",
+            daemon=True)
+        worker.Process.start()
+        __child_conn.close()
+        worker.Conn = __parent_conn
+        worker.Ready = 0
+        worker.LastSeen = time.perf_counter()
+
+    @staticmethod
+    def _stop(worker: _Worker) -> None:
+        if worker.Process is not None and worker.Process.is_alive():
+            worker.Process.kill()
+            worker.Process.join(timeout=5.0)
+        if worker.Conn is not None:
+            worker.Conn.close()
+        worker.Process = None
+        worker.Conn = None
+        worker.Ready = 0
+
+    def run(self, cases: Iterable[Case|CasePlan], task: Optional[Callable[[Session], Any]] = None) -> RunReport:
+        """
+        Execute the cases and wait for all of them to finish.
+        With the spawn start method the calling script must guard its entry point with if __name__ == "__main__".
+
+        Arguments:
+            cases {Iterable[Case|CasePlan]} -- Cases or compiled plans to execute
+
+        Keyword Arguments:
+            task {Optional[Callable[[Session], Any]]} -- Picklable callable run with each case's connected Session, default is Session.run_steps (default: {None})
+
+        Returns:
+            RunReport -- Case outcomes in queue order and the merged ResultCase
+        """
+        __start = time.perf_counter()
+        __cases = list(cases)
+        __runs: list[CaseRun|None] = [None] * len(__cases)
+        __attempts = [0] * len(__cases)
+        __inflight: dict[int, tuple[int, float]] = {}
+        __workers = [_Worker(Number=i, Logon=x) for i, x in enumerate(self.logons)]
+        __queues: list[deque] = [deque() for _ in __workers]
+        __slots = [w.Number for w in __workers for _ in range(w.Logon.Sessions)]
+        for i, start in enumerate(range(0, len(__cases), self.batch_size)):
+            __queues[__slots[i % len(__slots)]].extend(range(start, min(start + self.batch_size, len(__cases))))
+        __report = RunReport(Workers=len(__workers))
+        __remaining = len(__cases)
+
+        def finish(index: int, worker: int, result: Any, seconds: float, value: Any, error: str|None, status: ResultCase|None) -> None:
+            nonlocal __remaining
+            __case = _case_of(__cases[index])
+            if status is not None:
+                __case.Status = status
+            if error is not None and __case.Status.Result is None:
+                __case.Status.Result = Result.FAIL
+            __runs[index] = CaseRun(Case=__case, Worker=worker, Result=result if result is not None else __case.Status.Result, Seconds=seconds, ReturnValue=value, Error=error)
+            __remaining -= 1
+
+        def take(worker: _Worker) -> Optional[int]:
+            if __queues[worker.Number]:
+                return __queues[worker.Number].popleft()
+            __victim = max(__queues, key=len)
+            if __victim:
+                __report.Steals += 1
+                return __victim.pop()
+            return None
+
+        def dispatch(worker: _Worker) -> None:
+            while worker.Ready > 0 and worker.Conn is not None:
+                __index = take(worker)
+                if __index is None:
+                    return
+                try:
+                    worker.Conn.send((__index, __cases[__index]))
+                except OSError:
+                    # BrokenPipeError, the worker died since wait() returned
+                    __queues[worker.Number].appendleft(__index)
+                    recover(worker, f"Worker {worker.Number} ({worker.Logon.ConnectionName}) lost")
+                    return
+                worker.Ready -= 1
+                __inflight[__index] = (worker.Number, time.perf_counter())
+
+        def recover(worker: _Worker, reason: str, timed_out: Iterable[int] = ()) -> None:
+            self._stop(worker)
+            __timed_out = set(timed_out)
+            for index, (number, started) in list(__inflight.items()):
+                if number != worker.Number:
+                    continue
+                del __inflight[index]
+                __attempts[index] += 1
+                if index in __timed_out:
+                    finish(index, worker.Number, Result.FAIL, time.perf_counter() - started, None, f"Case exceeded case_timeout of {self.case_timeout}s, {reason}", None)
+                elif __attempts[index] > self.retries:
+                    finish(index, worker.Number, Result.FAIL, time.perf_counter() - started, None, reason, None)
+                else:
+                    __queues[worker.Number].appendleft(index)
+            if worker.Restarts < self.max_restarts and __remaining > 0:
+                worker.Restarts += 1
+                __report.Restarts += 1
+                self._start(worker, task)
+            else:
+                worker.Dead = True
+
+        for worker in __workers:
+            self._start(worker, task)
+        try:
+            while __remaining > 0:
+                __live = [w for w in __workers if w.Conn is not None]
+                if len(__live) == 0:
+                    for index in [i for q in __queues for i in q]:
+                        finish(index, -1, Result.FAIL, 0.0, None, "No LogonPool worker available", None)
+                    break
+                __by_conn = {id(w.Conn): w for w in __live}
+                for conn in wait([w.Conn for w in __live], timeout=min(self.heartbeat_interval, 0.25)):
+                    __worker = __by_conn[id(conn)]
+                    try:
+                        __message = conn.recv()
+                    except (EOFError, OSError):
+                        recover(__worker, f"Worker {__worker.Number} ({__worker.Logon.ConnectionName}) lost")
+                        continue
+                    __worker.LastSeen = time.perf_counter()
+                    match __message[0]:
+                        case "ready":
+                            __worker.Ready += 1
+                        case "started":
+                            __inflight[__message[2]] = (__worker.Number, time.perf_counter())
+                        case "done":
+                            __index = __message[2]
+                            if __inflight.pop(__index, None) is not None:
+                                finish(__index, __worker.Number, *__message[3])
+                        case "failed":
+                            recover(__worker, f"Worker {__worker.Number} ({__worker.Logon.ConnectionName}) failed to connect|{__message[2]}")
+                __now = time.perf_counter()
+                for worker in __workers:
+                    if worker.Conn is None:
+                        continue
+                    if not worker.Process.is_alive():
+                        recover(worker, f"Worker {worker.Number} ({worker.Logon.ConnectionName}) exited with code {worker.Process.exitcode}")
+                    elif __now - worker.LastSeen > self.heartbeat_timeout:
+                        recover(worker, f"Worker {worker.Number} ({worker.Logon.ConnectionName}) not responding for {self.heartbeat_timeout}s")
+                    elif self.case_timeout is not None:
+                        __late = [i for i, (n, t) in __inflight.items() if n == worker.Number and __now - t > self.case_timeout]
+                        if __late:
+                            recover(worker, f"Worker {worker.Number} ({worker.Logon.ConnectionName}) killed", timed_out=__late)
+                for worker in __workers:
+                    dispatch(worker)
+        finally:
+            for worker in __workers:
+                if worker.Conn is not None:
+                    try:
+                        worker.Conn.close()
+                    except OSError:
+                        pass
+                if worker.Process is not None:
+                    worker.Process.join(timeout=5.0)
+                    if worker.Process.is_alive():
+                        worker.Process.kill()
+        __report.Runs = __runs
+        __report.Cases = len(__cases)
+        __report.Result = merge_results(_case_of(x).Status for x in __cases)
+        __report.Seconds = time.perf_counter() - __start
+        return __report
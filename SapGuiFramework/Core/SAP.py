@@ -1,11 +1,14 @@
-import win32com.client
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Optional
+try:
+    from win32com.client import CDispatch
+except ImportError:  # SAP GUI scripting is only available on Windows
+    CDispatch = Any
 
 
 @dataclass
 class BaseElement:
-    Instance: Optional[win32com.client.CDispatch] = None
+    Instance: Optional[CDispatch] = None
     Id: Optional[str] = None
     Name: Optional[str] = None
     Text: Optional[str] = None
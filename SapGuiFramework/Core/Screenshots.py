@@ -0,0 +1,456 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+import hashlib
+import io
+import os
+import struct
+import threading
+import time
+import zlib
+try:
+    from PIL import Image  # type: ignore
+except ImportError:  # Pillow is optional, without it PNG screenshots are only recompressed
+    Image = None
+from Core.Imaging import PNG_SIGNATURE, block_hashes, changed_box, decode_image, encode_png
+
+
+FORMAT_EXTENSIONS: dict[str, str] = {"PNG": "png", "WEBP": "webp", "JPEG": "jpg", "ORIGINAL": "png"}
+
+
+@dataclass
+class ScreenshotPolicy:
+    """
+    Settings of the ScreenshotPipeline.
+
+    Format is the stored image format: PNG (recompressed with PngLevel), WEBP or JPEG (with Quality) or
+    ORIGINAL to store the capture unchanged. MaxWidth downscales wider captures keeping the aspect ratio.
+    WEBP, JPEG & MaxWidth require Pillow, without it captures are stored as PNG.
+    Workers threads process the captures, at most QueueSize captures wait for a worker, when the queue is
+    full the capturing step waits (Block True) or the capture is dropped (Block False), also with Dedup.
+    StorePath is the directory of the content-addressed store, None uses <LogPath>/screenshots.
+
+    Dedup compares each capture with the previous one using block hashes (BlockSize pixel blocks): an unchanged
+    capture is stored as a reference to the previous image, a capture whose changed blocks since the last full
+    image (keyframe) cover at most DeltaMaxArea of the window is stored as a cropped delta of that region.
+    After MaxDeltas deltas the next change is stored as a new keyframe. Dedup processes captures in order on
+    one worker thread, deltas are not made when MaxWidth is set. Dedup requires Pillow to decode the captures,
+    without it only identical files are stored once (content addressed store).
+    """
+    Format: str = "PNG"
+    PngLevel: int = 9
+    Quality: int = 80
+    MaxWidth: Optional[int] = None
+    Workers: int = 2
+    QueueSize: int = 32
+    Block: bool = True
+    StorePath: Optional[Path] = None
+    Dedup: bool = False
+    BlockSize: int = 16
+    DeltaMaxArea: float = 0.5
+    MaxDeltas: int = 50
+
+    @staticmethod
+    def from_dict(data: dict) -> "ScreenshotPolicy":
+        """
+        Create a ScreenshotPolicy from a dict using the json data file keys:
+        format, png_level, quality, max_width, workers, queue_size, block, store_path,
+        dedup, block_size, delta_max_area & max_deltas
+        """
+        __policy = ScreenshotPolicy()
+        if "format" in data:
+            __policy.Format = str(data.get("format")).upper()
+            if __policy.Format not in FORMAT_EXTENSIONS:
+                raise ValueError(f"Invalid screenshot format: {data.get('format')}, use one of: {', '.join(FORMAT_EXTENSIONS)}")
+        if "png_level" in data:
+            __policy.PngLevel = int(data.get("png_level"))
+        if "quality" in data:
+            __policy.Quality = int(data.get("quality"))
+        if "max_width" in data:
+            __policy.MaxWidth = int(data.get("max_width")) if data.get("max_width") is not None else None
+        if "workers" in data:
+            __policy.Workers = int(data.get("workers"))
+        if "queue_size" in data:
+            __policy.QueueSize = int(data.get("queue_size"))
+        if "block" in data:
+            __policy.Block = bool(data.get("block"))
+        if "store_path" in data:
+            __policy.StorePath = Path(data.get("store_path"))
+        if "dedup" in data:
+            __policy.Dedup = bool(data.get("dedup"))
+        if "block_size" in data:
+            __policy.BlockSize = int(data.get("block_size"))
+        if "delta_max_area" in data:
+            __policy.DeltaMaxArea = float(data.get("delta_max_area"))
+        if "max_deltas" in data:
+            __policy.MaxDeltas = int(data.get("max_deltas"))
+        return __policy
+
+
+@dataclass
+class ScreenshotRef:
+    """
+    Reference to a screenshot in a ScreenshotStore, kept in ResultCase instead of the image bytes.
+    Digest & Path are set once the pipeline stored the image, use wait() to block until then.
+
+    Kind is "full" for a complete image and "delta" for the region Box (left, top, width, height) of the
+    window cropped from the capture, the rest of the window is the keyframe BaseDigest/BasePath.
+    Unchanged captures share the fields of the reference they repeat and have Unchanged set.
+    """
+    Name: str
+    Digest: Optional[str] = None
+    Path: "Optional[Path]" = None
+    Bytes: int = 0
+    Error: Optional[str] = None
+    Kind: str = "full"
+    Unchanged: bool = False
+    BaseDigest: Optional[str] = None
+    BasePath: Optional[Path] = None
+    Box: Optional[tuple[int, int, int, int]] = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> "ScreenshotRef":
+        self._done.wait(timeout)
+        return self
+
+    def read(self) -> bytes:
+        """
+        Returns the stored image bytes, waits for the pipeline if needed.
+        """
+        self.wait()
+        if self.Path is None:
+            raise FileNotFoundError(f"Screenshot {self.Name} was not stored: {self.Error}")
+        return self.Path.read_bytes()
+
+    def image(self) -> bytes:
+        """
+        Returns the full window image, a delta is pasted onto its keyframe and returned as PNG.
+        """
+        if self.Kind != "delta":
+            return self.read()
+        __base = decode_image(self.BasePath.read_bytes())
+        __delta = decode_image(self.read())
+        if __delta.Channels != __base.Channels:
+            raise ValueError(f"Delta {self.Name} does not match its keyframe {self.BaseDigest}")
+        return encode_png(__base.paste(__delta, self.Box[0], self.Box[1]))
+
+    def __getstate__(self) -> dict:
+        __state = dict(self.__dict__)
+        __state["_done"] = self.done
+        return __state
+
+    def __setstate__(self, state: dict) -> None:
+        __done = threading.Event()
+        if state.pop("_done"):
+            __done.set()
+        self.__dict__.update(state, _done=__done)
+
+    def __repr__(self) -> str:
+        return f"class ScreenshotRef<Name: {self.Name}, Kind: {self.Kind}, Unchanged: {self.Unchanged}, Digest: {self.Digest}, Bytes: {self.Bytes}, Box: {self.Box}, Error: {self.Error}>"
+
+
+@dataclass
+class ScreenshotStats:
+    Submitted: int = 0
+    Stored: int = 0
+    Duplicates: int = 0
+    Dropped: int = 0
+    Failed: int = 0
+    Unchanged: int = 0
+    Deltas: int = 0
+    Keyframes: int = 0
+    BytesIn: int = 0
+    BytesOut: int = 0
+    ProcessSeconds: float = 0.0
+    BlockedSeconds: float = 0.0
+
+    @property
+    def SavedBytes(self) -> int:
+        """
+        Captured bytes that were not written to the store (recompression, duplicates, unchanged frames & deltas).
+        """
+        return self.BytesIn - self.BytesOut
+
+    def __repr__(self) -> str:
+        return f"class ScreenshotStats<Submitted: {self.Submitted}, Stored: {self.Stored}, Duplicates: {self.Duplicates}, Unchanged: {self.Unchanged}, Deltas: {self.Deltas}, Keyframes: {self.Keyframes}, Dropped: {self.Dropped}, Failed: {self.Failed}, BytesIn: {self.BytesIn}, BytesOut: {self.BytesOut}, SavedBytes: {self.SavedBytes}, ProcessSeconds: {self.ProcessSeconds:.3f}, BlockedSeconds: {self.BlockedSeconds:.3f}>"
+
+
+class ScreenshotStore:
+    """
+    Content-addressed image store, each image is saved once as <directory>/<digest[:2]>/<digest>.<ext>
+    where digest is the SHA-256 of the image bytes.
+
+    Arguments:
+        directory {str|Path} -- Root directory of the store, created if missing
+    """
+    def __init__(self, directory: str|Path) -> None:
+        self.directory: Path = Path(directory)
+        self.__digests: set[str] = set()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def path(self, digest: str, extension: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.{extension}"
+
+    def put(self, data: bytes, extension: str) -> tuple[str, Path, bool]:
+        """
+        Store image bytes.
+
+        Returns:
+            tuple[str, Path, bool] -- Digest, path & True if the image was new to the store
+        """
+        __digest = hashlib.sha256(data).hexdigest()
+        __path = self.path(__digest, extension)
+        # Reserve the digest so concurrent workers storing the same image write it once
+        with self.__lock:
+            if __digest in self.__digests or __path.exists():
+                self.__digests.add(__digest)
+                return __digest, __path, False
+            self.__digests.add(__digest)
+        __path.parent.mkdir(parents=True, exist_ok=True)
+        __tmp = __path.with_suffix(f".{threading.get_ident()}.tmp")
+        __tmp.write_bytes(data)
+        os.replace(__tmp, __path)
+        return __digest, __path, True
+
+
+def recompress_png(data: bytes, level: int = 9) -> bytes:
+    """
+    Recompress the image data of a PNG with the given zlib level without decoding the pixels.
+    Returns data unchanged if it is not a PNG or recompression does not make it smaller.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+    __chunks: list[tuple[bytes, bytes]] = []
+    __idat = []
+    __position = len(PNG_SIGNATURE)
+    while __position + 8 <= len(data):
+        __length, __tag = struct.unpack(">I4s", data[__position:__position + 8])
+        __body = data[__position + 8:__position + 8 + __length]
+        __position += 12 + __length
+        if __tag == b"IDAT":
+            if not __idat:
+                __chunks.append((b"IDAT", b""))
+            __idat.append(__body)
+        else:
+            __chunks.append((__tag, __body))
+        if __tag == b"IEND":
+            break
+    try:
+        __image_data = zlib.compress(zlib.decompress(b"".join(__idat)), level)
+    except zlib.error:
+        return data
+    __out = [PNG_SIGNATURE]
+    for tag, body in __chunks:
+        if tag == b"IDAT":
+            body = __image_data
+        __out.append(struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body)))
+    __result = b"".join(__out)
+    return __result if len(__result) < len(data) else data
+
+
+def convert_image(data: bytes, policy: ScreenshotPolicy) -> tuple[bytes, str]:
+    """
+    Convert a captured image according to the policy.
+
+    Returns:
+        tuple[bytes, str] -- Converted image bytes & file extension
+    """
+    __format = policy.Format.upper()
+    if __format == "ORIGINAL":
+        return data, FORMAT_EXTENSIONS["ORIGINAL"]
+    if Image is not None and (__format != "PNG" or policy.MaxWidth is not None):
+        with Image.open(io.BytesIO(data)) as img:
+            if policy.MaxWidth is not None and img.width > policy.MaxWidth:
+                img = img.resize((policy.MaxWidth, max(1, round(img.height * policy.MaxWidth / img.width))))
+            if __format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            __buffer = io.BytesIO()
+            if __format == "PNG":
+                img.save(__buffer, format="PNG", optimize=False, compress_level=policy.PngLevel)
+            else:
+                img.save(__buffer, format=__format, quality=policy.Quality)
+            return __buffer.getvalue(), FORMAT_EXTENSIONS[__format]
+    return recompress_png(data, policy.PngLevel), FORMAT_EXTENSIONS["PNG"]
+
+
+class ScreenshotPipeline:
+    """
+    Processes screenshots off the step thread: captures are handed over as bytes or as the path of the
+    file SAP GUI wrote, a bounded thread pool converts them (see convert_image) and writes them to a
+    ScreenshotStore. submit returns a ScreenshotRef right away. With ScreenshotPolicy.Dedup and Pillow captures 
+    are deduplicated against the previous ones, see _FrameHistory, dedup is False if Pillow is missing.
+
+    Arguments:
+        store {ScreenshotStore} -- Store the images are written to
+
+    Keyword Arguments:
+        policy {Optional[ScreenshotPolicy]} -- Conversion & pool settings, default ScreenshotPolicy() (default: {None})
+    """
+    def __init__(self, store: ScreenshotStore, policy: Optional[ScreenshotPolicy] = None) -> None:
+        self.store: ScreenshotStore = store
+        self.policy: ScreenshotPolicy = policy if policy is not None else ScreenshotPolicy()
+        self.stats: ScreenshotStats = ScreenshotStats()
+        # Decoding captures in pure python takes seconds, dedup needs Pillow
+        self.dedup: bool = self.policy.Dedup and Image is not None
+        self.block: bool = self.policy.Block
+        # Dedup compares each capture with the previous one, so captures are processed in order on one thread
+        __workers = 1 if self.dedup else max(1, self.policy.Workers)
+        self.__history: _FrameHistory|None = _FrameHistory() if self.dedup else None
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=__workers, thread_name_prefix="Screenshots")
+        self.__slots: threading.BoundedSemaphore = threading.BoundedSemaphore(__workers + max(0, self.policy.QueueSize))
+        self.__lock: threading.Lock = threading.Lock()
+        self.__closed: bool = False
+
+    def submit(self, name: str, data: Optional[bytes] = None, path: Optional[str|Path] = None, delete: bool = True) -> ScreenshotRef:
+        """
+        Queue a capture for processing.
+
+        Arguments:
+            name {str} -- Name of the screenshot
+
+        Keyword Arguments:
+            data {Optional[bytes]} -- Captured image bytes (default: {None})
+            path {Optional[str|Path]} -- Path of a captured image file, read by the worker (default: {None})
+            delete {bool} -- Delete the file at path after reading it (default: {True})
+
+        Returns:
+            ScreenshotRef -- Reference completed once the image is stored
+        """
+        __ref = ScreenshotRef(Name=name)
+        with self.__lock:
+            self.stats.Submitted += 1
+        if self.__closed:
+            return self._drop(__ref, "Screenshot pipeline is closed")
+        if not self.__slots.acquire(blocking=False):
+            if not self.block:
+                return self._drop(__ref, "Screenshot queue is full")
+            __start = time.perf_counter()
+            self.__slots.acquire()
+            with self.__lock:
+                self.stats.BlockedSeconds += time.perf_counter() - __start
+        try:
+            self.__executor.submit(self._process, __ref, data, path, delete)
+        except RuntimeError as err:
+            self.__slots.release()
+            return self._drop(__ref, str(err))
+        return __ref
+
+    def _drop(self, ref: ScreenshotRef, error: str) -> ScreenshotRef:
+        with self.__lock:
+            self.stats.Dropped += 1
+        ref.Error = error
+        ref._done.set()
+        return ref
+
+    def _process(self, ref: ScreenshotRef, data: Optional[bytes], path: Optional[str|Path], delete: bool) -> None:
+        __start = time.perf_counter()
+        try:
+            if data is None:
+                data = Path(path).read_bytes()
+                if delete:
+                    Path(path).unlink(missing_ok=True)
+            with self.__lock:
+                self.stats.BytesIn += len(data)
+            if self.__history is not None:
+                __converted, __extension = self._dedup(ref, data)
+                if __converted is None:
+                    return
+            else:
+                __converted, __extension = convert_image(data, self.policy)
+            ref.Digest, ref.Path, __new = self.store.put(__converted, __extension)
+            ref.Bytes = len(__converted)
+            if self.__history is not None:
+                self.__history.stored(ref)
+            with self.__lock:
+                if __new:
+                    self.stats.Stored += 1
+                    self.stats.BytesOut += len(__converted)
+                else:
+                    self.stats.Duplicates += 1
+        except Exception as err:
+            ref.Error = f"{type(err).__name__}: {err}"
+            if self.__history is not None:
+                # the next capture must not refer to an image that was not stored
+                self.__history.reset()
+            with self.__lock:
+                self.stats.Failed += 1
+        finally:
+            with self.__lock:
+                self.stats.ProcessSeconds += time.perf_counter() - __start
+            self.__slots.release()
+            ref._done.set()
+
+    def _dedup(self, ref: ScreenshotRef, data: bytes) -> tuple[bytes|None, str]:
+        """
+        Compare a capture with the previous ones, returns the image to store (the full capture or the
+        cropped delta) and its extension or None if the capture is unchanged and ref was completed.
+        """
+        __policy = self.policy
+        __history = self.__history
+        __frame = decode_image(data)
+        __hashes = block_hashes(__frame, __policy.BlockSize)
+        __size = (__frame.Width, __frame.Height, __frame.Channels)
+        __repeat: ScreenshotRef|None = None
+        if __history.last is not None and __history.last_size == __size and __history.last_hashes == __hashes:
+            __repeat = __history.last
+        __box = None
+        if __repeat is None and __history.key is not None and __history.key_size == __size:
+            __box = changed_box(__frame, __hashes, __history.key_hashes, __policy.BlockSize)
+            if __box is None:
+                __repeat = __history.key
+        __history.last_size, __history.last_hashes = __size, __hashes
+        if __repeat is not None:
+            for name in ("Digest", "Path", "Bytes", "Kind", "BaseDigest", "BasePath", "Box"):
+                setattr(ref, name, getattr(__repeat, name))
+            ref.Unchanged = True
+            __history.last = __repeat
+            with self.__lock:
+                self.stats.Unchanged += 1
+            return None, ""
+        if (__box is not None and __policy.MaxWidth is None and __history.deltas < __policy.MaxDeltas
+                and __box[2] * __box[3] <= __policy.DeltaMaxArea * __frame.Width * __frame.Height):
+            ref.Kind = "delta"
+            ref.Box = __box
+            ref.BaseDigest = __history.key.Digest
+            ref.BasePath = __history.key.Path
+            __history.deltas += 1
+            with self.__lock:
+                self.stats.Deltas += 1
+            return convert_image(encode_png(__frame.crop(__box), 1), self.policy)
+        __history.key, __history.key_size, __history.key_hashes = ref, __size, __hashes
+        __history.deltas = 0
+        with self.__lock:
+            self.stats.Keyframes += 1
+        return convert_image(data, self.policy)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop accepting captures, with wait True block until all queued captures are stored.
+        """
+        self.__closed = True
+        self.__executor.shutdown(wait=wait)
+
+
+class _FrameHistory:
+    """
+    Block hashes of the last capture and of the last keyframe of a deduplicating ScreenshotPipeline.
+    """
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.last: ScreenshotRef|None = None
+        self.last_size: tuple[int, int, int]|None = None
+        self.last_hashes: tuple[int, ...]|None = None
+        self.key: ScreenshotRef|None = None
+        self.key_size: tuple[int, int, int]|None = None
+        self.key_hashes: tuple[int, ...]|None = None
+        self.deltas: int = 0
+
+    def stored(self, ref: ScreenshotRef) -> None:
+        self.last = ref
@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+import re
+import threading
+from Core.Utilities import SelectionRange
+try:
+    import win32api  # type: ignore
+    import win32clipboard  # type: ignore
+    import win32event  # type: ignore
+except ImportError:  # pywin32 is only available on Windows, the clipboard is kept in the process
+    win32api = win32clipboard = win32event = None
+
+
+# Tabs of the "Multiple Selection" dialog, (sign, option) of a SelectionRange -> tab name
+SELECTION_TABS: dict[tuple[str, str], str] = {
+    ("I", "EQ"): "SIVA",
+    ("I", "CP"): "SIVA",
+    ("I", "BT"): "INTL",
+    ("E", "EQ"): "NOSV",
+    ("E", "CP"): "NOSV",
+    ("E", "BT"): "NOINT",
+}
+# Ids of the "Multiple Selection" dialog, relative to the session
+MULTIPLE_SELECTION_TAB: str = "wnd[1]/usr/tabsTAB_STRIP/tabp{tab}"
+UPLOAD_CLIPBOARD: str = "wnd[1]/tbar[0]/btn[24]"
+COPY_SELECTION: str = "wnd[1]/tbar[0]/btn[8]"
+# Multiple selection button of a select option on a selection screen, e.g. btn%_I1_%_APP_%-VALU_PUSH, or of a
+# row of the SE16N field table, btnPUSH[4,0]
+MULTIPLE_SELECTION_BUTTON: re.Pattern = re.compile(r"btn%_(\w+)_%_APP_%-VALU_PUSH$|btn(PUSH\[4,\d+\])$")
+# Rows of the "Maintain Selection Options" popup (F2 on a select option) -> option
+SELECTION_OPTION_ROWS: dict[str, int] = {"EQ": 0, "GE": 1, "LE": 2, "GT": 3, "LT": 4, "NE": 5}
+SELECTION_OPTIONS: str = "wnd[1]/usr/cntlOPTION_CONTAINER/shellcont/shell"
+
+# The clipboard is shared by all processes of the desktop, uploads hold clipboard_lock from writing the clipboard to
+# pressing upload: CLIPBOARD_LOCK between the threads of the process & the named mutex CLIPBOARD_MUTEX between processes
+CLIPBOARD_LOCK: threading.Lock = threading.Lock()
+CLIPBOARD_MUTEX: str = "Global\\SapGuiFramework.Clipboard"
+CLIPBOARD_TIMEOUT: float = 60.0
+_clipboard: list[str] = [""]
+
+
+@contextmanager
+def clipboard_lock(timeout: float = CLIPBOARD_TIMEOUT) -> Iterator[None]:
+    """
+    Hold the clipboard for the current thread against the other threads & processes using the framework
+    (e.g. Core.Runner.LogonPool workers) and restore the text that was on the clipboard when released.
+
+    Keyword Arguments:
+        timeout {float} -- Seconds to wait for another process to release the clipboard (default: {CLIPBOARD_TIMEOUT})
+
+    Raises:
+        TimeoutError -- If another process holds the clipboard longer than timeout
+    """
+    with CLIPBOARD_LOCK:
+        __mutex = None
+        if win32event is not None:
+            __mutex = win32event.CreateMutex(None, False, CLIPBOARD_MUTEX)
+            # WAIT_ABANDONED: the owner exited without releasing the mutex, it is owned by this thread now
+            if win32event.WaitForSingleObject(__mutex, int(timeout * 1000)) == win32event.WAIT_TIMEOUT:
+                win32api.CloseHandle(__mutex)
+                raise TimeoutError(f"Clipboard held by another process for more than {timeout}s")
+        try:
+            __previous = _previous_clipboard()
+            try:
+                yield
+            finally:
+                if __previous is not None:
+                    write_clipboard(__previous)
+        finally:
+            if __mutex is not None:
+                win32event.ReleaseMutex(__mutex)
+                win32api.CloseHandle(__mutex)
+
+
+def _previous_clipboard() -> Optional[str]:
+    try:
+        return read_clipboard()
+    except Exception:  # empty clipboard or no text on it, e.g. an image, nothing is restored
+        return None
+
+
+def write_clipboard(text: str) -> None:
+    """
+    Replace the text of the Windows clipboard, without pywin32 the text is kept for read_clipboard (Core.Simulator).
+    """
+    if win32clipboard is None:
+        _clipboard[0] = text
+        return
+    win32clipboard.OpenClipboard()
+    try:
+        win32clipboard.EmptyClipboard()
+        win32clipboard.SetClipboardText(text, win32clipboard.CF_UNICODETEXT)
+    finally:
+        win32clipboard.CloseClipboard()
+
+
+def read_clipboard() -> str:
+    """
+    Returns the text of the Windows clipboard, see write_clipboard.
+    """
+    if win32clipboard is None:
+        return _clipboard[0]
+    win32clipboard.OpenClipboard()
+    try:
+        return win32clipboard.GetClipboardData(win32clipboard.CF_UNICODETEXT)
+    finally:
+        win32clipboard.CloseClipboard()
+
+
+def selection_uploads(ranges: Iterable[SelectionRange]) -> dict[str, str]:
+    """
+    Group selection ranges by tab of the "Multiple Selection" dialog as clipboard text, one value per line and
+    low & high tab separated for intervals. Patterns (CP) are single values, SAP recognizes the * and + wildcards.
+
+    Arguments:
+        ranges {Iterable[SelectionRange]} -- Ranges of one select option
+
+    Raises:
+        ValueError -- If a range has an option that can not be uploaded (NE, GT, GE, LT, LE)
+
+    Returns:
+        dict[str, str] -- Tab name -> clipboard text, tabs without values are left out
+    """
+    __lines: dict[str, list[str]] = {}
+    for selection in ranges:
+        __tab = SELECTION_TABS.get((selection.Sign, selection.Option))
+        if __tab is None:
+            raise ValueError(f"Unable to upload a {selection.Sign} {selection.Option} range, only EQ, CP & BT ranges are uploaded")
+        __lines.setdefault(__tab, []).append(f"{selection.Low}\t{selection.High}" if selection.Option == "BT" else selection.Low)
+    return {tab: "\r\n".join(lines) + "\r\n" for tab, lines in __lines.items()}
@@ -0,0 +1,926 @@
+"""
+In-process stand-in for the SAP GUI scripting object model.
+
+The simulator mimics the parts of the scripting API used by Core.Framework.Session so the
+framework can be profiled and load-tested without Windows or a live SAP GUI.
+
+PascalCase members (FindById, Text, Press, ...) are the scripting API surface, they are
+resolved case-insensitively like win32com dynamic dispatch and every access is counted
+as one COM round trip in ComStats. snake_case methods are simulator controls used to seed
+screens and tables and are never counted.
+
+Usage:
+    gui = SapGuiAutomation(latency=0.0005)
+    sap = Session(case=my_case, sap_gui=gui)
+    sap.open_connection("DEV")
+    print(gui.stats.Calls)
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+import re
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from Core.Export import EXPORT_ENCODING, EXPORT_FILENAME, EXPORT_FORMAT_RADIO, EXPORT_FORMATS, EXPORT_PATH, write_export
+from Core.Selection import COPY_SELECTION, MULTIPLE_SELECTION_BUTTON, MULTIPLE_SELECTION_TAB, SELECTION_TABS, UPLOAD_CLIPBOARD, read_clipboard
+from Core.Utilities import element_type_for, id_index
+
+
+class ComError(Exception):
+    """
+    Raised where the real scripting engine would raise a pywintypes.com_error.
+    """
+
+
+@dataclass
+class ComStats:
+    """
+    Counters of simulated COM round trips.
+    Calls is the total of Gets, Sets and Methods. ByMember is keyed by (element type, member name).
+    """
+    Calls: int = 0
+    Gets: int = 0
+    Sets: int = 0
+    Methods: int = 0
+    ServerRoundTrips: int = 0
+    ByMember: Counter = field(default_factory=Counter)
+
+    def reset(self) -> None:
+        self.Calls = 0
+        self.Gets = 0
+        self.Sets = 0
+        self.Methods = 0
+        self.ServerRoundTrips = 0
+        self.ByMember.clear()
+
+
+class Backend:
+    """
+    Shared state of one simulated SAP GUI process: latency settings, counters and the
+    auto create flag used when an unknown element id is requested.
+    busy_time keeps GuiSession.Busy True for that many seconds after each server round trip.
+    hard_copy_to_memory False makes HardCopyToMemory fail like SAP GUI versions before 7.60.
+    """
+    def __init__(self, latency: float = 0.0, server_latency: float = 0.0, auto_create: bool = True, busy_time: float = 0.0, hard_copy_to_memory: bool = True) -> None:
+        self.latency: float = latency
+        self.hard_copy_to_memory: bool = hard_copy_to_memory
+        self.server_latency: float = server_latency
+        self.busy_time: float = busy_time
+        self.auto_create: bool = auto_create
+        self.stats: ComStats = ComStats()
+        self.lock: threading.Lock = threading.Lock()
+
+    def record(self, element_type: str, member: str, kind: str) -> None:
+        with self.lock:
+            self.stats.Calls += 1
+            match kind:
+                case "get":
+                    self.stats.Gets += 1
+                case "set":
+                    self.stats.Sets += 1
+                case _:
+                    self.stats.Methods += 1
+            self.stats.ByMember[(element_type, member)] += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def server_round_trip(self) -> float:
+        with self.lock:
+            self.stats.ServerRoundTrips += 1
+        if self.server_latency > 0:
+            time.sleep(self.server_latency)
+        return self.server_latency
+
+
+def _com_members(cls: type) -> dict[str, str]:
+    """
+    Build (and cache on the class) the case-insensitive index of PascalCase scripting members.
+    """
+    members = cls.__dict__.get("_members_index")
+    if members is None:
+        members = {}
+        for name in dir(cls):
+            if name[:1].isupper():
+                members[name.lower()] = name
+        setattr(cls, "_members_index", members)
+    return members
+
+
+class ComObject:
+    """
+    Base class of every simulated scripting object.
+    Plain property values live in _props keyed by lower case name.
+    """
+    _type: str = "GuiComponent"
+
+    def __init__(self, backend: Backend, **props) -> None:
+        object.__setattr__(self, "_backend", backend)
+        object.__setattr__(self, "_props", {k.lower(): v for k, v in props.items()})
+
+    def __getattribute__(self, name: str) -> Any:
+        if name.startswith("_"):
+            return object.__getattribute__(self, name)
+        key = name.lower()
+        cls = type(self)
+        members = _com_members(cls)
+        backend: Backend = object.__getattribute__(self, "_backend")
+        if key in members:
+            __member = members[key]
+            __attr = getattr(cls, __member)
+            backend.record(object.__getattribute__(self, "_com_type")(), __member, "get" if isinstance(__attr, property) else "call")
+            return object.__getattribute__(self, __member)
+        props: dict = object.__getattribute__(self, "_props")
+        if key in props:
+            backend.record(object.__getattribute__(self, "_com_type")(), name, "get")
+            return props[key]
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+            return
+        key = name.lower()
+        cls = type(self)
+        members = _com_members(cls)
+        self._backend.record(self._com_type(), name, "set")
+        if key in members and isinstance(getattr(cls, members[key]), property):
+            __prop: property = getattr(cls, members[key])
+            if __prop.fset is None:
+                raise ComError(f"Property {members[key]} of {self._com_type()} is read only")
+            __prop.fset(self, value)
+        else:
+            self._props[key] = value
+
+    def _com_type(self) -> str:
+        return self._props.get("type", self._type)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self._props.get('id', '')}>"
+
+
+class GuiCollection(ComObject):
+    """
+    Simulated GuiComponentCollection, supports len(), iteration, indexing and coll(index) calls.
+    """
+    _type = "GuiComponentCollection"
+
+    def __init__(self, backend: Backend, items: Optional[Iterable] = None) -> None:
+        super().__init__(backend)
+        self._items: list = list(items) if items is not None else []
+
+    @property
+    def Count(self) -> int:
+        return len(self._items)
+
+    @property
+    def Length(self) -> int:
+        return len(self._items)
+
+    def ElementAt(self, index: int) -> Any:
+        return self._items[index]
+
+    def Item(self, index: int) -> Any:
+        return self._items[index]
+
+    def __call__(self, index: int) -> Any:
+        return self.Item(index)
+
+    def __len__(self) -> int:
+        self._backend.record(self._type, "Count", "get")
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> Any:
+        self._backend.record(self._type, "Item", "call")
+        return self._items[index]
+
+    def __iter__(self):
+        self._backend.record(self._type, "_NewEnum", "call")
+        return iter(list(self._items))
+
+
+SEGMENT_PATTERN = re.compile(r"^([a-z]+)(.*)$")
+
+
+class GuiComponent(ComObject):
+    """
+    Generic simulated visual component (text fields, buttons, checkboxes, labels, containers, ...).
+    """
+    def __init__(self, backend: Backend, session: "GuiSession", id: str, type: str, name: str = "", **props) -> None:
+        defaults = {
+            "Id": id,
+            "Type": type,
+            "Name": name,
+            "Text": "",
+            "Changeable": True,
+            "Selected": False,
+            "Key": "",
+            "ScreenLeft": 0,
+            "ScreenTop": 0,
+            "Left": 0,
+            "Top": 0,
+            "Width": 100,
+            "Height": 20,
+            "Tooltip": "",
+            "ContainerType": type in ("GuiUserArea", "GuiSimpleContainer", "GuiModalWindow", "GuiMainWindow"),
+        }
+        defaults.update(props)
+        super().__init__(backend, **defaults)
+        self._session: GuiSession = session
+
+    def _trip(self) -> None:
+        self._session._round_trip()
+
+    def SetFocus(self) -> None:
+        self._session._focus = self
+
+    def Press(self) -> None:
+        self._session._pressed(self._props["id"])
+        self._trip()
+
+    def Select(self) -> None:
+        if self._com_type() in ("GuiRadioButton", "GuiTab"):
+            # only one radio button of a container, one tab of a tab strip is selected
+            for sibling in self._session._children_of(self._props["id"].rsplit("/", 1)[0]):
+                if sibling._com_type() == self._com_type():
+                    sibling._props["selected"] = False
+        if self._com_type() in ("GuiRadioButton", "GuiTab", "GuiCheckBox"):
+            self._props["selected"] = True
+        self._trip()
+
+    def Visualize(self, on: bool) -> bool:
+        return True
+
+    def FindById(self, id: str, raise_error: bool = True) -> Any:
+        return self._session._find(id, base=self._props["id"], raise_error=raise_error)
+
+    @property
+    def Children(self) -> GuiCollection:
+        return GuiCollection(self._backend, self._session._children_of(self._props["id"]))
+
+    @property
+    def Parent(self) -> Any:
+        return self._session._parent_of(self._props["id"])
+
+
+class GuiScrollbar(ComObject):
+    """
+    Simulated GuiScrollbar, setting Position scrolls the owning table control.
+    """
+    _type = "GuiScrollbar"
+
+    def __init__(self, backend: Backend, owner: "GuiTableControl") -> None:
+        super().__init__(backend, Minimum=0)
+        self._owner: GuiTableControl = owner
+
+    @property
+    def Position(self) -> int:
+        return self._owner._first_row
+
+    @Position.setter
+    def Position(self, value: int) -> None:
+        self._owner._scroll_to(int(value))
+
+    @property
+    def Maximum(self) -> int:
+        return max(len(self._owner._rows) - 1, 0)
+
+    @property
+    def PageSize(self) -> int:
+        return self._owner._visible_rows
+
+
+class GuiTableColumn(ComObject):
+    _type = "GuiTableColumn"
+
+
+class GuiTableRow(GuiCollection):
+    """
+    Simulated GuiTableRow, a collection of the cells of one visible table control row.
+    """
+    _type = "GuiTableRow"
+
+    @property
+    def Selected(self) -> bool:
+        return False
+
+
+class GuiTableControl(GuiComponent):
+    """
+    Simulated classic dynpro table control (GuiTableControl).
+    Only VisibleRowCount rows are loaded at a time, like the real control.
+    """
+    def __init__(self, backend: Backend, session: "GuiSession", id: str, name: str = "", columns: Optional[list[str]] = None, rows: Optional[list[list[str]]] = None, visible_rows: int = 20, **props) -> None:
+        super().__init__(backend, session, id, "GuiTableControl", name, **props)
+        self._columns: list[str] = list(columns) if columns is not None else []
+        self._rows: list[list[str]] = [list(r) for r in rows] if rows is not None else []
+        self._visible_rows: int = visible_rows
+        self._first_row: int = 0
+        self._scrollbar: GuiScrollbar = GuiScrollbar(backend, self)
+
+    def _scroll_to(self, row: int) -> None:
+        self._first_row = max(0, min(row, max(len(self._rows) - 1, 0)))
+        self._trip()
+
+    def _cell(self, column: int, visible_row: int) -> GuiComponent:
+        __row = self._first_row + visible_row
+        __value = self._rows[__row][column] if __row < len(self._rows) else ""
+        __name = self._columns[column]
+        return GuiComponent(
+            self._backend,
+            self._session,
+            f"{self._props['id']}/txt{__name}[{column},{visible_row}]",
+            "GuiTextField",
+            __name,
+            Text=__value)
+
+    @property
+    def RowCount(self) -> int:
+        return len(self._rows)
+
+    @property
+    def VisibleRowCount(self) -> int:
+        return self._visible_rows
+
+    @property
+    def VerticalScrollbar(self) -> GuiScrollbar:
+        return self._scrollbar
+
+    @property
+    def Columns(self) -> GuiCollection:
+        return GuiCollection(self._backend, [GuiTableColumn(self._backend, Name=c, Title=c, Type="GuiTableColumn") for c in self._columns])
+
+    @property
+    def Rows(self) -> GuiCollection:
+        __count = min(self._visible_rows, max(len(self._rows) - self._first_row, 0))
+        return GuiCollection(self._backend, [
+            GuiTableRow(self._backend, [self._cell(c, r) for c in range(len(self._columns))]) for r in range(__count)
+        ])
+
+    def GetCell(self, row: int, column: int) -> GuiComponent:
+        return self._cell(column, row)
+
+
+class GuiGridView(GuiComponent):
+    """
+    Simulated ALV grid (GuiShell with SubType GridView).
+    Cells outside the loaded block cost one extra server round trip per block,
+    scrolling with FirstVisibleRow loads a block in a single round trip.
+    """
+    def __init__(self, backend: Backend, session: "GuiSession", id: str, name: str = "", columns: Optional[list[str]] = None, rows: Optional[list[list[str]]] = None, visible_rows: int = 30, **props) -> None:
+        super().__init__(backend, session, id, "GuiShell", name, SubType="GridView", **props)
+        self._columns: list[str] = list(columns) if columns is not None else []
+        self._index: dict[str, int] = {c: i for i, c in enumerate(self._columns)}
+        self._rows: list[list[str]] = [list(r) for r in rows] if rows is not None else []
+        self._visible_rows: int = visible_rows
+        self._first_row: int = 0
+        self._loaded: set[int] = {0}
+        self._current: tuple[int, str] = (-1, "")
+        self._selected_rows: str = ""
+        self._toolbar_log: list[str] = []
+
+    def _load(self, row: int) -> None:
+        __block = row // self._visible_rows if self._visible_rows else 0
+        if __block not in self._loaded:
+            self._loaded.add(__block)
+            self._trip()
+
+    @property
+    def RowCount(self) -> int:
+        return len(self._rows)
+
+    @property
+    def ColumnCount(self) -> int:
+        return len(self._columns)
+
+    @property
+    def ColumnOrder(self) -> GuiCollection:
+        return GuiCollection(self._backend, self._columns)
+
+    @property
+    def VisibleRowCount(self) -> int:
+        return self._visible_rows
+
+    @property
+    def FirstVisibleRow(self) -> int:
+        return self._first_row
+
+    @FirstVisibleRow.setter
+    def FirstVisibleRow(self, value: int) -> None:
+        self._first_row = max(0, min(int(value), max(len(self._rows) - 1, 0)))
+        self._load(self._first_row)
+
+    @property
+    def CurrentCellRow(self) -> int:
+        return self._current[0]
+
+    @property
+    def CurrentCellColumn(self) -> str:
+        return self._current[1]
+
+    @property
+    def SelectedRows(self) -> str:
+        return self._selected_rows
+
+    @SelectedRows.setter
+    def SelectedRows(self, value: str) -> None:
+        self._selected_rows = str(value)
+
+    def GetCellValue(self, row: int, column: str) -> str:
+        if row < 0 or row >= len(self._rows) or column not in self._index:
+            raise ComError(f"Invalid cell ({row}, {column}) of grid {self._props['id']}")
+        self._load(row)
+        return self._rows[row][self._index[column]]
+
+    def ModifyCell(self, row: int, column: str, value: str) -> None:
+        if row < 0 or row >= len(self._rows) or column not in self._index:
+            raise ComError(f"Invalid cell ({row}, {column}) of grid {self._props['id']}")
+        self._rows[row][self._index[column]] = value
+
+    def SetCurrentCell(self, row: int, column: str) -> None:
+        self._current = (row, column)
+
+    def DoubleClickItem(self, item: str, column: str) -> None:
+        self._trip()
+
+    def DoubleClickCurrentCell(self) -> None:
+        self._trip()
+
+    def SelectAll(self) -> None:
+        self._selected_rows = f"0-{len(self._rows) - 1}" if self._rows else ""
+
+    def PressToolbarButton(self, button_id: str) -> None:
+        self._toolbar_log.append(button_id)
+        self._trip()
+
+    def PressToolbarContextButton(self, button_id: str) -> None:
+        self._toolbar_log.append(button_id)
+
+    def SelectContextMenuItem(self, item_id: str) -> None:
+        self._toolbar_log.append(item_id)
+        if item_id == "&PC":
+            self._session._open_export(self._columns, self._rows)
+        self._trip()
+
+    def ContextMenu(self) -> None:
+        pass
+
+
+class GuiFrameWindow(GuiComponent):
+    """
+    Simulated GuiMainWindow (wnd[0]) or GuiModalWindow (wnd[1..n]).
+    """
+    def SendVKey(self, vkey: int) -> None:
+        self._session._vkeys.append(int(vkey))
+        self._trip()
+
+    def Maximize(self) -> None:
+        pass
+
+    def Iconify(self) -> None:
+        pass
+
+    def Close(self) -> None:
+        self._session._close_window(self._props["id"])
+
+    def HardCopy(self, filename: str, image_type: str = "PNG", *pos) -> str:
+        __path = filename if "." in filename.rsplit("/", 1)[-1] else f"{tempfile.gettempdir()}/{filename}.png"
+        with open(__path, "wb") as f:
+            f.write(self._session._render())
+        return __path
+
+    def HardCopyToMemory(self, image_type: str = "PNG") -> bytes:
+        if not self._backend.hard_copy_to_memory:
+            raise ComError("The method got an invalid argument: HardCopyToMemory")
+        return self._session._render()
+
+
+class GuiSessionInfo(ComObject):
+    _type = "GuiSessionInfo"
+
+
+class GuiSession(ComObject):
+    """
+    Simulated GuiSession. Holds the element registry of all windows of the session.
+    """
+    _type = "GuiSession"
+
+    def __init__(self, backend: Backend, connection: "GuiConnection", index: int) -> None:
+        __id = f"{connection._props['id']}/ses[{index}]"
+        super().__init__(backend, Id=__id, Type="GuiSession", Name="ses", IsActive=True)
+        self._connection: GuiConnection = connection
+        self._index: int = index
+        self._elements: dict[str, ComObject] = {}
+        self._windows: list[int] = []
+        self._focus: Optional[ComObject] = None
+        self._vkeys: list[int] = []
+        self._busy_until: float = 0.0
+        self._hooks: list[Callable[["GuiSession"], None]] = []
+        self._press_hooks: dict[str, Callable[[], None]] = {}
+        self._exports: list[str] = []
+        self._selections: dict[str, dict[str, list[str]]] = {}
+        self._info: GuiSessionInfo = GuiSessionInfo(
+            backend,
+            Type="GuiSessionInfo",
+            ApplicationServer=connection._props.get("description", ""),
+            Client="100",
+            Codepage=4110,
+            Language="EN",
+            Program="SAPLSMTR_NAVIGATION",
+            ResponseTime=0,
+            RoundTrips=0,
+            ScreenNumber=100,
+            SystemName=connection._props.get("description", "")[:3].upper(),
+            SystemNumber=0,
+            SystemSessionId=f"{index:08d}",
+            Transaction="SESSION_MANAGER",
+            User="SIMULATOR",
+        )
+        self.open_window(0, title="SAP Easy Access")
+
+    # Simulator controls
+    def open_window(self, number: int, title: str = "") -> GuiFrameWindow:
+        """
+        Open a (modal) window in the session, wnd[0] is always the main window.
+        """
+        __id = f"{self._props['id']}/wnd[{number}]"
+        __type = "GuiMainWindow" if number == 0 else "GuiModalWindow"
+        __window = GuiFrameWindow(self._backend, self, __id, __type, "wnd", Text=title)
+        self._elements[__id] = __window
+        if number not in self._windows:
+            self._windows.append(number)
+        for area in ("mbar", "tbar[0]", "titl", "tbar[1]", "usr", "sbar"):
+            __area_id = f"{__id}/{area}"
+            __name = area.split("[")[0]
+            self._elements[__area_id] = GuiComponent(
+                self._backend, self, __area_id, element_type_for(__name), __name,
+                Text=title if __name == "titl" else "", MessageType="", MessageId="", MessageNumber="")
+        return __window
+
+    def add_element(self, id: str, type: Optional[str] = None, **props) -> GuiComponent:
+        """
+        Add a generic element, id may be absolute or relative to the session (wnd[0]/usr/...).
+        """
+        __id = self._absolute(id)
+        __segment = __id.rsplit("/", 1)[-1]
+        __type = type if type is not None else element_type_for(__segment)
+        __element = GuiComponent(self._backend, self, __id, __type, self._name_of(__segment), **props)
+        self._elements[__id] = __element
+        return __element
+
+    def add_grid(self, id: str, columns: list[str], rows: list[list[str]], visible_rows: int = 30) -> GuiGridView:
+        """
+        Add a GuiGridView (ALV grid) seeded with columns and rows.
+        """
+        __id = self._absolute(id)
+        __grid = GuiGridView(self._backend, self, __id, "shell", columns=columns, rows=rows, visible_rows=visible_rows)
+        self._elements[__id] = __grid
+        return __grid
+
+    def add_table_control(self, id: str, columns: list[str], rows: list[list[str]], visible_rows: int = 20) -> GuiTableControl:
+        """
+        Add a GuiTableControl seeded with columns and rows.
+        """
+        __id = self._absolute(id)
+        __segment = __id.rsplit("/", 1)[-1]
+        __table = GuiTableControl(self._backend, self, __id, self._name_of(__segment), columns=columns, rows=rows, visible_rows=visible_rows)
+        self._elements[__id] = __table
+        return __table
+
+    def set_screen(self, program: str, screen_number: int, transaction: Optional[str] = None) -> None:
+        """
+        Simulate a screen change to the given program and dynpro number.
+        """
+        self._info._props["program"] = program
+        self._info._props["screennumber"] = screen_number
+        if transaction is not None:
+            self._info._props["transaction"] = transaction
+
+    def on_round_trip(self, hook: Callable[["GuiSession"], None]) -> None:
+        """
+        Register a callback run after every simulated server round trip.
+        """
+        self._hooks.append(hook)
+
+    def on_press(self, id: str, hook: Callable[[], None]) -> None:
+        """
+        Register a callback run when the button id is pressed, e.g. to open the next popup of a dialog.
+        """
+        self._press_hooks[self._absolute(id)] = hook
+
+    @property
+    def vkeys(self) -> list[int]:
+        return self._vkeys
+
+    @property
+    def exports(self) -> list[str]:
+        return self._exports
+
+    @property
+    def selections(self) -> dict[str, dict[str, list[str]]]:
+        return self._selections
+
+    # Internals
+    @staticmethod
+    def _name_of(segment: str) -> str:
+        __match = SEGMENT_PATTERN.match(segment)
+        __name = __match.group(2) if __match else segment
+        return __name.split("[")[0] if __name.startswith("[") else __name
+
+    def _absolute(self, id: str, base: Optional[str] = None) -> str:
+        __id = id.strip()
+        if __id.startswith("/app/"):
+            return __id
+        if __id.startswith("/"):
+            __id = __id[1:]
+        __base = base if base is not None else self._props["id"]
+        return f"{__base}/{__id}"
+
+    def _find(self, id: str, base: Optional[str] = None, raise_error: bool = True) -> Any:
+        __id = self._absolute(id, base)
+        if __id == self._props["id"]:
+            return self
+        __element = self._elements.get(__id)
+        if __element is not None:
+            return __element
+        if not __id.startswith(f"{self._props['id']}/wnd["):
+            return self._connection._application._find_global(__id, raise_error)
+        if self._backend.auto_create:
+            __window = re.match(r".*?/wnd\[(\d+)\]", __id)
+            if __window is not None and int(__window.group(1)) not in self._windows:
+                self.open_window(int(__window.group(1)))
+                __element = self._elements.get(__id)
+                if __element is not None:
+                    return __element
+            __segment = __id.rsplit("/", 1)[-1]
+            __type = element_type_for(__segment)
+            if __type == "GuiTableControl":
+                return self.add_table_control(__id, [], [])
+            if __type == "GuiShell":
+                return self.add_grid(__id, [], [])
+            return self.add_element(__id, __type)
+        if raise_error:
+            raise ComError(f"The control could not be found by id. {__id}")
+        return None
+
+    def _pressed(self, id: str) -> None:
+        __hook = self._press_hooks.get(id)
+        if __hook is not None:
+            __hook()
+        elif MULTIPLE_SELECTION_BUTTON.search(id):
+            self._open_multiple_selection(next(x for x in MULTIPLE_SELECTION_BUTTON.search(id).groups() if x is not None))
+
+    def _open_export(self, columns: list[str], rows: list[list[str]]) -> None:
+        """
+        "Save list in file": a format popup (radio buttons, Continue) followed by the file dialog (path, file name,
+        encoding, Generate/Replace) that writes the list in the selected format, the path is added to exports.
+        """
+        self.open_window(1, "Save list in file...")
+        for index in EXPORT_FORMATS.values():
+            self.add_element(EXPORT_FORMAT_RADIO.format(index=index), "GuiRadioButton", Selected=index == 0)
+
+        def choose_file() -> None:
+            __format = next((k for k, v in EXPORT_FORMATS.items() if self._find(EXPORT_FORMAT_RADIO.format(index=v))._props["selected"]), "unconverted")
+            self._close_window(f"{self._props['id']}/wnd[1]")
+            self.open_window(1, "Save As")
+            self.add_element(EXPORT_PATH, Text=tempfile.gettempdir())
+            self.add_element(EXPORT_FILENAME, Text="export.txt")
+            self.add_element(EXPORT_ENCODING, Text="")
+
+            def save() -> None:
+                __path = f"{self._find(EXPORT_PATH)._props['text']}/{self._find(EXPORT_FILENAME)._props['text']}"
+                write_export(__path, columns, rows, export_format=__format, codepage=self._find(EXPORT_ENCODING)._props["text"])
+                self._exports.append(__path)
+                self._close_window(f"{self._props['id']}/wnd[1]")
+            self.on_press("wnd[1]/tbar[0]/btn[0]", save)
+            self.on_press("wnd[1]/tbar[0]/btn[11]", save)
+        self.on_press("wnd[1]/tbar[0]/btn[0]", choose_file)
+
+    def _open_multiple_selection(self, name: str) -> None:
+        """
+        "Multiple Selection" dialog of the select option name: "Upload from clipboard" adds the clipboard lines to the
+        selected tab, "Copy" stores the values of all tabs in selections[name] and closes the dialog.
+        """
+        self.open_window(1, f"Multiple Selection for {name}")
+        __values: dict[str, list[str]] = self._selections.get(name, {})
+        for index, tab in enumerate(dict.fromkeys(SELECTION_TABS.values())):
+            self.add_element(MULTIPLE_SELECTION_TAB.format(tab=tab), "GuiTab", Selected=index == 0)
+
+        def upload() -> None:
+            __tab = next(k for k in dict.fromkeys(SELECTION_TABS.values()) if self._find(MULTIPLE_SELECTION_TAB.format(tab=k))._props["selected"])
+            __values.setdefault(__tab, []).extend(x for x in read_clipboard().splitlines() if x != "")
+
+        def copy() -> None:
+            self._selections[name] = __values
+            self._close_window(f"{self._props['id']}/wnd[1]")
+        self.on_press(UPLOAD_CLIPBOARD, upload)
+        self.on_press(COPY_SELECTION, copy)
+
+    def _children_of(self, id: str) -> list[ComObject]:
+        __prefix = f"{id}/"
+        return [e for k, e in self._elements.items() if k.startswith(__prefix) and "/" not in k[len(__prefix):]]
+
+    def _parent_of(self, id: str) -> Any:
+        __parent = id.rsplit("/", 1)[0]
+        return self._find(__parent, raise_error=False)
+
+    def _close_window(self, id: str) -> None:
+        __number = int(re.search(r"wnd\[(\d+)\]$", id).group(1))
+        if __number == 0:
+            return
+        for key in [k for k in self._elements if k == id or k.startswith(f"{id}/")]:
+            del self._elements[key]
+        for key in [k for k in self._press_hooks if k.startswith(f"{id}/")]:
+            del self._press_hooks[key]
+        if __number in self._windows:
+            self._windows.remove(__number)
+
+    def _round_trip(self) -> None:
+        __latency = self._backend.server_round_trip()
+        # GuiSessionInfo describes the last dialog step, not the session
+        self._info._props["roundtrips"] = 1
+        self._info._props["responsetime"] = int(__latency * 1000)
+        if self._backend.busy_time > 0:
+            self._busy_until = time.perf_counter() + self._backend.busy_time
+        for hook in self._hooks:
+            hook(self)
+
+    def _render(self) -> bytes:
+        """
+        Render the visible state of the session as a small PNG.
+        Each element with text becomes a colored block so a changed field changes a region of the image.
+        """
+        __width, __height, __block = 160, 120, 8
+        __pixels = bytearray(b"\xe0" * (__width * __height * 3))
+        __elements = sorted((k, e) for k, e in self._elements.items() if e._props.get("text"))
+        for i, (key, element) in enumerate(__elements):
+            __crc = zlib.crc32(f"{key}={element._props.get('text')}".encode())
+            __color = bytes(((__crc >> 16) & 0xFF, (__crc >> 8) & 0xFF, __crc & 0xFF))
+            __x0 = (i * __block) % __width
+            __y0 = ((i * __block) // __width) * __block % __height
+            for y in range(__y0, __y0 + __block):
+                __start = (y * __width + __x0) * 3
+                __pixels[__start:__start + __block * 3] = __color * __block
+        __raw = b"".join(b"\x00" + bytes(__pixels[y * __width * 3:(y + 1) * __width * 3]) for y in range(__height))
+        def chunk(tag: bytes, data: bytes) -> bytes:
+            return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+        return b"".join([
+            b"\x89PNG\r\n\x1a\n",
+            chunk(b"IHDR", struct.pack(">IIBBBBB", __width, __height, 8, 2, 0, 0, 0)),
+            chunk(b"IDAT", zlib.compress(__raw, 6)),
+            chunk(b"IEND", b""),
+        ])
+
+    # Scripting API
+    @property
+    def Info(self) -> GuiSessionInfo:
+        return self._info
+
+    @property
+    def Busy(self) -> bool:
+        return time.perf_counter() < self._busy_until
+
+    @property
+    def ActiveWindow(self) -> GuiFrameWindow:
+        return self._elements[f"{self._props['id']}/wnd[{max(self._windows)}]"]
+
+    @property
+    def Children(self) -> GuiCollection:
+        return GuiCollection(self._backend, [self._elements[f"{self._props['id']}/wnd[{n}]"] for n in sorted(self._windows)])
+
+    def FindById(self, id: str, raise_error: bool = True) -> Any:
+        return self._find(id, raise_error=raise_error)
+
+    def StartTransaction(self, transaction: str) -> None:
+        self._info._props["transaction"] = transaction.upper()
+        self._round_trip()
+
+    def EndTransaction(self) -> None:
+        self._info._props["transaction"] = "SESSION_MANAGER"
+        self.set_screen("SAPLSMTR_NAVIGATION", 100)
+        self._round_trip()
+
+    def SendCommand(self, command: str) -> None:
+        self._round_trip()
+
+    def CreateSession(self) -> None:
+        self._connection._create_session()
+
+    def LockSessionUI(self) -> None:
+        pass
+
+    def UnlockSessionUI(self) -> None:
+        pass
+
+
+class GuiConnection(ComObject):
+    """
+    Simulated GuiConnection, allows up to GuiConnection.max_sessions sessions like a SAP logon.
+    """
+    _type = "GuiConnection"
+    max_sessions: int = 6
+
+    def __init__(self, backend: Backend, application: "GuiApplication", index: int, description: str) -> None:
+        super().__init__(backend, Id=f"/app/con[{index}]", Type="GuiConnection", Name="con", Description=description, DisabledByServer=False)
+        self._application: GuiApplication = application
+        self._sessions: list[GuiSession] = []
+        self._create_session()
+
+    def _create_session(self) -> GuiSession:
+        if len(self._sessions) >= self.max_sessions:
+            raise ComError(f"Maximum number of sessions ({self.max_sessions}) reached")
+        __index = max([s._index for s in self._sessions], default=-1) + 1
+        __session = GuiSession(self._backend, self, __index)
+        self._sessions.append(__session)
+        return __session
+
+    @property
+    def Sessions(self) -> GuiCollection:
+        return GuiCollection(self._backend, self._sessions)
+
+    @property
+    def Children(self) -> GuiCollection:
+        return GuiCollection(self._backend, self._sessions)
+
+    def CloseSession(self, id: str) -> None:
+        self._sessions = [s for s in self._sessions if not id.startswith(s._props["id"])]
+
+    def CloseConnection(self) -> None:
+        self._sessions = []
+        self._application._close_connection(self)
+
+
+class GuiApplication(ComObject):
+    """
+    Simulated GuiApplication returned by SapGuiAutomation.GetScriptingEngine.
+    """
+    _type = "GuiApplication"
+
+    def __init__(self, backend: Backend) -> None:
+        super().__init__(backend, Id="/app", Type="GuiApplication", Name="app", MajorVersion=7, MinorVersion=70, PatchLevel=1, Revision=1)
+        self._connections: list[GuiConnection] = []
+
+    def _find_global(self, id: str, raise_error: bool = True) -> Any:
+        if id == "/app":
+            return self
+        for conn in self._connections:
+            if id == conn._props["id"]:
+                return conn
+            for ses in conn._sessions:
+                if id == ses._props["id"] or id.startswith(f"{ses._props['id']}/"):
+                    return ses._find(id, raise_error=raise_error)
+        if raise_error:
+            raise ComError(f"The control could not be found by id. {id}")
+        return None
+
+    def _close_connection(self, connection: GuiConnection) -> None:
+        self._connections = [c for c in self._connections if c is not connection]
+
+    @property
+    def Connections(self) -> GuiCollection:
+        return GuiCollection(self._backend, self._connections)
+
+    @property
+    def Children(self) -> GuiCollection:
+        return GuiCollection(self._backend, self._connections)
+
+    def OpenConnection(self, description: str, sync: bool = True, raise_error: bool = True) -> GuiConnection:
+        __index = max([id_index(c._props["id"]) for c in self._connections], default=-1) + 1
+        __connection = GuiConnection(self._backend, self, __index, description)
+        self._connections.append(__connection)
+        self._backend.server_round_trip()
+        return __connection
+
+    def FindById(self, id: str, raise_error: bool = True) -> Any:
+        return self._find_global(id if id.startswith("/app") else f"/app/{id.lstrip('/')}", raise_error)
+
+
+class SapGuiAutomation(ComObject):
+    """
+    Simulated "SAPGUI" ROT entry, the object returned by win32com.client.GetObject("SAPGUI").
+    Pass an instance to Session(sap_gui=...) in place of the real COM object.
+    """
+    _type = "SapGuiAutomation"
+
+    def __init__(self, latency: float = 0.0, server_latency: float = 0.0, auto_create: bool = True, busy_time: float = 0.0, hard_copy_to_memory: bool = True) -> None:
+        __backend = Backend(latency=latency, server_latency=server_latency, auto_create=auto_create, busy_time=busy_time, hard_copy_to_memory=hard_copy_to_memory)
+        super().__init__(__backend, Type="SapGuiAutomation")
+        self._application: GuiApplication = GuiApplication(__backend)
+
+    @property
+    def GetScriptingEngine(self) -> GuiApplication:
+        return self._application
+
+    @property
+    def stats(self) -> ComStats:
+        return self._backend.stats
+
+    @property
+    def backend(self) -> Backend:
+        return self._backend
+
+    @property
+    def application(self) -> GuiApplication:
+        return self._application
@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+import time
+
+
+@dataclass
+class ExtractStats:
+    """
+    Throughput counters of a table extraction.
+    """
+    Rows: int = 0
+    Cells: int = 0
+    Pages: int = 0
+    Seconds: float = 0.0
+
+    @property
+    def RowsPerSecond(self) -> float:
+        return self.Rows / self.Seconds if self.Seconds > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"class ExtractStats<Rows: {self.Rows}, Cells: {self.Cells}, Pages: {self.Pages}, Seconds: {self.Seconds:.3f}, RowsPerSecond: {self.RowsPerSecond:.1f}>"
+
+
+def _page_bounds(total: int, page_size: int) -> Iterator[tuple[int, int]]:
+    __page = max(int(page_size), 1)
+    for start in range(0, total, __page):
+        yield start, min(start + __page, total)
+
+
+def iter_grid_rows(
+    grid: Any,
+    number_rows: Optional[int] = None,
+    page_size: Optional[int] = None,
+    columns: Optional[list[str]] = None,
+    stats: Optional[ExtractStats] = None
+    ) -> Iterator[dict]:
+    """
+    Stream the rows of a GuiShell/GridView (ALV grid) as dicts of column name to cell value.
+    Metadata (column order, row count, visible row count) is read once, the grid is scrolled with
+    firstVisibleRow one page at a time so each block of rows is loaded by a single server round trip
+    and each page is read column by column.
+
+    Arguments:
+        grid {Any} -- GuiGridView scripting object
+
+    Keyword Arguments:
+        number_rows {Optional[int]} -- Number of rows to return, default is All (default: {None})
+        page_size {Optional[int]} -- Rows per page, default is the grid's VisibleRowCount (default: {None})
+        columns {Optional[list[str]]} -- Column names to read, default is the grid's ColumnOrder (default: {None})
+        stats {Optional[ExtractStats]} -- ExtractStats instance updated while rows are yielded (default: {None})
+
+    Yields:
+        dict -- One dict per grid row
+    """
+    __stats = stats if stats is not None else ExtractStats()
+    __start_time = time.perf_counter()
+    __columns = list(columns) if columns is not None else [x for x in grid.ColumnOrder]
+    __row_count = grid.RowCount
+    __total = min(number_rows, __row_count) if number_rows is not None else __row_count
+    __page_size = page_size if page_size is not None else grid.VisibleRowCount
+    __get_cell = grid.GetCellValue
+    try:
+        for start, end in _page_bounds(__total, __page_size):
+            if start > 0:
+                grid.firstVisibleRow = start
+            __block = [[__get_cell(row, column) for row in range(start, end)] for column in __columns]
+            __stats.Pages += 1
+            __stats.Cells += (end - start) * len(__columns)
+            for i in range(end - start):
+                __stats.Rows += 1
+                yield {column: __block[j][i] for j, column in enumerate(__columns)}
+    finally:
+        __stats.Seconds += time.perf_counter() - __start_time
+
+
+def iter_table_control_rows(
+    table: Any,
+    refind: Optional[Callable[[], Any]] = None,
+    number_rows: Optional[int] = None,
+    stats: Optional[ExtractStats] = None
+    ) -> Iterator[dict]:
+    """
+    Stream the rows of a GuiTableControl as dicts of column name to cell text.
+    A table control only holds its visible rows, the table is scrolled with its vertical scrollbar
+    one VisibleRowCount page at a time. Scrolling re-renders the table, refind is called after each
+    scroll to get a fresh handle.
+
+    Arguments:
+        table {Any} -- GuiTableControl scripting object
+
+    Keyword Arguments:
+        refind {Optional[Callable[[], Any]]} -- Callable returning a fresh handle of the table after scrolling (default: {None})
+        number_rows {Optional[int]} -- Number of rows to return, default is All (default: {None})
+        stats {Optional[ExtractStats]} -- ExtractStats instance updated while rows are yielded (default: {None})
+
+    Yields:
+        dict -- One dict per table row
+    """
+    __stats = stats if stats is not None else ExtractStats()
+    __start_time = time.perf_counter()
+    __table = table
+    __columns = [x.Name for x in __table.Columns]
+    __row_count = __table.RowCount
+    __total = min(number_rows, __row_count) if number_rows is not None else __row_count
+    __visible = __table.VisibleRowCount
+    try:
+        if __table.VerticalScrollbar.Position != 0:
+            __table.VerticalScrollbar.Position = 0
+            if refind is not None:
+                __table = refind()
+        for start, end in _page_bounds(__total, __visible):
+            if start > 0:
+                __table.VerticalScrollbar.Position = start
+                if refind is not None:
+                    __table = refind()
+            __rows = __table.Rows
+            __stats.Pages += 1
+            for i in range(end - start):
+                __row = __rows.ElementAt(i)
+                __cells = [__row.ElementAt(c).Text for c in range(len(__columns))]
+                __stats.Rows += 1
+                __stats.Cells += len(__cells)
+                yield dict(zip(__columns, __cells))
+    finally:
+        __stats.Seconds += time.perf_counter() - __start_time
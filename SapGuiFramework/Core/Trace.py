@@ -0,0 +1,450 @@
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Iterator, Optional
+import json
+import logging
+import os
+import threading
+import types
+from Core.Utilities import element_type_for
+
+
+# Element types of the scripting members returning other scripting objects: member -> (type, item type)
+MEMBER_TYPES: dict[str, tuple[str, Optional[str]]] = {
+    "getscriptingengine": ("GuiApplication", None),
+    "connections": ("GuiComponentCollection", "GuiConnection"),
+    "openconnection": ("GuiConnection", None),
+    "sessions": ("GuiComponentCollection", "GuiSession"),
+    "info": ("GuiSessionInfo", None),
+    "activewindow": ("GuiFrameWindow", None),
+    "children": ("GuiComponentCollection", "GuiComponent"),
+    "columns": ("GuiCollection", "GuiTableColumn"),
+    "rows": ("GuiCollection", "GuiTableRow"),
+    "verticalscrollbar": ("GuiScrollbar", None),
+    "getcell": ("GuiComponent", None),
+    "parent": ("GuiComponent", None),
+}
+_PLAIN_TYPES: tuple[type, ...] = (str, int, float, bool, bytes, bytearray, memoryview, type(None))
+
+
+@dataclass
+class TracePolicy:
+    """
+    Per-case settings of the hot-path tracer, see Core.Trace.Tracer.
+
+    Enabled wraps the SAP GUI scripting objects of the session in recording proxies and writes a Chrome
+    trace-event file (chrome://tracing, Perfetto) to Path at cleanup, None uses <LogPath>/trace.json.
+    ComEvents False only writes the step & span events, the COM calls are still counted per step.
+    At most MaxEvents events are kept, later COM events are counted but dropped.
+    """
+    Enabled: bool = False
+    Path: "Optional[Path]" = None
+    ComEvents: bool = True
+    MaxEvents: int = 1000000
+
+    @staticmethod
+    def from_dict(data: dict) -> "TracePolicy":
+        """
+        Create a TracePolicy from a dict using the json data file keys:
+        enabled, path, com_events & max_events
+        """
+        __policy = TracePolicy()
+        if "enabled" in data:
+            __policy.Enabled = bool(data.get("enabled"))
+        if "path" in data:
+            __policy.Path = Path(data.get("path")) if data.get("path") is not None else None
+        if "com_events" in data:
+            __policy.ComEvents = bool(data.get("com_events"))
+        if "max_events" in data:
+            __policy.MaxEvents = int(data.get("max_events"))
+        return __policy
+
+
+@dataclass
+class StepTrace:
+    """
+    COM calls, log records and span times of one step.
+    ByMember counts and Times sums the calls keyed by "<element type>.<member>", Spans sums the seconds per span category.
+    """
+    Index: int
+    Name: str
+    Action: Optional[str] = None
+    Start: float = 0.0
+    Seconds: float = 0.0
+    Calls: int = 0
+    Gets: int = 0
+    Sets: int = 0
+    Methods: int = 0
+    ComSeconds: float = 0.0
+    Logs: int = 0
+    ByMember: Counter = field(default_factory=Counter)
+    Times: Counter = field(default_factory=Counter)
+    Spans: Counter = field(default_factory=Counter)
+
+    def __repr__(self) -> str:
+        return f"class StepTrace<Index: {self.Index}, Name: {self.Name}, Seconds: {self.Seconds:.6f}, Calls: {self.Calls}, ComSeconds: {self.ComSeconds:.6f}, Logs: {self.Logs}>"
+
+
+class ComProxy:
+    """
+    Recording proxy of a SAP GUI scripting object (win32com.client.CDispatch or Core.Simulator object).
+    Every property get, property set and method call is timed and recorded on the Tracer, scripting
+    objects returned by the calls are wrapped too, so wrapping the SAPGUI object covers the whole session.
+    """
+    __slots__ = ("_target", "_tracer", "_com_type", "_item_type")
+
+    def __init__(self, target: Any, tracer: "Tracer", com_type: str, item_type: Optional[str] = None) -> None:
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_tracer", tracer)
+        object.__setattr__(self, "_com_type", com_type)
+        object.__setattr__(self, "_item_type", item_type)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            return getattr(self._target, name)
+        __start = perf_counter()
+        __value = getattr(self._target, name)
+        if isinstance(__value, types.MethodType):
+            # a method is called by the caller, the call is recorded by _ComMethod
+            return _ComMethod(self, name, __value)
+        self._tracer.record(self._com_type, name, "get", __start, perf_counter() - __start)
+        return self._tracer.wrap(__value, *_member_type(name, ()))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        __start = perf_counter()
+        setattr(self._target, name, unwrap(value))
+        self._tracer.record(self._com_type, name, "set", __start, perf_counter() - __start)
+
+    def __len__(self) -> int:
+        __start = perf_counter()
+        __count = len(self._target)
+        self._tracer.record(self._com_type, "Count", "get", __start, perf_counter() - __start)
+        return __count
+
+    def __getitem__(self, index: Any) -> Any:
+        __start = perf_counter()
+        __item = self._target[index]
+        self._tracer.record(self._com_type, "Item", "call", __start, perf_counter() - __start)
+        return self._tracer.wrap(__item, self._item_type or "GuiComponent")
+
+    def __iter__(self) -> Iterator[Any]:
+        __start = perf_counter()
+        __items = list(iter(self._target))
+        self._tracer.record(self._com_type, "_NewEnum", "call", __start, perf_counter() - __start)
+        return iter([self._tracer.wrap(x, self._item_type or "GuiComponent") for x in __items])
+
+    def __call__(self, *args, **kwargs) -> Any:
+        __start = perf_counter()
+        __item = self._target(*[unwrap(x) for x in args], **{k: unwrap(v) for k, v in kwargs.items()})
+        self._tracer.record(self._com_type, "Item", "call", __start, perf_counter() - __start)
+        return self._tracer.wrap(__item, self._item_type or "GuiComponent")
+
+    def __bool__(self) -> bool:
+        return bool(self._target)
+
+    def __eq__(self, other: Any) -> bool:
+        return self._target == unwrap(other)
+
+    def __hash__(self) -> int:
+        return hash(self._target)
+
+    def __repr__(self) -> str:
+        return f"<ComProxy {self._com_type} {self._target!r}>"
+
+
+class _ComMethod:
+    __slots__ = ("owner", "name", "method")
+
+    def __init__(self, owner: ComProxy, name: str, method: Any) -> None:
+        self.owner: ComProxy = owner
+        self.name: str = name
+        self.method: Any = method
+
+    def __call__(self, *args, **kwargs) -> Any:
+        __tracer: Tracer = object.__getattribute__(self.owner, "_tracer")
+        __start = perf_counter()
+        __value = self.method(*[unwrap(x) for x in args], **{k: unwrap(v) for k, v in kwargs.items()})
+        __tracer.record(object.__getattribute__(self.owner, "_com_type"), self.name, "call", __start, perf_counter() - __start)
+        return __tracer.wrap(__value, *_member_type(self.name, args))
+
+
+class _LogFilter(logging.Filter):
+    """
+    Counts the log records of the traced logger per step and adds them as instant events, the message is not formatted.
+    """
+    def __init__(self, tracer: "Tracer") -> None:
+        super().__init__()
+        self.tracer: Tracer = tracer
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        self.tracer.instant(record.levelname, "log", logger=record.name)
+        return True
+
+
+class Tracer:
+    """
+    Hot-path tracer of a Session. Records the COM calls made through its ComProxy objects, spans of
+    sleeps, waits, screenshots & metadata collection and the log records, all attributed to the current step.
+    write() creates a Chrome trace-event JSON file with one complete event per step (its COM call counts in args),
+    one per span and, with com_events, one per COM call.
+
+    Keyword Arguments:
+        path {Optional[Path]} -- File written by close() (default: {None})
+        com_events {bool} -- Write an event per COM call (default: {True})
+        max_events {int} -- Maximum number of events kept (default: {1000000})
+    """
+    def __init__(self, path: Optional[Path] = None, com_events: bool = True, max_events: int = 1000000) -> None:
+        self.path: Optional[Path] = Path(path) if path is not None else None
+        self.com_events: bool = com_events
+        self.max_events: int = max_events
+        self.events: list[dict] = []
+        self.dropped: int = 0
+        self.steps: list[StepTrace] = []
+        self.current: Optional[StepTrace] = None
+        self.total: StepTrace = StepTrace(Index=-1, Name="total")
+        self.__origin: float = perf_counter()
+        self.__pid: int = os.getpid()
+        self.__threads: dict[int, str] = {}
+        self.__step: Any = None
+        self.__logger: Optional[logging.Logger] = None
+        self.__log_filter: _LogFilter = _LogFilter(self)
+        self.__lock: threading.RLock = threading.RLock()
+
+    @staticmethod
+    def from_policy(policy: TracePolicy, directory: Path) -> Optional["Tracer"]:
+        """
+        Returns the tracer configured by policy, None if tracing is not enabled.
+        """
+        if not policy.Enabled:
+            return None
+        return Tracer(
+            path=policy.Path if policy.Path is not None else Path(directory, "trace.json"),
+            com_events=policy.ComEvents,
+            max_events=policy.MaxEvents)
+
+    def wrap(self, value: Any, com_type: Optional[str] = None, item_type: Optional[str] = None) -> Any:
+        """
+        Wrap a scripting object in a ComProxy recording on this tracer, other values are returned unchanged.
+
+        Arguments:
+            value {Any} -- Value returned by a scripting call
+
+        Keyword Arguments:
+            com_type {Optional[str]} -- Element type used in the records, simulator objects know their type (_com_type) (default: {None})
+            item_type {Optional[str]} -- Element type of the items of a collection (default: {None})
+        """
+        if isinstance(value, _PLAIN_TYPES) or isinstance(value, ComProxy):
+            return value
+        if callable(getattr(value, "_com_type", None)):
+            return ComProxy(value, self, value._com_type(), item_type)
+        if getattr(value, "_oleobj_", None) is not None:
+            return ComProxy(value, self, com_type or "GuiComponent", item_type)
+        return value
+
+    def watch(self, logger: logging.Logger) -> None:
+        """
+        Count the records of logger per step, replaces a previously watched logger.
+        """
+        if self.__logger is logger:
+            return
+        if self.__logger is not None:
+            self.__logger.removeFilter(self.__log_filter)
+        self.__logger = logger
+        logger.addFilter(self.__log_filter)
+
+    def begin_step(self, step: Any) -> StepTrace:
+        """
+        End the current step and attribute the following records to step.
+
+        Arguments:
+            step {Flow.Actions.Step} -- The new step
+        """
+        with self.__lock:
+            self.end_step()
+            __action = step.Action
+            self.current = StepTrace(
+                Index=len(self.steps),
+                Name=step.Name,
+                Action=getattr(__action, "__name__", __action),
+                Start=perf_counter())
+            self.__step = step
+            self.steps.append(self.current)
+            return self.current
+
+    def end_step(self) -> None:
+        """
+        Close the current step, add its event and set its Step.ComCalls.
+        """
+        with self.__lock:
+            __trace = self.current
+            if __trace is None:
+                return
+            __trace.Seconds = perf_counter() - __trace.Start
+            self.__step.ComCalls = __trace.Calls
+            self.__add({
+                "name": __trace.Name,
+                "cat": "step",
+                "ph": "X",
+                "ts": self.__us(__trace.Start),
+                "dur": __trace.Seconds * 1e6,
+                "pid": self.__pid,
+                "tid": self.__tid(),
+                "args": {
+                    "index": __trace.Index,
+                    "action": __trace.Action,
+                    "com_calls": __trace.Calls,
+                    "com_gets": __trace.Gets,
+                    "com_sets": __trace.Sets,
+                    "com_methods": __trace.Methods,
+                    "com_ms": round(__trace.ComSeconds * 1000, 3),
+                    "logs": __trace.Logs,
+                    "spans_ms": {k: round(v * 1000, 3) for k, v in __trace.Spans.items()},
+                    "members": dict(__trace.ByMember.most_common()),
+                }}, force=True)
+            self.current = None
+            self.__step = None
+
+    def record(self, com_type: str, member: str, kind: str, start: float, seconds: float) -> None:
+        """
+        Record a COM call of the current step, used by ComProxy.
+
+        Arguments:
+            com_type {str} -- Element type
+            member {str} -- Property or method name
+            kind {str} -- get, set or call
+            start {float} -- perf_counter() at the start of the call
+            seconds {float} -- Duration of the call
+        """
+        # the scripting API is case-insensitive, findById & FindById are one member
+        __key = f"{com_type}.{member[:1].upper()}{member[1:]}"
+        with self.__lock:
+            for trace in (self.total, self.current) if self.current is not None else (self.total,):
+                trace.Calls += 1
+                match kind:
+                    case "get":
+                        trace.Gets += 1
+                    case "set":
+                        trace.Sets += 1
+                    case _:
+                        trace.Methods += 1
+                trace.ComSeconds += seconds
+                trace.ByMember[__key] += 1
+                trace.Times[__key] += seconds
+            if self.com_events:
+                self.__add({
+                    "name": __key,
+                    "cat": "com",
+                    "ph": "X",
+                    "ts": self.__us(start),
+                    "dur": seconds * 1e6,
+                    "pid": self.__pid,
+                    "tid": self.__tid(),
+                    "args": {"kind": kind}})
+
+    def instant(self, name: str, category: str, **args) -> None:
+        """
+        Add an instant event, events of category log are counted as the step's Logs.
+        """
+        with self.__lock:
+            if category == "log":
+                self.total.Logs += 1
+                if self.current is not None:
+                    self.current.Logs += 1
+            self.__add({"name": name, "cat": category, "ph": "i", "s": "t", "ts": self.__us(perf_counter()), "pid": self.__pid, "tid": self.__tid(), "args": args})
+
+    @contextmanager
+    def span(self, name: str, category: str, **args) -> Iterator[None]:
+        """
+        Context manager timing its block as a complete event, the time is summed per category in StepTrace.Spans.
+
+        Arguments:
+            name {str} -- Event name
+            category {str} -- Event category, e.g. sleep, wait, screenshot or metadata
+        """
+        __start = perf_counter()
+        try:
+            yield
+        finally:
+            __seconds = perf_counter() - __start
+            with self.__lock:
+                self.total.Spans[category] += __seconds
+                if self.current is not None:
+                    self.current.Spans[category] += __seconds
+                self.__add({"name": name, "cat": category, "ph": "X", "ts": self.__us(__start), "dur": __seconds * 1e6, "pid": self.__pid, "tid": self.__tid(), "args": args})
+
+    def hot_members(self, limit: int = 10) -> list[tuple[str, int, float]]:
+        """
+        Returns the limit most called "<element type>.<member>" as (member, calls, seconds).
+        """
+        return [(k, v, self.total.Times[k]) for k, v in self.total.ByMember.most_common(limit)]
+
+    def trace(self) -> dict:
+        """
+        Returns the Chrome trace-event JSON object.
+        """
+        with self.__lock:
+            __names = [
+                {"name": "thread_name", "ph": "M", "pid": self.__pid, "tid": k, "args": {"name": v}}
+                for k, v in self.__threads.items()]
+            return {
+                "traceEvents": __names + self.events,
+                "displayTimeUnit": "ms",
+                "otherData": {"com_calls": self.total.Calls, "com_ms": round(self.total.ComSeconds * 1000, 3), "steps": len(self.steps), "dropped_events": self.dropped},
+            }
+
+    def write(self, path: Optional[Path] = None) -> Path:
+        """
+        Write the trace to path, default the tracer's path.
+
+        Returns:
+            Path -- The written file
+        """
+        __path = Path(path) if path is not None else self.path
+        if __path is None:
+            raise ValueError("No trace file path")
+        __path.parent.mkdir(parents=True, exist_ok=True)
+        with open(__path, "w", encoding="utf-8") as f:
+            json.dump(self.trace(), f, default=str)
+        return __path
+
+    def close(self) -> Optional[Path]:
+        """
+        End the current step, stop watching the logger and write the trace if the tracer has a path.
+        """
+        self.end_step()
+        if self.__logger is not None:
+            self.__logger.removeFilter(self.__log_filter)
+            self.__logger = None
+        return self.write() if self.path is not None else None
+
+    def __add(self, event: dict, force: bool = False) -> None:
+        if not force and len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        self.events.append(event)
+
+    def __us(self, counter: float) -> float:
+        return round((counter - self.__origin) * 1e6, 3)
+
+    def __tid(self) -> int:
+        __ident = threading.get_ident()
+        if __ident not in self.__threads:
+            self.__threads[__ident] = threading.current_thread().name
+        return __ident
+
+
+def unwrap(value: Any) -> Any:
+    """
+    Returns the scripting object of a ComProxy, other values unchanged.
+    """
+    return object.__getattribute__(value, "_target") if isinstance(value, ComProxy) else value
+
+
+def _member_type(member: str, args: tuple) -> tuple[str, Optional[str]]:
+    __member = member.lower()
+    if __member == "findbyid" and args:
+        return element_type_for(str(unwrap(args[0])).rstrip("/").split("/")[-1]), None
+    return MEMBER_TYPES.get(__member, ("GuiComponent", None))
@@ -1,7 +1,8 @@
+from dataclasses import dataclass
 import datetime
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 import random
 import sys
 import re
@@ -49,6 +50,58 @@ def assert_string_has_numeric(text: str, len_value: Optional[int] = None) -> boo
     return True
 
 
+def id_index(id: str) -> int:
+    """
+    Returns the index of the last segment of a SAP GUI id, e.g. 3 for /app/con[0]/ses[3]
+    """
+    return int(re.search(r"\[(\d+)\]$", id).group(1))
+
+
+# Maps SAP GUI id prefixes to element types, longest prefixes first.
+ID_PREFIXES: list[tuple[str, str]] = [
+    ("shellcont", "GuiContainerShell"),
+    ("shell", "GuiShell"),
+    ("ctxt", "GuiCTextField"),
+    ("txt", "GuiTextField"),
+    ("pwd", "GuiPasswordField"),
+    ("btn", "GuiButton"),
+    ("chk", "GuiCheckBox"),
+    ("rad", "GuiRadioButton"),
+    ("cmb", "GuiComboBox"),
+    ("lbl", "GuiLabel"),
+    ("tabs", "GuiTabStrip"),
+    ("tabp", "GuiTab"),
+    ("tbl", "GuiTableControl"),
+    ("tbar", "GuiToolbar"),
+    ("titl", "GuiTitlebar"),
+    ("sbar", "GuiStatusbar"),
+    ("mbar", "GuiMenubar"),
+    ("menu", "GuiMenu"),
+    ("cntl", "GuiCustomControl"),
+    ("ssub", "GuiSimpleContainer"),
+    ("sub", "GuiSimpleContainer"),
+    ("usr", "GuiUserArea"),
+    ("okcd", "GuiOkCodeField"),
+    ("wnd", "GuiModalWindow"),
+]
+
+
+def element_type_for(segment: str) -> str:
+    """
+    Infer the SAP GUI element type from the last segment of an element id, e.g. ctxtVBAK-AUART.
+
+    Arguments:
+        segment {str} -- Last segment of a SAP GUI element id
+
+    Returns:
+        str -- Element type name, GuiComponent if the prefix is unknown
+    """
+    for prefix, element_type in ID_PREFIXES:
+        if segment.startswith(prefix):
+            return element_type
+    return "GuiComponent"
+
+
 def main_is_frozen() -> bool:
     return (hasattr(sys, "frozen") or # new py2exe
         hasattr(sys, "importers")) # old py2exe
@@ -63,11 +116,21 @@ def get_main_dir() -> Path:
         return Path(*Path(sys.argv[0]).parts[:-4])
     
 
+def _explicit_wait(args: tuple, wait_time: float) -> None:
+    # Instances with a wait_until_ready method (Core.Framework.Session) wait for readiness 
+    # according to their case's WaitPolicy instead of sleeping wait_time.
+    __wait_until_ready = getattr(args[0], "wait_until_ready", None) if args else None
+    if __wait_until_ready is not None:
+        __wait_until_ready()
+    elif wait_time > 0:
+        time.sleep(wait_time)
+
+
 def explicit_wait_before(_func = None, *, wait_time: float = 0.0):
     def decorator_explicit_wait_before(func):
         @functools.wraps(func)
         def wait_wrapper(*args, **kwargs):
-            time.sleep(wait_time)
+            _explicit_wait(args, wait_time)
             return func(*args, **kwargs)
         return wait_wrapper
     if _func is None:
@@ -81,7 +144,7 @@ def explicit_wait_after(_func = None, *, wait_time: float = 0.0):
         @functools.wraps(func)
         def wait_wrapper(*args, **kwargs):
             value = func(*args, **kwargs)
-            time.sleep(wait_time)
+            _explicit_wait(args, wait_time)
             return value
         return wait_wrapper
     if _func is None:
@@ -90,34 +153,179 @@ def explicit_wait_after(_func = None, *, wait_time: float = 0.0):
         return decorator_explicit_wait_after(_func)
 
 
+# Comparison operators of a WHERE clause -> option of a SAP selection range
+SQL_OPTIONS: dict[str, str] = {"=": "EQ", "<>": "NE", "!=": "NE", ">": "GT", ">=": "GE", "<": "LT", "<=": "LE"}
+# Quoted literals, operators, punctuation & words, anything else is an error (e.g. an unterminated quote)
+_SQL_TOKENS = re.compile(r"""(?P<literal>'(?:[^']|'')*'|"(?:[^"]|"")*")|(?P<symbol><>|!=|>=|<=|[=<>(),*])|(?P<word>[^\s=<>!(),;*'"]+)|(?P<space>[\s;]+)|(?P<error>.)""")
+
+
+def tokenize_sql(statement: str) -> list[str]:
+    """
+    Split a SQL like statement into tokens. Quoted literals keep their case & quotes, all other tokens are upper cased.
+    Semicolons are white space.
+
+    Raises:
+        ValueError -- If the statement has an unterminated quote or an unexpected character
+    """
+    __tokens = []
+    for match in _SQL_TOKENS.finditer(statement):
+        __kind = match.lastgroup
+        if __kind == "space":
+            continue
+        if __kind == "error":
+            raise ValueError(f"Unexpected {match.group()} at position {match.start()} of statement: {statement}")
+        __tokens.append(match.group() if __kind == "literal" else match.group().upper())
+    return __tokens
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Returns the statement with single spaces between tokens and everything but quoted literals upper cased, 
+    equal statements have equal normalized text.
+    """
+    return " ".join(tokenize_sql(statement))
+
+
 def parse_sql_select(statement: str) -> list:
-    statement = " ".join([x.strip('\t') for x in statement.strip("\n\r").upper().split(';')])   
-    statement = statement + ' WHERE ' if 'WHERE' not in statement else statement
-
-    regex = re.compile("SELECT(.*)FROM(.*)WHERE(.*)")
-
-    parts = regex.findall(statement)
-    parts = parts[0]
-    select = [x.strip() for x in parts[0].split(',')]
-    top = select[0].split(" ")
-    if len(top) == 3:
-        if "TOP" in top:
-            select[0] = top[2]
-            top = top[0:2]
+    """
+    Split a SQL like select statement: SELECT [TOP n] field, ... FROM table [WHERE condition ...]
+
+    Arguments:
+        statement {str} -- A SQL like select statement
+
+    Raises:
+        ValueError -- If the statement has no SELECT, FROM or table
+
+    Returns:
+        list -- [fields, top, table, where]: fields ["*"] for all, top ["TOP", "n"] or [], where the WHERE tokens
+    """
+    __tokens = tokenize_sql(statement)
+    if len(__tokens) == 0 or __tokens[0] != "SELECT":
+        raise ValueError(f"Statement does not start with SELECT: {statement}")
+    if "FROM" not in __tokens:
+        raise ValueError(f"Statement has no FROM: {statement}")
+    __from = __tokens.index("FROM")
+    __select = __tokens[1:__from]
+    top = []
+    if len(__select) >= 2 and __select[0] == "TOP":
+        if not __select[1].isdigit():
+            raise ValueError(f"TOP expects a number of rows, found {__select[1]}")
+        top = __select[0:2]
+        __select = __select[2:]
+    select = [x for x in __select if x != ","]
+    __rest = __tokens[__from + 1:]
+    if len(__rest) == 0 or __rest[0] == "WHERE":
+        raise ValueError(f"Statement has no table after FROM: {statement}")
+    frm = __rest[0]
+    where = __rest[2:] if len(__rest) > 1 and __rest[1] == "WHERE" else []
+    return [select, top, frm, where]
+
+
+@dataclass
+class SelectionRange:
+    """
+    One row of a SAP selection (range table): Sign I(nclude) or E(xclude), Option EQ, NE, GT, GE, LT, LE, BT or CP 
+    and the Low & High values.
+    """
+    Sign: str = "I"
+    Option: str = "EQ"
+    Low: str = ""
+    High: str = ""
+
+
+def _sql_value(token: str) -> str:
+    if len(token) >= 2 and token[0] == token[-1] and token[0] in "'\"":
+        return token[1:-1].replace(token[0] * 2, token[0])
+    return token
+
+
+def _sql_pattern(token: str) -> str:
+    # SQL LIKE wildcards to SAP pattern wildcards
+    return _sql_value(token).replace("%", "*").replace("_", "+")
+
+
+def _conditions(tokens: list[str]) -> Iterator[tuple[str, list[SelectionRange]]]:
+    __pos = 0
+
+    def take(expected: Optional[str] = None) -> str:
+        nonlocal __pos
+        if __pos >= len(tokens):
+            raise ValueError(f"Unexpected end of WHERE clause, expected {expected or 'a value'}")
+        __token = tokens[__pos]
+        if expected is not None and __token.upper() != expected:
+            raise ValueError(f"Expected {expected} in WHERE clause, found {__token}")
+        __pos += 1
+        return __token
+
+    while __pos < len(tokens):
+        if __pos > 0:
+            __join = take().upper()
+            if __join != "AND":
+                raise ValueError(f"Only AND is supported between conditions, found {__join}, use IN for alternatives")
+        __field = take().upper()
+        __operator = take().upper()
+        __sign = "I"
+        if __operator == "NOT":
+            __sign = "E"
+            __operator = take().upper()
+        if __operator == "IN":
+            __values = []
+            take("(")
+            while True:
+                __values.append(SelectionRange(__sign, "EQ", _sql_value(take())))
+                if take() == ")":
+                    break
+            yield __field, __values
+        elif __operator == "BETWEEN":
+            __low = _sql_value(take())
+            take("AND")
+            yield __field, [SelectionRange(__sign, "BT", __low, _sql_value(take()))]
+        elif __operator == "LIKE":
+            yield __field, [SelectionRange(__sign, "CP", _sql_pattern(take()))]
+        elif __operator in SQL_OPTIONS and __sign == "I":
+            __option = SQL_OPTIONS[__operator]
+            # not equal is uploaded as excluded single value
+            __range = SelectionRange("E", "EQ", _sql_value(take())) if __option == "NE" else SelectionRange("I", __option, _sql_value(take()))
+            yield __field, [__range]
         else:
-            top = []
-    else:
-        top = []
-    frm = parts[1].strip()
-    where = parts[2].strip()
+            raise ValueError(f"Unsupported condition on {__field}: {__operator}")
 
-    # splits by spaces but ignores quoted string with ''
-    PATTERN = re.compile(r"""((?:[^ '"]|'[^']*'|"[^"]*")+)""")
-    where = PATTERN.split(where)[1::2]
 
-    cleaned = [select, top, frm, where]
-    return cleaned
+def parse_sql_conditions(where: list[str]) -> dict[str, list[SelectionRange]]:
+    """
+    Parse the WHERE tokens returned by parse_sql_select into SAP selection ranges per field.
+
+    Supported conditions, joined by AND:
+        FIELD = 'A', FIELD <> 'A', FIELD > 'A' (>=, <, <=)
+        FIELD IN ('A', 'B'), FIELD NOT IN ('A', 'B')
+        FIELD BETWEEN 'A' AND 'B', FIELD NOT BETWEEN 'A' AND 'B'
+        FIELD LIKE 'A%', FIELD NOT LIKE 'A_B' (% and _ become the SAP wildcards * and +)
+
+    The included ranges of a SAP selection are ORed, so a field takes one including condition (IN for several 
+    values), FIELD >= 'A' AND FIELD <= 'B' is combined to BETWEEN. Excluding conditions are not limited.
 
+    Arguments:
+        where {list[str]} -- WHERE clause tokens
+
+    Raises:
+        ValueError -- If the clause uses OR, an unsupported operator or several including conditions on a field
+
+    Returns:
+        dict[str, list[SelectionRange]] -- Field name -> selection ranges, in the order of the clause
+    """
+    __conditions: dict[str, list[SelectionRange]] = {}
+    for field, ranges in _conditions(tokenize_sql(" ".join(where))):
+        __ranges = __conditions.setdefault(field, [])
+        __included = [x for x in __ranges if x.Sign == "I"]
+        if ranges[0].Sign == "I" and len(__included) != 0:
+            __options = {__included[0].Option, ranges[0].Option}
+            if len(__included) != 1 or len(ranges) != 1 or __options != {"GE", "LE"}:
+                raise ValueError(f"Several including conditions on {field} are ORed by a SAP selection, use IN or BETWEEN")
+            __low, __high = (__included[0], ranges[0]) if __included[0].Option == "GE" else (ranges[0], __included[0])
+            __ranges[__ranges.index(__included[0])] = SelectionRange("I", "BT", __low.Low, __high.Low)
+            continue
+        __ranges.extend(ranges)
+    return __conditions
 
 class Timer:
     """
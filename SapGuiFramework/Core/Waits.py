@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Callable, Optional
+import time
+
+
+class WaitMode(Enum):
+    READINESS = auto()
+    FIXED = auto()
+    NONE = auto()
+
+
+@dataclass
+class WaitPolicy:
+    """
+    Per-case settings of the ReadinessWaiter.
+
+    READINESS polls the readiness predicate (by default not session.Busy), starting with InitialDelay
+    between polls and multiplying the delay by Backoff up to MaxDelay, until it is ready or Timeout
+    seconds have passed. FIXED sleeps FixedWait seconds, None sleeps 0.0 like the explicit wait decorators
+    (bound to Session.__explicit_wait__ when the class is defined), NONE does not wait.
+    A READINESS wait reads session.Busy at least once per decorated action, use NONE to skip the read.
+    """
+    Mode: WaitMode = WaitMode.READINESS
+    Timeout: float = 30.0
+    InitialDelay: float = 0.005
+    MaxDelay: float = 0.25
+    Backoff: float = 2.0
+    FixedWait: Optional[float] = None
+
+    @staticmethod
+    def from_dict(data: dict) -> "WaitPolicy":
+        """
+        Create a WaitPolicy from a dict using the json data file keys:
+        mode, timeout, initial_delay, max_delay, backoff & fixed_wait
+        """
+        __policy = WaitPolicy()
+        if "mode" in data:
+            __policy.Mode = WaitMode[str(data.get("mode")).upper()]
+        if "timeout" in data:
+            __policy.Timeout = float(data.get("timeout"))
+        if "initial_delay" in data:
+            __policy.InitialDelay = float(data.get("initial_delay"))
+        if "max_delay" in data:
+            __policy.MaxDelay = float(data.get("max_delay"))
+        if "backoff" in data:
+            __policy.Backoff = float(data.get("backoff"))
+        if "fixed_wait" in data:
+            __policy.FixedWait = float(data.get("fixed_wait"))
+        return __policy
+
+
+@dataclass
+class WaitStats:
+    """
+    Counters of a ReadinessWaiter. Every poll of a Session is one session.Busy read.
+    """
+    Waits: int = 0
+    Polls: int = 0
+    Timeouts: int = 0
+    WaitedSeconds: float = 0.0
+
+    def __repr__(self) -> str:
+        return f"class WaitStats<Waits: {self.Waits}, Polls: {self.Polls}, Timeouts: {self.Timeouts}, WaitedSeconds: {self.WaitedSeconds:.3f}>"
+
+
+class ReadinessWaiter:
+    """
+    Waits for SAP GUI to become ready instead of sleeping a fixed time.
+
+    Keyword Arguments:
+        policy {Optional[WaitPolicy]} -- Wait settings, default WaitPolicy() (default: {None})
+        ready {Optional[Callable[[], bool]]} -- Readiness predicate, an exception counts as not ready (default: {None})
+        sleep {Callable[[float], None]} -- Sleep function (default: {time.sleep})
+        clock {Callable[[], float]} -- Monotonic clock (default: {time.perf_counter})
+    """
+    def __init__(
+        self,
+        policy: Optional[WaitPolicy] = None,
+        ready: Optional[Callable[[], bool]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.perf_counter
+        ) -> None:
+        self.policy: WaitPolicy = policy if policy is not None else WaitPolicy()
+        self.ready: Optional[Callable[[], bool]] = ready
+        self.stats: WaitStats = WaitStats()
+        self.__sleep = sleep
+        self.__clock = clock
+
+    @staticmethod
+    def _check(predicate: Callable[[], bool]) -> bool:
+        try:
+            return bool(predicate())
+        except Exception:
+            return False
+
+    def wait_for(self, predicate: Callable[[], bool], timeout: Optional[float] = None) -> bool:
+        """
+        Poll predicate with adaptive back-off until it returns True or the timeout is reached.
+        The first poll is made immediately.
+
+        Arguments:
+            predicate {Callable[[], bool]} -- Condition to wait for
+
+        Keyword Arguments:
+            timeout {Optional[float]} -- Timeout in seconds, default is WaitPolicy.Timeout (default: {None})
+
+        Returns:
+            bool -- Returns True if the predicate returned True otherwise False (timeout)
+        """
+        __timeout = timeout if timeout is not None else self.policy.Timeout
+        __delay = self.policy.InitialDelay
+        __start = self.__clock()
+        try:
+            while True:
+                self.stats.Polls += 1
+                if self._check(predicate):
+                    return True
+                __remaining = __timeout - (self.__clock() - __start)
+                if __remaining <= 0:
+                    self.stats.Timeouts += 1
+                    return False
+                self.__sleep(min(__delay, __remaining))
+                __delay = min(__delay * self.policy.Backoff, self.policy.MaxDelay)
+        finally:
+            self.stats.WaitedSeconds += self.__clock() - __start
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait according to the policy mode, replaces the fixed explicit wait around Session actions.
+
+        Keyword Arguments:
+            timeout {Optional[float]} -- Timeout in seconds, default is WaitPolicy.Timeout (default: {None})
+
+        Returns:
+            bool -- Returns True if SAP GUI is ready otherwise False (timeout)
+        """
+        self.stats.Waits += 1
+        match self.policy.Mode:
+            case WaitMode.NONE:
+                return True
+            case WaitMode.FIXED:
+                __start = self.__clock()
+                self.__sleep(self.policy.FixedWait or 0.0)
+                self.stats.WaitedSeconds += self.__clock() - __start
+                return True
+            case _:
+                if self.ready is None:
+                    return True
+                return self.wait_for(self.ready, timeout=timeout)
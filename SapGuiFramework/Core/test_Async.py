@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from Core.Async import AsyncSession
+from Core.Simulator import SapGuiAutomation
+from Flow.Data import Case
+from Logging.Logging import LoggingConfig
+
+
+def test_async_sessions_run_on_own_com_threads(tmp_path):
+    # given
+    gui = SapGuiAutomation(latency=0.01, busy_time=0.05)
+    log_config = LoggingConfig(LogPath=tmp_path, LogFilename=tmp_path / "async.log")
+
+    async def main():
+        sessions = [
+            await AsyncSession.create(case=Case(Name=f"case_{i}", LogConfig=log_config, ExitOnFail=False, CloseSAPOnCleanup=False), sap_gui=gui)
+            for i in range(2)]
+        for i, sap in enumerate(sessions):
+            await sap.open_connection("DEV", session_number=i)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        tick_task = asyncio.create_task(ticker())
+        await asyncio.gather(*(sap.start_transaction("VA01") for sap in sessions))
+        await asyncio.gather(*(sap.set_text("usr/ctxtVBAK-AUART", f"Z{i}") for i, sap in enumerate(sessions)))
+        ready = await asyncio.gather(*(sap.wait_until_ready() for sap in sessions))
+        values = await asyncio.gather(*(sap.get_value("usr/ctxtVBAK-AUART") for sap in sessions))
+        threads = await asyncio.gather(*(sap.call(lambda s: threading.current_thread().name) for sap in sessions))
+        tick_task.cancel()
+        for sap in sessions:
+            await sap.close()
+        return sessions, ready, values, threads, ticks
+
+    # when
+    sessions, ready, values, threads, ticks = asyncio.run(main())
+
+    # then
+    assert ready == [True, True]
+    assert values == ["Z0", "Z1"]
+    assert len(set(threads)) == 2 and threading.current_thread().name not in threads
+    assert [x.session.session_number for x in sessions] == [0, 1]
+    assert ticks > 10
+
+
+def test_async_session_creates_sap_gui_with_factory_on_worker(tmp_path):
+    # given
+    log_config = LoggingConfig(LogPath=tmp_path, LogFilename=tmp_path / "async.log")
+    created_on = []
+
+    def factory():
+        created_on.append(threading.current_thread().name)
+        return SapGuiAutomation()
+
+    async def main():
+        async with await AsyncSession.create(case=Case(LogConfig=log_config, ExitOnFail=False, CloseSAPOnCleanup=False),
+                                             name="factory_worker", sap_gui_factory=factory) as sap:
+            await sap.open_connection("DEV")
+            return await sap.call(lambda s: threading.current_thread().name)
+
+    # when
+    worker_thread = asyncio.run(main())
+
+    # then
+    assert created_on == [worker_thread]
+    assert worker_thread != threading.current_thread().name
@@ -0,0 +1,26 @@
+from Core.Benchmark import BENCHMARKS, BenchmarkResult, Thresholds, compare, load_baseline, run_benchmarks
+
+
+def test_benchmarks_do_not_use_more_com_calls_than_baseline():
+    # given
+    baseline = load_baseline()
+
+    # when
+    results = run_benchmarks(iterations=2, allocation_iterations=1)
+
+    # then
+    assert [x.Name for x in results] == [x.Name for x in BENCHMARKS]
+    assert all(x.Error is None for x in results if baseline[x.Name].Error is None)
+    assert compare(results, baseline, Thresholds(Seconds=None, PeakBytes=None)) == []
+
+
+def test_compare_reports_metrics_above_threshold():
+    # given
+    baseline = {"set_text": BenchmarkResult(Name="set_text", Seconds=0.01, ComCalls=10, RoundTrips=1, PeakBytes=1000)}
+    results = [BenchmarkResult(Name="set_text", Seconds=0.02, ComCalls=11, RoundTrips=1, PeakBytes=1000)]
+
+    # when
+    regressions = compare(results, baseline)
+
+    # then
+    assert [(x.Metric, x.Baseline, x.Value) for x in regressions] == [("Seconds", 0.01, 0.02), ("ComCalls", 10, 11)]
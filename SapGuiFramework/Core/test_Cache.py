@@ -0,0 +1,79 @@
+import time
+from Core.Cache import TableCache, TableCachePolicy
+from Core.Query import LocalTableReader, QueryPlanner
+from Flow.Columnar import ColumnStore
+
+
+def rows(*values: str) -> ColumnStore:
+    data = ColumnStore(columns=["MATNR"])
+    data.extend({"MATNR": x} for x in values)
+    return data
+
+
+def test_entries_expire_and_are_evicted():
+    # given
+    cache = TableCache(TableCachePolicy(Enabled=True, TTL=60, Tables={"MARD": 0, "T001": 0.05}, MaxEntries=2))
+
+    # when
+    cache.put("mard", "MARD", "GuiGridView", rows("M1"))
+    cache.put("t001", "T001", "GuiGridView", rows("1000"))
+    cache.put("mara 1", "MARA", "GuiGridView", rows("M1"))
+    cache.put("mara 2", "MARA", "GuiGridView", rows("M2"), seconds=1.5)
+    time.sleep(0.06)
+
+    # then
+    assert cache.get("mard") is None
+    assert cache.get("t001") is None
+    assert cache.get("mara 2").data().to_dicts() == [{"MATNR": "M2"}]
+    assert len(cache) == 2 and cache.seconds_saved == 1.5
+    assert (cache.stats.Hits, cache.stats.Misses, cache.stats.Evictions) == (1, 2, 1)
+
+
+def test_invalidate_by_table_and_transaction(new_session):
+    # given
+    _, sap = new_session()
+    sap.table_cache = TableCache(TableCachePolicy(Enabled=True, Invalidate={"MM02": ["MARA", "MARC"]}))
+    for table in ["MARA", "MARC", "T001"]:
+        sap.table_cache.put(table, table, "GuiGridView", rows("M1"))
+
+    # when
+    sap.start_transaction("mm02")
+
+    # then
+    assert [x for x in ["MARA", "MARC", "T001"] if sap.table_cache.get(x) is not None] == ["T001"]
+    assert sap.table_cache.invalidate("t001") == 1 and len(sap.table_cache) == 0
+
+
+def test_cache_is_persisted(tmp_path):
+    # given
+    policy = TableCachePolicy(Enabled=True, Path=tmp_path / "cache" / "tables.jsonl")
+    cache = TableCache(policy)
+    cache.put(("DEV", "100", "SELECT MATNR FROM MARA"), "MARA", "GuiGridView", rows("M1", "M2"))
+
+    # when
+    cache.save()
+    loaded = TableCache(policy)
+
+    # then
+    assert loaded.get(("DEV", "100", "SELECT MATNR FROM MARA")).data().to_dicts() == [{"MATNR": "M1"}, {"MATNR": "M2"}]
+    assert not list((tmp_path / "cache").glob("*.tmp"))
+    policy.Path.write_bytes(b"\x80\x04\x95 not a cache file")
+    assert len(TableCache(policy)) == 0
+
+
+def test_get_table_data_reads_through_cache(new_session):
+    # given
+    _, sap = new_session()
+    reader = LocalTableReader({"MARA": [{"MATNR": f"M{i:06}", "MTART": "FERT"} for i in range(100)]})
+    sap.query_planner = QueryPlanner(reader=reader)
+    sap.table_cache = TableCache(TableCachePolicy(Enabled=True))
+
+    # when
+    first = sap.get_table_data("SELECT MATNR FROM MARA WHERE MTART = 'FERT'")
+    second = sap.get_table_data("select matnr\n  from mara where mtart='FERT'")
+
+    # then
+    assert reader.calls == 1
+    assert second.Data.to_dicts() == first.Data.to_dicts() and len(second.Data) == 100
+    assert second.Data is not first.Data
+    assert (sap.table_cache.stats.Hits, sap.table_cache.stats.Misses) == (1, 1)
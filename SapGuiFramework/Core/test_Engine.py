@@ -0,0 +1,65 @@
+import json
+import pytest
+from Core.Simulator import SapGuiAutomation
+from Core.Runner import SessionRunner
+from Flow.Actions import Step
+from Flow.Data import load_case_from_json_file
+from Flow.Results import Result
+from Logging.Logging import LoggingConfig
+
+
+STEPS = [
+    {"action": "start_transaction", "args": ["VA01"]},
+    {"action": "set_text", "element_id": "usr/ctxtVBAK-AUART", "kwargs": {"text": "OR"}},
+    {"action": "enter"},
+    {"action": "get_value", "id": "usr/ctxtVBAK-AUART"},
+]
+
+
+def load_case(tmp_path, steps, **data):
+    data_file = tmp_path / "case.json"
+    data_file.write_text(json.dumps({"case_name": "engine", "exit_on_fail": False, "steps": steps, **data}))
+    case = load_case_from_json_file(str(data_file))
+    case.LogConfig = LoggingConfig(LogPath=tmp_path, LogFilename=tmp_path / "engine.log")
+    return case
+
+
+def test_json_case_steps_run_with_return_values(tmp_path):
+    # given
+    gui = SapGuiAutomation()
+    case = load_case(tmp_path, STEPS)
+
+    # when
+    report = SessionRunner("DEV", sessions=1, sap_gui=gui).run([case])
+
+    # then
+    results = report.Runs[0].ReturnValue
+    assert [x.Result for x in results] == [Result.PASS] * 4
+    assert results[3].ReturnValue == "OR"
+    assert gui.application.Connections[0].Sessions[0].vkeys == [0]
+    assert case.Steps[0].Status.Result == Result.PASS
+
+
+def test_steps_are_validated_before_the_first_step_runs(tmp_path):
+    gui = SapGuiAutomation()
+    case = load_case(tmp_path, STEPS + [{"action": "no_such_action"}, {"action": "set_text", "kwargs": {"txt": "OR"}}])
+    report = SessionRunner("DEV", sessions=1, sap_gui=gui).run([case])
+    assert report.Runs[0].Result == Result.FAIL
+    assert "Step 4 (no_such_action): Unknown action" in report.Runs[0].Error
+    assert "Step 5 (set_text)" in report.Runs[0].Error
+    assert gui.application.Connections[0].Sessions[0].vkeys == []
+
+
+def fail() -> None:
+    raise RuntimeError("step failed")
+
+
+@pytest.mark.parametrize("continue_on_fail, executed", [(False, 2), (True, 3)])
+def test_continue_on_fail(tmp_path, continue_on_fail, executed):
+    gui = SapGuiAutomation()
+    case = load_case(tmp_path, [STEPS[0], STEPS[2]], continue_on_fail=continue_on_fail)
+    case.Steps.insert(1, Step(Action=fail))
+    results = SessionRunner("DEV", sessions=1, sap_gui=gui).run([case]).Runs[0].ReturnValue
+    assert len(results) == executed
+    assert results[1].Result == Result.FAIL
+    assert results[1].Error == "RuntimeError: step failed"
@@ -0,0 +1,61 @@
+import pytest
+from Core.Export import iter_export_rows, iter_unconverted_rows, write_export
+
+
+def test_unconverted_rows_are_sliced_by_header_bounds():
+    # given
+    lines = [
+        "18.10.2026              Dynamic List Display              1",
+        "",
+        "---------------------------",
+        "|Material |Plant|Text     |",
+        "---------------------------",
+        "|M000001  |1000 |a | b    |",
+        "---------------------------",
+        "18.10.2026              Dynamic List Display              2",
+        "---------------------------",
+        "|Material |Plant|Text     |",
+        "---------------------------",
+        "|M000002  |     |         |",
+        "---------------------------",
+    ]
+
+    # when
+    rows = list(iter_unconverted_rows(lines, columns=["MATNR"]))
+
+    # then
+    assert rows == [
+        {"MATNR": "M000001", "Plant": "1000", "Text": "a | b"},
+        {"MATNR": "M000002", "Plant": "", "Text": ""},
+    ]
+
+
+@pytest.mark.parametrize("export_format, codepage", [("unconverted", "4110"), ("spreadsheet", "4103"), ("unconverted", "1160")])
+def test_grid_is_exported_to_local_file_and_read(new_session, export_format, codepage):
+    # given
+    gui, sap = new_session()
+    case = sap.case
+    rows = [[f"M{i:06}", "1000", f"Größe {i}"] for i in range(2000)]
+    sap.session.add_grid("wnd[0]/usr/cntlGRID1/shellcont/shell", ["MATNR", "WERKS", "MAKTX"], rows)
+
+    # when
+    gui.stats.reset()
+    table = sap.export_table_values("wnd[0]/usr/cntlGRID1/shellcont/shell", export_format=export_format, codepage=codepage)
+
+    # then
+    assert table.Columns == ["MATNR", "WERKS", "MAKTX"]
+    assert [list(x.values()) for x in table.Data.to_dicts()] == rows
+    assert gui.stats.ServerRoundTrips < 10
+    assert not table.TableObject.exists()
+    assert sap.case.Steps[-1].Status.Result.value == "pass"
+
+
+def test_export_rows_stop_at_number_rows(tmp_path):
+    # given
+    path = write_export(tmp_path / "export.txt", ["A", "B"], [[str(i), "x"] for i in range(10)], export_format="spreadsheet")
+
+    # when
+    rows = list(iter_export_rows(path, export_format="spreadsheet", number_rows=3))
+
+    # then
+    assert rows == [{"A": "0", "B": "x"}, {"A": "1", "B": "x"}, {"A": "2", "B": "x"}]
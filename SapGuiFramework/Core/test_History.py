@@ -0,0 +1,47 @@
+from Core.History import HistoryPolicy, RunHistory
+from Flow.Actions import Step
+from Flow.Results import Result, ResultStep
+
+
+def test_session_runs_are_written_to_history(tmp_path, new_session):
+    # given
+    def run(name):
+        _, sap = new_session(Name=name, HistoryConfig=HistoryPolicy(Path=tmp_path / "history.db"))
+        case = sap.case
+        sap.start_transaction("VA01")
+        sap.set_text("usr/ctxtVBAK-AUART", "OR")
+        sap.cleanup()
+
+    # when
+    run("create_order")
+    run("create_order")
+
+    # then
+    history = RunHistory(tmp_path / "history.db")
+    steps = history.timings(group_by=("case", "step"), case="create_order")
+    assert [x.Key[1] for x in steps] == ["Open Connection", "Set Text", "Start Transaction"]
+    assert all(x.Count == 2 and x.P50 >= 0 for x in steps)
+    assert [x.Key for x in history.timings(group_by=("transaction",), transaction="VA01")] == [("VA01",)]
+
+
+def test_regressions_compare_steps_with_earlier_runs(tmp_path):
+    # given
+    history = RunHistory(tmp_path / "history.db", flush_every=3)
+    step = Step(Action="press", Name="Save", Transaction="VA01", Status=ResultStep(Result=Result.PASS))
+    other = Step(Action="set_text", Name="Order Type", Transaction="VA01", Status=ResultStep(Result=Result.PASS))
+    for seconds in (1.0, 1.1, 0.9, 1.0, 1.2, 1.0):
+        history.start_run("create_order")
+        history.add("create_order", 0, other, 0.1)
+        history.add("create_order", 1, step, seconds)
+
+    # when
+    history.start_run("create_order")
+    history.add("create_order", 0, other, 0.11)
+    history.add("create_order", 1, step, 2.5)
+    regressions = history.regressions(factor=1.5, min_samples=5)
+
+    # then
+    assert [(x.Step, x.Baseline, x.Samples) for x in regressions] == [("Save", 1.0, 6)]
+    assert regressions[0].Ratio == 2.5
+    stats = history.timings(group_by=("step",))
+    assert [(x.Key, x.Count, x.P50, x.P99) for x in stats] == [(("Order Type",), 7, 0.1, 0.11), (("Save",), 7, 1.0, 2.5)]
@@ -0,0 +1,25 @@
+from Core.Simulator import SapGuiAutomation
+
+
+def test_step_time_is_split_into_server_framework_and_client(new_session):
+    # given
+    _, sap = new_session(gui=SapGuiAutomation(server_latency=0.02), Name="create_order")
+    case = sap.case
+    sap.start_transaction("VA01")
+
+    # when
+    sap.send_vkeys(["ENTER", "ENTER"])
+    sap.set_text("usr/ctxtVBAK-AUART", "OR")
+    sap.wait(0.05)
+    sap.cleanup()
+
+    # then
+    vkeys, text = [x.Latency for x in sap.case.Steps[-2:]]
+    assert vkeys.RoundTrips == 2 and vkeys.ServerSeconds >= 0.04
+    assert vkeys.Seconds >= vkeys.ServerSeconds + vkeys.OverheadSeconds
+    assert text.RoundTrips == 0 and text.ServerSeconds == 0
+    assert text.Transaction == "VA01"
+    totals = {x.Key: x for x in sap.latency.totals("transaction")}
+    assert totals["VA01"].Steps == 2 and totals["VA01"].RoundTrips == 2
+    assert [x.Key for x in sap.latency.totals("case")] == ["create_order"]
+    assert sap.latency.totals("case")[0].Blame == "server"
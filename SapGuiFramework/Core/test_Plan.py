@@ -0,0 +1,63 @@
+import json
+from Core.Plan import CasePlan, PlanCache, compile_case, resolve_id
+from Core.Runner import SessionRunner
+from Core.Simulator import SapGuiAutomation
+from Flow.Actions import Step
+from Flow.Data import Case
+from Flow.Results import Result
+from Logging.Logging import LoggingConfig
+
+
+STEPS = [
+    {"action": "start_transaction", "args": ["VA01"]},
+    {"action": "set_text", "element_id": "usr/ctxtVBAK-AUART", "kwargs": {"text": "OR"}},
+    {"action": "get_value", "args": ["/usr/ctxtVBAK-AUART"]},
+    {"action": "send_vkey", "kwargs": {"vkey": "Ctrl + S"}},
+    {"action": "set_focus_of_element", "kwargs": {"id": "wnd[0]/usr/ctxtVBAK-AUART"}},
+]
+
+
+def test_resolve_id():
+    assert resolve_id() == "/app/con[0]/ses[0]/wnd[0]"
+    assert resolve_id("usr/txtA", 1, 2, 3) == "/app/con[1]/ses[2]/wnd[3]/usr/txtA"
+    assert resolve_id("/tbar[0]/btn[3]", session_number=4) == "/app/con[0]/ses[4]/wnd[0]/tbar[0]/btn[3]"
+    assert resolve_id("wnd[1]/usr/txtA", 0, 5) == "/app/con[0]/ses[5]/wnd[1]/usr/txtA"
+    assert resolve_id("ses[1]/wnd[0]", 2) == "/app/con[2]/ses[1]/wnd[0]"
+    assert resolve_id("/app/con[0]/ses[0]/wnd[0]/usr") == "/app/con[0]/ses[0]/wnd[0]/usr"
+
+
+def test_compile_case_resolves_and_dedupes_ids():
+    # given
+    case = Case(Name="plan", Steps=[Step.from_dict(x) for x in STEPS])
+
+    # when
+    plan = compile_case(case, session_number=2)
+
+    # then
+    full_id = "/app/con[0]/ses[2]/wnd[0]/usr/ctxtVBAK-AUART"
+    assert plan.ElementIds == (full_id,)
+    assert plan.Steps[1].ElementId == full_id and plan.Steps[1].ElementIndex == 0
+    assert plan.Steps[2].Args == (full_id,)
+    assert plan.Steps[2].Args[0] is plan.Steps[4].Kwargs[0][1]
+    assert plan.Steps[3].Kwargs == (("vkey", 11),)
+    assert plan.retarget(0, 2) is plan
+    assert plan.retarget(0, 3).ElementIds == ("/app/con[0]/ses[3]/wnd[0]/usr/ctxtVBAK-AUART",)
+
+
+def test_plan_cache_runs_cached_plan(tmp_path):
+    # given
+    data_file = tmp_path / "case.json"
+    data_file.write_text(json.dumps({"case_name": "cached", "exit_on_fail": False, "steps": STEPS[:3]}))
+    cache = PlanCache(tmp_path / "plans")
+    compiled = cache.load(data_file)
+
+    # when
+    plan = cache.load(data_file)
+    plan.Case.LogConfig = LoggingConfig(LogPath=tmp_path, LogFilename=tmp_path / "plan.log")
+    report = SessionRunner("DEV", sessions=1, sap_gui=SapGuiAutomation()).run([plan])
+
+    # then
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert isinstance(plan, CasePlan) and plan == compiled and plan is not compiled
+    assert [x.Result for x in report.Runs[0].ReturnValue] == [Result.PASS] * 3
+    assert report.Runs[0].ReturnValue[2].ReturnValue == "OR"
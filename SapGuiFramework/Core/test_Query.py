@@ -0,0 +1,95 @@
+from Core.Query import LocalTableReader, QueryPlanner, rfc_options
+from Core.Utilities import SelectionRange
+
+
+def test_plans_are_cached_by_normalized_statement():
+    # given
+    planner = QueryPlanner(maxsize=2)
+
+    # when
+    plan = planner.plan("select top 5 matnr from mara where maktx = 'Bolt M8'")
+    same = planner.plan("SELECT TOP 5 MATNR\n  FROM MARA WHERE MAKTX='Bolt M8';")
+    planner.plan("SELECT MATNR FROM MARA WHERE MAKTX = 'BOLT M8'")
+    planner.plan("SELECT * FROM MARC")
+
+    # then
+    assert same is plan
+    assert (plan.Table, plan.Fields, plan.Top, plan.Conditions) == ("MARA", ["MATNR"], 5, {"MAKTX": [SelectionRange("I", "EQ", "Bolt M8")]})
+    assert (planner.stats.Hits, planner.stats.Misses, len(planner)) == (1, 3, 2)
+
+
+def test_large_in_list_is_split_into_chunks():
+    # given
+    planner = QueryPlanner(strategies=["se16"])
+    keys = [f"M{i:06}" for i in range(7000)]
+
+    # when
+    plan = planner.plan(f"SELECT MATNR FROM MARA WHERE MATNR IN ({', '.join(repr(x) for x in keys)}) AND MTART <> 'DIEN'")
+    chunks = list(plan.chunks())
+
+    # then
+    assert plan.Executions == len(chunks) == 3
+    assert [x.Low for chunk in chunks for x in chunk["MATNR"] if x.Sign == "I"] == keys
+    assert all(len(chunk["MATNR"]) <= 3000 and chunk["MTART"] == [SelectionRange("E", "EQ", "DIEN")] for chunk in chunks)
+
+
+def test_strategy_is_chosen_by_estimated_round_trips():
+    # given
+    planner = QueryPlanner(strategies=["se16n", "se16"])
+
+    # when
+    se16n = planner.plan("SELECT MATNR, WERKS FROM MARC WHERE WERKS IN ('1000', '2000')")
+    se16 = planner.plan("SELECT MATNR, WERKS FROM MARC WHERE LABST > '0'")
+
+    # then
+    assert (se16n.Strategy, se16.Strategy) == ("se16n", "se16")
+    assert se16n.RoundTrips < QueryPlanner(strategies=["se16"]).plan("SELECT MATNR, WERKS FROM MARC WHERE WERKS IN ('1000', '2000')").RoundTrips
+
+
+def test_rfc_options_do_not_split_values():
+    # given
+    conditions = {"MATNR": [SelectionRange("I", "EQ", f"MATERIAL {i:04}") for i in range(20)], "LVORM": [SelectionRange("E", "EQ", "X")]}
+
+    # when
+    options = rfc_options(conditions)
+
+    # then
+    assert all(len(x) <= 72 and x.count("'") % 2 == 0 for x in options)
+    assert " ".join(options).startswith("MATNR IN ('MATERIAL 0000', 'MATERIAL 0001',")
+    assert " ".join(options).endswith("AND NOT LVORM = 'X'")
+
+
+def test_get_table_data_reads_chunks_with_table_reader(new_session):
+    # given
+    gui, sap = new_session()
+    reader = LocalTableReader({"MARA": [{"MATNR": f"M{i:06}", "MTART": "FERT" if i % 2 else "DIEN"} for i in range(5000)]})
+    sap.query_planner = QueryPlanner(reader=reader)
+    keys = [f"M{i:06}" for i in range(1, 5000, 2)] + [f"M{i:06}" for i in range(0, 5000, 2)]
+
+    # when
+    gui.stats.reset()
+    table = sap.get_table_data(f"SELECT TOP 2000 MATNR FROM MARA WHERE MATNR IN ({', '.join(repr(x) for x in keys)}) AND MTART <> 'DIEN'")
+
+    # then
+    assert table.Columns == ["MATNR"]
+    assert len(table.Data) == 2000
+    assert reader.calls == 2
+    assert gui.stats.ServerRoundTrips == 0
+
+
+def test_get_table_data_with_se16n(new_session):
+    # given
+    gui, sap = new_session()
+    simulated = gui.GetScriptingEngine.Children(0).Children(0)
+    fields = ["MANDT", "MATNR", "WERKS", "PSTAT", "LVORM", "MMSTA"] * 5
+    simulated.add_table_control("wnd[0]/usr/tblSAPLSE16NSELFIELDS_TC", ["GS_SELFIELDS-FIELDNAME"], [[f"{x}{i // 6 or ''}"] for i, x in enumerate(fields)], visible_rows=10)
+    simulated.add_grid("wnd[0]/usr/cntlRESULT_LIST/shellcont/shell", ["MATNR", "WERKS"], [["M000001", "1000"]])
+    sap.query_planner = QueryPlanner(strategies=["se16n"])
+
+    # when
+    table = sap.get_table_data("SELECT MATNR, WERKS FROM MARC WHERE MATNR IN ('M000001', 'M000002') AND WERKS = '1000' AND MMSTA4 NOT LIKE 'Z%'")
+
+    # then
+    assert table.Data.to_dicts() == [{"MATNR": "M000001", "WERKS": "1000"}]
+    assert simulated.selections == {"PUSH[4,0]": {"SIVA": ["M000001", "M000002"], "NOSV": ["Z*"]}}
+    assert simulated.findById("wnd[0]/usr/tblSAPLSE16NSELFIELDS_TC/ctxtGS_SELFIELDS-LOW[2,2]").Text == "1000"
@@ -0,0 +1,121 @@
+import os
+from Core.Simulator import SapGuiAutomation
+from Core.Runner import Logon, LogonPool, SessionRunner
+from Flow.Data import Case
+from Flow.Results import Result
+from Logging.Logging import LoggingConfig
+
+
+def test_session_runner_spreads_cases_over_sessions(tmp_path):
+    # given
+    gui = SapGuiAutomation(server_latency=0.005)
+    log_config = LoggingConfig(LogPath=tmp_path, LogFilename=tmp_path / "runner.log")
+    cases = [Case(Name=f"case_{i}", LogConfig=log_config, ExitOnFail=False) for i in range(8)]
+
+    def task(sap):
+        sap.enter()
+        if sap.case.Name == "case_3":
+            raise RuntimeError("broken case")
+        return sap.session.Id
+
+    # when
+    report = SessionRunner("DEV", sessions=3, sap_gui=gui).run(cases, task)
+
+    # then
+    assert report.Workers == 3
+    assert [x.Case.Name for x in report.Runs] == [x.Name for x in cases]
+    assert {x.ReturnValue for x in report.Runs if x.ReturnValue} == {f"/app/con[0]/ses[{i}]" for i in range(3)}
+    assert report.Runs[3].Result == Result.FAIL and "broken case" in report.Runs[3].Error
+    assert report.Passed == 7
+    assert report.Result.Result == Result.FAIL
+    assert len(gui.application.Connections) == 1
+
+
+
+def test_session_runner_takes_cases_as_sessions_become_free(tmp_path):
+    # given
+    gui = SapGuiAutomation()
+    log_config = LoggingConfig(LogPath=tmp_path, LogFilename=tmp_path / "runner.log")
+    started: list[int] = []
+    finished: list[int] = []
+
+    def cases():
+        for i in range(30):
+            # at most the queued cases (2 per session) & the running cases are ahead of the finished cases
+            assert i - len(finished) <= 3 * 2 + 3
+            started.append(i)
+            yield Case(Name=f"case_{i}", LogConfig=log_config, ExitOnFail=False)
+
+    def task(sap):
+        sap.enter()
+        finished.append(sap.case.Name)
+        if sap.case.Name == "case_5":
+            raise RuntimeError("broken case")
+
+    # when
+    report = SessionRunner("DEV", sessions=3, sap_gui=gui).run(cases(), task, keep_runs=False)
+
+    # then
+    assert len(started) == report.Cases == 30
+    assert [x.Case.Name for x in report.Runs] == ["case_5"]
+    assert (report.Passed, report.Failed, report.Result.Result) == (29, 1, Result.FAIL)
+
+
+def crash_on_case_2(sap):
+    sap.enter()
+    if sap.case.Name == "case_2":
+        os._exit(3)
+    return os.getpid()
+
+
+def test_logon_pool_isolates_crashed_worker(tmp_path):
+    # given
+    log_config = LoggingConfig(LogPath=tmp_path, LogFilename=tmp_path / "pool.log")
+    logons = [Logon("DEV", SapGui=SapGuiAutomation, LogConfig=log_config), Logon("QAS", SapGui=SapGuiAutomation, LogConfig=log_config)]
+    cases = [Case(Name=f"case_{i}", LogConfig=log_config, ExitOnFail=False) for i in range(6)]
+
+    # when
+    report = LogonPool(logons, heartbeat_interval=0.2, retries=1).run(cases, crash_on_case_2)
+
+    # then
+    # the crash is detected by the closed pipe (lost) or the exit code, whichever comes first
+    assert report.Runs[2].Result == Result.FAIL and ("lost" in report.Runs[2].Error or "exited" in report.Runs[2].Error)
+    assert report.Passed == 5
+    assert report.Restarts >= 1
+    assert len({x.ReturnValue for x in report.Runs if x.ReturnValue}) >= 2
+
+
+class BrokenPipeConn:
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    def send(self, message) -> None:
+        raise BrokenPipeError("worker died")
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+class FirstStartBreaksPipe(LogonPool):
+    def _start(self, worker, task) -> None:
+        super()._start(worker, task)
+        if worker.Restarts == 0:
+            worker.Conn = BrokenPipeConn(worker.Conn)
+
+
+def enter(sap):
+    sap.enter()
+    return os.getpid()
+
+
+def test_logon_pool_recovers_worker_lost_before_dispatch(tmp_path):
+    # given
+    log_config = LoggingConfig(LogPath=tmp_path, LogFilename=tmp_path / "pool.log")
+    cases = [Case(Name=f"case_{i}", LogConfig=log_config, ExitOnFail=False) for i in range(3)]
+
+    # when
+    report = FirstStartBreaksPipe([Logon("DEV", SapGui=SapGuiAutomation, LogConfig=log_config)], heartbeat_interval=0.2).run(cases, enter)
+
+    # then
+    assert report.Restarts == 1
+    assert report.Passed == 3 and report.Result.Result == Result.PASS
@@ -0,0 +1,117 @@
+import io
+import time
+import pytest
+import Core.Screenshots
+from Core.Imaging import decode_png
+from Core.Screenshots import ScreenshotPipeline, ScreenshotPolicy, ScreenshotStore, recompress_png
+from Core.Simulator import SapGuiAutomation
+
+
+@pytest.mark.parametrize("hard_copy_to_memory", [True, False])
+def test_step_screenshots_are_stored_by_reference(tmp_path, new_session, hard_copy_to_memory):
+    # given
+    _, sap = new_session(gui=SapGuiAutomation(hard_copy_to_memory=hard_copy_to_memory), ScreenShotOnPass=True, ScreenshotConfig=ScreenshotPolicy(StorePath=tmp_path / "shots"))
+    case = sap.case
+
+    # when
+    sap.start_transaction("VA01")
+    sap.set_text("usr/ctxtVBAK-AUART", "OR")
+    sap.set_text("usr/ctxtVBAK-AUART", "OR")
+    sap.cleanup()
+
+    # then
+    refs = case.Status.PassedScreenShots
+    assert len(refs) > 3 and all(x.done and x.Error is None for x in refs)
+    assert sap.screenshots.stats.Duplicates > 0
+    assert sap.screenshots.stats.Stored == len({x.Digest for x in refs})
+    assert refs[-1].Path.parent.parent == tmp_path / "shots"
+    assert refs[-1].read().startswith(b"\x89PNG")
+
+
+def test_pipeline_drops_when_full_without_blocking(tmp_path):
+    # given
+    png = SapGuiAutomation().GetScriptingEngine.OpenConnection("DEV", True).children(0)._render()
+    pipeline = ScreenshotPipeline(ScreenshotStore(tmp_path), ScreenshotPolicy(Workers=1, QueueSize=0, Block=False))
+
+    # when
+    refs = [pipeline.submit(f"shot_{i}", data=png) for i in range(50)]
+    pipeline.close()
+
+    # then
+    assert pipeline.stats.Dropped + pipeline.stats.Stored + pipeline.stats.Duplicates == 50
+    assert pipeline.stats.Stored == 1
+    assert all(x.done for x in refs)
+    assert len(recompress_png(png, 9)) <= len(png)
+
+
+def test_dedup_stores_unchanged_frames_as_references_and_changes_as_deltas(tmp_path):
+    # given
+    pytest.importorskip("PIL")
+    gui = SapGuiAutomation()
+    session = gui.GetScriptingEngine.OpenConnection("DEV", True).children(0)
+    pipeline = ScreenshotPipeline(ScreenshotStore(tmp_path), ScreenshotPolicy(Dedup=True, BlockSize=8))
+    frames = [session._render()]
+    frames.append(session._render())
+    session.findById("wnd[0]/usr/txtA").text = "A"
+    frames.append(session._render())
+    session.findById("wnd[0]/usr/txtA").text = "B"
+    frames.append(session._render())
+
+    # when
+    refs = [pipeline.submit(f"shot_{i}", data=x) for i, x in enumerate(frames)]
+    pipeline.close()
+
+    # then
+    assert [(x.Kind, x.Unchanged) for x in refs] == [("full", False), ("full", True), ("delta", False), ("delta", False)]
+    assert refs[2].BaseDigest == refs[0].Digest and refs[2].Box[2:] == (8, 8)
+    assert all(decode_png(x.image()) == decode_png(y) for x, y in zip(refs, frames))
+    assert (pipeline.stats.Keyframes, pipeline.stats.Unchanged, pipeline.stats.Deltas) == (1, 1, 2)
+    assert pipeline.stats.SavedBytes > sum(len(x) for x in frames[1:]) // 2
+
+
+def test_dedup_of_full_size_frames_keeps_every_capture(tmp_path):
+    # given
+    pil = pytest.importorskip("PIL.Image")
+    draw = pytest.importorskip("PIL.ImageDraw")
+    frames = []
+    for i in range(20):
+        image = pil.new("RGB", (1280, 800), (240, 240, 240))
+        canvas = draw.Draw(image)
+        for y in range(0, 800, 20):
+            canvas.text((10, y), f"Material M{y:06}  Plant 1000  Quantity {y * 7}", fill=(0, 0, 0))
+        canvas.text((600, 400), f"Order {i // 5}", fill=(0, 0, 0))
+        data = io.BytesIO()
+        image.save(data, "PNG")
+        frames.append(data.getvalue())
+    pipeline = ScreenshotPipeline(ScreenshotStore(tmp_path), ScreenshotPolicy(Dedup=True))
+
+    # when
+    start = time.perf_counter()
+    refs = [pipeline.submit(f"shot_{i}", data=x) for i, x in enumerate(frames)]
+    submit_seconds = time.perf_counter() - start
+    pipeline.close()
+
+    # then
+    processed = pipeline.stats.Keyframes + pipeline.stats.Unchanged + pipeline.stats.Deltas
+    assert pipeline.dedup and pipeline.block
+    assert submit_seconds < 0.5
+    assert processed == 20 and pipeline.stats.Dropped == 0 and pipeline.stats.Unchanged > 0
+    assert pipeline.stats.ProcessSeconds / processed < 0.5
+    assert all(x.done for x in refs)
+
+
+def test_dedup_without_pillow_stores_identical_captures_once(tmp_path, monkeypatch):
+    # given
+    monkeypatch.setattr(Core.Screenshots, "Image", None)
+    gui = SapGuiAutomation()
+    frame = gui.GetScriptingEngine.OpenConnection("DEV", True).children(0)._render()
+    pipeline = ScreenshotPipeline(ScreenshotStore(tmp_path), ScreenshotPolicy(Dedup=True))
+
+    # when
+    refs = [pipeline.submit(f"shot_{i}", data=frame) for i in range(3)]
+    pipeline.close()
+
+    # then
+    assert not pipeline.dedup
+    assert len({x.Digest for x in refs}) == 1 and all(x.Kind == "full" and not x.Unchanged for x in refs)
+    assert (pipeline.stats.Stored, pipeline.stats.Duplicates) == (1, 2)
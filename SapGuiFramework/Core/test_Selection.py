@@ -0,0 +1,52 @@
+import pytest
+from Core.Query import QueryPlanner
+from Core.Selection import read_clipboard, write_clipboard
+from Core.Utilities import SelectionRange, parse_sql_conditions, parse_sql_select
+
+
+def test_where_clause_is_parsed_into_selection_ranges():
+    # given
+    _, _, _, where = parse_sql_select(
+        "SELECT MATNR FROM MARC WHERE WERKS IN ('1000', '2000') AND MATNR NOT IN ('A') AND LVORM <> 'X' "
+        "AND ERSDA >= '20200101' AND ERSDA <= '20201231' AND MMSTA NOT BETWEEN '01' AND '05' AND MAKTX LIKE 'M%_'")
+
+    # when
+    conditions = parse_sql_conditions(where)
+
+    # then
+    assert conditions == {
+        "WERKS": [SelectionRange("I", "EQ", "1000"), SelectionRange("I", "EQ", "2000")],
+        "MATNR": [SelectionRange("E", "EQ", "A")],
+        "LVORM": [SelectionRange("E", "EQ", "X")],
+        "ERSDA": [SelectionRange("I", "BT", "20200101", "20201231")],
+        "MMSTA": [SelectionRange("E", "BT", "01", "05")],
+        "MAKTX": [SelectionRange("I", "CP", "M*+")],
+    }
+
+
+@pytest.mark.parametrize("where", ["A = '1' OR B = '2'", "A = '1' AND A = '2'", "A IS NULL"])
+def test_unsupported_where_clause_raises(where):
+    with pytest.raises(ValueError):
+        parse_sql_conditions(where.split())
+
+
+def test_value_list_is_uploaded_in_one_multiple_selection(new_session):
+    # given
+    gui, sap = new_session()
+    sap.query_planner = QueryPlanner(max_values={"se16": 5000})
+    keys = [f"M{i:06}" for i in range(5000)]
+    statement = f"SELECT MATNR FROM MARA WHERE MATNR IN ({', '.join(repr(x) for x in keys)}) AND MTART <> 'DIEN' AND MATKL BETWEEN '001' AND '009'"
+
+    write_clipboard("copied by the user")
+
+    # when
+    gui.stats.reset()
+    sap.get_table_data(statement)
+
+    # then
+    assert sap.session.selections["I1"] == {"SIVA": keys}
+    assert sap.session.selections["I2"] == {"NOSV": ["DIEN"]}
+    assert "I3" not in sap.session.selections
+    assert (sap.session.findById("wnd[0]/usr/ctxtI3-LOW").Text, sap.session.findById("wnd[0]/usr/ctxtI3-HIGH").Text) == ("001", "009")
+    assert gui.stats.ServerRoundTrips < 100
+    assert read_clipboard() == "copied by the user"
@@ -0,0 +1,173 @@
+import pytest
+from Core.Simulator import SapGuiAutomation, ComError
+from Core.Cache import CacheStats
+from Core.Metadata import DIALOG_STEP_FIELDS, VOLATILE_FIELDS
+
+
+def test_open_connection_creates_session():
+    # given
+    gui = SapGuiAutomation()
+    app = gui.GetScriptingEngine
+
+    # when
+    conn = app.OpenConnection("DEV", True)
+
+    # then
+    assert len(app.connections) == 1
+    assert conn.Description == "DEV"
+    assert conn.sessions[0].Id == "/app/con[0]/ses[0]"
+    assert conn.children(0).findById("wnd[0]").Type == "GuiMainWindow"
+
+
+def test_connection_numbers_past_nine():
+    # given
+    app = SapGuiAutomation().GetScriptingEngine
+
+    # when
+    connections = [app.OpenConnection("DEV", True) for _ in range(12)]
+
+    # then
+    assert [x.Id for x in connections[9:]] == ["/app/con[9]", "/app/con[10]", "/app/con[11]"]
+
+
+def test_com_calls_are_counted_case_insensitive():
+    # given
+    gui = SapGuiAutomation()
+    session = gui.GetScriptingEngine.OpenConnection("DEV").Sessions[0]
+    session.add_element("wnd[0]/usr/ctxtVBAK-AUART")
+    gui.stats.reset()
+
+    # when
+    field = session.findById("wnd[0]/usr/ctxtVBAK-AUART")
+    field.text = "OR"
+
+    # then
+    assert field.Text == "OR"
+    assert field.Type == "GuiCTextField"
+    assert gui.stats.Calls == 4
+    assert gui.stats.Sets == 1
+    assert gui.stats.ByMember[("GuiSession", "FindById")] == 1
+
+
+def test_unknown_element_raises_without_auto_create():
+    gui = SapGuiAutomation(auto_create=False)
+    session = gui.GetScriptingEngine.OpenConnection("DEV").Sessions[0]
+    with pytest.raises(ComError):
+        session.findById("wnd[0]/usr/txtMISSING")
+
+
+def test_grid_view_scrolling_loads_blocks():
+    # given
+    gui = SapGuiAutomation()
+    session = gui.GetScriptingEngine.OpenConnection("DEV").Sessions[0]
+    grid = session.add_grid("wnd[0]/usr/cntlGRID/shellcont/shell", ["MATNR", "WERKS"], [[str(i), "1000"] for i in range(100)], visible_rows=25)
+
+    # when
+    grid.firstVisibleRow = 50
+    value = grid.GetCellValue(60, "MATNR")
+
+    # then
+    assert value == "60"
+    assert grid.SubType == "GridView"
+    assert grid.ColumnCount == 2
+    assert session.info.RoundTrips == 1
+
+
+def test_table_control_rows_follow_scrollbar():
+    gui = SapGuiAutomation()
+    session = gui.GetScriptingEngine.OpenConnection("DEV").Sessions[0]
+    table = session.add_table_control("wnd[0]/usr/tblSAPDV70ATC_NAST3", ["KSCHL", "SPRAS"], [[f"Z{i:03d}", "EN"] for i in range(12)], visible_rows=5)
+    table.verticalScrollbar.position = 10
+    rows = [row for row in table.Rows]
+    assert len(rows) == 2
+    assert rows[0].ElementAt(0).Text == "Z010"
+
+
+def test_session_uses_injected_sap_gui(new_session):
+    # given
+    gui, sap = new_session(connect=False)
+
+    # when
+    sap.open_connection(connection_name="DEV")
+
+    # then
+    assert sap.sap_app is gui.GetScriptingEngine
+    assert sap.session.Id == "/app/con[0]/ses[0]"
+    assert gui.stats.Calls > 0
+
+
+def test_session_element_cache_hits_until_screen_change(new_session):
+    # given
+    _, sap = new_session()
+    sap.element_cache.stats = CacheStats()
+
+    # when
+    for _ in range(3):
+        sap.is_element("usr/ctxtVBAK-AUART")
+    sap.session.set_screen("SAPMV45A", 4001)
+    sap.send_vkey("ENTER")
+    sap.is_element("usr/ctxtVBAK-AUART")
+
+    # then
+    assert sap.element_cache.stats.Hits == 2
+    assert sap.element_cache.stats.Misses == 2
+    assert sap.element_cache.stats.Invalidations >= 1
+
+
+def test_send_vkeys_sends_sequence_as_one_step(new_session):
+    # given
+    _, sap = new_session()
+    case = sap.case
+    steps = len(case.Steps)
+
+    # when
+    sap.send_vkeys(["Enter", "Control + S", "esc", "shift+ctrl+f1", 8])
+    sap.send_vkeys(["Enter", "Ctrl + Q"])
+
+    # then
+    assert sap.session.vkeys == [0, 11, 12, 37, 8]
+    assert len(case.Steps) == steps + 2
+    assert len(case.Status.FailedSteps) == 1
+
+
+def test_send_vkey_does_not_send_an_invalid_vkey(new_session):
+    # given
+    _, sap = new_session()
+    case = sap.case
+    passed = case.Status.Passed
+
+    # when
+    sap.send_vkey("999")
+
+    # then
+    assert sap.session.vkeys == []
+    assert (case.Status.Passed, case.Status.Failed) == (passed, 1)
+
+
+def test_step_metadata_is_shared_until_a_round_trip(new_session):
+    # given
+    _, sap = new_session()
+    case = sap.case
+    sap.start_transaction("VA01")
+    reads = sap.meta_data.stats.Reads
+
+    # when
+    sap.set_text("usr/ctxtVBAK-AUART", "OR")
+    sap.set_text("usr/ctxtVBAK-VKORG", "1000")
+    sap.send_vkey("ENTER")
+    sap.set_text("usr/ctxtVBAK-VKORG", "2000")
+    sap.start_transaction("VA02")
+    sap.send_vkey("ENTER")
+    sap.set_text("usr/ctxtVBAK-VKORG", "3000")
+
+    # then
+    steps = case.Steps[-7:]
+    assert steps[0].MetaData is steps[1].MetaData
+    assert steps[2].MetaData is steps[1].MetaData
+    assert steps[3].MetaData is not steps[2].MetaData
+    assert steps[3].RoundTrips == 1 and steps[3].Transaction == "VA01"
+    # GuiSessionInfo.RoundTrips is 1 after each of the last two dialog steps, the screen is still read again
+    assert [x.Transaction for x in steps[4:]] == ["VA01", "VA02", "VA02"]
+    assert steps[6].MetaData is not steps[5].MetaData and steps[6].RoundTrips == steps[5].RoundTrips == 1
+    # the snapshot of the first step (start_transaction VA01 expired it) & three round trips
+    assert sap.meta_data.stats.Reads - reads == 4 * len(VOLATILE_FIELDS) + 3 * len(DIALOG_STEP_FIELDS)
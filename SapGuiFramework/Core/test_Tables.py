@@ -0,0 +1,51 @@
+from Core.Simulator import SapGuiAutomation
+from Core.Tables import ExtractStats, iter_grid_rows, iter_table_control_rows
+
+
+def simulated_session():
+    gui = SapGuiAutomation()
+    return gui, gui.GetScriptingEngine.OpenConnection("DEV").Sessions[0]
+
+
+def test_iter_grid_rows_reads_all_pages():
+    # given
+    gui, session = simulated_session()
+    rows = [[f"{i:06d}", "1000", str(i % 7)] for i in range(95)]
+    grid = session.add_grid("wnd[0]/usr/cntlGRID1/shellcont/shell", ["MATNR", "WERKS", "LABST"], rows, visible_rows=30)
+    stats = ExtractStats()
+
+    # when
+    data = list(iter_grid_rows(grid, stats=stats))
+
+    # then
+    assert len(data) == 95
+    assert data[94] == {"MATNR": "000094", "WERKS": "1000", "LABST": "3"}
+    assert stats.Pages == 4
+    assert stats.Cells == 95 * 3
+    assert gui.stats.ServerRoundTrips - 1 == 3
+
+
+def test_iter_grid_rows_number_rows_scrolls_grid():
+    gui, session = simulated_session()
+    grid = session.add_grid("wnd[0]/usr/cntlGRID1/shellcont/shell", ["VBELN"], [[str(i)] for i in range(200)], visible_rows=25)
+    data = list(iter_grid_rows(grid, number_rows=60))
+    assert [x["VBELN"] for x in data] == [str(i) for i in range(60)]
+    assert grid.FirstVisibleRow == 50
+
+
+def test_iter_table_control_rows_scrolls_and_refinds():
+    # given
+    gui, session = simulated_session()
+    table_id = "wnd[0]/usr/tblSAPDV70ATC_NAST3"
+    session.add_table_control(table_id, ["KSCHL", "PARVW"], [[f"Z{i:03d}", "SH"] for i in range(23)], visible_rows=10)
+    refinds = []
+    def refind():
+        refinds.append(1)
+        return session.findById(table_id)
+
+    # when
+    data = list(iter_table_control_rows(session.findById(table_id), refind=refind))
+
+    # then
+    assert [x["KSCHL"] for x in data] == [f"Z{i:03d}" for i in range(23)]
+    assert len(refinds) == 2
@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from Core.Trace import TracePolicy
+
+
+def test_traced_com_calls_are_attributed_to_steps(tmp_path, new_session):
+    # given
+    gui, sap = new_session(TraceConfig=TracePolicy(Enabled=True))
+    case = sap.case
+    sap.start_transaction("VA01")
+
+    # when
+    gui.stats.reset()
+    sap.set_text("usr/ctxtVBAK-AUART", "OR")
+    step = sap.tracer.current
+    sap.wait(0.01)
+    sap.cleanup()
+
+    # then
+    assert step.Name == "Set Text"
+    assert step.Calls == gui.stats.Calls == sap.case.Steps[-1].ComCalls
+    assert step.ByMember["GuiCTextField.Text"] == 1
+    assert step.Spans["sleep"] >= 0.01
+    trace = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    steps = [x for x in trace["traceEvents"] if x.get("cat") == "step"]
+    assert [x["name"] for x in steps] == ["Open Connection", "Start Transaction", "Set Text"]
+    assert steps[-1]["args"]["com_calls"] == step.Calls
+    assert sum(1 for x in trace["traceEvents"] if x.get("cat") == "com") == trace["otherData"]["com_calls"]
+
+
+def test_loading_a_case_does_not_load_the_simulator():
+    # when
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, Flow.Data, Core.Trace; print(sorted(x for x in sys.modules if x.startswith('Core.')))"],
+        capture_output=True, text=True, check=True, cwd=Path(__file__).parent.parent).stdout
+
+    # then
+    assert "Core.Simulator" not in loaded and "Core.Selection" not in loaded and "Core.Export" not in loaded
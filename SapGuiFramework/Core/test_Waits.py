@@ -0,0 +1,71 @@
+from Core.Simulator import SapGuiAutomation
+from Core.Waits import ReadinessWaiter, WaitMode, WaitPolicy
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_readiness_wait_backs_off_until_ready():
+    # given
+    fake = FakeClock()
+    polls = iter([False, False, False, True])
+    policy = WaitPolicy(InitialDelay=0.01, MaxDelay=0.03, Backoff=2.0)
+    waiter = ReadinessWaiter(policy=policy, ready=lambda: next(polls), sleep=fake.sleep, clock=fake.clock)
+
+    # when
+    ready = waiter.wait()
+
+    # then
+    assert ready
+    assert fake.sleeps == [0.01, 0.02, 0.03]
+    assert waiter.stats.Polls == 4
+    assert round(waiter.stats.WaitedSeconds, 6) == 0.06
+
+
+def test_readiness_wait_times_out_and_fixed_mode_sleeps():
+    fake = FakeClock()
+    waiter = ReadinessWaiter(policy=WaitPolicy(Timeout=1.0, MaxDelay=0.25), ready=lambda: False, sleep=fake.sleep, clock=fake.clock)
+    assert not waiter.wait()
+    assert waiter.stats.Timeouts == 1
+    assert fake.now == 1.0
+    fixed = ReadinessWaiter(policy=WaitPolicy(Mode=WaitMode.FIXED, FixedWait=0.5), sleep=fake.sleep, clock=fake.clock)
+    assert fixed.wait()
+    assert fake.sleeps[-1] == 0.5
+    assert ReadinessWaiter(policy=WaitPolicy(Mode=WaitMode.FIXED), sleep=fake.sleep, clock=fake.clock).wait()
+    assert fake.sleeps[-1] == 0.0
+
+
+def test_session_busy_is_polled_after_round_trip():
+    gui = SapGuiAutomation(busy_time=0.02)
+    session = gui.GetScriptingEngine.OpenConnection("DEV").Sessions[0]
+    waiter = ReadinessWaiter(ready=lambda: not session.Busy)
+    session.StartTransaction("VA01")
+    assert session.Busy
+    assert waiter.wait()
+    assert not session.Busy
+    assert waiter.stats.Polls > 1
+
+
+def test_wait_for_element_records_one_step(new_session):
+    # given
+    _, sap = new_session(gui=SapGuiAutomation(auto_create=False))
+    case = sap.case
+    passed = case.Status.Passed
+
+    # when
+    sap.wait_for_element("wnd[0]", timeout=1.0)
+    sap.wait_for_element("wnd[0]/usr/ctxtMISSING", timeout=0.05)
+
+    # then
+    assert sap.waiter.stats.Polls > 2
+    assert (case.Status.Passed, case.Status.Failed) == (passed + 1, 1)
@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from typing import Optional, Callable, Any
 from Flow.Results import ResultStep
+from Core.Latency import StepLatency
+from Core.Metadata import SessionMetaData
 
 
 @dataclass
@@ -27,6 +29,10 @@ class Step:
     SystemSessionId: Optional[str] = None
     Transaction: Optional[str] = None
     User: Optional[str] = None
+    MetaData: Optional[SessionMetaData] = None
+    Seconds: Optional[float] = None
+    ComCalls: Optional[int] = None
+    Latency: Optional[StepLatency] = None
     
     PyCode: Optional[str] = field(default_factory=str)
     
@@ -57,4 +63,18 @@ class Step:
     
     def run(self) -> Any:
         if isinstance(self.Action, Callable):
-            self.Action(*self.Args, **self.Kwargs)
+            return self.Action(*self.Args, **self.Kwargs)
+
+    @staticmethod
+    def from_dict(data: dict) -> "Step":
+        """
+        Create a Step from a dict using the json data file keys: 
+        action, element_id (or id), args, kwargs, name & description
+        """
+        return Step(
+            Action=data.get("action"),
+            ElementId=data.get("element_id", data.get("id", "")),
+            Args=list(data.get("args", [])),
+            Kwargs=dict(data.get("kwargs", {})),
+            Name=data.get("name", ""),
+            Description=data.get("description", ""))
@@ -0,0 +1,287 @@
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, TextIO
+import csv
+import json
+import sys
+
+
+class Column:
+    """
+    One column of a ColumnStore.
+
+    A column starts categorical: each distinct value is stored once and rows hold a 2 byte code
+    in an array. If the number of distinct values passes category_limit the column is converted to
+    a plain list of interned strings, so repeated values still share one string object.
+    """
+    __slots__ = ("Name", "codes", "categories", "index", "values", "category_limit")
+
+    def __init__(self, name: str, categorical: bool = True, category_limit: int = 65535) -> None:
+        self.Name: str = name
+        self.category_limit: int = min(category_limit, 65535)
+        self.codes: array|None = array("H") if categorical else None
+        self.categories: list|None = [] if categorical else None
+        self.index: dict|None = {} if categorical else None
+        self.values: list|None = None if categorical else []
+
+    @property
+    def is_categorical(self) -> bool:
+        return self.codes is not None
+
+    @staticmethod
+    def _intern(value: Any) -> Any:
+        return sys.intern(value) if type(value) is str else value
+
+    def _to_plain(self) -> None:
+        __categories = [self._intern(x) for x in self.categories]
+        self.values = [__categories[c] for c in self.codes]
+        self.codes = None
+        self.categories = None
+        self.index = None
+
+    def _code(self, value: Any) -> int|None:
+        __code = self.index.get(value)
+        if __code is None:
+            if len(self.categories) >= self.category_limit:
+                return None
+            __code = len(self.categories)
+            self.categories.append(self._intern(value))
+            self.index[value] = __code
+        return __code
+
+    def append(self, value: Any) -> None:
+        if self.codes is not None:
+            __code = self._code(value)
+            if __code is not None:
+                self.codes.append(__code)
+                return
+            self._to_plain()
+        self.values.append(self._intern(value))
+
+    def __getitem__(self, row: int) -> Any:
+        if self.codes is not None:
+            return self.categories[self.codes[row]]
+        return self.values[row]
+
+    def __setitem__(self, row: int, value: Any) -> None:
+        if self.codes is not None:
+            __code = self._code(value)
+            if __code is not None:
+                self.codes[row] = __code
+                return
+            self._to_plain()
+        self.values[row] = self._intern(value)
+
+    def __len__(self) -> int:
+        return len(self.codes) if self.codes is not None else len(self.values)
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.codes is not None:
+            __categories = self.categories
+            return (__categories[c] for c in self.codes)
+        return iter(self.values)
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory used by the column container, excluding the shared string objects.
+        """
+        if self.codes is not None:
+            return self.codes.itemsize * len(self.codes) + sys.getsizeof(self.categories) + sys.getsizeof(self.index)
+        return sys.getsizeof(self.values)
+
+
+class RowView(Mapping):
+    """
+    Lazy dict-like view of one row of a ColumnStore, values are read from the columns on access.
+    """
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "ColumnStore", row: int) -> None:
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, column: str) -> Any:
+        return self._store.column(column)[self._row]
+
+    def __setitem__(self, column: str, value: Any) -> None:
+        self._store.column(column)[self._row] = value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.columns)
+
+    def __len__(self) -> int:
+        return len(self._store.columns)
+
+    def __contains__(self, column: object) -> bool:
+        return column in self._store._columns
+
+    def to_dict(self) -> dict:
+        return {name: column[self._row] for name, column in self._store._columns.items()}
+
+    def __repr__(self) -> str:
+        return f"RowView({self.to_dict()!r})"
+
+
+class ColumnStore(Sequence):
+    """
+    Columnar, array backed storage for Table.Data.
+
+    Behaves like the list of dicts it replaces: len(), indexing, iteration and append(dict) work the
+    same, rows are returned as RowView objects supporting dict style access. Column names are stored
+    once instead of once per row, see Column for the value encoding.
+
+    Keyword Arguments:
+        columns {Optional[Iterable[str]]} -- Column names, taken from the first appended row if None (default: {None})
+        categorical {bool|Iterable[str]} -- True for categorical encoding of all columns, False for none or
+                                            an iterable of the column names to encode (default: {True})
+        category_limit {int} -- Distinct values after which a categorical column is stored as plain values (default: {65535})
+    """
+    def __init__(self, columns: Optional[Iterable[str]] = None, categorical: bool|Iterable[str] = True, category_limit: int = 65535) -> None:
+        self._categorical: bool|set[str] = categorical if isinstance(categorical, bool) else set(categorical)
+        self._category_limit: int = category_limit
+        self._columns: dict[str, Column] = {}
+        self._length: int = 0
+        for name in columns if columns is not None else []:
+            self._add_column(name)
+
+    def _add_column(self, name: str) -> Column:
+        __categorical = self._categorical if isinstance(self._categorical, bool) else name in self._categorical
+        __column = Column(name, categorical=__categorical, category_limit=self._category_limit)
+        for _ in range(self._length):
+            __column.append(None)
+        self._columns[name] = __column
+        return __column
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> Column:
+        return self._columns[name]
+
+    def append(self, row: Mapping) -> None:
+        """
+        Append one row given as a dict (or any mapping) of column name to value.
+        Missing columns are stored as None, unknown columns are added and backfilled with None.
+        """
+        for name in row:
+            if name not in self._columns:
+                self._add_column(name)
+        for name, column in self._columns.items():
+            column.append(row.get(name))
+        self._length += 1
+
+    def extend(self, rows: Iterable[Mapping]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int|slice) -> RowView|list[RowView]:
+        if isinstance(index, slice):
+            return [RowView(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError("ColumnStore index out of range")
+        return RowView(self, index)
+
+    def __iter__(self) -> Iterator[RowView]:
+        return (RowView(self, i) for i in range(self._length))
+
+    def iter_tuples(self) -> Iterator[tuple]:
+        """
+        Iterate rows as tuples in column order without creating row objects.
+        """
+        return zip(*(iter(c) for c in self._columns.values()))
+
+    def to_dicts(self) -> list[dict]:
+        __names = self.columns
+        return [dict(zip(__names, row)) for row in self.iter_tuples()]
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory used by the column containers.
+        """
+        return sum(c.nbytes() for c in self._columns.values())
+
+    # Exports
+    def to_csv(self, target: str|Path|TextIO, delimiter: str = ",", header: bool = True, encoding: str = "utf-8") -> None:
+        """
+        Write the rows as CSV, streaming straight from the columns.
+
+        Arguments:
+            target {str|Path|TextIO} -- Path of the file to write or an open text file
+
+        Keyword Arguments:
+            delimiter {str} -- Field delimiter (default: {","})
+            header {bool} -- Write the column names as first row (default: {True})
+            encoding {str} -- File encoding when target is a path (default: {"utf-8"})
+        """
+        if isinstance(target, (str, Path)):
+            with open(target, "w", newline="", encoding=encoding) as f:
+                self.to_csv(f, delimiter=delimiter, header=header)
+            return
+        __writer = csv.writer(target, delimiter=delimiter)
+        if header:
+            __writer.writerow(self.columns)
+        __writer.writerows(self.iter_tuples())
+
+    def to_jsonl(self, target: str|Path|TextIO, encoding: str = "utf-8") -> None:
+        """
+        Write one JSON object per row (JSON Lines).
+
+        Arguments:
+            target {str|Path|TextIO} -- Path of the file to write or an open text file
+
+        Keyword Arguments:
+            encoding {str} -- File encoding when target is a path (default: {"utf-8"})
+        """
+        if isinstance(target, (str, Path)):
+            with open(target, "w", encoding=encoding) as f:
+                self.to_jsonl(f)
+            return
+        __names = self.columns
+        for row in self.iter_tuples():
+            target.write(json.dumps(dict(zip(__names, row)), ensure_ascii=False))
+            target.write("\n")
+
+    def to_arrow(self) -> Any:
+        """
+        Convert to a pyarrow.Table. Categorical columns become dictionary arrays whose indices
+        reference the code arrays' memory without copying.
+        Requires the optional pyarrow package.
+
+        Returns:
+            pyarrow.Table -- Arrow table with one column per store column
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as err:
+            raise ImportError("pyarrow is required for ColumnStore.to_arrow, install with: pip install pyarrow") from err
+        __arrays = []
+        for column in self._columns.values():
+            if column.is_categorical:
+                __indices = pa.Array.from_buffers(pa.uint16(), len(column.codes), [None, pa.py_buffer(column.codes)])
+                __arrays.append(pa.DictionaryArray.from_arrays(__indices, pa.array(column.categories)))
+            else:
+                __arrays.append(pa.array(column.values))
+        return pa.Table.from_arrays(__arrays, names=self.columns)
+
+    def to_parquet(self, target: str|Path, **kwargs) -> None:
+        """
+        Write the rows to a Parquet file. Requires the optional pyarrow package.
+
+        Arguments:
+            target {str|Path} -- Path of the file to write
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as err:
+            raise ImportError("pyarrow is required for ColumnStore.to_parquet, install with: pip install pyarrow") from err
+        pq.write_table(self.to_arrow(), str(target), **kwargs)
+
+    def __repr__(self) -> str:
+        return f"class ColumnStore<Rows: {self._length}, Columns: {self.columns}>"
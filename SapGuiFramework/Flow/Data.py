@@ -1,16 +1,23 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum, auto
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterable, Iterator, Optional
+import csv
 import xml.etree.ElementTree as ET
 from Core.Utilities import get_main_dir
+from Core.Cache import TableCachePolicy
+from Core.History import HistoryPolicy
+from Core.Trace import TracePolicy
+from Core.Screenshots import ScreenshotPolicy
+from Core.Waits import WaitPolicy
 from Flow.Actions import Step
-from Flow.Results import ResultCase
+from Flow.Columnar import ColumnStore
+from Flow.Results import ResultCase, ResultStep
+from Flow.Sinks import ResultPolicy
 from Logging.Logging import LoggingConfig
 from dotenv import load_dotenv
 import json
-from types import SimpleNamespace
 import os
 
 
@@ -116,6 +123,24 @@ class Case:
     def default_web_wait() -> float:
         return 1.0
     
+    def default_wait_config() -> WaitPolicy:
+        return WaitPolicy()
+    
+    def default_screenshot_config() -> ScreenshotPolicy:
+        return ScreenshotPolicy()
+    
+    def default_result_config() -> ResultPolicy:
+        return ResultPolicy()
+    
+    def default_history_config() -> HistoryPolicy:
+        return HistoryPolicy()
+    
+    def default_trace_config() -> TracePolicy:
+        return TracePolicy()
+    
+    def default_table_cache_config() -> TableCachePolicy:
+        return TableCachePolicy()
+    
     Name: str = field(default_factory=default_name)
     Description: str = field(default_factory=str)
     BusinessProcessOwner: str = field(default_factory=str)
@@ -126,20 +151,28 @@ class Case:
     LogConfig: LoggingConfig = field(default_factory=default_log_config)
     DateFormat: str = field(default_factory=default_date_format)
     ExplicitWait: float = field(default_factory=default_explicit_wait)
+    WaitConfig: WaitPolicy = field(default_factory=default_wait_config)
     CaseType: CaseTypes = field(default_factory=default_case_type)
     
     WebWait: float = field(default_factory=default_web_wait)
     
     ScreenShotOnPass: bool = False
     ScreenShotOnFail: bool = False
+    ScreenshotConfig: ScreenshotPolicy = field(default_factory=default_screenshot_config)
     FailOnError: bool = True
     ExitOnFail: bool = True
     CloseSAPOnCleanup: bool = True
+    CacheElements: bool = True
+    ContinueOnFail: bool = False
     
     Systems: dict = field(default_factory=dict)
     Steps: list[Step] = field(default_factory=list)
     Data: dict = field(default_factory=dict)
     Status: ResultCase = field(default_factory=default_result)
+    ResultConfig: ResultPolicy = field(default_factory=default_result_config)
+    HistoryConfig: HistoryPolicy = field(default_factory=default_history_config)
+    TraceConfig: TracePolicy = field(default_factory=default_trace_config)
+    TableCacheConfig: TableCachePolicy = field(default_factory=default_table_cache_config)
     
     SapMajorVersion: Optional[int] = None
     SapMinorVersion: Optional[int] = None
@@ -147,21 +180,137 @@ class Case:
     SapRevision: Optional[int] = None
 
 
-def load_case_from_excel_file(excel_file: str|Path) -> Case:
+# Extensions read by iter_sheet_rows as csv, anything else is opened as workbook
+CSV_EXTENSIONS: tuple[str, ...] = (".csv", ".txt")
+
+
+def _csv_value(value: str) -> Any:
+    if value.strip() == "":
+        return None
+    if value.strip().upper() in ("TRUE", "FALSE"):
+        return value.strip().upper() == "TRUE"
+    return value
+
+
+def _named_rows(rows: Iterable[Iterable[Any]]) -> Iterator[dict]:
+    __header: list[str]|None = None
+    for row in rows:
+        __values = [None if isinstance(x, str) and x.strip() == "" else x for x in row]
+        if all(x is None for x in __values):
+            continue
+        if __header is None:
+            __header = [str(x).strip() if x is not None else "" for x in __values]
+            continue
+        yield {name: value for name, value in zip(__header, __values) if name and value is not None}
+
+
+def iter_sheet_rows(
+    data_file: str|Path, 
+    sheet: Optional[str] = None, 
+    delimiter: str = ",", 
+    encoding: str = "utf-8-sig"
+    ) -> Iterator[dict]:
     """
-    Load test case data from a excel file.
+    Stream the rows of a workbook (.xlsx, .xlsm) or csv file as dicts keyed by the header row (the first non blank row). 
+    Only one row is held in memory, workbooks are read with openpyxl in read-only mode and csv files line by line.
+    Empty cells are left out of the dicts and blank rows are skipped. Workbook cells keep their type, 
+    csv cells are text except TRUE & FALSE which become bool.
+    Requires the optional openpyxl package for workbooks.
 
     Arguments:
-        data_file {str|Path} -- Path the excel data file
+        data_file {str|Path} -- Path of the workbook or csv file
 
     Keyword Arguments:
-        case {Optional[Case]} -- An existing Case object that will be updated 
-                                from the loaded excel file (default: {None})
+        sheet {Optional[str]} -- Worksheet name, default is the active worksheet (default: {None})
+        delimiter {str} -- Delimiter of csv files (default: {","})
+        encoding {str} -- Encoding of csv files, utf-8-sig also reads the byte order mark Excel writes (default: {"utf-8-sig"})
 
     Returns:
-        Case -- Return the updated Case object.
+        Iterator[dict] -- Column name -> cell value, one dict per row
+    """
+    __path = Path(data_file)
+    if __path.suffix.lower() in CSV_EXTENSIONS:
+        with open(__path, mode="r", newline="", encoding=encoding) as f:
+            yield from _named_rows(map(_csv_value, row) for row in csv.reader(f, delimiter=delimiter))
+        return
+    try:
+        import openpyxl
+    except ImportError as err:
+        raise ImportError("openpyxl is required to read workbooks, install with: pip install openpyxl") from err
+    __workbook = openpyxl.load_workbook(__path, read_only=True, data_only=True)
+    try:
+        __sheet = __workbook[sheet] if sheet is not None else __workbook.active
+        # Read-only sheets trust the dimensions stored in the file, which some writers leave wrong
+        __sheet.reset_dimensions()
+        yield from _named_rows(__sheet.iter_rows(values_only=True))
+    finally:
+        __workbook.close()
+
+
+def load_cases_from_excel_file(
+    excel_file: str|Path, 
+    template: Optional[Case|dict] = None, 
+    sheet: Optional[str] = None, 
+    delimiter: str = ","
+    ) -> Iterator[Case]:
     """
-    raise NotImplementedError
+    Stream the cases of a workbook or csv file, one case per row, see iter_sheet_rows. 
+    Memory stays constant in the number of rows as long as the caller does not keep the cases, e.g. 
+    Core.Runner.SessionRunner.run with keep_runs=False.
+
+    Without a template the columns are the json data file keys (case_name, description, exit_on_fail, ...) and 
+    each row is loaded like a json data file. With a template each row is a parameter set of the template:
+    a dict template (json data) is updated with the row and loaded, a Case template is copied (its steps with a new status) with the row 
+    added to Case.Data and named by the case_name column or <template name>_<row number>.
+
+    Arguments:
+        excel_file {str|Path} -- Path of the workbook or csv file
+
+    Keyword Arguments:
+        template {Optional[Case|dict]} -- Case or json data the rows are parameter sets of (default: {None})
+        sheet {Optional[str]} -- Worksheet name, default is the active worksheet (default: {None})
+        delimiter {str} -- Delimiter of csv files (default: {","})
+
+    Returns:
+        Iterator[Case] -- One new Case per row
+    """
+    for i, row in enumerate(iter_sheet_rows(excel_file, sheet=sheet, delimiter=delimiter), start=1):
+        if template is None:
+            yield load_case(data=row, case=Case())
+        elif isinstance(template, dict):
+            yield load_case(data=template | row, case=Case())
+        else:
+            yield replace(
+                template, 
+                Name=str(row.get("case_name", f"{template.Name}_{i}")), 
+                Data=template.Data | row, 
+                Steps=[replace(x, Status=ResultStep()) for x in template.Steps], 
+                Status=ResultCase())
+
+
+def load_case_from_excel_file(excel_file: str|Path, sheet: Optional[str] = None) -> Case:
+    """
+    Load test case data from the first row of a excel (or csv) file, see load_cases_from_excel_file.
+
+    Arguments:
+        excel_file {str|Path} -- Path the excel data file
+
+    Keyword Arguments:
+        sheet {Optional[str]} -- Worksheet name, default is the active worksheet (default: {None})
+
+    Raises:
+        ValueError -- If the file has no data rows
+
+    Returns:
+        Case -- Return a Case object.
+    """
+    __cases = load_cases_from_excel_file(excel_file, sheet=sheet)
+    try:
+        return next(__cases)
+    except StopIteration:
+        raise ValueError(f"No case rows in {excel_file}") from None
+    finally:
+        __cases.close()
 
 
 def load_case_from_json_file(data_file: str) -> Case:
@@ -174,14 +323,9 @@ def load_case_from_json_file(data_file: str) -> Case:
     Returns:
         Case -- Return a Case object.
     """
-    __case = Case()
-    #Load test case
     with open(file=data_file, mode="r") as f:
-        __case = json.load(fp=f, object_hook=lambda d: SimpleNamespace(**d))
-    return __case
-
-    # __data: dict = json.load(open(data_file, "rb"))
-    # return load_case(data=__data, case=case)
+        __data: dict = json.load(fp=f)
+    return load_case(data=__data, case=Case())
 
 
 def load_case(data: dict, case: Case) -> Case:
@@ -205,7 +349,7 @@ def load_case(data: dict, case: Case) -> Case:
     elif "case_name" in os.environ:
         _case.Name = os.getenv(os.getenv("case_name"))
     else:
-        _case.Name = f"test_{datetime.datetime.now().strftime('%m%d%Y_%H%M%S')}"
+        _case.Name = f"test_{datetime.now().strftime('%m%d%Y_%H%M%S')}"
     if "description" in __data:
         _case.Description = __data.get("description")
     elif "description" in os.environ:
@@ -245,9 +389,13 @@ def load_case(data: dict, case: Case) -> Case:
     if "explicit_wait" in __data:
         _case.ExplicitWait = __data.get("explicit_wait")
     elif "explicit_wait" in os.environ:
-        _case.ExplicitWait = os.getenv(os.getenv("explicit_wait"))
+        _case.ExplicitWait = float(os.getenv("explicit_wait"))
     else:
         _case.ExplicitWait = 0.25
+    if "wait_policy" in __data:
+        _case.WaitConfig = WaitPolicy.from_dict(__data.get("wait_policy"))
+    else:
+        _case.WaitConfig = WaitPolicy()
     if "web_wait" in __data:
         _case.WebWait = __data.get("web_wait")
     elif "explicit_wait" in os.environ:
@@ -266,6 +414,26 @@ def load_case(data: dict, case: Case) -> Case:
         _case.ScreenShotOnFail = os.getenv(os.getenv("screenshot_on_fail"))
     else:
         _case.ScreenShotOnFail = False
+    if "screenshots" in __data:
+        _case.ScreenshotConfig = ScreenshotPolicy.from_dict(__data.get("screenshots"))
+    else:
+        _case.ScreenshotConfig = ScreenshotPolicy()
+    if "results" in __data:
+        _case.ResultConfig = ResultPolicy.from_dict(__data.get("results"))
+    else:
+        _case.ResultConfig = ResultPolicy()
+    if "history" in __data:
+        _case.HistoryConfig = HistoryPolicy.from_dict(__data.get("history"))
+    else:
+        _case.HistoryConfig = HistoryPolicy()
+    if "trace" in __data:
+        _case.TraceConfig = TracePolicy.from_dict(__data.get("trace"))
+    else:
+        _case.TraceConfig = TracePolicy()
+    if "table_cache" in __data:
+        _case.TableCacheConfig = TableCachePolicy.from_dict(__data.get("table_cache"))
+    else:
+        _case.TableCacheConfig = TableCachePolicy()
     if "fail_on_error" in __data:
         _case.FailOnError = __data.get("fail_on_error")
     elif "fail_on_error" in os.environ:
@@ -284,6 +452,20 @@ def load_case(data: dict, case: Case) -> Case:
         _case.CloseSAPOnCleanup = os.getenv(os.getenv("close_sap_on_cleanup"))
     else:
         _case.CloseSAPOnCleanup = True
+    if "cache_elements" in __data:
+        _case.CacheElements = __data.get("cache_elements")
+    elif "cache_elements" in os.environ:
+        _case.CacheElements = os.getenv("cache_elements").lower() in ("1", "true", "yes")
+    else:
+        _case.CacheElements = True
+    if "continue_on_fail" in __data:
+        _case.ContinueOnFail = __data.get("continue_on_fail")
+    elif "continue_on_fail" in os.environ:
+        _case.ContinueOnFail = os.getenv("continue_on_fail").lower() in ("1", "true", "yes")
+    else:
+        _case.ContinueOnFail = False
+    if "steps" in __data:
+        _case.Steps = [Step.from_dict(x) for x in __data.get("steps")]
     if "system" in __data:
         _case.System = __data.get("system")
     elif "system" in os.environ:
@@ -309,6 +491,75 @@ VKEYS = ["ENTER", "F1", "F2", "F3", "F4", "F5", "F6", "F7", "F8", "F9", "F10", "
     "CTRL+X", "CTRL+C", "CTRL+V", "SHIFT+F10", None, None, "CTRL+#"]
 
 
+# Alternative spellings of key names accepted by vkey_number
+VKEY_ALIASES: dict[str, str] = {
+    "CONTROL": "CTRL", "STRG": "CTRL", "DELETE": "DEL", "INSERT": "INS", "ESCAPE": "ESC", "RETURN": "ENTER",
+    "PGUP": "PAGEUP", "PGDN": "PAGEDOWN", "PAGEDN": "PAGEDOWN", "BKSP": "BACKSPACE"}
+# Modifiers in the order they appear in VKEYS, e.g. CTRL+SHIFT+F1
+VKEY_MODIFIERS: tuple[str, ...] = ("CTRL", "SHIFT", "ALT")
+# Key combination -> vkey number, including the second combination of vkeys 11 (Ctrl + S) & 12 (Esc)
+VKEY_NUMBERS: dict[str, int] = {name: i for i, name in enumerate(VKEYS) if name is not None} | {"CTRL+S": 11, "ESC": 12}
+# Vkey number -> key combination as listed in VKEYS
+VKEY_NAMES: dict[int, str] = {i: name for i, name in enumerate(VKEYS) if name is not None}
+
+
+def normalize_vkey(vkey: str) -> str:
+    """
+    Normalize a key combination to the VKEYS spelling: upper case, no spaces, aliases replaced
+    and modifiers in CTRL, SHIFT, ALT order, e.g. "Shift + Control + f1" -> "CTRL+SHIFT+F1".
+    """
+    __keys = [VKEY_ALIASES.get(x, x) for x in vkey.upper().replace(" ", "").split("+")]
+    if len(__keys) > 2:
+        __keys = sorted(__keys[:-1], key=lambda x: VKEY_MODIFIERS.index(x) if x in VKEY_MODIFIERS else len(VKEY_MODIFIERS)) + __keys[-1:]
+    return "+".join(__keys)
+
+
+# Every spelling looked up once is remembered, so repeated lookups are a single dict access
+_VKEY_LOOKUP: dict[str, int] = dict(VKEY_NUMBERS)
+
+
+def vkey_number(vkey: str|int) -> int:
+    """
+    Convert a virtual key combination like "Ctrl + S" to its SAP GUI vkey number, see VKEY_NUMBERS.
+
+    Arguments:
+        vkey {str|int} -- Vkey number or key combination
+
+    Returns:
+        int -- Vkey number
+
+    Raises:
+        ValueError -- If vkey is not a supported key combination or vkey number (VKEY_NAMES)
+    """
+    if type(vkey) is int and vkey in VKEY_NAMES:
+        return vkey
+    __number = _VKEY_LOOKUP.get(vkey)
+    if __number is not None:
+        return __number
+    __vkey = str(vkey).strip()
+    if __vkey.isdigit() and int(__vkey) in VKEY_NAMES:
+        return int(__vkey)
+    __number = VKEY_NUMBERS.get(normalize_vkey(__vkey))
+    if __number is None:
+        raise ValueError(f"Invalid vkey: {vkey}, provide a valid Vkey number or combination")
+    if len(_VKEY_LOOKUP) < 4096:
+        _VKEY_LOOKUP[vkey] = __number
+    return __number
+
+
+def vkey_name(vkey: int) -> str:
+    """
+    Returns the key combination of a vkey number, e.g. 11 -> "F11".
+
+    Raises:
+        ValueError -- If vkey is not a supported vkey number
+    """
+    try:
+        return VKEY_NAMES[vkey]
+    except KeyError:
+        raise ValueError(f"Invalid vkey number: {vkey}") from None
+
+
 class Strings:
     def transaction_does_not_exist(self) -> tuple:
         return (
@@ -346,4 +597,4 @@ class Table:
     VisibleRows: int 
     Columns: list[object]
     Rows: list[object]
-    Data: list[dict]
+    Data: list[dict]|ColumnStore
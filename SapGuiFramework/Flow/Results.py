@@ -1,5 +1,7 @@
+from collections import deque
 from enum import StrEnum, auto
 from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
 
 class Result(StrEnum):
     PASS = auto()
@@ -9,11 +11,50 @@ class Result(StrEnum):
 
 @dataclass
 class ResultCase:    
+    """
+    Result of a case. Passed, Failed & Warned count the recorded steps (see add_step), WARN steps are also passed steps.
+    When streaming to a Flow.Sinks.ResultSink the steps are written to the sink, only the last failed steps are kept
+    in FailedSteps & FailedScreenShots and PassedSteps & PassedScreenShots stay empty, use Sink.result_case() to
+    rebuild the full ResultCase.
+    """
     Result: Result = None
     FailedSteps: list = field(default_factory=list)
     FailedScreenShots: list = field(default_factory=list)
     PassedSteps: list = field(default_factory=list)
     PassedScreenShots: list = field(default_factory=list)
+    Passed: int = 0
+    Failed: int = 0
+    Warned: int = 0
+    Sink: Optional[Any] = field(default=None, repr=False, compare=False)
+
+    def add_step(self, step: Any, screenshot: Optional[Any] = None) -> None:
+        """
+        Record a finished step and its screenshot reference according to the step's Status.Result.
+        """
+        __failed = step.Status.Result == Result.FAIL
+        if __failed:
+            self.Failed += 1
+        elif step.Status.Result == Result.WARN:
+            self.Warned += 1
+        else:
+            self.Passed += 1
+        if self.Sink is not None:
+            self.Sink.write(step, screenshot)
+            if not __failed:
+                return
+        __steps, __screenshots = (self.FailedSteps, self.FailedScreenShots) if __failed else (self.PassedSteps, self.PassedScreenShots)
+        __steps.append(step)
+        if screenshot is not None:
+            __screenshots.append(screenshot)
+
+    def stream_to(self, sink: Any, keep_failures: int = 50) -> None:
+        """
+        Write the steps recorded from now on to sink (a Flow.Sinks.ResultSink) and keep only the last
+        keep_failures failed steps in memory.
+        """
+        self.Sink = sink
+        self.FailedSteps = deque(self.FailedSteps, maxlen=keep_failures)
+        self.FailedScreenShots = deque(self.FailedScreenShots, maxlen=keep_failures)
 
 
 @dataclass
@@ -22,4 +63,29 @@ class ResultStep:
     Error: str = None
     
     def __repr__(self) -> str:
-        return f"class ResultStep<Result: {self.Result.value}, Error: {self.Error}>"
+        return f"class ResultStep<Result: {self.Result.value if self.Result is not None else None}, Error: {self.Error}>"
+
+
+def merge_results(results: Iterable[ResultCase]) -> ResultCase:
+    """
+    Merge the results of several cases into one ResultCase.
+    The merged Result is FAIL if any case or step failed, WARN if any case warned, PASS otherwise and None if there are no results.
+    """
+    __merged = ResultCase()
+    __results = []
+    for result in results:
+        __results.append(result.Result)
+        __merged.Passed += result.Passed
+        __merged.Failed += result.Failed
+        __merged.Warned += result.Warned
+        __merged.FailedSteps.extend(result.FailedSteps)
+        __merged.FailedScreenShots.extend(result.FailedScreenShots)
+        __merged.PassedSteps.extend(result.PassedSteps)
+        __merged.PassedScreenShots.extend(result.PassedScreenShots)
+    if Result.FAIL in __results or len(__merged.FailedSteps) != 0 or __merged.Failed != 0:
+        __merged.Result = Result.FAIL
+    elif Result.WARN in __results:
+        __merged.Result = Result.WARN
+    elif len(__results) != 0:
+        __merged.Result = Result.PASS
+    return __merged
@@ -0,0 +1,303 @@
+from abc import ABC, abstractmethod
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Optional
+import json
+import sqlite3
+import threading
+import uuid
+from Core.Screenshots import ScreenshotRef
+from Flow.Actions import Step
+from Flow.Results import Result, ResultCase, ResultStep
+
+
+# Columns of a step record, in the order of the SQLite table
+RECORD_FIELDS: tuple[str, ...] = (
+    "run", "case", "index", "time", "name", "action", "element_id", "description", "result", "error",
+    "transaction", "program", "screen_number", "round_trips", "screenshot")
+
+
+@dataclass
+class ResultPolicy:
+    """
+    Per-case settings of the streaming result sink.
+
+    Sink "jsonl" appends one JSON object per finished step to Path, "sqlite" inserts it into the steps table
+    of the SQLite database Path, None keeps every step in memory (ResultCase lists & Case.Steps).
+    With a sink only the counters and the last KeepFailures failed steps stay in memory, records are
+    written every FlushEvery steps. Path None uses <LogPath>/results.jsonl or <LogPath>/results.db.
+    """
+    Sink: Optional[str] = None
+    Path: "Optional[Path]" = None
+    KeepFailures: int = 50
+    FlushEvery: int = 100
+
+    @staticmethod
+    def from_dict(data: dict) -> "ResultPolicy":
+        """
+        Create a ResultPolicy from a dict using the json data file keys:
+        sink, path, keep_failures & flush_every
+        """
+        __policy = ResultPolicy()
+        if "sink" in data:
+            __policy.Sink = str(data.get("sink")).lower() if data.get("sink") is not None else None
+        if "path" in data:
+            __policy.Path = Path(data.get("path"))
+        if "keep_failures" in data:
+            __policy.KeepFailures = int(data.get("keep_failures"))
+        if "flush_every" in data:
+            __policy.FlushEvery = int(data.get("flush_every"))
+        return __policy
+
+
+class ResultSink(ABC):
+    """
+    Append-only store of the step results of one run. write() only queues the step, every flush_every steps the
+    queued steps whose screenshot the pipeline has stored are written, the others stay queued so the step never
+    waits for a screenshot. close() waits for the remaining screenshots and writes everything.
+    Every record carries the run id of the sink, so several runs can share one file or database.
+
+    Arguments:
+        path {Path} -- File the records are appended to
+        case_name {str} -- Case name stored with each record
+
+    Keyword Arguments:
+        flush_every {int} -- Steps kept before the records are written (default: {100})
+    """
+    def __init__(self, path: Path, case_name: str, flush_every: int = 100) -> None:
+        self.path: Path = Path(path)
+        self.case_name: str = case_name
+        self.flush_every: int = max(1, flush_every)
+        self.run: str = uuid.uuid4().hex
+        self.count: int = 0
+        self.__pending: list[tuple[int, str, Step, Optional[ScreenshotRef]]] = []
+        self.__lock: threading.Lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, step: Step, screenshot: Optional[ScreenshotRef] = None) -> None:
+        """
+        Queue a finished step and its screenshot reference.
+        """
+        with self.__lock:
+            self.__pending.append((self.count, datetime.now().isoformat(timespec="milliseconds"), step, screenshot))
+            self.count += 1
+            __flush = len(self.__pending) >= self.flush_every
+        if __flush:
+            self.flush()
+
+    def flush(self, wait: bool = False) -> None:
+        """
+        Write the queued steps, in order, up to the first step whose screenshot is not stored yet.
+
+        Keyword Arguments:
+            wait {bool} -- Wait for the screenshots and write all queued steps (default: {False})
+        """
+        with self.__lock:
+            __ready = len(self.__pending)
+            if not wait:
+                __ready = next((i for i, x in enumerate(self.__pending) if x[3] is not None and not x[3].done), __ready)
+            __pending, self.__pending = self.__pending[:__ready], self.__pending[__ready:]
+            if __pending:
+                self._append([self.record(*x) for x in __pending])
+
+    def close(self) -> None:
+        self.flush(wait=True)
+
+    def record(self, index: int, time: str, step: Step, screenshot: Optional[ScreenshotRef]) -> dict:
+        """
+        Returns the record of a step, the step is read when the record is written so changes of its status
+        after write() (e.g. by Core.Engine) are included. Waits for the screenshot if it is not stored yet.
+        """
+        __action = step.Action
+        __screenshot = None
+        if screenshot is not None:
+            screenshot.wait()
+            __screenshot = {
+                "name": screenshot.Name,
+                "digest": screenshot.Digest,
+                "path": str(screenshot.Path) if screenshot.Path is not None else None,
+                "bytes": screenshot.Bytes,
+                "kind": screenshot.Kind,
+                "unchanged": screenshot.Unchanged,
+                "base_digest": screenshot.BaseDigest,
+                "base_path": str(screenshot.BasePath) if screenshot.BasePath is not None else None,
+                "box": list(screenshot.Box) if screenshot.Box is not None else None,
+                "error": screenshot.Error,
+            }
+        return {
+            "run": self.run,
+            "case": self.case_name,
+            "index": index,
+            "time": time,
+            "name": step.Name,
+            "action": getattr(__action, "__name__", __action),
+            "element_id": step.ElementId,
+            "description": step.Description,
+            "result": step.Status.Result.value if step.Status.Result is not None else None,
+            "error": str(step.Status.Error) if step.Status.Error else None,
+            "transaction": step.Transaction,
+            "program": step.Program,
+            "screen_number": step.ScreenNumber,
+            "round_trips": step.RoundTrips,
+            "screenshot": __screenshot,
+        }
+
+    @abstractmethod
+    def _append(self, records: list[dict]) -> None:
+        """
+        Append the records to the store.
+        """
+
+    @abstractmethod
+    def records(self, run: Optional[str] = None) -> Iterator[dict]:
+        """
+        Iterate over the written records of a run, default this sink's run.
+        """
+
+    def result_case(self, run: Optional[str] = None) -> ResultCase:
+        """
+        Rebuild the ResultCase of a run from the written records, e.g. for reporting after the run.
+        """
+        self.flush(wait=True)
+        __case = ResultCase()
+        for record in self.records(run):
+            __step = step_from_record(record)
+            __screenshot = screenshot_from_record(record)
+            __case.add_step(__step, __screenshot)
+        if __case.Failed != 0:
+            __case.Result = Result.FAIL
+        elif __case.Passed + __case.Warned != 0:
+            __case.Result = Result.PASS
+        return __case
+
+
+class JsonLinesSink(ResultSink):
+    """
+    ResultSink appending one JSON object per step to a JSON Lines file.
+    """
+    def _append(self, records: list[dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(x, default=str) + "\n" for x in records))
+
+    def records(self, run: Optional[str] = None) -> Iterator[dict]:
+        __run = run if run is not None else self.run
+        if not self.path.is_file():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                __record = json.loads(line)
+                if __record.get("run") == __run:
+                    yield __record
+
+
+class SqliteSink(ResultSink):
+    """
+    ResultSink inserting the steps into the steps table of a SQLite database.
+    The connection is opened on first use and closed by close(), records() of a closed sink reads with its own
+    connection, closed once the records are read.
+    """
+    def __init__(self, path: Path, case_name: str, flush_every: int = 100) -> None:
+        super().__init__(path, case_name, flush_every)
+        self.__connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            self.__connection = self._connect()
+        return self.__connection
+
+    def _connect(self) -> sqlite3.Connection:
+        __connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        with __connection:
+            __connection.execute(f"CREATE TABLE IF NOT EXISTS steps ({', '.join(_quote(x) for x in RECORD_FIELDS)})")
+            __connection.execute("CREATE INDEX IF NOT EXISTS steps_run ON steps (run)")
+        return __connection
+
+    def _append(self, records: list[dict]) -> None:
+        __columns = ", ".join(_quote(x) for x in RECORD_FIELDS)
+        __values = ", ".join("?" for _ in RECORD_FIELDS)
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO steps ({__columns}) VALUES ({__values})",
+                [tuple(json.dumps(x[k]) if k == "screenshot" else x[k] for k in RECORD_FIELDS) for x in records])
+
+    def records(self, run: Optional[str] = None) -> Iterator[dict]:
+        if self.__connection is not None:
+            yield from self._records(self.__connection, run)
+            return
+        with closing(self._connect()) as __connection:
+            yield from self._records(__connection, run)
+
+    def _records(self, connection: sqlite3.Connection, run: Optional[str]) -> Iterator[dict]:
+        __cursor = connection.execute(
+            f"SELECT {', '.join(_quote(x) for x in RECORD_FIELDS)} FROM steps WHERE run = ? ORDER BY rowid",
+            (run if run is not None else self.run,))
+        for row in __cursor:
+            __record = dict(zip(RECORD_FIELDS, row))
+            __record["screenshot"] = json.loads(__record["screenshot"]) if __record["screenshot"] else None
+            yield __record
+
+    def close(self) -> None:
+        super().close()
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+
+SINKS: dict[str, tuple[type[ResultSink], str]] = {
+    "jsonl": (JsonLinesSink, "results.jsonl"),
+    "sqlite": (SqliteSink, "results.db"),
+}
+
+
+def open_result_sink(policy: ResultPolicy, directory: Path, case_name: str) -> Optional[ResultSink]:
+    """
+    Open the sink configured by policy, None if the policy has no sink.
+
+    Raises:
+        ValueError -- If policy.Sink is not one of SINKS
+    """
+    if policy.Sink is None:
+        return None
+    if policy.Sink not in SINKS:
+        raise ValueError(f"Unknown result sink: {policy.Sink}, expected one of {', '.join(SINKS)}")
+    __sink, __filename = SINKS[policy.Sink]
+    return __sink(policy.Path if policy.Path is not None else Path(directory, __filename), case_name, policy.FlushEvery)
+
+
+def step_from_record(record: dict) -> Step:
+    return Step(
+        Action=record.get("action"),
+        ElementId=record.get("element_id") or "",
+        Name=record.get("name") or "",
+        Description=record.get("description") or "",
+        Transaction=record.get("transaction"),
+        Program=record.get("program"),
+        ScreenNumber=record.get("screen_number"),
+        RoundTrips=record.get("round_trips"),
+        Status=ResultStep(Result=Result(record["result"]) if record.get("result") else None, Error=record.get("error")))
+
+
+def screenshot_from_record(record: dict) -> Optional[ScreenshotRef]:
+    __data: Optional[dict[str, Any]] = record.get("screenshot")
+    if not __data:
+        return None
+    __ref = ScreenshotRef(
+        Name=__data.get("name"),
+        Digest=__data.get("digest"),
+        Path=Path(__data["path"]) if __data.get("path") else None,
+        Bytes=__data.get("bytes") or 0,
+        Error=__data.get("error"),
+        Kind=__data.get("kind") or "full",
+        Unchanged=bool(__data.get("unchanged")),
+        BaseDigest=__data.get("base_digest"),
+        BasePath=Path(__data["base_path"]) if __data.get("base_path") else None,
+        Box=tuple(__data["box"]) if __data.get("box") else None)
+    __ref._done.set()
+    return __ref
+
+
+def _quote(name: str) -> str:
+    return f'"{name}"'
@@ -0,0 +1,41 @@
+import io
+import json
+from Flow.Columnar import ColumnStore
+
+
+def test_column_store_behaves_like_list_of_dicts():
+    # given
+    rows = [{"MATNR": f"{i:06d}", "WERKS": "1000" if i % 2 else "2000"} for i in range(10)]
+    store = ColumnStore(columns=["MATNR", "WERKS"])
+
+    # when
+    store.extend(rows)
+
+    # then
+    assert len(store) == 10
+    assert store[3] == rows[3]
+    assert store[-1]["MATNR"] == "000009"
+    assert [dict(x) for x in store] == rows
+    assert store.to_dicts() == rows
+    assert store.column("WERKS").is_categorical
+
+
+def test_column_store_falls_back_to_plain_values_and_adds_columns():
+    store = ColumnStore(category_limit=4)
+    store.extend({"VBELN": str(i)} for i in range(6))
+    store.append({"VBELN": "6", "POSNR": "10"})
+    store[0]["VBELN"] = "X"
+    assert not store.column("VBELN").is_categorical
+    assert store.columns == ["VBELN", "POSNR"]
+    assert store[0] == {"VBELN": "X", "POSNR": None}
+    assert store[6]["POSNR"] == "10"
+
+
+def test_column_store_exports():
+    store = ColumnStore(columns=["A", "B"])
+    store.extend([{"A": "1", "B": "x,y"}, {"A": "2", "B": "z"}])
+    csv_out, jsonl_out = io.StringIO(), io.StringIO()
+    store.to_csv(csv_out)
+    store.to_jsonl(jsonl_out)
+    assert csv_out.getvalue().splitlines() == ["A,B", '1,"x,y"', "2,z"]
+    assert [json.loads(x) for x in jsonl_out.getvalue().splitlines()] == store.to_dicts()
@@ -1,27 +1,108 @@
+import json
 import os
-from SapGuiFramework.Flow.Data import load_case_from_json_file
+from Flow.Actions import Step
+from Flow.Data import Case, load_case_from_json_file, load_cases_from_excel_file, vkey_name, vkey_number, VKEY_NUMBERS
+import pytest
+import re
 
-def test_load_case_from_json_file():
+def test_load_case_from_json_file(tmp_path):
     # given
-    data_file = os.path.join(os.path.dirname(__file__), 'data', 'test_case.json')
-    expected_case = Case(
-        name='Test Case',
-        steps=[
-            Step(
-                description='Step 1',
-                actions=['Action 1.1', 'Action 1.2'],
-                expected_results=['Expected Result 1.1', 'Expected Result 1.2']
-            ),
-            Step(
-                description='Step 2',
-                actions=['Action 2.1', 'Action 2.2'],
-                expected_results=['Expected Result 2.1', 'Expected Result 2.2']
-            )
-        ]
-    )
+    data_file = tmp_path / "test_case.json"
+    data_file.write_text(json.dumps({
+        "case_name": "Test Case",
+        "description": "Create a standard order",
+        "explicit_wait": 0.5,
+        "exit_on_fail": False,
+        "steps": [
+            {"action": "start_transaction", "args": ["VA01"], "name": "Step 1", "description": "Open VA01"},
+            {"action": "set_text", "id": "usr/ctxtVBAK-AUART", "args": ["OR"], "name": "Step 2"},
+        ],
+    }))
+    expected_steps = [
+        Step(Action="start_transaction", Args=["VA01"], Name="Step 1", Description="Open VA01"),
+        Step(Action="set_text", ElementId="usr/ctxtVBAK-AUART", Args=["OR"], Name="Step 2"),
+    ]
 
     # when
     actual_case = load_case_from_json_file(data_file)
 
     # then
-    assert actual_case == expected_case
\ No newline at end of file
+    assert isinstance(actual_case, Case)
+    assert actual_case.Name == "Test Case"
+    assert actual_case.Description == "Create a standard order"
+    assert actual_case.ExplicitWait == 0.5
+    assert actual_case.ExitOnFail is False
+    assert actual_case.Steps == expected_steps
+
+
+
+@pytest.mark.parametrize("value, expected", [("false", False), ("0", False), ("True", True), ("yes", True)])
+def test_cache_elements_is_parsed_from_environment(tmp_path, monkeypatch, value, expected):
+    # given
+    data_file = tmp_path / "test_case.json"
+    data_file.write_text(json.dumps({"case_name": "Test Case", "steps": []}))
+    monkeypatch.setenv("cache_elements", value)
+
+    # when
+    actual_case = load_case_from_json_file(data_file)
+
+    # then
+    assert actual_case.CacheElements is expected
+
+
+def test_load_cases_from_csv_file_streams_rows(tmp_path):
+    # given
+    data_file = tmp_path / "orders.csv"
+    data_file.write_text("\ufeffcase_name;order_type;material;exit_on_fail\n;;;\norder_1;OR;000123;FALSE\norder_2;RE;;true\n", encoding="utf-8")
+    template = {"description": "Create a standard order", "steps": [{"action": "start_transaction", "args": ["VA01"]}], "material": "M-01"}
+
+    # when
+    cases = load_cases_from_excel_file(data_file, template=template, delimiter=";")
+    first = next(cases)
+    rest = list(cases)
+
+    # then
+    assert (first.Name, first.Description, first.ExitOnFail) == ("order_1", "Create a standard order", False)
+    assert (first.Data["order_type"], first.Data["material"]) == ("OR", "000123")
+    assert [(x.Name, x.Data["material"], x.ExitOnFail) for x in rest] == [("order_2", "M-01", True)]
+    assert rest[0].Steps == first.Steps and rest[0].Steps[0] is not first.Steps[0]
+
+
+def test_load_cases_from_workbook_with_case_template(tmp_path):
+    # given
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Orders")
+    sheet.append(["order_type", "quantity", None])
+    for i in range(1000):
+        sheet.append(["OR", i, "ignored"])
+    workbook.save(tmp_path / "orders.xlsx")
+    template = Case(Name="order", Steps=[Step(Action="start_transaction", Args=["VA01"])], Data={"sales_org": "1000"})
+
+    # when
+    cases = list(load_cases_from_excel_file(tmp_path / "orders.xlsx", template=template, sheet="Orders"))
+
+    # then
+    assert len(cases) == 1000
+    assert (cases[7].Name, cases[7].Data) == ("order_8", {"sales_org": "1000", "order_type": "OR", "quantity": 7})
+    assert cases[0].Steps[0] is not cases[1].Steps[0] and template.Data == {"sales_org": "1000"}
+
+
+def test_vkey_map_matches_vkeys_txt():
+    # given
+    vkeys_file = os.path.join(os.path.dirname(__file__), '..', '..', 'vkeys.txt')
+    with open(vkeys_file) as f:
+        documented = re.findall(r"\*(\d+)\*\s*\|\s*([^|]+?)\s*\|", f.read())
+
+    # then
+    assert len(documented) == len(set(VKEY_NUMBERS.values()))
+    for number, combinations in documented:
+        for combination in combinations.split(" or "):
+            assert vkey_number(combination) == int(number), combination
+        assert vkey_number(vkey_name(int(number))) == int(number)
+
+
+@pytest.mark.parametrize("vkey", ["13", "999", 999, -1, "Ctrl + Z + Q"])
+def test_unknown_vkey_numbers_are_rejected(vkey):
+    with pytest.raises(ValueError):
+        vkey_number(vkey)
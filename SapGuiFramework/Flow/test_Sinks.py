@@ -0,0 +1,66 @@
+import pytest
+from Core.Screenshots import ScreenshotPolicy, ScreenshotRef
+from Flow.Actions import Step
+from Flow.Results import Result, ResultStep
+from Flow.Sinks import JsonLinesSink, ResultPolicy, SqliteSink
+
+
+@pytest.mark.parametrize("sink", ["jsonl", "sqlite"])
+def test_streamed_results_keep_memory_bounded_and_rebuild(tmp_path, new_session, sink):
+    # given
+    _, sap = new_session(ScreenShotOnFail=True, ScreenshotConfig=ScreenshotPolicy(StorePath=tmp_path / "shots"), ResultConfig=ResultPolicy(Sink=sink, KeepFailures=3, FlushEvery=25))
+    case = sap.case
+
+    # when
+    for i in range(200):
+        sap.set_text("usr/ctxtVBAK-AUART", f"OR{i}")
+        if i % 20 == 0:
+            sap.new_step(action="check_order", name=f"Check {i}")
+            sap.step_fail(msg=f"Order {i} not saved", ss_name=f"check_{i}")
+    sap.cleanup()
+
+    # then
+    status = case.Status
+    assert status.Passed > 200 and status.Failed == 10 and status.Result == Result.FAIL
+    assert len(status.PassedSteps) == 0 and len(case.Steps) == 0
+    assert [x.Name for x in status.FailedSteps] == ["Check 140", "Check 160", "Check 180"]
+    rebuilt = status.Sink.result_case()
+    assert (rebuilt.Passed, rebuilt.Failed, rebuilt.Result) == (status.Passed, 10, Result.FAIL)
+    assert rebuilt.FailedSteps[0].Name == "Check 0" and rebuilt.FailedSteps[0].Status.Result == Result.FAIL
+    assert len(rebuilt.FailedScreenShots) == 10 and all(x.Path.is_file() for x in rebuilt.FailedScreenShots)
+    assert any(x.Action == "set_text" and x.Transaction is not None for x in rebuilt.PassedSteps)
+
+
+def test_flush_does_not_wait_for_screenshots(tmp_path):
+    # given
+    sink = JsonLinesSink(tmp_path / "results.jsonl", "case", flush_every=2)
+    pending = ScreenshotRef(Name="slow")
+    steps = [Step(Action="set_text", Name=f"Step {i}", Status=ResultStep(Result=Result.PASS)) for i in range(5)]
+
+    # when
+    sink.write(steps[0])
+    sink.write(steps[1], pending)
+    sink.write(steps[2])
+    sink.write(steps[3])
+    written = [x["name"] for x in sink.records()]
+    pending._done.set()
+    sink.write(steps[4])
+    sink.close()
+
+    # then
+    assert written == ["Step 0"]
+    assert [x["name"] for x in sink.records()] == [f"Step {i}" for i in range(5)]
+
+
+def test_sqlite_records_of_closed_sink_do_not_reopen_it(tmp_path):
+    # given
+    sink = SqliteSink(tmp_path / "results.db", "case")
+    sink.write(Step(Action="set_text", Name="Step 0", Status=ResultStep(Result=Result.PASS)))
+    sink.close()
+
+    # when
+    records = [x["name"] for x in sink.records()]
+
+    # then
+    assert records == ["Step 0"]
+    assert sink._SqliteSink__connection is None
@@ -1,6 +1,34 @@
+import atexit
+import datetime
+import json
 import logging
+import logging.handlers
+import os
+import queue
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Optional
+
+
+# Custom logging levels, available as logging.Logger.shot, .status & .documentation
+SCREENSHOT_LEVELV_NUM = 25
+STATUS_LEVELV_NUM = 55
+DOCUMENTATION_LEVELV_NUM = 60
+
+
+def _add_level(number: int, name: str, method: str) -> None:
+    logging.addLevelName(number, name)
+    def log_at_level(self, message, *args, **kws):
+        if self.isEnabledFor(number):
+            # Yes, logger takes its '*args' as 'args'.
+            self._log(number, message, args, **kws)
+    setattr(logging.Logger, method, log_at_level)
+
+
+_add_level(SCREENSHOT_LEVELV_NUM, "SHOT", "shot")
+_add_level(STATUS_LEVELV_NUM, "STATUS", "status")
+_add_level(DOCUMENTATION_LEVELV_NUM, "DOCUMENTATION", "documentation")
+
 
 @dataclass
 class LoggingConfig:
@@ -22,6 +50,9 @@ class LoggingConfig:
     def default_name_factory() -> str:
         return "SapGuiFramework"
     
+    def default_queue_factory() -> bool:
+        return True
+
     def default_filename_factory() -> Path:
         return Path(
             LoggingConfig.default_filepath_factory(), 
@@ -35,9 +66,73 @@ class LoggingConfig:
     LogFormat: str = field(default_factory=default_format_factory)
     LogFileMode: str = field(default_factory=default_filemode_factory)
     LogStream: bool = field(default_factory=default_stream_factory)
+    LogQueue: bool = field(default_factory=default_queue_factory)
+    LogJsonFilename: Optional[Path] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object per line: time, level, logger, thread, message & exception.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        __entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            __entry["exception"] = record.exc_text
+        return json.dumps(__entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that only merges the arguments into the message on the logging thread,
+    the handlers of the QueueListener format and write the record on the writer thread.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge in place (the message does not change for other handlers) so the arguments are formatted
+        # while they still have the values of the log call, the listener thread only reads the record
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# QueueHandler & QueueListener of each logger name, shared by all Logger instances of that name
+_queues: dict[str, tuple[_QueueHandler, logging.handlers.QueueListener]] = {}
+
+
+def _queue_of(name: str) -> tuple[_QueueHandler, logging.handlers.QueueListener]:
+    if name not in _queues:
+        __queue = queue.Queue(-1)
+        __listener = logging.handlers.QueueListener(__queue, respect_handler_level=True)
+        __listener.start()
+        _queues[name] = (_QueueHandler(__queue), __listener)
+    return _queues[name]
+
+
+@atexit.register
+def _stop_listeners() -> None:
+    """
+    Write the queued records and stop the writer threads, runs after the Session cleanups (atexit is last in, first out).
+    """
+    for __handler, __listener in list(_queues.values()):
+        __listener.stop()
+    _queues.clear()
 
 
 class Logger:
+    """
+    Logger of a case, writing to LogFilename, the console (LogStream) and LogJsonFilename as JSON Lines.
+
+    With LogQueue (default) log calls only put the record on a queue, a QueueListener thread formats and
+    writes it, so file and console I/O never runs on the thread executing the steps. Use flush() to wait
+    until the queued records are written.
+    """
     def __init__(self, config: LoggingConfig) -> None:
         self.log_name = config.LogName
         self.log_path = config.LogPath
@@ -46,48 +141,41 @@ class Logger:
         self.format: str = config.LogFormat
         self.file_mode: str = config.LogFileMode
         self.stream = config.LogStream
+        self.use_queue: bool = config.LogQueue
+        self.json_file: Optional[Path] = config.LogJsonFilename
         self.log: logging.Logger = None
         self.formatter: logging.Formatter = None
         self.file_handler: logging.FileHandler = None
         self.stream_handler: logging.StreamHandler = None
+        self.json_handler: logging.FileHandler = None
+        self.queue_handler: logging.handlers.QueueHandler = None
+        self.listener: logging.handlers.QueueListener = None
         
         if not self.log_file.is_file():
             with open(self.log_file, "w") as f:
                 pass
         
-        # Create custom logging level for screenshots
-        SCREENSHOT_LEVELV_NUM = 25 
-        logging.addLevelName(SCREENSHOT_LEVELV_NUM, "SHOT")
-        def shot(self, message, *args, **kws):
-            if self.isEnabledFor(SCREENSHOT_LEVELV_NUM):
-                # Yes, logger takes its '*args' as 'args'.
-                self._log(SCREENSHOT_LEVELV_NUM, message, args, **kws)
-        logging.Logger.shot = shot
-
-        # Create custom logging level for status
-        STATUS_LEVELV_NUM = 55 
-        logging.addLevelName(STATUS_LEVELV_NUM, "STATUS")
-        def status(self, message, *args, **kws):
-            if self.isEnabledFor(STATUS_LEVELV_NUM):
-                # Yes, logger takes its '*args' as 'args'.
-                self._log(STATUS_LEVELV_NUM, message, args, **kws)
-        logging.Logger.status = status
-
-        # Create custom logging level for documentation
-        DOCUMENTATION_LEVELV_NUM = 60 
-        logging.addLevelName(DOCUMENTATION_LEVELV_NUM, "DOCUMENTATION")
-        def documentation(self, message, *args, **kws):
-            if self.isEnabledFor(DOCUMENTATION_LEVELV_NUM):
-                # Yes, logger takes its '*args' as 'args'.
-                self._log(DOCUMENTATION_LEVELV_NUM, message, args, **kws)
-        logging.Logger.documentation = documentation
-
         self.log = logging.getLogger(self.log_name)
         self.formatter = logging.Formatter(self.format)
-        self.file_handler = logging.FileHandler(self.log_file, mode=self.file_mode)
+        if self.use_queue or self.log_name in _queues:
+            self.queue_handler, self.listener = _queue_of(self.log_name)
+        # Several Logger instances (e.g. one per case in Core.Runner) share the logging.Logger of LogName,
+        # reuse its handlers instead of adding a second handler that would write every record twice.
+        __handlers = list(self.log.handlers) + (list(self.listener.handlers) if self.listener is not None else [])
+        __file_handlers = [
+            h for h in __handlers 
+            if isinstance(h, logging.FileHandler) and h.baseFilename == os.path.abspath(self.log_file)]
+        __stream_handlers = [h for h in __handlers if type(h) is logging.StreamHandler]
+        __json_handlers = [
+            h for h in __handlers 
+            if self.json_file is not None and isinstance(h, logging.FileHandler) and h.baseFilename == os.path.abspath(self.json_file)]
+        self.file_handler = __file_handlers[0] if __file_handlers else logging.FileHandler(self.log_file, mode=self.file_mode)
         self.file_handler.setFormatter(self.formatter)
+        if self.json_file is not None:
+            self.json_handler = __json_handlers[0] if __json_handlers else logging.FileHandler(self.json_file, mode=self.file_mode, encoding="utf-8")
+            self.json_handler.setFormatter(JsonLinesFormatter())
         if self.stream:
-            self.stream_handler = logging.StreamHandler()
+            self.stream_handler = __stream_handlers[0] if __stream_handlers else logging.StreamHandler()
             self.stream_handler.setFormatter(self.formatter)
         match self.verbosity:
             case 5:
@@ -120,6 +208,30 @@ class Logger:
                 self.file_handler.setLevel(25)
                 if self.stream:
                     self.stream_handler.setLevel(90)
-        self.log.addHandler(self.file_handler)
-        if self.stream:
-            self.log.addHandler(self.stream_handler)
+        if self.json_handler is not None:
+            self.json_handler.setLevel(self.file_handler.level)
+        __new_handlers = []
+        if not __file_handlers:
+            __new_handlers.append(self.file_handler)
+        if self.stream and not __stream_handlers:
+            __new_handlers.append(self.stream_handler)
+        if self.json_handler is not None and not __json_handlers:
+            __new_handlers.append(self.json_handler)
+        if self.listener is not None:
+            # the listener reads its handlers tuple for every record, replacing it is thread safe
+            self.listener.handlers = self.listener.handlers + tuple(__new_handlers)
+            if self.queue_handler not in self.log.handlers:
+                self.log.addHandler(self.queue_handler)
+        else:
+            for handler in __new_handlers:
+                self.log.addHandler(handler)
+
+    def flush(self) -> None:
+        """
+        Block until all queued records are written.
+        """
+        if self.listener is not None:
+            self.listener.queue.join()
+        for handler in (self.file_handler, self.stream_handler, self.json_handler):
+            if handler is not None:
+                handler.flush()
@@ -0,0 +1,40 @@
+import json
+import threading
+from Logging.Logging import Logger, LoggingConfig
+
+
+class Probe:
+    def __init__(self) -> None:
+        self.threads = []
+
+    def __repr__(self) -> str:
+        self.threads.append(threading.current_thread().name)
+        return "probe"
+
+
+def test_queue_logger_writes_off_thread_and_formats_lazily(tmp_path):
+    # given
+    config = LoggingConfig(
+        LogName="test_queue_logger",
+        LogPath=tmp_path,
+        LogFilename=tmp_path / "test.log",
+        LogJsonFilename=tmp_path / "test.jsonl",
+        LogVerbosity=3)
+    logger = Logger(config=config)
+    skipped, written = Probe(), Probe()
+
+    # when
+    logger.log.info("%r", skipped)
+    logger.log.shot("%r", written)
+    logger.log.status("Case passed")
+    logger.log.documentation("Opening connection for DEV")
+    logger.flush()
+
+    # then
+    assert skipped.threads == []
+    assert set(written.threads) == {threading.current_thread().name}
+    assert [x.split("|")[1:] for x in (tmp_path / "test.log").read_text().splitlines()] == [
+        ["SHOT", "probe"], ["STATUS", "Case passed"], ["DOCUMENTATION", "Opening connection for DEV"]]
+    entries = [json.loads(x) for x in (tmp_path / "test.jsonl").read_text().splitlines()]
+    assert [x["level"] for x in entries] == ["SHOT", "STATUS", "DOCUMENTATION"]
+    assert Logger(config=config).listener.handlers == logger.listener.handlers
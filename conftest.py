@@ -0,0 +1,36 @@
+import atexit
+import sys
+from pathlib import Path
+from typing import Any, Callable, Optional
+import pytest
+
+# The package modules import each other as top level packages (Core, Flow, Logging).
+sys.path.insert(0, str(Path(__file__).parent / "SapGuiFramework"))
+
+from Core.Framework import Session
+from Core.Simulator import SapGuiAutomation
+from Flow.Data import Case
+from Logging.Logging import Logger, LoggingConfig
+
+
+@pytest.fixture
+def new_session(tmp_path) -> Callable[..., tuple[SapGuiAutomation, Session]]:
+    """
+    Factory of Sessions on a SapGuiAutomation simulator, logging to tmp_path.
+    The Case does not exit on fail or close SAP, its keyword arguments override the defaults.
+    The session is connected to DEV unless connect is False, Session.cleanup is not run at exit.
+    """
+    def factory(gui: Optional[SapGuiAutomation] = None, connect: bool = True, **case: Any) -> tuple[SapGuiAutomation, Session]:
+        __gui = gui if gui is not None else SapGuiAutomation()
+        __case = Case(**{
+            "LogConfig": LoggingConfig(LogPath=tmp_path, LogFilename=tmp_path / "test.log"),
+            "ExitOnFail": False,
+            "CloseSAPOnCleanup": False,
+            **case})
+        __sap = Session(case=__case, sap_gui=__gui)
+        atexit.unregister(__sap.cleanup)
+        __sap.logger = Logger(config=__case.LogConfig)
+        if connect:
+            __sap.open_connection(connection_name="DEV")
+        return __gui, __sap
+    return factory